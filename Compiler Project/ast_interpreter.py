@@ -0,0 +1,118 @@
+"""
+============================================
+OPTIMIZATION SUPPORT: AST INTERPRETER
+CSE 430 - Compiler Design Lab
+============================================
+
+A plain tree-walking interpreter: runs the AST after semantic analysis
+with the same value semantics as the TAC interpreter (ints and floats
+mix freely, int division truncates toward zero, comparisons give 0/1).
+It is the baseline the ahead-of-time Python backend is measured
+against.
+"""
+
+from typing import List
+from parser import (Program, Declaration, Assignment, BinaryOp, Number, FloatNumber,
+                    StringLiteral, Variable, IfStatement, WhileLoop, PrintStatement)
+from tac_interpreter import apply_operator, TACRuntimeError
+
+
+class ASTInterpreter:
+    """Evaluates the AST node by node and counts executed statements"""
+
+    def __init__(self, ast: Program, max_steps: int = 10_000_000):
+        self.ast = ast
+        self.max_steps = max_steps
+        self.variables = {}
+        self.output: List[str] = []
+        self.statements = 0
+
+    def run(self) -> List[str]:
+        self.execute_block(self.ast.statements)
+        return self.output
+
+    def execute_block(self, statements):
+        for statement in statements or []:
+            self.execute(statement)
+
+    def execute(self, node):
+        self.statements += 1
+        if self.statements > self.max_steps:
+            raise TACRuntimeError(f"Step limit of {self.max_steps} exceeded")
+        if isinstance(node, Declaration):
+            if node.value is not None:
+                self.variables[node.var_name] = self.evaluate(node.value)
+        elif isinstance(node, Assignment):
+            self.variables[node.var_name] = self.evaluate(node.expression)
+        elif isinstance(node, PrintStatement):
+            self.output.append(str(self.evaluate(node.expression)))
+        elif isinstance(node, IfStatement):
+            if self.evaluate(node.condition):
+                self.execute_block(node.true_block)
+            else:
+                self.execute_block(node.false_block)
+        elif isinstance(node, WhileLoop):
+            while self.evaluate(node.condition):
+                self.execute_block(node.body)
+        else:
+            raise TACRuntimeError(f"Cannot execute {type(node).__name__}")
+
+    def evaluate(self, node):
+        if isinstance(node, BinaryOp):
+            return apply_operator(self.evaluate(node.left), node.operator,
+                                  self.evaluate(node.right))
+        if isinstance(node, Variable):
+            return self.variables.get(node.name, 0)
+        if isinstance(node, (Number, FloatNumber, StringLiteral)):
+            return node.value
+        raise TACRuntimeError(f"Cannot evaluate {type(node).__name__}")
+
+    def display(self):
+        print(f"\nExecuted {self.statements} statements")
+
+
+# Testing function for the AST interpreter
+def test_ast_interpreter(source_code: str):
+    """Run a program on the AST interpreter"""
+    print("\n" + "="*60)
+    print(" TESTING AST INTERPRETER")
+    print("="*60)
+
+    try:
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+
+        ast = Parser(Lexer(source_code).tokenize()).parse()
+        SemanticAnalyzer().analyze(ast)
+        interpreter = ASTInterpreter(ast)
+        output = interpreter.run()
+        print("\nProgram Output:")
+        print("-" * 50)
+        for line in output:
+            print(line)
+        interpreter.display()
+        print("\n✓ AST Interpretation Successful!")
+        return output
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    int total = 0;
+    while (i < 10) {
+        if (i > 4) {
+            total = total + i * 3;
+        } else {
+            total = total - 1;
+        }
+        i = i + 1;
+    }
+    print(total);
+    """
+
+    test_ast_interpreter(test_code)
@@ -0,0 +1,322 @@
+"""
+============================================
+OPTIMIZATION SUPPORT: LANE-BATCHED EXECUTION
+CSE 430 - Compiler Design Lab
+============================================
+
+Runs one program over many input sets at once (parameter sweeps).
+Every variable is a NumPy array with one lane per input set:
+
+    inputs = {'n': [10, 20, 30]}           n     = [10, 20, 30]
+    while (i < n) { ... }          =>      i < n = [ 1,  1,  0]  (active mask)
+
+- BinaryOps are evaluated as vectorized NumPy operations over all
+  lanes, with the TAC interpreter's semantics (int division truncates
+  toward zero, comparisons give 0/1).
+- Control flow diverges per lane: an if runs its true block under
+  mask & cond and its false block under mask & ~cond; a while keeps
+  iterating the lanes whose condition still holds and stops when every
+  lane has exited.  Assignments only change the active lanes.
+- Top-level declarations of input variables keep the lane's input
+  instead of their initializer, so `int n = 250;` becomes a parameter.
+- Lanes hold 64-bit ints and floats.  If lanes would give one variable
+  different types (an int in one lane, a float in another) or an int
+  result needs more than 63 bits, the batch falls back to running the
+  lanes one by one on the AST interpreter.
+
+NumPy is optional for the rest of the compiler; this module needs it.
+"""
+
+from typing import Dict, List, Sequence
+from parser import (Program, Declaration, Assignment, BinaryOp, Number, FloatNumber,
+                    StringLiteral, Variable, IfStatement, WhileLoop, PrintStatement)
+from tac_interpreter import apply_operator, TACRuntimeError
+from ast_interpreter import ASTInterpreter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class LaneFallback(Exception):
+    """The lanes cannot stay in 64-bit NumPy arrays (mixed types or an
+    int overflow)"""
+
+
+def parameterize(ast: Program, names) -> Program:
+    """Copy of the program whose top-level declarations of the given
+    variables have no initializer (the preset value is kept)"""
+    statements = []
+    for node in ast.statements:
+        if isinstance(node, Declaration) and node.var_name in names:
+            node = Declaration(node.var_type, node.var_name)
+        statements.append(node)
+    return Program(statements)
+
+
+def run_lanes(ast: Program, inputs: Dict[str, Sequence], max_steps: int = 10_000_000) -> List[List[str]]:
+    """Reference: run every lane separately on the AST interpreter"""
+    program = parameterize(ast, inputs)
+    columns = {name: list(values) for name, values in inputs.items()}
+    lanes = len(next(iter(columns.values()))) if columns else 0
+    outputs = []
+    for lane in range(lanes):
+        interpreter = ASTInterpreter(program, max_steps)
+        interpreter.variables = {name: lane_value(values[lane]) for name, values in columns.items()}
+        outputs.append(interpreter.run())
+    return outputs
+
+
+def lane_value(value):
+    """Plain Python value of one input (NumPy scalars unwrapped)"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+class BatchInterpreter:
+    """Walks the AST once for all lanes, masking the inactive ones"""
+
+    def __init__(self, ast: Program, inputs: Dict[str, Sequence], max_steps: int = 10_000_000):
+        if np is None:
+            raise RuntimeError("Batched execution needs NumPy (pip install numpy)")
+        if not inputs:
+            raise ValueError("Batched execution needs at least one input variable")
+        self.inputs = inputs
+        self.ast = parameterize(ast, inputs)
+        self.max_steps = max_steps
+        self.variables = {name: self.column(values) for name, values in inputs.items()}
+        sizes = {len(values) for values in self.variables.values()}
+        if len(sizes) != 1:
+            raise ValueError(f"Input variables have different lane counts: {sorted(sizes)}")
+        self.lanes = sizes.pop()
+        self.outputs: List[List[str]] = [[] for _ in range(self.lanes)]
+        self.counts = np.zeros(self.lanes, dtype=np.int64)   # statements per lane
+        self.steps = 0                                      # vectorized statements
+        self.fallback = None
+
+    def column(self, values):
+        """Lane array of an input: int64, float64 or object (strings)"""
+        array = np.asarray(values)
+        if array.dtype.kind in 'iub':
+            return array.astype(np.int64)
+        if array.dtype.kind == 'f':
+            return array.astype(np.float64)
+        return array.astype(object)
+
+    def run(self) -> List[List[str]]:
+        try:
+            # Inactive lanes may overflow floats harmlessly
+            with np.errstate(all='ignore'):
+                self.execute_block(self.ast.statements, np.ones(self.lanes, dtype=bool))
+        except LaneFallback as reason:
+            self.fallback = str(reason)
+            self.outputs = run_lanes(self.ast, self.inputs, self.max_steps)
+        return self.outputs
+
+    # ---------- statements ----------
+
+    def execute_block(self, statements, mask):
+        for statement in statements or []:
+            self.execute(statement, mask)
+
+    def execute(self, node, mask):
+        self.steps += 1
+        if self.steps > self.max_steps:
+            raise TACRuntimeError(f"Step limit of {self.max_steps} exceeded")
+        self.counts += mask
+        if isinstance(node, Declaration):
+            if node.value is not None:
+                self.assign(node.var_name, self.evaluate(node.value, mask), mask)
+        elif isinstance(node, Assignment):
+            self.assign(node.var_name, self.evaluate(node.expression, mask), mask)
+        elif isinstance(node, PrintStatement):
+            value = self.evaluate(node.expression, mask)
+            if isinstance(value, np.ndarray):
+                values = value.tolist()
+                for lane in np.flatnonzero(mask).tolist():
+                    self.outputs[lane].append(str(values[lane]))
+            else:
+                text = str(value)
+                for lane in np.flatnonzero(mask).tolist():
+                    self.outputs[lane].append(text)
+        elif isinstance(node, IfStatement):
+            condition = self.truth(self.evaluate(node.condition, mask))
+            taken = mask & condition
+            if taken.any():
+                self.execute_block(node.true_block, taken)
+            skipped = mask & ~condition
+            if skipped.any():
+                self.execute_block(node.false_block, skipped)
+        elif isinstance(node, WhileLoop):
+            active = mask
+            while True:
+                active = active & self.truth(self.evaluate(node.condition, active))
+                if not active.any():
+                    break
+                self.execute_block(node.body, active)
+        else:
+            raise TACRuntimeError(f"Cannot execute {type(node).__name__}")
+
+    def assign(self, name: str, value, mask):
+        value = self.broadcast(value)
+        old = self.variables.get(name)
+        if mask.all():
+            self.variables[name] = value
+        elif old is None and value.dtype.kind == 'i':
+            self.variables[name] = np.where(mask, value, 0)
+        elif old is not None and old.dtype == value.dtype:
+            self.variables[name] = np.where(mask, value, old)
+        else:
+            raise LaneFallback(f"'{name}' would hold {value.dtype} in some lanes only")
+
+    # ---------- expressions ----------
+
+    def evaluate(self, node, mask):
+        """A lane array, or a plain Python value when it is the same in every lane"""
+        if isinstance(node, BinaryOp):
+            left = self.evaluate(node.left, mask)
+            right = self.evaluate(node.right, mask)
+            if isinstance(left, np.ndarray) or isinstance(right, np.ndarray):
+                return self.apply(left, node.operator, right, mask)
+            return apply_operator(left, node.operator, right)
+        if isinstance(node, Variable):
+            value = self.variables.get(node.name)
+            return 0 if value is None else value
+        if isinstance(node, (Number, FloatNumber, StringLiteral)):
+            return node.value
+        raise TACRuntimeError(f"Cannot evaluate {type(node).__name__}")
+
+    def apply(self, left, op: str, right, mask):
+        """Vectorized apply_operator; division checks active lanes only"""
+        if op in ARITHMETIC:
+            result = ARITHMETIC[op](left, right)
+            if is_int(left) and is_int(right):
+                # Python ints never overflow; leave the lanes before int64 does
+                wide = ARITHMETIC[op](np.asarray(left, dtype=np.float64), right)
+                if (np.abs(wide) >= 2.0 ** 62).any():
+                    raise LaneFallback("an int result needs more than 63 bits")
+            return result
+        if op == '/':
+            zero = self.broadcast(right == 0)
+            if (zero & mask).any():
+                raise TACRuntimeError("Division by zero")
+            # Inactive lanes may divide by zero; give them a harmless divisor
+            divisor = np.where(zero, 1, right)
+            if is_int(left) and is_int(right):
+                quotient = np.abs(left) // np.abs(divisor)
+                return np.where((np.asarray(left) < 0) == (divisor < 0), quotient, -quotient)
+            return left / divisor
+        if op in COMPARE:
+            return self.broadcast(COMPARE[op](left, right)).astype(np.int64)
+        raise TACRuntimeError(f"Unknown operator '{op}'")
+
+    def broadcast(self, value):
+        """Lane array of a value (a plain value is repeated in every lane)"""
+        if isinstance(value, np.ndarray):
+            if value.shape != (self.lanes,):
+                value = np.broadcast_to(value, (self.lanes,))
+            return value
+        if isinstance(value, bool):
+            return np.full(self.lanes, value)
+        if isinstance(value, int):
+            return np.full(self.lanes, value, dtype=np.int64)
+        if isinstance(value, float):
+            return np.full(self.lanes, value, dtype=np.float64)
+        return np.full(self.lanes, value, dtype=object)
+
+    def truth(self, value):
+        """Per-lane truth of a condition"""
+        if isinstance(value, np.ndarray):
+            return value.astype(bool) if value.dtype == object else value != 0
+        return np.full(self.lanes, bool(value))
+
+    def display(self):
+        print(f"\nLanes: {self.lanes}")
+        if self.fallback:
+            print(f"Ran lane by lane: {self.fallback}")
+            return
+        print(f"Vectorized statements: {self.steps}")
+        print(f"Lane statements: {int(self.counts.sum())} "
+              f"(min {int(self.counts.min())}, max {int(self.counts.max())} per lane)")
+
+
+def is_int(value) -> bool:
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind == 'i'
+    return isinstance(value, int)
+
+
+ARITHMETIC = {
+    '+': lambda left, right: left + right,
+    '-': lambda left, right: left - right,
+    '*': lambda left, right: left * right,
+}
+
+COMPARE = {
+    '<': lambda left, right: left < right,
+    '>': lambda left, right: left > right,
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left != right,
+    '<=': lambda left, right: left <= right,
+    '>=': lambda left, right: left >= right,
+}
+
+
+# Testing function for batched execution
+def test_batch_execution(source_code: str, inputs: Dict[str, Sequence]):
+    """Run a program over all input lanes at once and check every lane
+    against a separate AST interpreter run"""
+    print("\n" + "="*60)
+    print(" TESTING LANE-BATCHED EXECUTION")
+    print("="*60)
+
+    try:
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+
+        ast = Parser(Lexer(source_code).tokenize()).parse()
+        SemanticAnalyzer().analyze(ast)
+        interpreter = BatchInterpreter(ast, inputs)
+        outputs = interpreter.run()
+        print("\nProgram Output (first lanes):")
+        print("-" * 50)
+        for lane, output in enumerate(outputs[:4]):
+            print(f"lane {lane}: {' '.join(output)}")
+        interpreter.display()
+
+        expected = run_lanes(ast, inputs)
+        for lane, (output, reference) in enumerate(zip(outputs, expected)):
+            if output != reference:
+                raise RuntimeError(f"Lane {lane} output {output} differs from the AST interpreter {reference}")
+        print("\nEvery lane matches the AST interpreter")
+        print("\n✓ Batched Execution Successful!")
+        return outputs
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code: n is swept over the lanes, so the loop runs a different
+    # number of times (and takes different branches) in each lane
+    test_code = """
+    int n = 10;
+    int i = 0;
+    int total = 0;
+    float scale = 0.5;
+    while (i < n) {
+        if (i - (i / 3) * 3 == 0) {
+            total = total + i;
+        } else {
+            total = total - 1;
+        }
+        i = i + 1;
+    }
+    print(total);
+    print(total * scale);
+    print(total / 4);
+    print(i > 5);
+    """
+
+    test_batch_execution(test_code, {'n': range(0, 64)})
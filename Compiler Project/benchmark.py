@@ -0,0 +1,410 @@
+"""
+============================================
+BENCHMARKS FOR OPTIMIZATION PASSES
+CSE 430 - Compiler Design Lab
+============================================
+
+Compiles a small corpus of programs and compares passes by what the
+generated code does at runtime, measured with the TAC interpreter and,
+for the x86 backend, the x86 emulator.
+
+    python benchmark.py
+"""
+
+import io
+import time
+import contextlib
+from typing import Dict, Tuple
+
+from lexer import Lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+from intermediate_code import IntermediateCode
+from tac_interpreter import TACInterpreter
+from loop_unroll import LoopUnroller
+from loop_rotation import LoopRotator
+from jump_optimizer import JumpOptimizer
+from code_generator import AssemblyGenerator
+from code_generator_x64 import X64AssemblyGenerator
+from pass_manager import PassManager
+from x86_emulator import X86Emulator
+from bytecode_vm import BytecodeCompiler, VirtualMachine
+from ast_interpreter import ASTInterpreter
+from tiered_execution import TieredInterpreter
+from python_generator import CodeCache, compile_program, load_program
+import batch_execution
+from batch_execution import BatchInterpreter, run_lanes
+
+
+BENCHMARK_CORPUS = {
+    'sum_to_100': """
+        int i = 0;
+        int total = 0;
+        while (i < 100) {
+            total = total + i;
+            i = i + 1;
+        }
+        print(total);
+    """,
+    'small_constant_loop': """
+        int i = 0;
+        int square = 0;
+        while (i < 8) {
+            square = i * i;
+            print(square);
+            i = i + 1;
+        }
+    """,
+    'countdown_by_three': """
+        int n = 90;
+        while (n > 0) {
+            n = n - 3;
+        }
+        print(n);
+    """,
+    'nested_loops': """
+        int i = 0;
+        int total = 0;
+        while (i < 20) {
+            int j = 0;
+            while (j < 20) {
+                total = total + i * j;
+                j = j + 1;
+            }
+            i = i + 1;
+        }
+        print(total);
+    """,
+    'symbolic_bound': """
+        int n = 250;
+        int i = 0;
+        int acc = 1;
+        while (i < n) {
+            acc = acc + i / 3;
+            i = i + 1;
+        }
+        print(acc);
+    """,
+    'branchy_loop': """
+        int i = 0;
+        int evens = 0;
+        int odds = 0;
+        while (i < 60) {
+            if (i - (i / 2) * 2 == 0) {
+                evens = evens + 1;
+            } else {
+                odds = odds + 1;
+            }
+            i = i + 1;
+        }
+        print(evens);
+        print(odds);
+    """,
+    'float_average': """
+        float total = 0.0;
+        int count = 0;
+        while (count < 40) {
+            total = total + 2.5;
+            count = count + 1;
+        }
+        print(total / count);
+    """,
+}
+
+
+# Variable swept by the batched-execution benchmark and its value in
+# each lane (different values give the lanes different trip counts)
+BATCH_SWEEPS = {
+    'sum_to_100': ('total', lambda lane: lane),
+    'small_constant_loop': ('i', lambda lane: lane % 8),
+    'countdown_by_three': ('n', lambda lane: lane % 90),
+    'nested_loops': ('i', lambda lane: lane % 20),
+    'symbolic_bound': ('n', lambda lane: lane % 250),
+    'branchy_loop': ('i', lambda lane: lane % 60),
+    'float_average': ('total', lambda lane: lane * 0.5),
+}
+
+
+def compile_to_tac(source_code: str) -> Tuple[list, object, Dict]:
+    """Run phases 1-4 without their console output"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        tokens = Lexer(source_code).tokenize()
+        ast = Parser(tokens).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        ic_generator = IntermediateCode()
+        tac = ic_generator.generate(ast)
+    return tac, symbol_table, ic_generator.string_literals
+
+
+def run_tac(tac, string_literals) -> TACInterpreter:
+    interpreter = TACInterpreter(tac, string_literals)
+    interpreter.run()
+    return interpreter
+
+
+def benchmark_unrolling(factors=(2, 4, 8)):
+    """Dynamic TAC instruction counts before and after loop unrolling"""
+    print("\n" + "="*70)
+    print(" LOOP UNROLLING: DYNAMIC INSTRUCTION COUNT")
+    print("="*70)
+    header = f"{'Program':<22} {'Baseline':>10}" + "".join(f" {'x' + str(f):>11}" for f in factors)
+    print(header)
+    print("-" * len(header))
+    for name, source in BENCHMARK_CORPUS.items():
+        tac, symbol_table, strings = compile_to_tac(source)
+        baseline = run_tac(tac, strings)
+        row = f"{name:<22} {baseline.instructions:>10}"
+        for factor in factors:
+            unrolled = LoopUnroller(tac, symbol_table, factor=factor).optimize()
+            result = run_tac(unrolled, strings)
+            if result.output != baseline.output:
+                raise RuntimeError(f"{name}: unrolling by {factor} changed the output")
+            change = 100.0 * (result.instructions - baseline.instructions) / baseline.instructions
+            row += f" {result.instructions:>5} {change:+4.0f}%"
+        print(row)
+
+
+def benchmark_rotation():
+    """Executed branches (conditional + unconditional) before and after rotation"""
+    print("\n" + "="*70)
+    print(" LOOP ROTATION: EXECUTED BRANCHES")
+    print("="*70)
+    header = f"{'Program':<22} {'Baseline':>10} {'Rotated':>10} {'Change':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, source in BENCHMARK_CORPUS.items():
+        tac, symbol_table, strings = compile_to_tac(source)
+        baseline = run_tac(tac, strings)
+        rotated = JumpOptimizer(LoopRotator(tac, symbol_table).optimize()).optimize()
+        result = run_tac(rotated, strings)
+        if result.output != baseline.output:
+            raise RuntimeError(f"{name}: rotation changed the output")
+        before = baseline.branches + baseline.jumps
+        after = result.branches + result.jumps
+        print(f"{name:<22} {before:>10} {after:>10} {100.0 * (after - before) / before:>+7.0f}%")
+
+
+def benchmark_peephole():
+    """Static assembly instruction counts before and after the peephole pass"""
+    print("\n" + "="*70)
+    print(" PEEPHOLE OPTIMIZER: ASSEMBLY INSTRUCTIONS")
+    print("="*70)
+    header = f"{'Program':<22} {'Before':>8} {'After':>8} {'Saved':>6}  Rules fired"
+    print(header)
+    print("-" * len(header))
+    for name, source in BENCHMARK_CORPUS.items():
+        tac, symbol_table, strings = compile_to_tac(source)
+        generator = AssemblyGenerator(tac, symbol_table, strings)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator.generate()
+        peephole = generator.peephole
+        saved = peephole.instructions_before - peephole.instructions_after
+        fired = ", ".join(f"{rule} {count}" for rule, count in peephole.fired.items() if count)
+        print(f"{name:<22} {peephole.instructions_before:>8} {peephole.instructions_after:>8} "
+              f"{saved:>6}  {fired or '-'}")
+
+
+def benchmark_scheduling():
+    """Estimated cycles of the x86 and x86-64 code before and after list scheduling"""
+    print("\n" + "="*70)
+    print(" INSTRUCTION SCHEDULING: ESTIMATED CYCLES (STATIC)")
+    print("="*70)
+    header = f"{'Program':<22} {'x86':>8} {'sched':>8} {'x86-64':>8} {'sched':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, source in BENCHMARK_CORPUS.items():
+        tac, symbol_table, strings = compile_to_tac(source)
+        row = f"{name:<22}"
+        for backend, options in ((AssemblyGenerator, {'select_instructions': True}),
+                                 (X64AssemblyGenerator, {})):
+            generator = backend(tac, symbol_table, strings, schedule=True, **options)
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.generate()
+            scheduler = generator.scheduler
+            row += f" {scheduler.cycles_before:>8} {scheduler.cycles_after:>8}"
+        print(row)
+
+
+def benchmark_emulated(levels=('O0', 'O1', 'O2')):
+    """Executed x86 instructions, memory accesses and taken branches of
+    the generated code at each -O level; Instrs leaves out the runtime
+    library, the memory and branch counts include its (equal) share"""
+    print("\n" + "="*70)
+    print(" x86 EMULATOR: DYNAMIC COUNTS BY OPTIMIZATION LEVEL")
+    print("="*70)
+    header = (f"{'Program':<22} {'Level':>5} {'Instrs':>8} {'Runtime':>8} "
+              f"{'Reads':>7} {'Writes':>7} {'Taken':>7}")
+    print(header)
+    print("-" * len(header))
+    for name, source in BENCHMARK_CORPUS.items():
+        tac, symbol_table, strings = compile_to_tac(source)
+        outputs = set()
+        for level in levels:
+            manager = PassManager(level, symbol_table, strings)
+            generator = AssemblyGenerator(manager.run(tac), symbol_table, strings,
+                                          **manager.codegen_options())
+            with contextlib.redirect_stdout(io.StringIO()):
+                assembly = generator.generate()
+            emulator = X86Emulator(assembly)
+            outputs.add(tuple(emulator.run()))
+            print(f"{name:<22} {'-' + level:>5} {emulator.program_instructions:>8} "
+                  f"{emulator.instructions - emulator.program_instructions:>8} "
+                  f"{emulator.memory_reads:>7} {emulator.memory_writes:>7} {emulator.taken_branches:>7}")
+        if len(outputs) != 1:
+            raise RuntimeError(f"{name}: the output changes between optimization levels")
+
+
+def instructions_per_second(make_runner, min_time: float = 0.2) -> Tuple[float, object]:
+    """Run fresh runners until min_time has passed; (instructions/s, last runner)"""
+    executed, elapsed = 0, 0.0
+    while elapsed < min_time:
+        runner = make_runner()
+        start = time.perf_counter()
+        runner.run()
+        elapsed += time.perf_counter() - start
+        executed += runner.instructions
+    return executed / elapsed, runner
+
+
+def benchmark_vm():
+    """Instructions per second: TAC interpreter vs. register bytecode VM"""
+    print("\n" + "="*70)
+    print(" REGISTER BYTECODE VM: INSTRUCTIONS PER SECOND")
+    print("="*70)
+    header = f"{'Program':<22} {'Instrs':>8} {'TAC (M/s)':>10} {'VM (M/s)':>10} {'Speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, source in BENCHMARK_CORPUS.items():
+        tac, symbol_table, strings = compile_to_tac(source)
+        program = BytecodeCompiler(tac, symbol_table, strings).assemble()
+        tac_rate, interpreter = instructions_per_second(lambda: TACInterpreter(tac, strings))
+        vm_rate, vm = instructions_per_second(lambda: VirtualMachine(program))
+        if vm.output != interpreter.output:
+            raise RuntimeError(f"{name}: the VM output differs from the TAC interpreter")
+        print(f"{name:<22} {vm.instructions:>8} {tac_rate / 1e6:>10.2f} {vm_rate / 1e6:>10.2f} "
+              f"{vm_rate / tac_rate:>7.1f}x")
+
+
+def seconds_per_call(function, min_time: float = 0.2) -> float:
+    """Average wall time of function() over at least min_time seconds"""
+    calls, elapsed = 0, 0.0
+    while elapsed < min_time:
+        start = time.perf_counter()
+        function()
+        elapsed += time.perf_counter() - start
+        calls += 1
+    return elapsed / calls
+
+
+def benchmark_aot():
+    """Run time of the tree-walking AST interpreter vs. programs compiled
+    ahead of time to CPython code objects"""
+    print("\n" + "="*70)
+    print(" AHEAD-OF-TIME PYTHON CODE OBJECTS VS. AST INTERPRETER")
+    print("="*70)
+    header = (f"{'Program':<22} {'AST (us)':>10} {'AOT (us)':>10} {'Speedup':>8} "
+              f"{'Compile (us)':>13} {'Cached (us)':>12}")
+    print(header)
+    print("-" * len(header))
+    for name, source in BENCHMARK_CORPUS.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            ast = Parser(Lexer(source).tokenize()).parse()
+            SemanticAnalyzer().analyze(ast)
+        cache = CodeCache()
+        compile_time = seconds_per_call(lambda: compile_program(source), 0.05)
+        code = compile_program(source, cache)
+        cached_time = seconds_per_call(lambda: compile_program(source, cache), 0.05)
+        program = load_program(code)
+        output = []
+        program(output.append)
+        if output != ASTInterpreter(ast).run():
+            raise RuntimeError(f"{name}: the compiled program output differs")
+        ast_time = seconds_per_call(lambda: ASTInterpreter(ast).run())
+        aot_time = seconds_per_call(lambda: program([].append))
+        print(f"{name:<22} {ast_time * 1e6:>10.1f} {aot_time * 1e6:>10.1f} "
+              f"{ast_time / aot_time:>7.1f}x {compile_time * 1e6:>13.0f} {cached_time * 1e6:>12.1f}")
+
+
+def benchmark_tiered(threshold: int = 20):
+    """Run time of the AST interpreter vs. tiered execution, compiling
+    every trace (cold) or reusing cached trace code (warm), with the tier
+    transitions of each program"""
+    print("\n" + "="*70)
+    print(f" TIERED EXECUTION (HOT LOOPS TRACED AFTER {threshold} BACK EDGES)")
+    print("="*70)
+    header = (f"{'Program':<22} {'AST (us)':>9} {'Cold (us)':>10} {'Warm (us)':>10} "
+              f"{'Speedup':>8} {'Compiled':>9} {'Traced':>7} {'Exits':>6}")
+    print(header)
+    print("-" * len(header))
+    for name, source in BENCHMARK_CORPUS.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            ast = Parser(Lexer(source).tokenize()).parse()
+            SemanticAnalyzer().analyze(ast)
+        tiered = TieredInterpreter(ast, threshold)
+        if tiered.run() != ASTInterpreter(ast).run():
+            raise RuntimeError(f"{name}: tiered execution changed the output")
+        profiles = tiered.profiles.values()
+        ast_time = seconds_per_call(lambda: ASTInterpreter(ast).run())
+        cold_time = seconds_per_call(lambda: TieredInterpreter(ast, threshold).run())
+        # Warm: trace code objects cached from earlier runs
+        cache = CodeCache()
+        warm_time = seconds_per_call(lambda: TieredInterpreter(ast, threshold, cache=cache).run())
+        print(f"{name:<22} {ast_time * 1e6:>9.1f} {cold_time * 1e6:>10.1f} {warm_time * 1e6:>10.1f} "
+              f"{ast_time / warm_time:>7.1f}x "
+              f"{sum(1 for p in profiles if p.compiles):>4}/{len(profiles):<4} "
+              f"{sum(p.trace_iterations for p in profiles):>7} {sum(p.side_exits for p in profiles):>6}")
+
+
+def benchmark_batched(lanes: int = 1000, scaling=(1, 10, 100, 1000, 10000)):
+    """Parameter sweeps: every lane run one by one on the AST interpreter
+    vs. all lanes at once in NumPy arrays"""
+    print("\n" + "="*70)
+    print(f" LANE-BATCHED EXECUTION ({lanes} LANES) VS. ONE RUN PER LANE")
+    print("="*70)
+    if batch_execution.np is None:
+        print("NumPy is not installed; skipping")
+        return
+    header = (f"{'Program':<22} {'Sweep':>6} {'One by one (ms)':>16} {'Batched (ms)':>13} "
+              f"{'Speedup':>8} {'Lanes/s':>10}")
+    print(header)
+    print("-" * len(header))
+    asts = {}
+    for name, source in BENCHMARK_CORPUS.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            ast = Parser(Lexer(source).tokenize()).parse()
+            SemanticAnalyzer().analyze(ast)
+        asts[name] = ast
+        variable, value = BATCH_SWEEPS[name]
+        inputs = {variable: [value(lane) for lane in range(lanes)]}
+        if BatchInterpreter(ast, inputs).run() != run_lanes(ast, inputs):
+            raise RuntimeError(f"{name}: batched execution changed the output")
+        single_time = seconds_per_call(lambda: run_lanes(ast, inputs), 0.05)
+        batched_time = seconds_per_call(lambda: BatchInterpreter(ast, inputs).run())
+        print(f"{name:<22} {variable:>6} {single_time * 1e3:>16.1f} {batched_time * 1e3:>13.2f} "
+              f"{single_time / batched_time:>7.1f}x {lanes / batched_time:>10.0f}")
+
+    # Vectorizing only pays off once there are enough lanes; each batch
+    # spreads the same range of n over its lanes
+    name = 'symbolic_bound'
+    print(f"\n{name}, lanes/s by batch size:")
+    header = f"{'Lanes':>7} {'One by one':>11} {'Batched':>10} {'Speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    for count in scaling:
+        inputs = {'n': [(lane + 1) * 250 // count for lane in range(count)]}
+        sample = {'n': inputs['n'][::max(1, count // 1000)]}
+        single_rate = len(sample['n']) / seconds_per_call(lambda: run_lanes(asts[name], sample), 0.05)
+        batched_rate = count / seconds_per_call(lambda: BatchInterpreter(asts[name], inputs).run(), 0.05)
+        print(f"{count:>7} {single_rate:>11.0f} {batched_rate:>10.0f} {batched_rate / single_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark_unrolling()
+    benchmark_rotation()
+    benchmark_peephole()
+    benchmark_scheduling()
+    benchmark_emulated()
+    benchmark_vm()
+    benchmark_aot()
+    benchmark_tiered()
+    benchmark_batched()
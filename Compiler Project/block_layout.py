@@ -0,0 +1,470 @@
+"""
+============================================
+OPTIMIZATION: PROFILE-GUIDED BLOCK LAYOUT
+CSE 430 - Compiler Design Lab
+============================================
+
+IntermediateCode lays blocks out in source order, so a rarely taken
+`else` sits inside hot loop code and the common path pays taken
+branches.  Profile-guided optimization (PGO) fixes the layout from a
+training run:
+
+    python compiler_test.py --profile-generate=prog.profile program.txt
+    python compiler_test.py -O2 --profile-use=prog.profile program.txt
+
+- BlockProfiler runs the unoptimized TAC (TAC interpreter semantics)
+  and counts how often every block runs, how often every conditional
+  branch is taken, and how often every loop is entered and iterates.
+- Blocks are keyed by stable IDs: the label that starts them, 'entry',
+  or the label before them plus '+n' for a block starting after a
+  jump.  IntermediateCode numbers labels in source order, so the IDs
+  are the same on every compile of the same program; the profile file
+  (JSON) stores a checksum of that TAC and is refused for other code.
+- The pass manager carries the ID of each instruction through the
+  passes like source lines (source_map.remap_lines), so copies made by
+  unrolling or rotation keep the counts of the code they copy.
+- BlockLayout runs after the loop passes: it chains blocks along their
+  hottest edges (Pettis-Hansen), so the likely successor of a branch
+  falls through, and places chains in source order with never-executed
+  chains last.  Back edges are chained last, so a loop stays closed by
+  its bottom test.  Branches are inverted and gotos added where a
+  successor moved; jump threading then removes what is left over.
+
+        L0: if_false i == 50 goto L2      L0: if_true i == 50 goto L4
+            print str0                        t0 = total + i
+            goto L3                           total = t0
+        L2: t0 = total + i                L3: i = i + 1
+            total = t0            =>          if_true i < 100 goto L0
+        L3: i = i + 1                         print total
+            if_true i < 100 goto L0           goto L5
+            print total                   L4: print str0
+                                              goto L3
+                                          L5:
+
+- The loop counts also feed LoopUnroller: loops that never ran are not
+  unrolled, and a loop whose trip count is unknown at compile time is
+  only partially unrolled when its profiled average trip count reaches
+  the unroll factor.
+"""
+
+import json
+import hashlib
+from collections import Counter
+from typing import List, Dict, Optional
+from control_flow import (ControlFlowGraph, is_label, label_name, is_goto, is_jump,
+                          is_conditional_jump, jump_target, retarget_jump, next_label_index)
+from jump_optimizer import INVERTED_BRANCH
+from tac_interpreter import TACInterpreter, TACRuntimeError, apply_operator
+from source_map import shape
+
+PROFILE_VERSION = 1
+
+
+def block_ids(tac: List[str]) -> List[str]:
+    """Stable ID of the basic block of every TAC instruction"""
+    ids = []
+    label, current, count = 'entry', 'entry', 0
+    after_jump = False
+    for instruction in tac:
+        if is_label(instruction):
+            label = current = label_name(instruction)
+            count = 0
+        elif after_jump:
+            count += 1
+            current = f"{label}+{count}"
+        after_jump = is_jump(instruction)
+        ids.append(current)
+    return ids
+
+
+def checksum(tac: List[str]) -> str:
+    return hashlib.sha1("\n".join(tac).encode()).hexdigest()[:16]
+
+
+def condition_of(branch: str) -> str:
+    """Condition of a conditional jump, temporaries renamed away"""
+    return shape(" ".join(branch.split()[1:-2]))
+
+
+class Profile:
+    """Block, branch and loop counts of a training run, by block ID"""
+
+    def __init__(self, checksum: str, blocks: Dict[str, int] = None,
+                 branches: Dict[str, dict] = None, loops: Dict[str, list] = None):
+        self.checksum = checksum
+        self.blocks = blocks or {}          # block ID -> times run
+        self.branches = branches or {}      # block ID -> {'branch', 'taken', 'not_taken'}
+        self.loops = loops or {}            # header ID -> [entries, iterations]
+
+    def matches(self, tac: List[str]) -> bool:
+        """Was the profile recorded for this (unoptimized) TAC?"""
+        return self.checksum == checksum(tac)
+
+    def true_probability(self, block_id: str, branch: str) -> Optional[float]:
+        """How often the condition of `branch` held in the training run, when
+        the branch it was profiled as tests the same condition"""
+        record = self.branches.get(block_id)
+        if record is None or condition_of(record['branch']) != condition_of(branch):
+            return None
+        total = record['taken'] + record['not_taken']
+        if total == 0:
+            return None
+        taken = record['taken'] / total
+        return taken if record['branch'].startswith('if_true') else 1 - taken
+
+    def to_dict(self) -> Dict:
+        return {'version': PROFILE_VERSION, 'checksum': self.checksum, 'blocks': self.blocks,
+                'branches': self.branches, 'loops': self.loops}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Profile':
+        if data.get('version') != PROFILE_VERSION:
+            raise ValueError(f"Unsupported profile version {data.get('version')}")
+        return cls(data['checksum'], data['blocks'], data['branches'],
+                   {header: list(counts) for header, counts in data['loops'].items()})
+
+    def save(self, path: str):
+        with open(path, 'w') as output:
+            json.dump(self.to_dict(), output, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> 'Profile':
+        with open(path) as source:
+            return cls.from_dict(json.load(source))
+
+
+class BlockProfiler(TACInterpreter):
+    """TACInterpreter that counts blocks, branch outcomes and loop trips"""
+
+    def __init__(self, tac: List[str], string_literals: Dict = None, max_steps: int = 10_000_000):
+        super().__init__(tac, string_literals, max_steps)
+        self.ids = block_ids(tac)
+        self.block_counts = Counter()
+        self.taken = Counter()
+        self.not_taken = Counter()
+        self.loop_counts = {}       # header position -> [entries, iterations]
+
+    def run(self) -> List[str]:
+        """TACInterpreter.run, counting on the way"""
+        tac, ids = self.tac, self.ids
+        labels = {label_name(instr): i for i, instr in enumerate(tac) if is_label(instr)}
+        starts = {i for i in range(len(tac)) if i == 0 or ids[i] != ids[i - 1]}
+        # Loop headers: targets of backward jumps
+        for i, instruction in enumerate(tac):
+            if is_jump(instruction) and labels[jump_target(instruction)] <= i:
+                self.loop_counts[labels[jump_target(instruction)]] = [0, 0]
+        pc = 0
+        came_from = -1
+        while pc < len(tac):
+            if pc in starts:
+                self.block_counts[ids[pc]] += 1
+                if pc in self.loop_counts:
+                    # Arriving by a backward jump starts another iteration
+                    self.loop_counts[pc][1 if came_from >= pc else 0] += 1
+            instruction = tac[pc]
+            came_from = pc
+            pc += 1
+            if is_label(instruction):
+                continue
+            self.instructions += 1
+            if self.instructions > self.max_steps:
+                raise TACRuntimeError(f"Step limit of {self.max_steps} exceeded")
+            parts = instruction.split()
+
+            if parts[0] == 'goto':
+                self.jumps += 1
+                pc = labels[parts[1]]
+            elif parts[0] in ('if_false', 'if_true'):
+                if len(parts) == 6:
+                    condition = apply_operator(self.value(parts[1]), parts[2], self.value(parts[3]))
+                else:
+                    condition = self.value(parts[1])
+                self.branches += 1
+                if bool(condition) == (parts[0] == 'if_true'):
+                    self.taken_branches += 1
+                    self.taken[came_from] += 1
+                    pc = labels[parts[-1]]
+                else:
+                    self.not_taken[came_from] += 1
+            elif parts[0] == 'print':
+                self.output.append(str(self.value(parts[1])))
+            elif len(parts) == 3:
+                self.variables[parts[0]] = self.value(parts[2])
+            elif len(parts) == 5:
+                self.variables[parts[0]] = apply_operator(
+                    self.value(parts[2]), parts[3], self.value(parts[4]))
+            else:
+                raise TACRuntimeError(f"Cannot execute '{instruction}'")
+        return self.output
+
+    def profile(self) -> Profile:
+        branches = {}
+        for position, instruction in enumerate(self.tac):
+            if is_conditional_jump(instruction):
+                branches[self.ids[position]] = {'branch': instruction,
+                                                'taken': self.taken[position],
+                                                'not_taken': self.not_taken[position]}
+        loops = {self.ids[position]: counts for position, counts in self.loop_counts.items()}
+        return Profile(checksum(self.tac), dict(self.block_counts), branches, loops)
+
+    def display(self):
+        print(f"\nProfile: {len(self.block_counts)} blocks run, {self.branches} branches "
+              f"({self.taken_branches} taken), {len(self.loop_counts)} loops")
+        for header, (entries, iterations) in self.profile().loops.items():
+            average = iterations / entries if entries else 0
+            print(f"  loop {header}: entered {entries}x, {iterations} iterations "
+                  f"(average {average:.1f})")
+
+
+class BlockLayout:
+    """Reorders basic blocks so the hot successor of every block falls through"""
+
+    def __init__(self, tac: List[str], profile: Profile, ids: List[Optional[str]]):
+        self.tac = tac
+        self.profile = profile
+        self.ids = ids              # profile block ID of every instruction
+        self.positions = []         # input position of every output instruction, None if new
+        self.chains = 0
+        self.moved = 0
+        self.inverted = 0
+        self.added_jumps = 0
+        self.next_label = 0
+
+    # ---------- weights ----------
+
+    def block_weight(self, block, starts) -> int:
+        """Times the block's first instruction ran in the training run"""
+        return self.profile.blocks.get(self.ids[starts[block]], 0)
+
+    def edge_weights(self, cfg: ControlFlowGraph, block, following, weight, starts):
+        """(successor, estimated count) of the edges leaving block"""
+        last = block.terminator()
+        by_label = cfg.block_map()
+        target = by_label.get(jump_target(last)) if last is not None else None
+        if last is not None and is_goto(last):
+            return [(target, weight[block])] if target is not None else []
+        if target is None or following is None or target is following:
+            edges = [(following or target, weight[block])]
+            return [(successor, count) for successor, count in edges if successor is not None]
+        # Conditional branch: split the block's count by the profiled condition
+        position = starts[block] + (1 if block.label else 0) + len(block.instructions) - 1
+        chance = self.profile.true_probability(self.ids[position], last)
+        if chance is not None:
+            taken = chance if last.startswith('if_true') else 1 - chance
+            return [(target, weight[block] * taken), (following, weight[block] * (1 - taken))]
+        return [(target, min(weight[block], weight[target])),
+                (following, min(weight[block], weight[following]))]
+
+    # ---------- layout ----------
+
+    def fresh_label(self) -> str:
+        label = f"L{self.next_label}"
+        self.next_label += 1
+        return label
+
+    def optimize(self) -> List[str]:
+        if not self.tac:
+            return []
+        cfg = ControlFlowGraph(self.tac)
+        blocks = cfg.blocks
+        self.next_label = next_label_index(self.tac)
+        # Input position of the first entry (label or instruction) of every block
+        starts, position = {}, 0
+        for block in blocks:
+            starts[block] = position
+            position += len(block.instructions) + (1 if block.label else 0)
+        weight = {block: self.block_weight(block, starts) for block in blocks}
+
+        edges = []
+        for index, block in enumerate(blocks):
+            following = blocks[index + 1] if index + 1 < len(blocks) else None
+            for successor, count in self.edge_weights(cfg, block, cfg.fallthrough(block),
+                                                      weight, starts):
+                # Back edges last, so loops stay closed by their bottom test;
+                # ties keep the source order
+                backward = blocks.index(successor) <= index
+                edges.append((backward, -count, 0 if successor is following else 1, index,
+                              blocks.index(successor), block, successor))
+
+        # Chain blocks along the hottest edges first
+        chain_of = {block: [block] for block in blocks}
+        for *_, source, target in sorted(edges, key=lambda edge: edge[:5]):
+            first, second = chain_of[source], chain_of[target]
+            if (target is cfg.entry() or first is second
+                    or first[-1] is not source or second[0] is not target):
+                continue
+            first.extend(second)
+            for block in second:
+                chain_of[block] = first
+
+        chains = []
+        for block in blocks:
+            if chain_of[block] not in chains:
+                chains.append(chain_of[block])
+        self.chains = len(chains)
+        ran = [chain for chain in chains[1:] if any(weight[block] for block in chain)]
+        cold = [chain for chain in chains[1:] if not any(weight[block] for block in chain)]
+        order = [block for chain in [chains[0]] + ran + cold for block in chain]
+        self.moved = sum(1 for old, new in zip(blocks, order) if old is not new)
+        return self.emit(cfg, order, starts)
+
+    def emit(self, cfg: ControlFlowGraph, order, starts) -> List[str]:
+        """TAC for the blocks in their new order, jumps fixed up"""
+        labels = {}
+        for block in order:
+            labels[block] = block.label
+
+        def label_of(block) -> str:
+            if labels[block] is None:
+                labels[block] = self.fresh_label()
+            return labels[block]
+
+        # Block each block ran into in the old layout; None for the end
+        index_of = {block: index for index, block in enumerate(cfg.blocks)}
+        by_label = cfg.block_map()
+        exit_label = None
+        code = []       # (instruction, input position or None), labels added after
+        pending = {}    # block -> code index where its label goes
+        for index, block in enumerate(order):
+            following = order[index + 1] if index + 1 < len(order) else None
+            old_index = index_of[block]
+            old_next = cfg.blocks[old_index + 1] if old_index + 1 < len(cfg.blocks) else None
+            pending[block] = len(code)
+            start = starts[block] + (1 if block.label else 0)
+            for offset, instruction in enumerate(block.instructions):
+                code.append([instruction, start + offset])
+            last = block.terminator()
+            if last is not None and is_goto(last):
+                continue
+            if old_next is following:
+                continue
+            if old_next is None:
+                if exit_label is None:
+                    exit_label = self.fresh_label()
+                destination = exit_label
+            else:
+                destination = label_of(old_next)
+            if (last is not None and following is not None
+                    and by_label.get(jump_target(last)) is following):
+                # The branch target now falls through: branch the other way
+                parts = last.split()
+                parts[0] = INVERTED_BRANCH[parts[0]]
+                code[-1][0] = retarget_jump(" ".join(parts), destination)
+                self.inverted += 1
+            else:
+                code.append([f"goto {destination}", None])
+                self.added_jumps += 1
+
+        tac, self.positions = [], []
+        at_block = {}
+        for block, index in pending.items():
+            at_block.setdefault(index, []).append(block)
+        for index in range(len(code) + 1):
+            for block in at_block.get(index, []):
+                if labels[block] is not None:
+                    tac.append(f"{labels[block]}:")
+                    self.positions.append(starts[block] if block.label else None)
+            if index < len(code):
+                tac.append(code[index][0])
+                self.positions.append(code[index][1])
+        if exit_label is not None:
+            tac.append(f"{exit_label}:")
+            self.positions.append(None)
+        return tac
+
+    def carry(self, values: List) -> List:
+        """Per-instruction values (source lines) for the laid-out TAC; new
+        jumps and labels take the value of the instruction before them"""
+        result = []
+        previous = next((value for value in values if value is not None), None)
+        for position in self.positions:
+            if position is not None:
+                previous = values[position]
+            result.append(previous)
+        return result
+
+    def display(self):
+        print(f"\nBlock layout: {self.chains} chains, {self.moved} blocks moved, "
+              f"{self.inverted} branches inverted, {self.added_jumps} jumps added")
+
+
+# Testing function for profile-guided block layout
+def test_block_layout(source_code: str, opt_level: str = 'O2'):
+    """Profile a program, compile it with and without the profile and
+    compare the branches the x86 code takes in the emulator"""
+    print("\n" + "="*60)
+    print(f" TESTING PROFILE-GUIDED BLOCK LAYOUT (-{opt_level})")
+    print("="*60)
+
+    try:
+        import io
+        import contextlib
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+        from intermediate_code import IntermediateCode
+        from pass_manager import PassManager
+        from code_generator import AssemblyGenerator
+        from x86_emulator import X86Emulator
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            ast = Parser(Lexer(source_code).tokenize()).parse()
+            symbol_table = SemanticAnalyzer().analyze(ast)
+            generator = IntermediateCode()
+            tac = generator.generate(ast)
+
+        profiler = BlockProfiler(tac, generator.string_literals)
+        expected = profiler.run()
+        profiler.display()
+        # The profile goes through its file format
+        profile = Profile.from_dict(json.loads(json.dumps(profiler.profile().to_dict())))
+
+        results = {}
+        for name, used in (('without profile', None), ('with profile', profile)):
+            manager = PassManager(opt_level, symbol_table, generator.string_literals, profile=used)
+            optimized = manager.run(tac)
+            with contextlib.redirect_stdout(io.StringIO()):
+                assembly = AssemblyGenerator(optimized, symbol_table, generator.string_literals,
+                                             **manager.codegen_options()).generate()
+            emulator = X86Emulator(assembly)
+            if emulator.run() != expected:
+                raise RuntimeError(f"Output {name} differs from the TAC interpreter")
+            results[name] = (optimized, emulator)
+
+        optimized, emulator = results['with profile']
+        print("\nOptimized TAC (with profile):")
+        print("-" * 50)
+        for i, instruction in enumerate(optimized, 1):
+            print(f"{i:3d}. {instruction}")
+        print(f"\n{'':<16} {'Instructions':>12} {'Branches':>9} {'Taken':>7} {'Jumps':>7}")
+        for name, (_, run) in results.items():
+            print(f"{name:<16} {run.program_instructions:>12} {run.branches:>9} "
+                  f"{run.taken_branches:>7} {run.opcodes['jmp']:>7}")
+        print("\nOutput matches the TAC interpreter")
+        print("\n✓ Block Layout Successful!")
+        return optimized
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code: the else branch and the print are cold
+    test_code = """
+    int i = 0;
+    int total = 0;
+    while (i < 200) {
+        if (i - (i / 50) * 50 == 0) {
+            print(total);
+        } else {
+            total = total + i;
+        }
+        if (total < 0) {
+            print("overflow");
+        }
+        i = i + 1;
+    }
+    print(total);
+    """
+
+    test_block_layout(test_code)
@@ -0,0 +1,489 @@
+"""
+============================================
+PHASE 5 (ALTERNATIVE): REGISTER BYTECODE VM
+CSE 430 - Compiler Design Lab
+============================================
+
+Assembles TAC into a compact register bytecode and runs it in-process:
+
+    i = i + 1               add   r5, r5, r1        ; r1 = constant 1
+    if_false i < 10 goto L1 jf_lt @9, r5, r2        ; r2 = constant 10
+
+- Every instruction is four unsigned 16-bit words (opcode, a, b, c)
+  stored in an array('H'); jump targets are instruction indexes.
+- Constants live in a separate pool and are copied into the first
+  registers of a preallocated register file, so every operand is a
+  register index.  Variables and temporaries take the registers after
+  them.
+- The VM is a single dispatch loop over the code buffer.
+
+Bytecode files (.mcb) hold a fixed header, the constant pool and the
+code, 8-byte aligned and little-endian, so the code can be used
+straight from a read-only memory map without copying or recompiling:
+
+    offset  0  magic 'MCBC', version u16, flags u16
+            8  registers u32, constants u32, instructions u32
+           20  constant pool offset u32, code offset u32, reserved u32
+           32  constants: tag 'i' (i64) | 'f' (f64) | 's' (u32 length + UTF-8)
+    code offset  instructions * 4 * u16
+"""
+
+import mmap
+import struct
+import sys
+import time
+from array import array
+from typing import List, Dict
+from semantic_analyzer import SymbolTable
+from control_flow import is_int_constant, is_float_constant, is_label, label_name
+
+
+class VMRuntimeError(Exception):
+    pass
+
+
+# Opcodes (fields a, b, c)
+MOVE = 0                                        # R[a] = R[b]
+ADD, SUB, MUL, DIV = 1, 2, 3, 4                 # R[a] = R[b] op R[c]
+LT, GT, EQ, NE, LE, GE = 5, 6, 7, 8, 9, 10      # R[a] = int(R[b] op R[c])
+JMP = 11                                        # goto a
+JF, JT = 12, 13                                 # goto a if R[b] is false / true
+JF_LT, JF_GT, JF_EQ, JF_NE, JF_LE, JF_GE = 14, 15, 16, 17, 18, 19   # goto a unless R[b] op R[c]
+JT_LT, JT_GT, JT_EQ, JT_NE, JT_LE, JT_GE = 20, 21, 22, 23, 24, 25   # goto a if R[b] op R[c]
+PRINT = 26                                      # print R[a]
+HALT = 27
+
+OPCODE_NAMES = ['move', 'add', 'sub', 'mul', 'div', 'lt', 'gt', 'eq', 'ne', 'le', 'ge',
+                'jmp', 'jf', 'jt', 'jf_lt', 'jf_gt', 'jf_eq', 'jf_ne', 'jf_le', 'jf_ge',
+                'jt_lt', 'jt_gt', 'jt_eq', 'jt_ne', 'jt_le', 'jt_ge', 'print', 'halt']
+ARITHMETIC = {'+': ADD, '-': SUB, '*': MUL, '/': DIV}
+COMPARE = {'<': LT, '>': GT, '==': EQ, '!=': NE, '<=': LE, '>=': GE}
+JUMP_FALSE = {'<': JF_LT, '>': JF_GT, '==': JF_EQ, '!=': JF_NE, '<=': JF_LE, '>=': JF_GE}
+JUMP_TRUE = {'<': JT_LT, '>': JT_GT, '==': JT_EQ, '!=': JT_NE, '<=': JT_LE, '>=': JT_GE}
+
+MAGIC = b'MCBC'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIIIII')
+FIELD_LIMIT = 0xFFFF
+
+
+class BytecodeProgram:
+    """Code buffer, constant pool and register file size"""
+
+    def __init__(self, code, constants: List, registers: int, names: Dict[int, str] = None):
+        self.code = code                # array('H') or a memoryview of a mapped file
+        self.constants = constants
+        self.registers = registers
+        self.names = names or {}        # register -> TAC name (not stored in files)
+        self.mapping = None
+
+    @property
+    def instructions(self) -> int:
+        return len(self.code) // 4
+
+    def operand(self, register: int) -> str:
+        if register < len(self.constants):
+            return repr(self.constants[register])
+        return self.names.get(register, f"r{register}")
+
+    def disassemble(self) -> List[str]:
+        lines = []
+        for index in range(self.instructions):
+            op, a, b, c = self.code[4 * index:4 * index + 4]
+            name = OPCODE_NAMES[op]
+            if op == MOVE:
+                fields = [self.operand(a), self.operand(b)]
+            elif op <= GE:
+                fields = [self.operand(a), self.operand(b), self.operand(c)]
+            elif op == JMP:
+                fields = [f"@{a}"]
+            elif op in (JF, JT):
+                fields = [f"@{a}", self.operand(b)]
+            elif op <= JT_GE:
+                fields = [f"@{a}", self.operand(b), self.operand(c)]
+            elif op == PRINT:
+                fields = [self.operand(a)]
+            else:
+                fields = []
+            lines.append(f"{index:4}: {name:<6} {', '.join(fields)}".rstrip())
+        return lines
+
+    # ---------- file format ----------
+
+    def to_bytes(self) -> bytes:
+        pool = bytearray()
+        for value in self.constants:
+            if isinstance(value, str):
+                data = value.encode('utf-8')
+                pool += b's' + struct.pack('<I', len(data)) + data
+            elif isinstance(value, float):
+                pool += b'f' + struct.pack('<d', value)
+            else:
+                if not -2**63 <= value < 2**63:
+                    raise ValueError(f"Constant {value} does not fit in 64 bits")
+                pool += b'i' + struct.pack('<q', value)
+        pool_offset = HEADER.size
+        code_offset = (pool_offset + len(pool) + 7) & ~7
+        code = array('H', self.code)
+        if sys.byteorder != 'little':
+            code.byteswap()
+        header = HEADER.pack(MAGIC, VERSION, 0, self.registers, len(self.constants),
+                             self.instructions, pool_offset, code_offset, 0)
+        return header + bytes(pool) + bytes(code_offset - pool_offset - len(pool)) + code.tobytes()
+
+    def save(self, path: str) -> int:
+        data = self.to_bytes()
+        with open(path, 'wb') as handle:
+            handle.write(data)
+        return len(data)
+
+    @classmethod
+    def load(cls, path: str) -> 'BytecodeProgram':
+        """Map a .mcb file read-only; the code is used in place"""
+        with open(path, 'rb') as handle:
+            mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, registers, count, instructions,
+         pool_offset, code_offset, _) = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC or version != VERSION:
+            mapping.close()
+            raise ValueError(f"{path} is not a version {VERSION} bytecode file")
+        constants = []
+        offset = pool_offset
+        for _ in range(count):
+            tag = mapping[offset:offset + 1]
+            offset += 1
+            if tag == b's':
+                (length,) = struct.unpack_from('<I', mapping, offset)
+                constants.append(mapping[offset + 4:offset + 4 + length].decode('utf-8'))
+                offset += 4 + length
+            elif tag == b'f':
+                constants.append(struct.unpack_from('<d', mapping, offset)[0])
+                offset += 8
+            else:
+                constants.append(struct.unpack_from('<q', mapping, offset)[0])
+                offset += 8
+        if sys.byteorder == 'little':
+            code = memoryview(mapping)[code_offset:code_offset + 8 * instructions].cast('H')
+        else:
+            code = array('H', mapping[code_offset:code_offset + 8 * instructions])
+            code.byteswap()
+        program = cls(code, constants, registers)
+        program.mapping = mapping
+        return program
+
+    def close(self):
+        """Release the memory map of a loaded program"""
+        if self.mapping is not None:
+            if isinstance(self.code, memoryview):
+                self.code.release()
+            self.mapping.close()
+            self.mapping = None
+
+
+class BytecodeCompiler:
+    """Assembles TAC into a BytecodeProgram"""
+
+    def __init__(self, tac: List[str], symbol_table: SymbolTable, string_literals: Dict,
+                 peephole: bool = True, select_instructions: bool = False,
+                 schedule: bool = False):
+        # Machine-level options do not apply to bytecode; they are accepted
+        # so -O level options apply to every target
+        self.tac = tac
+        self.symbol_table = symbol_table
+        self.strings = {label: value for value, label in string_literals.items()}
+        self.constants: Dict[tuple, int] = {}    # (type, repr) -> constant index
+        self.pool: List = []                     # constant values by index
+        self.variables: Dict[str, int] = {}      # name -> variable index
+        self.program = None
+
+    def constant_of(self, name: str):
+        """Python value of a literal operand, or None for a variable"""
+        if is_int_constant(name):
+            return int(name)
+        if is_float_constant(name):
+            return float(name)
+        return self.strings.get(name)
+
+    def collect(self, name: str):
+        value = self.constant_of(name)
+        if value is not None:
+            key = (type(value), repr(value))
+            if key not in self.constants:
+                self.constants[key] = len(self.pool)
+                self.pool.append(value)
+        else:
+            self.variables.setdefault(name, len(self.variables))
+
+    def register(self, name: str) -> int:
+        value = self.constant_of(name)
+        if value is not None:
+            return self.constants[(type(value), repr(value))]
+        return len(self.constants) + self.variables[name]
+
+    def assemble(self) -> BytecodeProgram:
+        """Two passes: operands and label addresses, then encoding"""
+        labels = {}
+        count = 0
+        for instruction in self.tac:
+            parts = instruction.split()
+            if is_label(instruction):
+                labels[label_name(instruction)] = count
+                continue
+            count += 1
+            if parts[0] == 'goto':
+                continue
+            if parts[0] in ('if_false', 'if_true'):
+                operands = parts[1:-2:2]
+            elif parts[0] == 'print':
+                operands = parts[1:]
+            else:
+                operands = [parts[0]] + parts[2::2]
+            for operand in operands:
+                self.collect(operand)
+        if len(self.constants) + len(self.variables) > FIELD_LIMIT or count >= FIELD_LIMIT:
+            raise ValueError("Program too large for 16-bit bytecode fields")
+
+        code = array('H')
+        for instruction in self.tac:
+            parts = instruction.split()
+            if is_label(instruction):
+                continue
+            if parts[0] == 'goto':
+                code.extend((JMP, labels[parts[1]], 0, 0))
+            elif parts[0] in ('if_false', 'if_true') and len(parts) == 6:
+                table = JUMP_FALSE if parts[0] == 'if_false' else JUMP_TRUE
+                code.extend((table[parts[2]], labels[parts[5]],
+                             self.register(parts[1]), self.register(parts[3])))
+            elif parts[0] in ('if_false', 'if_true'):
+                code.extend((JF if parts[0] == 'if_false' else JT, labels[parts[3]],
+                             self.register(parts[1]), 0))
+            elif parts[0] == 'print':
+                code.extend((PRINT, self.register(parts[1]), 0, 0))
+            elif len(parts) == 3:
+                code.extend((MOVE, self.register(parts[0]), self.register(parts[2]), 0))
+            elif len(parts) == 5:
+                op = ARITHMETIC.get(parts[3], COMPARE.get(parts[3]))
+                code.extend((op, self.register(parts[0]),
+                             self.register(parts[2]), self.register(parts[4])))
+            else:
+                raise ValueError(f"Cannot assemble '{instruction}'")
+        code.extend((HALT, 0, 0, 0))
+
+        constants = list(self.pool)
+        names = {len(constants) + index: name for name, index in self.variables.items()}
+        self.program = BytecodeProgram(code, constants, len(constants) + len(self.variables), names)
+        return self.program
+
+    def generate(self) -> List[str]:
+        """Assemble and return the disassembly"""
+        print("\n" + "="*50)
+        print("PHASE 5: CODE GENERATION (REGISTER BYTECODE)")
+        print("="*50)
+
+        program = self.assemble()
+        listing = program.disassemble()
+        print("\nBytecode:")
+        print("-" * 50)
+        for line in listing:
+            print(line)
+        print(f"\n{program.instructions} instructions ({program.instructions * 8} bytes), "
+              f"{len(program.constants)} constants, {program.registers} registers")
+        return listing
+
+
+class VirtualMachine:
+    """Runs a BytecodeProgram with one dispatch loop"""
+
+    def __init__(self, program: BytecodeProgram, max_steps: int = 10_000_000):
+        self.program = program
+        self.max_steps = max_steps
+        self.output: List[str] = []
+        self.instructions = 0           # executed, as counted by TACInterpreter
+        self.elapsed = 0.0
+
+    def run(self) -> List[str]:
+        program = self.program
+        code = program.code
+        registers = list(program.constants) + [0] * (program.registers - len(program.constants))
+        output = self.output
+        limit = self.max_steps
+        executed = 0
+        pc = 0
+        start = time.perf_counter()
+        while True:
+            op = code[pc]
+            a = code[pc + 1]
+            b = code[pc + 2]
+            c = code[pc + 3]
+            pc += 4
+            executed += 1
+            if op == MOVE:
+                registers[a] = registers[b]
+            elif op == ADD:
+                registers[a] = registers[b] + registers[c]
+            elif op == JF_LT:
+                if not registers[b] < registers[c]:
+                    pc = a << 2
+            elif op == JMP:
+                pc = a << 2
+                if executed > limit:
+                    raise VMRuntimeError(f"Step limit of {limit} exceeded")
+            elif op == SUB:
+                registers[a] = registers[b] - registers[c]
+            elif op == MUL:
+                registers[a] = registers[b] * registers[c]
+            elif op == DIV:
+                left, right = registers[b], registers[c]
+                if right == 0:
+                    raise VMRuntimeError("Division by zero")
+                if type(left) is int and type(right) is int:
+                    # idiv truncates toward zero
+                    quotient = abs(left) // abs(right)
+                    registers[a] = quotient if (left < 0) == (right < 0) else -quotient
+                else:
+                    registers[a] = left / right
+            elif op <= GE:
+                left, right = registers[b], registers[c]
+                if op == LT:
+                    registers[a] = int(left < right)
+                elif op == GT:
+                    registers[a] = int(left > right)
+                elif op == EQ:
+                    registers[a] = int(left == right)
+                elif op == NE:
+                    registers[a] = int(left != right)
+                elif op == LE:
+                    registers[a] = int(left <= right)
+                else:
+                    registers[a] = int(left >= right)
+            elif op == JF:
+                if not registers[b]:
+                    pc = a << 2
+            elif op == JT:
+                if registers[b]:
+                    pc = a << 2
+            elif op <= JT_GE:
+                left, right = registers[b], registers[c]
+                if op >= JT_LT:
+                    op -= JT_LT - JF_LT
+                    wanted = True
+                else:
+                    wanted = False
+                if op == JF_GT:
+                    taken = left > right
+                elif op == JF_EQ:
+                    taken = left == right
+                elif op == JF_NE:
+                    taken = left != right
+                elif op == JF_LE:
+                    taken = left <= right
+                elif op == JF_GE:
+                    taken = left >= right
+                else:
+                    taken = left < right
+                if taken == wanted:
+                    pc = a << 2
+                    if executed > limit:
+                        raise VMRuntimeError(f"Step limit of {limit} exceeded")
+            elif op == PRINT:
+                output.append(str(registers[a]))
+            elif op == HALT:
+                break
+            else:
+                raise VMRuntimeError(f"Bad opcode {op} at {(pc >> 2) - 1}")
+        self.elapsed = time.perf_counter() - start
+        # HALT is not a program instruction
+        self.instructions = executed - 1
+        return output
+
+    def display(self):
+        rate = self.instructions / self.elapsed if self.elapsed else 0.0
+        print(f"\nVM: {self.instructions} instructions in {self.elapsed * 1000:.3f} ms "
+              f"({rate / 1e6:.2f} M instructions/s)")
+
+
+# Testing function for the bytecode VM
+def test_bytecode_vm(source_code: str, path: str = None):
+    """Assemble, run, save, memory-map and run again; both runs must match
+    the TAC interpreter"""
+    print("\n" + "="*60)
+    print(" TESTING REGISTER BYTECODE VM")
+    print("="*60)
+
+    try:
+        import os
+        import tempfile
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+        from intermediate_code import IntermediateCode
+        from tac_interpreter import TACInterpreter
+
+        ast = Parser(Lexer(source_code).tokenize()).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        generator = IntermediateCode()
+        tac = generator.generate(ast)
+        compiler = BytecodeCompiler(tac, symbol_table, generator.string_literals)
+        compiler.generate()
+
+        vm = VirtualMachine(compiler.program)
+        output = vm.run()
+        print("\nProgram Output:")
+        print("-" * 50)
+        for line in output:
+            print(line)
+        vm.display()
+        expected = TACInterpreter(tac, generator.string_literals).run()
+        if output != expected:
+            raise RuntimeError(f"VM output {output} differs from the TAC interpreter {expected}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = path or os.path.join(directory, 'program.mcb')
+            size = compiler.program.save(path)
+            loaded = BytecodeProgram.load(path)
+            try:
+                reloaded = VirtualMachine(loaded).run()
+            finally:
+                loaded.close()
+        if reloaded != expected:
+            raise RuntimeError(f"Mapped program output {reloaded} differs from {expected}")
+        print(f"\nSaved and memory-mapped {size} bytes; output matches the TAC interpreter")
+
+        print("\n✓ Bytecode VM Successful!")
+        return compiler.program
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Run a saved bytecode file: python bytecode_vm.py program.mcb
+        program = BytecodeProgram.load(sys.argv[1])
+        try:
+            for line in VirtualMachine(program).run():
+                print(line)
+        finally:
+            program.close()
+        sys.exit(0)
+
+    # Test code
+    test_code = """
+    int i = 0;
+    int total = 0;
+    float scale = 2.5;
+    while (i < 10) {
+        if (i > 4) {
+            total = total + i * 3;
+        } else {
+            total = total - 1;
+        }
+        i = i + 1;
+    }
+    print(total);
+    print(total * scale);
+    print(7 / 2);
+    print("done");
+    """
+
+    test_bytecode_vm(test_code)
@@ -0,0 +1,284 @@
+"""
+============================================
+PHASE 5 (ALTERNATIVE): C CODE GENERATOR
+CSE 430 - Compiler Design Lab
+============================================
+
+Lowers the AST to portable C so that any local C compiler can build
+and optimize the program (cc -O2):
+
+    int i = 0;                      long long i = 0;
+    while (i < 10) {        =>      i = 0LL;
+        i = i + 1;                  while (i < 10LL) {
+    }                                   i = i + 1LL;
+    print(i);                       }
+                                    printf("%lld\\n", i);
+
+- Variables come from the SymbolTable: int -> long long (as on the
+  x86-64 backend), float -> double, string -> const char *.  The table
+  is flat, so every variable is declared once at the top of main.
+- if/else and while stay structured; conditions test for non-zero.
+- print uses printf; floats print with the fewest digits that read back
+  as the same double, like the TAC interpreter (Python repr).
+- Strings compare with strcmp; string arithmetic is rejected.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import List, Optional
+from parser import (Program, Declaration, Assignment, BinaryOp, Number, FloatNumber,
+                    StringLiteral, Variable, IfStatement, WhileLoop, PrintStatement)
+from semantic_analyzer import SymbolTable
+
+
+C_TYPES = {'int': 'long long', 'float': 'double', 'string': 'const char *'}
+C_DEFAULTS = {'int': '0', 'float': '0.0', 'string': '""'}
+COMPARISONS = ('<', '>', '==', '!=', '<=', '>=')
+
+# Runtime support emitted before main
+C_PRELUDE = r"""#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+/* Shortest round-trip formatting of a double, as Python's repr() */
+static void print_float(double value)
+{
+    char scientific[40], text[48];
+    int precision, exponent, decimals;
+    if (value != value) {
+        printf("nan\n");
+        return;
+    }
+    if (value > 1.7976931348623157e308 || value < -1.7976931348623157e308) {
+        printf(value > 0 ? "inf\n" : "-inf\n");
+        return;
+    }
+    for (precision = 1; precision < 17; precision++) {
+        snprintf(scientific, sizeof scientific, "%.*e", precision - 1, value);
+        if (strtod(scientific, NULL) == value)
+            break;
+    }
+    snprintf(scientific, sizeof scientific, "%.*e", precision - 1, value);
+    exponent = atoi(strchr(scientific, 'e') + 1);
+    if (exponent >= -4 && exponent < 16) {
+        decimals = precision - 1 - exponent;
+        snprintf(text, sizeof text, "%.*f", decimals > 0 ? decimals : 1, value);
+    } else {
+        snprintf(text, sizeof text, "%.*g", precision, value);
+    }
+    printf("%s\n", text);
+}
+"""
+
+
+class CCodeGenerator:
+    """Generates a C translation unit from the AST"""
+
+    def __init__(self, ast: Program, symbol_table: SymbolTable):
+        self.ast = ast
+        self.symbol_table = symbol_table
+        self.lines: List[str] = []
+
+    def generate(self) -> List[str]:
+        """Generate C source code (one list entry per line)"""
+        print("\n" + "="*50)
+        print("PHASE 5: CODE GENERATION (C)")
+        print("="*50)
+
+        self.lines = ["/* Generated by the Mini Compiler C backend */"]
+        self.lines.extend(C_PRELUDE.splitlines())
+        self.lines.append("")
+        self.lines.append("int main(void)")
+        self.lines.append("{")
+        for name, info in self.symbol_table.symbols.items():
+            self.lines.append(f"    {C_TYPES[info['type']]} {name} = {C_DEFAULTS[info['type']]};")
+        if self.symbol_table.symbols:
+            self.lines.append("")
+        for statement in self.ast.statements:
+            self.statement(statement, 1)
+        self.lines.append("    return 0;")
+        self.lines.append("}")
+
+        print("\nGenerated C Code:")
+        print("-" * 50)
+        for line in self.lines:
+            print(line)
+        return self.lines
+
+    # ---------- statements ----------
+
+    def emit(self, text: str, depth: int):
+        self.lines.append("    " * depth + text)
+
+    def block(self, statements, depth: int):
+        for statement in statements or []:
+            self.statement(statement, depth)
+
+    def statement(self, node, depth: int):
+        if isinstance(node, Declaration):
+            if node.value is not None:
+                self.emit(f"{node.var_name} = {self.typed(node.value, node.var_type)};", depth)
+        elif isinstance(node, Assignment):
+            target = self.symbol_table.get_type(node.var_name)
+            self.emit(f"{node.var_name} = {self.typed(node.expression, target)};", depth)
+        elif isinstance(node, PrintStatement):
+            text, kind = self.expression(node.expression)
+            if kind == 'int':
+                self.emit(f'printf("%lld\\n", {unwrap(node.expression, text)});', depth)
+            elif kind == 'float':
+                self.emit(f"print_float({unwrap(node.expression, text)});", depth)
+            else:
+                self.emit(f'printf("%s\\n", {text});', depth)
+        elif isinstance(node, IfStatement):
+            self.emit(f"if ({self.condition(node.condition)}) {{", depth)
+            self.block(node.true_block, depth + 1)
+            if node.false_block:
+                self.emit("} else {", depth)
+                self.block(node.false_block, depth + 1)
+            self.emit("}", depth)
+        elif isinstance(node, WhileLoop):
+            self.emit(f"while ({self.condition(node.condition)}) {{", depth)
+            self.block(node.body, depth + 1)
+            self.emit("}", depth)
+
+    def condition(self, node) -> str:
+        text, kind = self.expression(node)
+        if kind == 'string':
+            return f"{text}[0] != '\\0'"
+        return unwrap(node, text)
+
+    def typed(self, node, target: str) -> str:
+        """Expression converted to the type of the variable it is stored in"""
+        text, kind = self.expression(node)
+        if (kind == 'string') != (target == 'string'):
+            raise ValueError(f"Cannot store a {kind} value in a {target} variable in C")
+        if kind == 'float' and target == 'int':
+            return f"(long long){text}"
+        return unwrap(node, text)
+
+    # ---------- expressions ----------
+
+    def expression(self, node) -> tuple:
+        """(C text, type) of an expression"""
+        if isinstance(node, Number):
+            return f"{node.value}LL", 'int'
+        if isinstance(node, FloatNumber):
+            return repr(node.value), 'float'
+        if isinstance(node, StringLiteral):
+            escaped = node.value.replace('\\', '\\\\').replace('"', '\\"')
+            return f'"{escaped}"', 'string'
+        if isinstance(node, Variable):
+            return node.name, self.symbol_table.get_type(node.name)
+        if isinstance(node, BinaryOp):
+            left, left_kind = self.expression(node.left)
+            right, right_kind = self.expression(node.right)
+            op = node.operator
+            if 'string' in (left_kind, right_kind):
+                if op in COMPARISONS and left_kind == right_kind:
+                    return f"((long long)(strcmp({left}, {right}) {op} 0))", 'int'
+                raise ValueError(f"Operator '{op}' on strings is not supported in C")
+            if op in COMPARISONS:
+                # A C comparison is an int; the language's ints are long long
+                return f"((long long)({left} {op} {right}))", 'int'
+            kind = 'float' if 'float' in (left_kind, right_kind) else 'int'
+            return f"({left} {op} {right})", kind
+        raise ValueError(f"Cannot lower {type(node).__name__} to C")
+
+
+def unwrap(node, text: str) -> str:
+    """Drop the parentheses around a binary operation used as a whole"""
+    return text[1:-1] if isinstance(node, BinaryOp) else text
+
+
+def find_c_compiler() -> Optional[str]:
+    """The system C compiler: $CC, cc, gcc or clang"""
+    for candidate in (os.environ.get('CC'), 'cc', 'gcc', 'clang'):
+        if candidate and shutil.which(candidate):
+            return candidate
+    return None
+
+
+def compile_c(lines: List[str], output: str, flags=('-O2',), compiler: str = None) -> str:
+    """Build an executable from generated C with the system compiler"""
+    compiler = compiler or find_c_compiler()
+    if compiler is None:
+        raise RuntimeError("No C compiler found (set CC, or install cc/gcc/clang)")
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'program.c')
+        with open(source, 'w') as handle:
+            handle.write("\n".join(lines) + "\n")
+        result = subprocess.run([compiler, *flags, '-o', output, source],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"{compiler} failed:\n{result.stderr}")
+    return output
+
+
+# Testing function for the C backend
+def test_c_generator(source_code: str, run: bool = True):
+    """Generate C, build it with the system compiler, and check its output
+    against the TAC interpreter"""
+    print("\n" + "="*60)
+    print(" TESTING C CODE GENERATOR")
+    print("="*60)
+
+    try:
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+        from intermediate_code import IntermediateCode
+        from tac_interpreter import TACInterpreter
+
+        ast = Parser(Lexer(source_code).tokenize()).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        lines = CCodeGenerator(ast, symbol_table).generate()
+
+        if run:
+            if find_c_compiler() is None:
+                print("\nNo C compiler found; skipping the end-to-end run")
+            else:
+                with tempfile.TemporaryDirectory() as directory:
+                    executable = compile_c(lines, os.path.join(directory, 'program'))
+                    output = subprocess.run([executable], capture_output=True, text=True,
+                                            timeout=30).stdout.splitlines()
+                generator = IntermediateCode()
+                tac = generator.generate(ast)
+                expected = TACInterpreter(tac, generator.string_literals).run()
+                print("\nProgram Output (cc -O2):")
+                print("-" * 50)
+                for line in output:
+                    print(line)
+                if output != expected:
+                    raise RuntimeError(f"C output {output} differs from the TAC interpreter {expected}")
+                print("\nOutput matches the TAC interpreter")
+
+        print("\n✓ C Code Generation Successful!")
+        return lines
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    int total = 0;
+    float scale = 2.5;
+    while (i < 10) {
+        if (i > 4) {
+            total = total + i * 3;
+        } else {
+            total = total - 1;
+        }
+        i = i + 1;
+    }
+    print(total);
+    print(total * scale);
+    print(7 / 2);
+    print("done");
+    """
+
+    test_c_generator(test_code)
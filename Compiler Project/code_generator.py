@@ -9,16 +9,54 @@ ID - 21201118
 
 from typing import List, Dict
 from semantic_analyzer import SymbolTable
+from control_flow import is_temp, temp_index, is_int_constant, is_float_constant
+from register_allocator import RegisterAllocator
+from peephole import PeepholeOptimizer
+from instruction_scheduler import InstructionScheduler
+from instruction_selection import InstructionSelector, SELECTION_REGISTERS
+from runtime_library import PRINT_ROUTINES, X86_RUNTIME, X86_RUNTIME_DATA, link_runtime
+from source_map import line_marker, EPILOGUE_LINE
+
+
+# Conditional jump taken when the comparison holds / fails
+JUMP_IF = {'<': 'jl', '>': 'jg', '==': 'je', '!=': 'jne', '<=': 'jle', '>=': 'jge'}
+JUMP_UNLESS = {'<': 'jge', '>': 'jle', '==': 'jne', '!=': 'je', '<=': 'jg', '>=': 'jl'}
+
+# idiv has no immediate form; constant divisors are loaded here
+DIVISOR_REGISTER = 'ebp'
 
 
 class AssemblyGenerator:
     """Generates simple assembly code from intermediate code"""
    
-    def __init__(self, tac: List[str], symbol_table: SymbolTable, string_literals: Dict):
+    def __init__(self, tac: List[str], symbol_table: SymbolTable, string_literals: Dict,
+                 allocate_registers: bool = True, peephole: bool = True,
+                 select_instructions: bool = False, schedule: bool = False,
+                 source_lines: List = None):
         self.tac = tac
+        self.source_lines = source_lines    # source line per TAC instruction ('; line N' markers)
+        self.current_line = None
         self.symbol_table = symbol_table
         self.string_literals = string_literals
         self.assembly = []
+        self.registers = {}
+        self.constants = {}         # float literal value -> .rodata label
+        self.temp_types = {}        # temporary -> 'string' once assigned a string
+        self.runtime_calls = set()  # runtime library routines the program calls
+        self.allocator = None
+        self.peephole = PeepholeOptimizer([]) if peephole else None
+        self.scheduler = InstructionScheduler([]) if schedule else None
+        self.selector = None
+        if select_instructions:
+            # Temporaries folded into expression trees need no register
+            self.selector = InstructionSelector(tac, symbol_table)
+            if allocate_registers:
+                self.allocator = RegisterAllocator(tac, symbol_table, SELECTION_REGISTERS,
+                                                   track=lambda n: n in self.selector.materialized)
+        elif allocate_registers:
+            self.allocator = RegisterAllocator(tac, symbol_table)
+        if self.allocator is not None:
+            self.registers = self.allocator.allocate()
    
     def generate(self):
         """Generate assembly code"""
@@ -46,16 +84,33 @@ class AssemblyGenerator:
             elif info['type'] == 'string':
                 self.assembly.append(f"    {var_name} dd 0    ; string pointer")
        
+        # Float literals, one aligned slot per distinct value
+        for instr in self.tac:
+            if not instr.endswith(':'):
+                for part in instr.split():
+                    if is_float_constant(part) and float(part) not in self.constants:
+                        self.constants[float(part)] = f"flt{len(self.constants)}"
+        if self.constants:
+            self.assembly.append("")
+            self.assembly.append("; Read-only Data Section (constant pool)")
+            self.assembly.append("section .rodata")
+            self.assembly.append("    align 8")
+            for value, label in self.constants.items():
+                self.assembly.append(f"    {label} dq {value!r}")
+       
         self.assembly.append("")
         self.assembly.append("; BSS Section (temporary variables)")
         self.assembly.append("section .bss")
        
-        # Count temporaries
-        temp_count = max([int(instr.split('t')[1].split()[0])
-                         for instr in self.tac
-                         if 't' in instr and instr.split()[0].startswith('t')], default=-1) + 1
+        # One slot per temporary the TAC uses that did not get a register
+        self.temps = sorted({temp_index(part)
+                             for instr in self.tac if not instr.endswith(':')
+                             for part in instr.split()
+                             if is_temp(part) and part not in self.symbol_table.symbols
+                             and part not in self.registers
+                             and (self.selector is None or part in self.selector.materialized)})
        
-        for i in range(temp_count):
+        for i in self.temps:
             self.assembly.append(f"    t{i} resd 1")
        
         # Code section
@@ -66,25 +121,137 @@ class AssemblyGenerator:
         self.assembly.append("")
         self.assembly.append("_start:")
        
-        # Convert TAC to assembly
-        for instruction in self.tac:
-            self.convert_instruction(instruction)
+        # Convert TAC to assembly (tree tiling, or one template per instruction)
+        if self.selector is not None:
+            self.selector.select(self)
+        else:
+            for position, instruction in enumerate(self.tac):
+                self.mark_source(position)
+                self.convert_instruction(instruction)
        
-        # Exit program
+        # Exit program (after writing out buffered output)
         self.assembly.append("")
+        if self.source_lines is not None:
+            self.assembly.append(line_marker(EPILOGUE_LINE))
         self.assembly.append("    ; Exit program")
+        self.call_runtime('rt_flush')
         self.assembly.append("    mov eax, 1      ; sys_exit")
         self.assembly.append("    xor ebx, ebx    ; exit code 0")
         self.assembly.append("    int 0x80")
        
+        if self.peephole is not None:
+            self.peephole.assembly = self.assembly
+            self.assembly = self.peephole.optimize()
+        if self.scheduler is not None:
+            self.scheduler.assembly = self.assembly
+            self.assembly = self.scheduler.optimize()
+       
         # Print assembly
         print("\nGenerated Assembly Code:")
         print("-" * 50)
         for line in self.assembly:
             print(line)
        
+        # Runtime routines go after the optimized program, which they never change
+        self.runtime = link_runtime(self.runtime_calls, X86_RUNTIME, X86_RUNTIME_DATA)
+        self.assembly.extend(self.runtime)
+        print(f"\nRuntime library: {', '.join(sorted(self.runtime_calls))} "
+              f"({len(self.runtime)} lines linked after the program)")
+       
+        if self.selector is not None:
+            self.selector.display()
+        if self.allocator is not None:
+            self.allocator.display()
+        if self.peephole is not None:
+            self.peephole.display()
+        if self.scheduler is not None:
+            self.scheduler.display()
+        print(f"\n.bss: {len(self.temps)} temporaries, {len(self.temps) * 4} bytes")
+       
         return self.assembly
    
+    def mark_source(self, position: int):
+        """Line marker before the code of TAC instruction `position`
+        when its source line differs from the previous one"""
+        if self.source_lines is None:
+            return
+        line = self.source_lines[position]
+        if line is not None and line != self.current_line:
+            self.assembly.append(line_marker(line))
+            self.current_line = line
+   
+    def location(self, name: str) -> str:
+        """Register holding a temporary, an immediate, or a memory operand"""
+        if name in self.registers:
+            return self.registers[name]
+        if is_int_constant(name):
+            return name
+        if is_float_constant(name):
+            return f"[{self.constants[float(name)]}]"
+        return f"[{name}]"
+
+    def value_type(self, name: str) -> str:
+        """'int', 'float' or 'string': picks the print routine and the
+        copy width (arithmetic on this target is int-only)"""
+        if name in self.string_literals.values():
+            return 'string'
+        if is_float_constant(name):
+            return 'float'
+        if name in self.symbol_table.symbols:
+            value_type = self.symbol_table.symbols[name]['type']
+            return value_type if value_type in ('float', 'string') else 'int'
+        return self.temp_types.get(name, 'int')
+
+    def is_double(self, name: str) -> bool:
+        """An 8-byte float in memory (a float variable or constant)"""
+        return self.value_type(name) == 'float' and self.in_memory(name)
+
+    def call_runtime(self, routine: str):
+        self.runtime_calls.add(routine)
+        self.assembly.append(f"    call {routine}")
+
+    def print_value(self, name: str):
+        """Hand a value to its print routine: eax holds an int, a string
+        pointer or the address of a double"""
+        value_type = self.value_type(name)
+        if value_type == 'float' and self.in_memory(name):
+            self.assembly.append(f"    lea eax, {self.location(name)}")
+        else:
+            value_type = 'string' if value_type == 'string' else 'int'
+            self.load('eax', name)
+        self.call_runtime(PRINT_ROUTINES[value_type])
+
+    def copy_double(self, dest: str, src: str):
+        """x = y between float locations copies all 8 bytes"""
+        self.assembly.append(f"    movsd xmm0, {self.location(src)}")
+        self.assembly.append(f"    movsd {self.location(dest)}, xmm0")
+
+    def in_memory(self, name: str) -> bool:
+        return self.location(name).startswith('[')
+
+    def load(self, register: str, name: str):
+        """Bring a value into a register (no-op when it is already there)"""
+        if name in self.string_literals.values():
+            self.assembly.append(f"    lea {register}, [{name}]")
+        elif self.location(name) != register:
+            self.assembly.append(f"    mov {register}, {self.location(name)}")
+
+    def store(self, name: str, register: str):
+        if self.location(name) != register:
+            self.assembly.append(f"    mov {self.location(name)}, {register}")
+
+    def compare(self, left: str, right: str):
+        """cmp of two operands; at most one of them may be in memory"""
+        if left in self.registers:
+            self.assembly.append(f"    cmp {self.location(left)}, {self.location(right)}")
+        elif self.in_memory(left) and is_int_constant(right):
+            self.assembly.append(f"    cmp dword {self.location(left)}, {right}")
+        elif self.in_memory(left) and right in self.registers:
+            self.assembly.append(f"    cmp {self.location(left)}, {self.location(right)}")
+        else:
+            self.load('eax', left)
+            self.assembly.append(f"    cmp eax, {self.location(right)}")
+
     def convert_instruction(self, instruction: str):
         """Convert single TAC instruction to assembly"""
         parts = instruction.split()
@@ -92,33 +259,40 @@ class AssemblyGenerator:
         if '=' in instruction and len(parts) == 3:
             # Simple assignment: x = y or x = str0
             dest, _, src = parts
+            if is_temp(dest) and dest not in self.symbol_table.symbols:
+                self.temp_types[dest] = 'string' if self.value_type(src) == 'string' else 'int'
            
-            # Check if source is a string literal
-            if src.startswith('str'):
-                self.assembly.append(f"    lea eax, [{src}]")
-                self.assembly.append(f"    mov [{dest}], eax")
+            if self.is_double(dest) and self.is_double(src):
+                self.copy_double(dest, src)
+            elif dest in self.registers:
+                self.load(self.location(dest), src)
+            elif is_int_constant(src):
+                self.assembly.append(f"    mov dword {self.location(dest)}, {src}")
+            elif src in self.registers:
+                self.store(dest, self.location(src))
             else:
-                self.assembly.append(f"    mov eax, [{src}]")
-                self.assembly.append(f"    mov [{dest}], eax")
+                self.load('eax', src)
+                self.store(dest, 'eax')
        
         elif '=' in instruction and len(parts) == 5:
             # Binary operation: t0 = x + y
             dest, _, left, op, right = parts
            
-            self.assembly.append(f"    mov eax, [{left}]")
-            self.assembly.append(f"    mov ebx, [{right}]")
-           
-            if op == '+':
-                self.assembly.append(f"    add eax, ebx")
-            elif op == '-':
-                self.assembly.append(f"    sub eax, ebx")
-            elif op == '*':
-                self.assembly.append(f"    imul eax, ebx")
-            elif op == '/':
+            if op == '/':
+                self.load('eax', left)
                 self.assembly.append(f"    cdq")
-                self.assembly.append(f"    idiv ebx")
+                if right in self.registers:
+                    self.assembly.append(f"    idiv {self.location(right)}")
+                elif is_int_constant(right):
+                    self.assembly.append(f"    mov {DIVISOR_REGISTER}, {right}")
+                    self.assembly.append(f"    idiv {DIVISOR_REGISTER}")
+                else:
+                    self.assembly.append(f"    idiv dword {self.location(right)}")
+                self.store(dest, 'eax')
+           
             elif op in ['<', '>', '==', '!=', '<=', '>=']:
-                self.assembly.append(f"    cmp eax, ebx")
+                self.compare(left, right)
+                target = self.registers.get(dest, 'eax')
                 if op == '<':
                     self.assembly.append(f"    setl al")
                 elif op == '>':
@@ -131,27 +305,51 @@ class AssemblyGenerator:
                     self.assembly.append(f"    setle al")
                 elif op == '>=':
                     self.assembly.append(f"    setge al")
-                self.assembly.append(f"    movzx eax, al")
+                self.assembly.append(f"    movzx {target}, al")
+                self.store(dest, target)
            
-            self.assembly.append(f"    mov [{dest}], eax")
+            else:
+                if op in ('+', '*') and dest in self.registers and \
+                        self.location(right) == self.location(dest):
+                    # Commutative: accumulate into the register already holding right
+                    left, right = right, left
+                target = self.registers.get(dest, 'eax')
+                if self.location(right) == target and left != right:
+                    target = 'eax'
+                self.load(target, left)
+                if op == '+':
+                    self.assembly.append(f"    add {target}, {self.location(right)}")
+                elif op == '-':
+                    self.assembly.append(f"    sub {target}, {self.location(right)}")
+                elif op == '*':
+                    self.assembly.append(f"    imul {target}, {self.location(right)}")
+                self.store(dest, target)
        
         elif instruction.startswith('print'):
             # Print statement
             var = parts[1]
             self.assembly.append(f"    ; Print {var}")
-            if var.startswith('str'):
-                self.assembly.append(f"    lea eax, [{var}]")
-            else:
-                self.assembly.append(f"    mov eax, [{var}]")
-            self.assembly.append(f"    ; (print syscall would go here)")
+            self.print_value(var)
+       
+        elif parts[0] in ('if_false', 'if_true') and len(parts) == 6:
+            # Fused compare-and-branch: if_false a < b goto L
+            branch, left, op, right, _, label = parts
+            jump = JUMP_IF[op] if branch == 'if_true' else JUMP_UNLESS[op]
+            self.compare(left, right)
+            self.assembly.append(f"    {jump} {label}")
        
         elif instruction.startswith('if_false'):
             # Conditional jump
             _, cond, _, label = parts
-            self.assembly.append(f"    mov eax, [{cond}]")
-            self.assembly.append(f"    cmp eax, 0")
+            self.compare(cond, '0')
             self.assembly.append(f"    je {label}")
        
+        elif instruction.startswith('if_true'):
+            # Inverted conditional jump (produced by the jump optimizer)
+            _, cond, _, label = parts
+            self.compare(cond, '0')
+            self.assembly.append(f"    jne {label}")
+       
         elif instruction.startswith('goto'):
             # Unconditional jump
             label = parts[1]
@@ -161,7 +359,6 @@ class AssemblyGenerator:
             # Label
             self.assembly.append(f"{instruction}")
 
-
 # Testing function for Phase 5
 def test_code_generator(source_code: str, tac: List[str] = None, 
                        symbol_table: SymbolTable = None, 
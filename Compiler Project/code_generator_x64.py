@@ -0,0 +1,485 @@
+"""
+============================================
+PHASE 5: CODE GENERATOR (x86-64 ASSEMBLY)
+CSE 430 - Compiler Design Lab
+============================================
+
+x86-64 System V backend (NASM syntax, Linux):
+
+- int values are 64-bit; int temporaries live in callee-saved
+  general-purpose registers (rbx, r12-r15)
+- float values are doubles computed with SSE2 (movsd, addsd, subsd,
+  mulsd, divsd, ucomisd); float temporaries live in xmm8-xmm15
+- mixed int/float operands are widened with cvtsi2sd; an int literal
+  in a float context becomes a double in the constant pool
+- print calls the buffered runtime library (runtime_library.py), which
+  leaves the callee-saved registers holding temporaries alone
+- the program flushes the output buffer and exits with the syscall
+  instruction
+
+The symbol table gives the type of every variable; the type of a
+temporary is the type of the value assigned to it.  A temporary that
+holds ints at one point and floats at another stays in memory.
+"""
+
+from typing import List, Dict
+from semantic_analyzer import SymbolTable
+from control_flow import is_int_constant, is_float_constant, is_temp, is_label
+from code_generator import JUMP_IF, JUMP_UNLESS
+from register_allocator import RegisterAllocator
+from peephole import PeepholeOptimizer
+from instruction_scheduler import InstructionScheduler
+from runtime_library import PRINT_ROUTINES, X64_RUNTIME, X64_RUNTIME_DATA, link_runtime
+
+
+# Registers handed out to temporaries; rax, rcx, rdx, rdi, xmm0 and xmm1 are scratch
+INT_REGISTERS = ['rbx', 'r12', 'r13', 'r14', 'r15']
+FLOAT_REGISTERS = [f"xmm{i}" for i in range(8, 16)]
+
+# setcc / jcc after ucomisd a, b (unsigned conditions; NaN sets CF, ZF and PF)
+FLOAT_SET = {'>': 'seta', '>=': 'setae'}
+FLOAT_JUMP_IF = {'>': 'ja', '>=': 'jae'}
+FLOAT_JUMP_UNLESS = {'>': 'jbe', '>=': 'jb'}
+SWAPPED = {'<': '>', '<=': '>='}
+
+COMPARISONS = ('<', '>', '==', '!=', '<=', '>=')
+INT_ARITHMETIC = {'+': 'add', '-': 'sub', '*': 'imul'}
+FLOAT_ARITHMETIC = {'+': 'addsd', '-': 'subsd', '*': 'mulsd', '/': 'divsd'}
+
+
+class X64AssemblyGenerator:
+    """Generates x86-64 assembly with SSE2 floating point from TAC"""
+
+    def __init__(self, tac: List[str], symbol_table: SymbolTable, string_literals: Dict,
+                 allocate_registers: bool = True, peephole: bool = True,
+                 select_instructions: bool = False, schedule: bool = False):
+        # Tree-pattern selection (instruction_selection) targets 32-bit x86
+        # only; the flag is accepted so -O level options apply to both targets
+        self.tac = tac
+        self.symbol_table = symbol_table
+        self.string_literals = string_literals
+        self.assembly = []
+        self.text = []
+        self.temp_types = {}        # temporary -> type of its current value
+        self.runtime_calls = {'rt_flush'}   # runtime library routines the program calls
+        self.constants = {}         # double value -> .rodata label
+        self.registers = {}
+        self.next_label = 0
+        self.allocators = []
+        if allocate_registers:
+            self.allocate_registers()
+        self.peephole = PeepholeOptimizer([]) if peephole else None
+        self.scheduler = InstructionScheduler([]) if schedule else None
+
+    # ---------- types ----------
+
+    def type_of(self, name: str) -> str:
+        if is_float_constant(name):
+            return 'float'
+        if is_int_constant(name):
+            return 'int'
+        if name in self.string_literals.values():
+            return 'string'
+        if name in self.symbol_table.symbols:
+            return self.symbol_table.symbols[name]['type']
+        return self.temp_types.get(name, 'int')
+
+    def result_type(self, parts: List[str]) -> str:
+        """Type of the value an assignment instruction produces"""
+        if len(parts) == 3:
+            return self.type_of(parts[2])
+        if parts[3] in COMPARISONS:
+            return 'int'
+        return 'float' if 'float' in (self.type_of(parts[2]), self.type_of(parts[4])) else 'int'
+
+    def is_temporary(self, name: str) -> bool:
+        return is_temp(name) and name not in self.symbol_table.symbols
+
+    def allocate_registers(self):
+        """Linear scan per register class over temporaries of one type"""
+        seen = {}
+        for instruction in self.tac:
+            parts = instruction.split()
+            if not is_label(instruction) and len(parts) in (3, 5) and parts[1] == '=':
+                if self.is_temporary(parts[0]):
+                    value_type = self.result_type(parts)
+                    self.temp_types[parts[0]] = value_type
+                    seen.setdefault(parts[0], set()).add(value_type)
+        self.temp_types = {}
+        for value_type, registers in (('int', INT_REGISTERS), ('float', FLOAT_REGISTERS)):
+            allocator = RegisterAllocator(self.tac, self.symbol_table, registers,
+                                          track=lambda name, t=value_type: seen.get(name) == {t})
+            self.registers.update(allocator.allocate())
+            self.allocators.append(allocator)
+
+    # ---------- operands ----------
+
+    def constant(self, value: float) -> str:
+        """Memory operand of a double in the constant pool"""
+        if value not in self.constants:
+            self.constants[value] = f"flt{len(self.constants)}"
+        return f"[{self.constants[value]}]"
+
+    def int_operand(self, name: str) -> str:
+        """Register, r/m64 or imm32 operand holding an int"""
+        if name in self.registers:
+            return self.registers[name]
+        if is_int_constant(name):
+            if -2**31 <= int(name) < 2**31:
+                return name
+            self.emit(f"mov rcx, {name}")
+            return 'rcx'
+        return f"qword [{name}]"
+
+    def float_operand(self, name: str, scratch: str = 'xmm1') -> str:
+        """xmm or m64 operand holding a double; ints are converted"""
+        if is_float_constant(name) or is_int_constant(name):
+            return self.constant(float(name))
+        if self.type_of(name) != 'float':
+            self.emit(f"cvtsi2sd {scratch}, {self.int_operand(name)}")
+            return scratch
+        if name in self.registers:
+            return self.registers[name]
+        return f"qword [{name}]"
+
+    def load_int(self, register: str, name: str):
+        if is_int_constant(name):
+            self.emit(f"mov {register}, {name}")
+        elif name in self.string_literals.values():
+            self.emit(f"lea {register}, [{name}]")
+        elif self.type_of(name) == 'float':
+            self.emit(f"cvttsd2si {register}, {self.float_operand(name)}")
+        elif self.int_operand(name) != register:
+            self.emit(f"mov {register}, {self.int_operand(name)}")
+
+    def load_float(self, register: str, name: str):
+        operand = self.float_operand(name, register)
+        if operand != register:
+            self.emit(f"movsd {register}, {operand}")
+
+    def store(self, dest: str, register: str):
+        """Move a computed value from a register into dest"""
+        move = 'movsd' if register.startswith('xmm') else 'mov'
+        target = self.registers.get(dest, f"[{dest}]")
+        if target != register:
+            self.emit(f"{move} {target}, {register}")
+
+    def emit(self, line: str):
+        self.text.append(f"    {line}")
+
+    def fresh_label(self) -> str:
+        label = f"Lnan{self.next_label}"
+        self.next_label += 1
+        return label
+
+    # ---------- generation ----------
+
+    def generate(self):
+        """Generate x86-64 assembly code"""
+        print("\n" + "="*50)
+        print("PHASE 5: CODE GENERATION (x86-64 ASSEMBLY)")
+        print("="*50)
+
+        for instruction in self.tac:
+            self.convert_instruction(instruction)
+
+        self.assembly.append("; x86-64 System V, NASM syntax")
+        self.assembly.append("default rel")
+        self.assembly.append("")
+        self.assembly.append("; Data Section")
+        self.assembly.append("section .data")
+        for value, label in self.string_literals.items():
+            self.assembly.append(f"    {label} db \"{value}\", 0")
+        if self.string_literals:
+            self.assembly.append("")
+        for var_name, info in self.symbol_table.symbols.items():
+            if info['type'] == 'int':
+                self.assembly.append(f"    {var_name} dq 0    ; int variable")
+            elif info['type'] == 'float':
+                self.assembly.append(f"    {var_name} dq 0.0  ; float variable")
+            elif info['type'] == 'string':
+                self.assembly.append(f"    {var_name} dq 0    ; string pointer")
+
+        if self.constants:
+            self.assembly.append("")
+            self.assembly.append("; Read-only Data Section (constant pool)")
+            self.assembly.append("section .rodata")
+            self.assembly.append("    align 8")
+            for value, label in self.constants.items():
+                self.assembly.append(f"    {label} dq {value!r}")
+
+        # One slot per temporary that did not get a register
+        self.temps = [temp for temp in self.temp_types if temp not in self.registers]
+        self.assembly.append("")
+        self.assembly.append("; BSS Section (temporary variables)")
+        self.assembly.append("section .bss")
+        self.assembly.append("    alignb 8")
+        for temp in self.temps:
+            self.assembly.append(f"    {temp} resq 1")
+
+        self.assembly.append("")
+        self.assembly.append("; Code Section")
+        self.assembly.append("section .text")
+        self.assembly.append("global _start")
+        self.assembly.append("")
+        self.assembly.append("_start:")
+        self.assembly.extend(self.text)
+        self.assembly.append("")
+        self.assembly.append("    ; Exit program")
+        self.assembly.append("    call rt_flush")
+        self.assembly.append("    mov eax, 60     ; sys_exit")
+        self.assembly.append("    xor edi, edi    ; exit code 0")
+        self.assembly.append("    syscall")
+
+        if self.peephole is not None:
+            self.peephole.assembly = self.assembly
+            self.assembly = self.peephole.optimize()
+        if self.scheduler is not None:
+            self.scheduler.assembly = self.assembly
+            self.assembly = self.scheduler.optimize()
+
+        print("\nGenerated Assembly Code:")
+        print("-" * 50)
+        for line in self.assembly:
+            print(line)
+
+        # Runtime routines go after the optimized program, which they never change
+        self.runtime = link_runtime(self.runtime_calls, X64_RUNTIME, X64_RUNTIME_DATA)
+        self.assembly.extend(self.runtime)
+        print(f"\nRuntime library: {', '.join(sorted(self.runtime_calls))} "
+              f"({len(self.runtime)} lines linked after the program)")
+
+        floats = sum(1 for register in self.registers.values() if register.startswith('xmm'))
+        print(f"\nRegisters: {len(self.registers) - floats} int temporaries in general-purpose "
+              f"registers, {floats} float temporaries in XMM registers")
+        print(f".bss: {len(self.temps)} temporaries, {len(self.temps) * 8} bytes")
+        if self.peephole is not None:
+            self.peephole.display()
+        if self.scheduler is not None:
+            self.scheduler.display()
+
+        return self.assembly
+
+    def convert_instruction(self, instruction: str):
+        """Convert single TAC instruction to x86-64 assembly"""
+        parts = instruction.split()
+
+        if '=' in instruction and len(parts) == 3:
+            # Simple assignment: x = y
+            dest, _, src = parts
+            dest_type = (self.symbol_table.symbols[dest]['type']
+                         if dest in self.symbol_table.symbols else self.type_of(src))
+            if src in self.registers and self.type_of(src) == dest_type:
+                self.store(dest, self.registers[src])
+            elif dest_type == 'float':
+                register = self.registers.get(dest, 'xmm0')
+                self.load_float(register, src)
+                self.store(dest, register)
+            elif is_int_constant(src) and dest not in self.registers and -2**31 <= int(src) < 2**31:
+                self.emit(f"mov qword [{dest}], {src}")
+            else:
+                register = self.registers.get(dest, 'rax')
+                self.load_int(register, src)
+                self.store(dest, register)
+            if self.is_temporary(dest):
+                self.temp_types[dest] = dest_type
+
+        elif '=' in instruction and len(parts) == 5:
+            # Binary operation: t0 = x + y
+            dest, _, left, op, right = parts
+            is_float = 'float' in (self.type_of(left), self.type_of(right))
+            if op in COMPARISONS:
+                if is_float:
+                    self.float_compare(left, op, right)
+                else:
+                    self.int_compare(left, op, right)
+                self.store(dest, 'rax')
+                result = 'int'
+            elif is_float:
+                self.float_arithmetic(dest, left, op, right)
+                result = 'float'
+            elif op == '/':
+                self.load_int('rax', left)
+                self.emit("cqo")
+                divisor = self.int_operand(right)
+                if is_int_constant(divisor):
+                    # idiv has no immediate form
+                    self.emit(f"mov rcx, {divisor}")
+                    divisor = 'rcx'
+                self.emit(f"idiv {divisor}")
+                self.store(dest, 'rax')
+                result = 'int'
+            else:
+                self.int_arithmetic(dest, left, op, right)
+                result = 'int'
+            if self.is_temporary(dest):
+                self.temp_types[dest] = result
+
+        elif parts[0] == 'print':
+            # Print statement: argument in rdi (int, string) or xmm0 (float)
+            var = parts[1]
+            value_type = self.type_of(var)
+            self.text.append(f"    ; Print {var} ({value_type})")
+            if value_type == 'float':
+                self.load_float('xmm0', var)
+            else:
+                self.load_int('rdi', var)
+            routine = PRINT_ROUTINES[value_type]
+            self.runtime_calls.add(routine)
+            self.emit(f"call {routine}")
+
+        elif parts[0] in ('if_false', 'if_true') and len(parts) == 6:
+            # Fused compare-and-branch: if_false a < b goto L
+            branch, left, op, right, _, label = parts
+            if 'float' in (self.type_of(left), self.type_of(right)):
+                self.float_branch(branch == 'if_true', left, op, right, label)
+            else:
+                self.int_cmp(left, right)
+                jump = JUMP_IF[op] if branch == 'if_true' else JUMP_UNLESS[op]
+                self.emit(f"{jump} {label}")
+
+        elif parts[0] in ('if_false', 'if_true'):
+            # Conditional jump on a value: if_false c goto L
+            branch, cond, _, label = parts
+            if self.type_of(cond) == 'float':
+                self.float_branch(branch == 'if_true', cond, '!=', '0.0', label)
+            else:
+                self.int_cmp(cond, '0')
+                self.emit(f"{'jne' if branch == 'if_true' else 'je'} {label}")
+
+        elif parts[0] == 'goto':
+            self.emit(f"jmp {parts[1]}")
+
+        elif instruction.endswith(':'):
+            self.text.append(instruction)
+
+    def int_arithmetic(self, dest: str, left: str, op: str, right: str):
+        target = self.registers.get(dest, 'rax')
+        if op in ('+', '*') and target == self.registers.get(right):
+            # Commutative: accumulate into the register already holding right
+            left, right = right, left
+        if self.registers.get(right) == target and left != right:
+            target = 'rax'
+        self.load_int(target, left)
+        self.emit(f"{INT_ARITHMETIC[op]} {target}, {self.int_operand(right)}")
+        if dest in self.symbol_table.symbols and self.type_of(dest) == 'float':
+            self.emit(f"cvtsi2sd xmm0, {target}")
+            self.store(dest, 'xmm0')
+        else:
+            self.store(dest, target)
+
+    def float_arithmetic(self, dest: str, left: str, op: str, right: str):
+        target = self.registers.get(dest, 'xmm0')
+        if op in ('+', '*') and target == self.registers.get(right):
+            left, right = right, left
+        if self.registers.get(right) == target and left != right:
+            target = 'xmm0'
+        self.load_float(target, left)
+        self.emit(f"{FLOAT_ARITHMETIC[op]} {target}, {self.float_operand(right)}")
+        if dest in self.symbol_table.symbols and self.type_of(dest) == 'int':
+            self.emit(f"cvttsd2si rax, {target}")
+            self.store(dest, 'rax')
+        else:
+            self.store(dest, target)
+
+    def int_cmp(self, left: str, right: str):
+        """cmp of two int operands; at most one of them may be in memory"""
+        small = is_int_constant(right) and -2**31 <= int(right) < 2**31
+        if left in self.registers or (not is_int_constant(left) and left not in
+                                      self.string_literals.values()
+                                      and (right in self.registers or small)):
+            self.emit(f"cmp {self.int_operand(left)}, {self.int_operand(right)}")
+        else:
+            self.load_int('rax', left)
+            self.emit(f"cmp rax, {self.int_operand(right)}")
+
+    def int_compare(self, left: str, op: str, right: str):
+        """rax = (left op right) for ints"""
+        self.int_cmp(left, right)
+        self.emit(f"{'set' + JUMP_IF[op][1:]} al")
+        self.emit("movzx eax, al")
+
+    def float_compare(self, left: str, op: str, right: str):
+        """rax = (left op right) for doubles; false when either is NaN"""
+        if op in SWAPPED:
+            left, right, op = right, left, SWAPPED[op]
+        self.load_float('xmm0', left)
+        self.emit(f"ucomisd xmm0, {self.float_operand(right)}")
+        if op == '==':
+            self.emit("sete al")
+            self.emit("setnp cl")
+            self.emit("and al, cl")
+        elif op == '!=':
+            self.emit("setne al")
+            self.emit("setp cl")
+            self.emit("or al, cl")
+        else:
+            self.emit(f"{FLOAT_SET[op]} al")
+        self.emit("movzx eax, al")
+
+    def float_branch(self, when_true: bool, left: str, op: str, right: str, label: str):
+        """Jump to label when (left op right) == when_true, for doubles"""
+        if op in SWAPPED:
+            left, right, op = right, left, SWAPPED[op]
+        self.load_float('xmm0', left)
+        self.emit(f"ucomisd xmm0, {self.float_operand(right)}")
+        if op in FLOAT_JUMP_IF:
+            jump = FLOAT_JUMP_IF[op] if when_true else FLOAT_JUMP_UNLESS[op]
+            self.emit(f"{jump} {label}")
+        elif (op == '==') == when_true:
+            # Equal and ordered: PF=1 (NaN) skips the je
+            skip = self.fresh_label()
+            self.emit(f"jp {skip}")
+            self.emit(f"je {label}")
+            self.text.append(f"{skip}:")
+        else:
+            # Not equal or unordered
+            self.emit(f"jne {label}")
+            self.emit(f"jp {label}")
+
+
+# Testing function for the x86-64 backend
+def test_code_generator_x64(source_code: str, tac: List[str] = None,
+                            symbol_table: SymbolTable = None,
+                            string_literals: Dict = None):
+    """Test x86-64 code generation independently"""
+    print("\n" + "="*60)
+    print(" TESTING PHASE 5: x86-64 ASSEMBLY CODE GENERATOR")
+    print("="*60)
+
+    try:
+        if tac is None or symbol_table is None:
+            from intermediate_code import test_intermediate_code
+            from semantic_analyzer import test_semantic_analyzer
+
+            symbol_table = test_semantic_analyzer(source_code)
+            if symbol_table is None:
+                return None
+
+            tac, string_literals = test_intermediate_code(source_code)
+            if tac is None:
+                return None
+
+        asm_generator = X64AssemblyGenerator(tac, symbol_table, string_literals)
+        assembly = asm_generator.generate()
+        print("\n✓ x86-64 Code Generation Successful!")
+        return assembly
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    float x = 10.7;
+    int y = 20;
+    float sum = x + y;
+    print(sum);
+
+    if (sum > 25) {
+        print("Result is greater");
+    }
+    """
+
+    test_code_generator_x64(test_code)
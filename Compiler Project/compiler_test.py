@@ -12,13 +12,71 @@ This module allows testing from any phase of the compiler:
 - Phase 3: Up to Semantic Analysis
 - Phase 4: Up to Intermediate Code Generation
 - Phase 5: Complete compilation (all phases)
+
+Optimization levels (-O0, -O1, -O2, -O3, -Os) run the TAC through the
+pass manager after Phase 4:
+
+    python compiler_test.py -O2 program.txt
+
+Phase 5 targets 32-bit x86 by default; --target=x86-64 selects the
+x86-64 System V backend with SSE2 floating point.  For x86, -o writes
+a static ELF executable directly (no assembler or linker needed):
+
+    python compiler_test.py -O2 -o program program.txt
+
+--emulate runs the x86 code in the built-in emulator and reports its
+dynamic instruction, memory access and branch counts:
+
+    python compiler_test.py -O2 --emulate program.txt
+
+--profile also charges the executed instructions and estimated cycles
+to source lines and prints the hottest lines (line_profiler.py):
+
+    python compiler_test.py -O2 --profile program.txt
+
+--profile-generate=FILE runs the unoptimized program once and writes
+its block and branch counts to FILE; --profile-use=FILE lays blocks out
+so the hot paths fall through and guides loop unrolling with them
+(block_layout.py):
+
+    python compiler_test.py --profile-generate=program.profile program.txt
+    python compiler_test.py -O2 --profile-use=program.profile program.txt
+
+--target=c lowers the AST to C instead; -o then builds it with the
+system C compiler (cc -O2).  --target=llvm emits LLVM IR; -o builds it
+with opt, llc and the system C compiler.  --target=bytecode assembles
+register bytecode; -o saves a .mcb file that bytecode_vm.py runs:
+
+    python compiler_test.py -O1 --target=bytecode -o program.mcb program.txt
+    python bytecode_vm.py program.mcb
 """
 
+import sys
+
 from lexer import Lexer, test_lexer
 from parser import Parser, test_parser
 from semantic_analyzer import SemanticAnalyzer, test_semantic_analyzer
 from intermediate_code import IntermediateCode, test_intermediate_code
 from code_generator import AssemblyGenerator, test_code_generator
+from code_generator_x64 import X64AssemblyGenerator
+from pass_manager import PassManager
+from elf_writer import ELFWriter
+from x86_emulator import X86Emulator
+from line_profiler import LineProfiler
+from block_layout import BlockProfiler, Profile
+from c_generator import CCodeGenerator, compile_c
+from llvm_generator import LLVMGenerator, build_llvm
+from bytecode_vm import BytecodeCompiler
+
+
+# Phase 5 backends by target name
+TARGETS = {
+    'x86': AssemblyGenerator,
+    'x86-64': X64AssemblyGenerator,
+    'c': CCodeGenerator,
+    'llvm': LLVMGenerator,
+    'bytecode': BytecodeCompiler,
+}
 
 
 class Compiler:
@@ -30,10 +88,14 @@ class Compiler:
         self.ast = None
         self.symbol_table = None
         self.tac = None
+        self.source_lines = None
         self.string_literals = None
         self.assembly = None
+        self.pass_manager = None
    
-    def compile(self, stop_at_phase: int = 5):
+    def compile(self, stop_at_phase: int = 5, opt_level: str = 'O0', target: str = 'x86',
+                source_map: bool = False, profile_generate: str = None,
+                profile_use: str = None):
         """
         Run compilation phases up to specified phase
         
@@ -45,10 +107,20 @@ class Compiler:
             3 = Up to Semantic Analysis
             4 = Up to Intermediate Code Generation
             5 = Complete compilation (all phases)
+        opt_level : str
+            'O0' (no optimization), 'O1', 'O2', 'O3' or 'Os'
+        target : str
+            'x86' (32-bit) or 'x86-64' (System V, SSE2 floats)
+        source_map : bool
+            mark the x86 assembly with the source line of its code
+        profile_generate : str
+            run the program and write its block profile to this file
+        profile_use : str
+            optimize with the block profile in this file
         """
         print("\n" + "="*60)
         print("MINI COMPILER - CSE 430 Project")
-        print(f" Running up to Phase {stop_at_phase}")
+        print(f" Running up to Phase {stop_at_phase} (-{opt_level.lstrip('-')})")
         print("="*60)
        
         try:
@@ -98,7 +170,28 @@ class Compiler:
             if stop_at_phase >= 4:
                 ic_generator = IntermediateCode()
                 self.tac = ic_generator.generate(self.ast)
+                self.source_lines = ic_generator.source_lines
                 self.string_literals = ic_generator.string_literals
+
+                if profile_generate:
+                    profiler = BlockProfiler(self.tac, self.string_literals)
+                    profiler.run()
+                    profiler.profile().save(profile_generate)
+                    profiler.display()
+                    print(f"Wrote {profile_generate}")
+                profile = None
+                if profile_use:
+                    profile = Profile.load(profile_use)
+                    if not profile.matches(self.tac):
+                        print(f"\nWarning: {profile_use} was recorded for different code; ignored")
+                        profile = None
+
+                self.pass_manager = PassManager(opt_level, self.symbol_table,
+                                                self.string_literals, profile)
+                if self.pass_manager.pipeline():
+                    self.tac = self.pass_manager.run(self.tac, self.source_lines)
+                    self.source_lines = self.pass_manager.source_lines
+                    self.pass_manager.display()
                 
                 if stop_at_phase == 4:
                     print("\n" + "="*60)
@@ -115,8 +208,15 @@ class Compiler:
            
             # Phase 5: Code Generation
             if stop_at_phase >= 5:
-                asm_generator = AssemblyGenerator(self.tac, self.symbol_table, 
-                                                  self.string_literals)
+                if target == 'c':
+                    # The C backend works from the AST; cc optimizes it
+                    asm_generator = CCodeGenerator(self.ast, self.symbol_table)
+                else:
+                    options = self.pass_manager.codegen_options()
+                    if source_map and target == 'x86':
+                        options['source_lines'] = self.source_lines
+                    asm_generator = TARGETS[target](self.tac, self.symbol_table,
+                                                    self.string_literals, **options)
                 self.assembly = asm_generator.generate()
            
                 print("\n" + "="*60)
@@ -197,5 +297,82 @@ def main_menu():
 # MAIN EXECUTION
 # ============================================
 
+def main(args):
+    """Compile a source file:
+    compiler_test.py [-O0|-O1|-O2|-O3|-Os] [--target=x86|x86-64|c|llvm|bytecode]
+                     [--emulate|--profile] [--profile-generate=FILE|--profile-use=FILE]
+                     [-o output] <file>"""
+    opt_level = 'O0'
+    target = 'x86'
+    output = None
+    emulate = False
+    profile = False
+    profile_generate = profile_use = None
+    files = []
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg.startswith('-O'):
+            opt_level = arg[1:]
+        elif arg.startswith('--target='):
+            target = arg.split('=', 1)[1]
+        elif arg == '-o' and args:
+            output = args.pop(0)
+        elif arg == '--emulate':
+            emulate = True
+        elif arg == '--profile':
+            profile = True
+        elif arg.startswith('--profile-generate='):
+            profile_generate = arg.split('=', 1)[1]
+        elif arg.startswith('--profile-use='):
+            profile_use = arg.split('=', 1)[1]
+        else:
+            files.append(arg)
+    if (len(files) != 1 or target not in TARGETS or (output and target == 'x86-64')
+            or ((emulate or profile) and target != 'x86')):
+        print("Usage: python compiler_test.py [-O0|-O1|-O2|-O3|-Os] "
+              "[--target=x86|x86-64|c|llvm|bytecode] [--emulate|--profile] "
+              "[--profile-generate=FILE|--profile-use=FILE] [-o output] <source file>")
+        print("       (-o writes a static ELF executable for the x86 target,")
+        print("        builds the generated C / LLVM IR with the system toolchain,")
+        print("        or saves a bytecode file; --emulate runs x86 code in-process,")
+        print("        --profile also reports the hottest source lines;")
+        print("        --profile-generate records a block profile, --profile-use")
+        print("        optimizes with it)")
+        return 1
+    with open(files[0]) as source:
+        compiler = Compiler(source.read())
+    result = compiler.compile(opt_level=opt_level, target=target, source_map=profile,
+                              profile_generate=profile_generate, profile_use=profile_use)
+    if result and profile:
+        profiler = LineProfiler(result['assembly'])
+        profiler.run()
+        profiler.display()
+        profiler.report(compiler.source_code)
+    elif result and emulate:
+        emulator = X86Emulator(result['assembly'])
+        emulator.run()
+        emulator.display()
+    if result and output and target == 'c':
+        compile_c(result['assembly'], output)
+        print(f"\nWrote {output}")
+    elif result and output and target == 'llvm':
+        build_llvm(result['assembly'], output)
+        print(f"\nWrote {output}")
+    elif result and output and target == 'bytecode':
+        program = BytecodeCompiler(compiler.tac, compiler.symbol_table,
+                                   compiler.string_literals).assemble()
+        size = program.save(output)
+        print(f"\nWrote {output}: {size} bytes")
+    elif result and output:
+        writer = ELFWriter(result['assembly'])
+        size = writer.write(output)
+        writer.display()
+        print(f"\nWrote {output}: {size} bytes")
+    return 0 if result else 1
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main(sys.argv[1:]))
     main_menu()
\ No newline at end of file
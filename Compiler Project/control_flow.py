@@ -0,0 +1,338 @@
+"""
+============================================
+OPTIMIZATION SUPPORT: CONTROL FLOW GRAPH
+CSE 430 - Compiler Design Lab
+============================================
+
+Splits Three-Address Code (TAC) into basic blocks, links them into a
+control flow graph (CFG) and flattens the graph back into TAC.  The
+optimization passes work on this structure instead of raw strings.
+"""
+
+import re
+from typing import List, Dict, Optional, Set
+
+
+TEMP_PATTERN = re.compile(r't(\d+)$')
+LABEL_PATTERN = re.compile(r'L(\d+)$')
+COMPARISON_OPERATORS = ['<', '>', '==', '!=', '<=', '>=']
+
+
+# ============================================
+# TAC INSTRUCTION HELPERS
+# ============================================
+
+def is_label(instruction: str) -> bool:
+    return instruction.endswith(':')
+
+
+def label_name(instruction: str) -> str:
+    return instruction[:-1]
+
+
+def is_goto(instruction: str) -> bool:
+    return instruction.startswith('goto ')
+
+
+def is_conditional_jump(instruction: str) -> bool:
+    return instruction.startswith('if_false ') or instruction.startswith('if_true ')
+
+
+def is_jump(instruction: str) -> bool:
+    return is_goto(instruction) or is_conditional_jump(instruction)
+
+
+def jump_target(instruction: str) -> Optional[str]:
+    """Return the label a jump instruction transfers control to"""
+    if is_jump(instruction):
+        return instruction.split()[-1]
+    return None
+
+
+def is_fused_branch(instruction: str) -> bool:
+    """if_false a < b goto L: the comparison lives in the branch itself"""
+    return is_conditional_jump(instruction) and len(instruction.split()) == 6
+
+
+def retarget_jump(instruction: str, label: str) -> str:
+    """Return the jump instruction with its target replaced by label"""
+    parts = instruction.split()
+    parts[-1] = label
+    return " ".join(parts)
+
+
+def is_temp(operand: str) -> bool:
+    return TEMP_PATTERN.match(operand) is not None
+
+
+def temp_index(operand: str) -> int:
+    return int(TEMP_PATTERN.match(operand).group(1))
+
+
+def is_int_constant(operand: str) -> bool:
+    return re.fullmatch(r'-?\d+', operand) is not None
+
+
+def is_float_constant(operand: str) -> bool:
+    # repr() of very large or small floats uses an exponent: 1e+16, 1.5e-05
+    return re.fullmatch(r'-?\d+(\.\d+|(\.\d+)?e[+-]\d+)', operand) is not None
+
+
+def is_constant(operand: str, string_labels=()) -> bool:
+    """Numeric literals and string literal labels never change at runtime.
+    string_labels are the labels of the program's string_literals; a user
+    variable may have a label-like name (str1), so the name alone is no
+    evidence"""
+    return (re.fullmatch(r'-?\d+(\.\d+)?(e[+-]\d+)?', operand) is not None
+            or operand in string_labels)
+
+
+def is_assignment(instruction: str) -> bool:
+    parts = instruction.split()
+    return len(parts) >= 3 and parts[1] == '='
+
+
+def defined_var(instruction: str) -> Optional[str]:
+    """Return the name written by an instruction, if any"""
+    if is_assignment(instruction):
+        return instruction.split()[0]
+    return None
+
+
+def used_vars(instruction: str, string_labels=()) -> List[str]:
+    """Return the variable and temporary names read by an instruction"""
+    parts = instruction.split()
+    if is_label(instruction) or is_goto(instruction):
+        operands = []
+    elif is_conditional_jump(instruction):
+        # if_false c goto L  /  if_false a < b goto L
+        operands = [parts[1]] if len(parts) == 4 else [parts[1], parts[3]]
+    elif instruction.startswith('print '):
+        operands = [parts[1]]
+    elif is_assignment(instruction):
+        operands = [parts[2]] if len(parts) == 3 else [parts[2], parts[4]]
+    else:
+        operands = []
+    return [op for op in operands if not is_constant(op, string_labels)]
+
+
+def replace_uses(instruction: str, mapping: Dict[str, str]) -> str:
+    """Rename the operands an instruction reads (never the one it writes)"""
+    parts = instruction.split()
+    if is_conditional_jump(instruction):
+        positions = [1] if len(parts) == 4 else [1, 3]
+    elif instruction.startswith('print '):
+        positions = [1]
+    elif is_assignment(instruction):
+        positions = [2] if len(parts) == 3 else [2, 4]
+    else:
+        positions = []
+    for pos in positions:
+        parts[pos] = mapping.get(parts[pos], parts[pos])
+    return " ".join(parts)
+
+
+def next_temp_index(tac: List[str]) -> int:
+    """First temporary number not used anywhere in the TAC"""
+    highest = -1
+    for instruction in tac:
+        for part in instruction.split():
+            if is_temp(part):
+                highest = max(highest, temp_index(part))
+    return highest + 1
+
+
+def next_label_index(tac: List[str]) -> int:
+    """First label number not used anywhere in the TAC"""
+    highest = -1
+    for instruction in tac:
+        for part in instruction.rstrip(':').split():
+            match = LABEL_PATTERN.match(part)
+            if match:
+                highest = max(highest, int(match.group(1)))
+    return highest + 1
+
+
+# ============================================
+# BASIC BLOCKS AND CFG
+# ============================================
+
+class BasicBlock:
+    """Straight-line run of TAC with a single entry and a single exit"""
+
+    def __init__(self, block_id: int, label: str = None):
+        self.id = block_id
+        self.label = label
+        self.instructions = []
+        self.successors = []
+        self.predecessors = []
+
+    def terminator(self) -> Optional[str]:
+        if self.instructions and is_jump(self.instructions[-1]):
+            return self.instructions[-1]
+        return None
+
+    def __repr__(self):
+        name = self.label if self.label else f"B{self.id}"
+        return f"BasicBlock({name}, {len(self.instructions)} instr)"
+
+
+class ControlFlowGraph:
+    """Basic blocks in layout order with successor/predecessor edges"""
+
+    def __init__(self, tac: List[str], string_labels=()):
+        self.blocks = []
+        # Labels of string literals: read like names, but never written
+        self.string_labels = set(string_labels)
+        self.next_block_id = 0
+        self.build(tac)
+
+    def new_block(self, label: str = None) -> BasicBlock:
+        block = BasicBlock(self.next_block_id, label)
+        self.next_block_id += 1
+        return block
+
+    def build(self, tac: List[str]):
+        """Split TAC into basic blocks at labels and after jumps"""
+        current = None
+        for instruction in tac:
+            if is_label(instruction):
+                current = self.new_block(label_name(instruction))
+                self.blocks.append(current)
+                continue
+            if current is None:
+                current = self.new_block()
+                self.blocks.append(current)
+            current.instructions.append(instruction)
+            if is_jump(instruction):
+                current = None
+        if not self.blocks:
+            self.blocks.append(self.new_block())
+        self.link()
+
+    def link(self):
+        """(Re)compute successor and predecessor edges from the layout"""
+        by_label = self.block_map()
+        for block in self.blocks:
+            block.successors = []
+            block.predecessors = []
+        for index, block in enumerate(self.blocks):
+            following = self.blocks[index + 1] if index + 1 < len(self.blocks) else None
+            last = block.terminator()
+            targets = []
+            if last is None or is_conditional_jump(last):
+                if following is not None:
+                    targets.append(following)
+            if last is not None:
+                target = by_label.get(jump_target(last))
+                if target is not None and target not in targets:
+                    targets.append(target)
+            block.successors = targets
+            for target in targets:
+                target.predecessors.append(block)
+
+    def block_map(self) -> Dict[str, BasicBlock]:
+        return {block.label: block for block in self.blocks if block.label}
+
+    def entry(self) -> BasicBlock:
+        return self.blocks[0]
+
+    def fallthrough(self, block: BasicBlock) -> Optional[BasicBlock]:
+        """Block reached when control runs off the end of block"""
+        last = block.terminator()
+        if last is not None and is_goto(last):
+            return None
+        index = self.blocks.index(block)
+        if index + 1 < len(self.blocks):
+            return self.blocks[index + 1]
+        return None
+
+    def reachable(self) -> Set[BasicBlock]:
+        seen = set()
+        stack = [self.entry()]
+        while stack:
+            block = stack.pop()
+            if block in seen:
+                continue
+            seen.add(block)
+            stack.extend(block.successors)
+        return seen
+
+    def dominators(self) -> Dict[BasicBlock, Set[BasicBlock]]:
+        """Iterative dominator sets over the reachable blocks"""
+        blocks = [b for b in self.blocks if b in self.reachable()]
+        entry = self.entry()
+        dom = {b: set(blocks) for b in blocks}
+        dom[entry] = {entry}
+        changed = True
+        while changed:
+            changed = False
+            for block in blocks:
+                if block is entry:
+                    continue
+                preds = [dom[p] for p in block.predecessors if p in dom]
+                new = set.intersection(*preds) if preds else set()
+                new = new | {block}
+                if new != dom[block]:
+                    dom[block] = new
+                    changed = True
+        return dom
+
+    def liveness(self):
+        """Backward dataflow: names live on entry to / exit from each block"""
+        use, define = {}, {}
+        for block in self.blocks:
+            use[block], define[block] = set(), set()
+            for instruction in block.instructions:
+                for name in used_vars(instruction, self.string_labels):
+                    if name not in define[block]:
+                        use[block].add(name)
+                written = defined_var(instruction)
+                if written:
+                    define[block].add(written)
+        live_in = {block: set() for block in self.blocks}
+        live_out = {block: set() for block in self.blocks}
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(self.blocks):
+                out = set()
+                for succ in block.successors:
+                    out |= live_in[succ]
+                new_in = use[block] | (out - define[block])
+                if out != live_out[block] or new_in != live_in[block]:
+                    live_out[block], live_in[block] = out, new_in
+                    changed = True
+        return live_in, live_out
+
+    def fresh_label(self) -> str:
+        return f"L{next_label_index(self.to_tac())}"
+
+    def insert_block_before(self, target: BasicBlock, label: str = None) -> BasicBlock:
+        """Insert an empty block in the layout right before target"""
+        block = self.new_block(label)
+        self.blocks.insert(self.blocks.index(target), block)
+        return block
+
+    def to_tac(self) -> List[str]:
+        """Flatten the graph back into TAC in layout order"""
+        return self.flatten(self.blocks)
+
+    @staticmethod
+    def flatten(blocks: List[BasicBlock]) -> List[str]:
+        tac = []
+        for block in blocks:
+            if block.label:
+                tac.append(f"{block.label}:")
+            tac.extend(block.instructions)
+        return tac
+
+    def display(self):
+        print("\nControl Flow Graph:")
+        print("-" * 50)
+        for block in self.blocks:
+            name = block.label if block.label else f"B{block.id}"
+            succs = ", ".join(s.label or f"B{s.id}" for s in block.successors)
+            print(f"{name}: {len(block.instructions)} instr -> [{succs}]")
+            for instruction in block.instructions:
+                print(f"    {instruction}")
@@ -0,0 +1,549 @@
+"""
+============================================
+BACKEND: MACHINE-CODE ENCODER AND ELF WRITER
+CSE 430 - Compiler Design Lab
+============================================
+
+Turns the assembly lines of AssemblyGenerator (32-bit x86) straight
+into a static Linux executable, without an external assembler or
+linker:
+
+    section .data    ->  x dd 0 / dq / db "...", 0   (bytes)
+    section .rodata  ->  constant pool                (bytes)
+    section .bss     ->  t0 resd 1                    (size only)
+    section .text    ->  X86Encoder                   (machine code)
+
+The encoder knows the instruction subset the backend and its runtime
+library (runtime_library.py, including a few SSE2 instructions) emit, and picks
+the same short forms as GNU as (imm8 arithmetic, eax/moffs moves, rel8
+jumps), so its output can be compared byte for byte.  Labels are
+resolved in two passes: the first lays out the code, growing any jump
+whose target is out of rel8 range until nothing changes, and the
+second encodes with every address known.
+
+The ELF file has one read/execute segment (headers, .text, .rodata),
+one read/write segment (.data, .bss), section headers and a symbol
+table, so objdump/readelf/gdb can read it.
+"""
+
+import struct
+from typing import List, Dict, Optional
+from source_map import marker_line
+
+
+# ---------- operands ----------
+
+REGISTERS_32 = {'eax': 0, 'ecx': 1, 'edx': 2, 'ebx': 3, 'esp': 4, 'ebp': 5, 'esi': 6, 'edi': 7}
+REGISTERS_8 = {'al': 0, 'cl': 1, 'dl': 2, 'bl': 3}
+REGISTERS_XMM = {f"xmm{n}": n for n in range(8)}
+SCALE_BITS = {1: 0, 2: 1, 4: 2, 8: 3}
+
+# ALU opcode extensions (/digit) and condition codes
+ALU = {'add': 0, 'or': 1, 'and': 4, 'sub': 5, 'xor': 6, 'cmp': 7}
+# F7 group (/digit) and shifts (C1 /digit)
+UNARY = {'neg': 3, 'mul': 4, 'idiv': 7}
+SHIFTS = {'shl': 4, 'shr': 5}
+# Scalar double SSE2 instructions used by the runtime: prefix + 0F opcode
+SSE2 = {'movsd': b'\xf2\x0f\x10', 'addsd': b'\xf2\x0f\x58', 'mulsd': b'\xf2\x0f\x59',
+        'subsd': b'\xf2\x0f\x5c', 'divsd': b'\xf2\x0f\x5e', 'ucomisd': b'\x66\x0f\x2e',
+        'cvtsi2sd': b'\xf2\x0f\x2a', 'cvttsd2si': b'\xf2\x0f\x2c'}
+CONDITIONS = {'o': 0, 'no': 1, 'b': 2, 'ae': 3, 'e': 4, 'ne': 5, 'be': 6, 'a': 7,
+              's': 8, 'ns': 9, 'p': 10, 'np': 11, 'l': 12, 'ge': 13, 'le': 14, 'g': 15,
+              'z': 4, 'nz': 5}
+
+BASE_ADDRESS = 0x08048000
+PAGE_SIZE = 0x1000
+
+
+class Operand:
+    """Register, immediate, memory reference or label"""
+
+    def __init__(self, kind: str, register: int = None, value: int = 0, base: int = None,
+                 index: int = None, scale: int = 1, symbol: str = None, byte: bool = False):
+        self.kind = kind            # 'reg', 'imm', 'mem', 'label'
+        self.register = register
+        self.value = value          # immediate / displacement
+        self.base = base
+        self.index = index
+        self.scale = scale
+        self.symbol = symbol        # data label inside [...] or jump target
+        self.byte = byte            # 8-bit register or byte memory operand
+
+    @staticmethod
+    def parse(text: str) -> 'Operand':
+        text = text.strip()
+        byte = text.startswith('byte ')
+        for prefix in ('dword ', 'qword ', 'byte '):
+            if text.startswith(prefix):
+                text = text[len(prefix):].strip()
+        if text.startswith('['):
+            operand = Operand('mem', byte=byte)
+            terms = text[1:-1].replace('-', '+-').split('+')
+            for term in (t.strip() for t in terms if t.strip()):
+                if '*' in term:
+                    register, scale = term.split('*')
+                    operand.index, operand.scale = REGISTERS_32[register], int(scale)
+                elif term in REGISTERS_32:
+                    if operand.base is None:
+                        operand.base = REGISTERS_32[term]
+                    else:
+                        operand.index = REGISTERS_32[term]
+                elif term.lstrip('-').isdigit():
+                    operand.value += int(term)
+                else:
+                    operand.symbol = term
+            return operand
+        if text in REGISTERS_32:
+            return Operand('reg', REGISTERS_32[text])
+        if text in REGISTERS_8:
+            return Operand('reg', REGISTERS_8[text], byte=True)
+        if text in REGISTERS_XMM:
+            return Operand('reg', REGISTERS_XMM[text])
+        try:
+            return Operand('imm', value=int(text, 0))
+        except ValueError:
+            return Operand('label', symbol=text)
+
+
+def fits_byte(value: int) -> bool:
+    return -128 <= value <= 127
+
+
+def modrm(reg_field: int, operand: Operand, symbols: Dict[str, int]) -> bytes:
+    """ModRM (+ SIB + displacement) for a register or memory operand"""
+    if operand.kind == 'reg':
+        return bytes([0xC0 | reg_field << 3 | operand.register])
+    disp = operand.value + (symbols.get(operand.symbol, 0) if operand.symbol else 0)
+    if operand.base is None and operand.index is None:
+        return bytes([reg_field << 3 | 0b101]) + struct.pack('<i', disp)
+    if operand.symbol is not None:
+        mod, tail = 0b10, struct.pack('<i', disp)
+    elif disp == 0 and operand.base != REGISTERS_32['ebp']:
+        mod, tail = 0b00, b''
+    elif fits_byte(disp):
+        mod, tail = 0b01, struct.pack('<b', disp)
+    else:
+        mod, tail = 0b10, struct.pack('<i', disp)
+    if operand.index is None and operand.base != REGISTERS_32['esp']:
+        return bytes([mod << 6 | reg_field << 3 | operand.base]) + tail
+    # SIB byte: [base + index*scale]; no base means disp32 with mod 00
+    index = operand.index if operand.index is not None else 0b100
+    if operand.base is None:
+        sib = SCALE_BITS[operand.scale] << 6 | index << 3 | 0b101
+        return bytes([reg_field << 3 | 0b100, sib]) + struct.pack('<i', disp)
+    sib = SCALE_BITS[operand.scale] << 6 | index << 3 | operand.base
+    return bytes([mod << 6 | reg_field << 3 | 0b100, sib]) + tail
+
+
+def is_absolute(operand: Operand) -> bool:
+    return operand.kind == 'mem' and operand.base is None and operand.index is None
+
+
+class X86Encoder:
+    """Two-pass encoder for the .text lines of AssemblyGenerator output"""
+
+    def __init__(self, lines: List[str]):
+        self.instructions = []      # (opcode, operands, source line)
+        self.labels: Dict[str, int] = {}    # label -> instruction index it precedes
+        self.long_jumps = set()     # indices of jumps that need rel32
+        self.source_lines = []      # program line of each instruction ('; line N' markers)
+        source_line = None
+        for line in lines:
+            marked = marker_line(line)
+            if marked is not None:
+                source_line = marked
+                continue
+            text = line.split(';')[0].strip()
+            if not text or text.startswith('global'):
+                continue
+            if text.endswith(':'):
+                self.labels[text[:-1]] = len(self.instructions)
+                continue
+            opcode, _, rest = text.partition(' ')
+            operands = [Operand.parse(part) for part in rest.split(',')] if rest.strip() else []
+            self.instructions.append((opcode, operands, line))
+            self.source_lines.append(source_line)
+
+    def is_jump(self, opcode: str) -> bool:
+        return opcode == 'jmp' or (opcode.startswith('j') and opcode[1:] in CONDITIONS)
+
+    def layout(self) -> Dict[str, int]:
+        """Offsets of every label; grows rel8 jumps until all targets fit"""
+        while True:
+            offsets = []
+            offset = 0
+            for index, (opcode, operands, _) in enumerate(self.instructions):
+                offsets.append(offset)
+                offset += len(self.encode_one(index, opcode, operands, {}, 0, sizing=True))
+            offsets.append(offset)
+            labels = {label: offsets[index] for label, index in self.labels.items()}
+            grown = False
+            for index, (opcode, operands, _) in enumerate(self.instructions):
+                if self.is_jump(opcode) and index not in self.long_jumps:
+                    end = offsets[index + 1]
+                    if not fits_byte(labels[operands[0].symbol] - end):
+                        self.long_jumps.add(index)
+                        grown = True
+            if not grown:
+                self.size = offset
+                return labels
+
+    def encode(self, address: int, symbols: Dict[str, int]) -> bytes:
+        """Machine code for the whole section placed at address"""
+        labels = self.layout()
+        symbols = dict(symbols)
+        symbols.update({label: address + offset for label, offset in labels.items()})
+        code = bytearray()
+        for index, (opcode, operands, _) in enumerate(self.instructions):
+            code += self.encode_one(index, opcode, operands, symbols, address + len(code))
+        self.labels_at = {label: symbols[label] for label in labels}
+        return bytes(code)
+
+    def encode_one(self, index: int, opcode: str, operands: List[Operand],
+                   symbols: Dict[str, int], address: int, sizing: bool = False) -> bytes:
+        try:
+            return self.select(index, opcode, operands, symbols, address, sizing)
+        except (KeyError, IndexError, AttributeError, TypeError):
+            pass
+        raise ValueError(f"Cannot encode: {self.instructions[index][2].strip()}")
+
+    def select(self, index, opcode, operands, symbols, address, sizing) -> bytes:
+        ops = operands
+        if self.is_jump(opcode):
+            target = 0 if sizing else symbols[ops[0].symbol]
+            condition = CONDITIONS.get(opcode[1:]) if opcode != 'jmp' else None
+            if index in self.long_jumps:
+                prefix = b'\xe9' if condition is None else bytes([0x0F, 0x80 | condition])
+                return prefix + struct.pack('<i', target - (address + len(prefix) + 4))
+            prefix = b'\xeb' if condition is None else bytes([0x70 | condition])
+            return prefix + struct.pack('<b', 0 if sizing else target - (address + 2))
+        if opcode == 'call':
+            target = 0 if sizing else symbols[ops[0].symbol]
+            return b'\xe8' + struct.pack('<i', target - (address + 5))
+        if opcode == 'ret':
+            return b'\xc3'
+        if opcode == 'push':
+            return bytes([0x50 | ops[0].register])
+        if opcode == 'pop':
+            return bytes([0x58 | ops[0].register])
+        if opcode == 'mov' and (ops[0].byte or ops[1].byte):
+            dest, source = ops
+            if source.kind == 'imm':
+                return b'\xc6' + modrm(0, dest, symbols) + struct.pack('<B', source.value & 0xFF)
+            if source.kind == 'reg':
+                return b'\x88' + modrm(source.register, dest, symbols)
+            return b'\x8a' + modrm(dest.register, source, symbols)
+        if opcode == 'mov':
+            dest, source = ops
+            if dest.kind == 'reg' and source.kind == 'imm':
+                return bytes([0xB8 | dest.register]) + struct.pack('<I', source.value & 0xFFFFFFFF)
+            if dest.kind == 'reg' and source.kind == 'reg':
+                return b'\x89' + modrm(source.register, dest, symbols)
+            if dest.kind == 'reg' and source.kind == 'mem':
+                if dest.register == 0 and is_absolute(source):
+                    return b'\xa1' + modrm(0, source, symbols)[1:]
+                return b'\x8b' + modrm(dest.register, source, symbols)
+            if dest.kind == 'mem' and source.kind == 'reg':
+                if source.register == 0 and is_absolute(dest):
+                    return b'\xa3' + modrm(0, dest, symbols)[1:]
+                return b'\x89' + modrm(source.register, dest, symbols)
+            if dest.kind == 'mem' and source.kind == 'imm':
+                return b'\xc7' + modrm(0, dest, symbols) + struct.pack('<I', source.value & 0xFFFFFFFF)
+        if opcode in ALU:
+            dest, source = ops
+            extension = ALU[opcode]
+            if source.kind == 'imm' and dest.byte:
+                return b'\x80' + modrm(extension, dest, symbols) + struct.pack('<B', source.value & 0xFF)
+            if source.kind == 'imm':
+                if fits_byte(source.value):
+                    return b'\x83' + modrm(extension, dest, symbols) + struct.pack('<b', source.value)
+                immediate = struct.pack('<I', source.value & 0xFFFFFFFF)
+                if dest.kind == 'reg' and dest.register == 0:
+                    return bytes([extension << 3 | 0x05]) + immediate
+                return b'\x81' + modrm(extension, dest, symbols) + immediate
+            if source.kind == 'reg':
+                return bytes([extension << 3 | 0x01]) + modrm(source.register, dest, symbols)
+            return bytes([extension << 3 | 0x03]) + modrm(dest.register, source, symbols)
+        if opcode == 'test':
+            dest, source = ops
+            return b'\x85' + modrm(source.register, dest, symbols)
+        if opcode == 'imul':
+            if len(ops) == 2 and ops[1].kind == 'imm':
+                ops = [ops[0], ops[0], ops[1]]
+            if len(ops) == 3:
+                dest, source, value = ops
+                if fits_byte(value.value):
+                    return b'\x6b' + modrm(dest.register, source, symbols) + struct.pack('<b', value.value)
+                return b'\x69' + modrm(dest.register, source, symbols) + \
+                    struct.pack('<I', value.value & 0xFFFFFFFF)
+            return b'\x0f\xaf' + modrm(ops[0].register, ops[1], symbols)
+        if opcode == 'lea':
+            return b'\x8d' + modrm(ops[0].register, ops[1], symbols)
+        if opcode in SHIFTS:
+            if ops[1].value == 1:
+                return b'\xd1' + modrm(SHIFTS[opcode], ops[0], symbols)
+            return b'\xc1' + modrm(SHIFTS[opcode], ops[0], symbols) + bytes([ops[1].value])
+        if opcode in UNARY:
+            return b'\xf7' + modrm(UNARY[opcode], ops[0], symbols)
+        if opcode in SSE2:
+            dest, source = ops
+            if opcode == 'movsd' and dest.kind == 'mem':
+                return b'\xf2\x0f\x11' + modrm(source.register, dest, symbols)
+            return SSE2[opcode] + modrm(dest.register, source, symbols)
+        if opcode == 'cdq':
+            return b'\x99'
+        if opcode == 'movzx':
+            return b'\x0f\xb6' + modrm(ops[0].register, ops[1], symbols)
+        if opcode.startswith('set') and opcode[3:] in CONDITIONS:
+            return bytes([0x0F, 0x90 | CONDITIONS[opcode[3:]]]) + modrm(0, ops[0], symbols)
+        if opcode == 'xchg':
+            first, second = ops
+            if first.kind == 'reg' and second.kind == 'reg' and 0 in (first.register, second.register):
+                return bytes([0x90 | (first.register or second.register)])
+            return b'\x87' + modrm(second.register, first, symbols)
+        if opcode == 'int':
+            return bytes([0xCD, ops[0].value])
+        raise KeyError(opcode)
+
+
+# ---------- data sections ----------
+
+class DataSection:
+    """Bytes (or, for .bss, just a size) and label offsets of one section"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.data = bytearray()
+        self.size = 0
+        self.align = 4
+        self.labels: Dict[str, int] = {}
+
+    def add(self, line: str):
+        text = strip_comment(line)
+        if not text:
+            return
+        words = text.split(None, 2)
+        if words[0] in ('align', 'alignb'):
+            boundary = int(words[1])
+            self.align = max(self.align, boundary)
+            self.reserve((-self.size) % boundary)
+            return
+        label, directive, rest = words
+        self.labels[label] = self.size
+        if directive == 'dd':
+            self.emit(b''.join(struct.pack('<i', int(v)) for v in rest.split(',')))
+        elif directive == 'dq':
+            self.emit(b''.join(struct.pack('<d', float(v)) for v in rest.split(',')))
+        elif directive == 'db':
+            value, _, tail = rest.rpartition(',')
+            self.emit(value.strip()[1:-1].encode() + bytes([int(tail)]))
+        elif directive in ('resb', 'resd', 'resq'):
+            self.reserve({'resb': 1, 'resd': 4, 'resq': 8}[directive] * int(rest))
+        else:
+            raise ValueError(f"Unknown data directive: {text}")
+
+    def emit(self, data: bytes):
+        self.data += data
+        self.size += len(data)
+
+    def reserve(self, count: int):
+        if self.name != '.bss':
+            self.data += bytes(count)
+        self.size += count
+
+
+def strip_comment(line: str) -> str:
+    """Text before a ';' comment that is not inside a string literal"""
+    quoted = False
+    for position, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ';' and not quoted:
+            return line[:position].strip()
+    return line.strip()
+
+
+def align_up(value: int, boundary: int) -> int:
+    return (value + boundary - 1) // boundary * boundary
+
+
+class ELFWriter:
+    """Static ELF32 i386 executable from AssemblyGenerator output"""
+
+    def __init__(self, assembly: List[str]):
+        self.sections = {name: DataSection(name) for name in ('.data', '.rodata', '.bss')}
+        text = []
+        current = None
+        for line in assembly:
+            stripped = line.strip()
+            if stripped.startswith('section '):
+                current = stripped.split()[1]
+            elif current == '.text':
+                text.append(line)
+            elif current in self.sections:
+                self.sections[current].add(line)
+        self.encoder = X86Encoder(text)
+        self.addresses: Dict[str, int] = {}
+        self.symbols: Dict[str, int] = {}
+        self.text = b''
+
+    def layout(self):
+        """Section addresses; .text's size does not depend on data addresses"""
+        self.encoder.layout()
+        program_headers = 2
+        offset = align_up(52 + 32 * program_headers, 16)
+        self.offsets = {'.text': offset}
+        offset += self.encoder.size
+        rodata = self.sections['.rodata']
+        offset = align_up(offset, rodata.align)
+        self.offsets['.rodata'] = offset
+        offset += rodata.size
+        data = self.sections['.data']
+        offset = align_up(offset, 16)
+        self.offsets['.data'] = offset
+        self.addresses = {name: BASE_ADDRESS + self.offsets[name] for name in ('.text', '.rodata')}
+        # Read/write segment on the next page, congruent to its file offset
+        self.addresses['.data'] = BASE_ADDRESS + PAGE_SIZE + offset
+        bss = self.sections['.bss']
+        self.addresses['.bss'] = align_up(self.addresses['.data'] + data.size, bss.align)
+        for name, section in self.sections.items():
+            for label, label_offset in section.labels.items():
+                self.symbols[label] = self.addresses[name] + label_offset
+
+    def build(self) -> bytes:
+        self.layout()
+        self.text = self.encoder.encode(self.addresses['.text'], self.symbols)
+        self.symbols.update(self.encoder.labels_at)
+        if '_start' not in self.symbols:
+            raise ValueError("No _start label in .text")
+
+        data = self.sections['.data']
+        rodata = self.sections['.rodata']
+        bss = self.sections['.bss']
+        image = bytearray(self.offsets['.data'] + data.size)
+        image[self.offsets['.text']:self.offsets['.text'] + len(self.text)] = self.text
+        image[self.offsets['.rodata']:self.offsets['.rodata'] + rodata.size] = rodata.data
+        image[self.offsets['.data']:] = data.data
+
+        # Symbol table and section names
+        strtab = bytearray(b'\0')
+        symtab = bytearray(bytes(16))
+        section_index = {'.text': 1, '.rodata': 2, '.data': 3, '.bss': 4}
+        ordered = sorted(self.symbols.items(), key=lambda item: (item[0] == '_start', item[1]))
+        for name, value in ordered:
+            section = next((s for s, index in section_index.items() if name in self.sections_of(s)), '.text')
+            binding = 1 if name == '_start' else 0
+            kind = 0 if section == '.text' else 1
+            symtab += struct.pack('<IIIBBH', len(strtab), value, 0, binding << 4 | kind, 0,
+                                  section_index[section])
+            strtab += name.encode() + b'\0'
+        first_global = len(ordered)
+        names = [b'', b'.text', b'.rodata', b'.data', b'.bss', b'.symtab', b'.strtab', b'.shstrtab']
+        shstrtab = b'\0'.join(names) + b'\0'
+        name_offset = {name: shstrtab.index(name + b'\0') if name else 0 for name in names}
+
+        symtab_offset = align_up(len(image), 4)
+        image += bytes(symtab_offset - len(image)) + symtab
+        strtab_offset = len(image)
+        image += strtab
+        shstrtab_offset = len(image)
+        image += shstrtab
+        section_headers_offset = align_up(len(image), 4)
+        image += bytes(section_headers_offset - len(image))
+
+        def header(name, kind, flags, address, offset, size, link=0, info=0, align=1, entsize=0):
+            return struct.pack('<10I', name_offset[name], kind, flags, address, offset, size,
+                               link, info, align, entsize)
+
+        image += bytes(40)
+        image += header(b'.text', 1, 6, self.addresses['.text'], self.offsets['.text'],
+                        len(self.text), align=16)
+        image += header(b'.rodata', 1, 2, self.addresses['.rodata'], self.offsets['.rodata'],
+                        rodata.size, align=rodata.align)
+        image += header(b'.data', 1, 3, self.addresses['.data'], self.offsets['.data'],
+                        data.size, align=4)
+        image += header(b'.bss', 8, 3, self.addresses['.bss'], self.offsets['.data'] + data.size,
+                        bss.size, align=bss.align)
+        image += header(b'.symtab', 2, 0, 0, symtab_offset, len(symtab), link=6,
+                        info=first_global, align=4, entsize=16)
+        image += header(b'.strtab', 3, 0, 0, strtab_offset, len(strtab))
+        image += header(b'.shstrtab', 3, 0, 0, shstrtab_offset, len(shstrtab))
+
+        # ELF header and the two PT_LOAD program headers
+        text_end = self.offsets['.rodata'] + rodata.size
+        data_memory = self.addresses['.bss'] + bss.size - self.addresses['.data']
+        image[0:52] = struct.pack('<4sBBBBB7sHHIIIIIHHHHHH', b'\x7fELF', 1, 1, 1, 0, 0, bytes(7),
+                                  2, 3, 1, self.symbols['_start'], 52, section_headers_offset, 0,
+                                  52, 32, 2, 40, 8, 7)
+        image[52:84] = struct.pack('<8I', 1, 0, BASE_ADDRESS, BASE_ADDRESS, text_end, text_end,
+                                   5, PAGE_SIZE)
+        image[84:116] = struct.pack('<8I', 1, self.offsets['.data'], self.addresses['.data'],
+                                    self.addresses['.data'], data.size, data_memory, 6, PAGE_SIZE)
+        return bytes(image)
+
+    def sections_of(self, name: str) -> Dict[str, int]:
+        if name == '.text':
+            return self.encoder.labels_at
+        return self.sections[name].labels
+
+    def write(self, path: str) -> int:
+        """Write the executable; returns its size in bytes"""
+        import os
+        image = self.build()
+        with open(path, 'wb') as output:
+            output.write(image)
+        os.chmod(path, 0o755)
+        return len(image)
+
+    def display(self):
+        print(f"\nELF sections:")
+        print(f"  {'.text':<8} {self.addresses['.text']:#010x}  {len(self.text):>6} bytes "
+              f"({len(self.encoder.instructions)} instructions, "
+              f"{len(self.encoder.long_jumps)} long jumps)")
+        for name in ('.rodata', '.data', '.bss'):
+            print(f"  {name:<8} {self.addresses[name]:#010x}  {self.sections[name].size:>6} bytes")
+
+
+# Testing function for the ELF writer
+def test_elf_writer(source_code: str, path: str = 'a.out', assembly: List[str] = None):
+    """Compile to a static executable without an external assembler"""
+    print("\n" + "="*60)
+    print(" TESTING MACHINE-CODE ENCODER AND ELF WRITER")
+    print("="*60)
+
+    try:
+        if assembly is None:
+            from code_generator import test_code_generator
+            assembly = test_code_generator(source_code)
+            if assembly is None:
+                return None
+
+        import time
+        start = time.perf_counter()
+        writer = ELFWriter(assembly)
+        size = writer.write(path)
+        elapsed = (time.perf_counter() - start) * 1000
+        writer.display()
+        print(f"\n.text bytes: {writer.text[:32].hex(' ')}{' ...' if len(writer.text) > 32 else ''}")
+        print(f"\nWrote {path}: {size} bytes in {elapsed:.2f} ms")
+        print("\n✓ ELF Emission Successful!")
+        return writer
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int x = 10;
+    int y = 20;
+    int sum = x + y;
+    print(sum);
+    while (x < sum) {
+        x = x + 3;
+    }
+    print("done");
+    """
+
+    test_elf_writer(test_code, '/tmp/minicompiler_demo')
@@ -0,0 +1,298 @@
+"""
+============================================
+OPTIMIZATION: LIST INSTRUCTION SCHEDULING
+CSE 430 - Compiler Design Lab
+============================================
+
+Reorders the instructions of each basic block of generated assembly so
+that loads and long-latency instructions (imul, idiv, SSE arithmetic)
+start early and their results are not needed on the next cycle:
+
+    mov ebx, [a]               mov ebx, [a]
+    imul ebx, [b]      =>      mov ecx, [c]
+    mov ecx, [c]               imul ebx, [b]
+    add ecx, 1                 add ecx, 1
+
+A dependence DAG is built from the registers, memory locations and
+flags every instruction reads and writes, and nodes are list-scheduled
+by the longest latency path to the end of the block.  Labels, jumps,
+comments and anything unknown (int 0x80, syscall) stay in place and
+bound the blocks.  Source line markers are the exception: instructions
+carry their line while they move, and the markers are rewritten after.
+
+The machine model is one instruction issued per cycle, in order, with
+the latencies in LATENCIES; estimate_cycles() uses the same model to
+report the cycle count before and after scheduling.
+"""
+
+from typing import List, Dict, Set
+from peephole import AsmInstruction, REGISTER_FAMILIES, is_memory, address
+from source_map import strip_markers, insert_markers
+
+
+# Cycles until the result can be used (one issue per cycle, in order)
+LATENCIES = {
+    'mov': 1, 'movzx': 1, 'lea': 1, 'add': 1, 'sub': 1, 'and': 1, 'or': 1, 'xor': 1,
+    'shl': 1, 'cmp': 1, 'test': 1, 'cdq': 1, 'cqo': 1, 'xchg': 2, 'setcc': 1,
+    'imul': 3, 'idiv': 26,
+    'movsd': 1, 'addsd': 4, 'subsd': 4, 'mulsd': 4, 'divsd': 14, 'ucomisd': 3,
+    'cvtsi2sd': 4, 'cvttsd2si': 6,
+}
+# Extra cycles when an instruction reads a memory operand
+LOAD_LATENCY = 4
+
+# Instructions that write their first operand only
+WRITE_ONLY = ('mov', 'movzx', 'lea', 'movsd', 'cvtsi2sd', 'cvttsd2si')
+# Instructions that read and write their first operand
+READ_WRITE = ('add', 'sub', 'and', 'or', 'xor', 'shl', 'imul',
+              'addsd', 'subsd', 'mulsd', 'divsd')
+COMPARES = ('cmp', 'test', 'ucomisd')
+WRITES_FLAGS = ('add', 'sub', 'and', 'or', 'xor', 'shl', 'imul', 'idiv', 'cmp', 'test', 'ucomisd')
+
+
+def latency_of(instruction: AsmInstruction) -> int:
+    opcode = 'setcc' if instruction.opcode.startswith('set') else instruction.opcode
+    latency = LATENCIES.get(opcode, 1)
+    if any(is_memory(operand) for operand in instruction.operands[1:]) or \
+            (instruction.operands and is_memory(instruction.operands[0])
+             and instruction.opcode not in WRITE_ONLY):
+        latency += LOAD_LATENCY
+    return latency
+
+
+def registers_in(operand: str) -> Set[str]:
+    tokens = operand.replace('[', ' ').replace(']', ' ').replace('+', ' ') \
+                    .replace('-', ' ').replace('*', ' ').split()
+    return {f"reg:{REGISTER_FAMILIES[token]}" for token in tokens if token in REGISTER_FAMILIES}
+
+
+def location(operand: str) -> Set[str]:
+    """Resources an operand names as a value: a register or a memory cell"""
+    if is_memory(operand):
+        return {f"mem:{address(operand)}"}
+    return registers_in(operand)
+
+
+def effects(instruction: AsmInstruction):
+    """(reads, writes) resource sets, or None for an instruction that must
+    not move (unknown opcode, system call, jump)"""
+    opcode, operands = instruction.opcode, instruction.operands
+    reads, writes = set(), set()
+    # Registers forming a memory address are always read
+    for operand in operands:
+        if is_memory(operand):
+            reads |= registers_in(operand)
+    if opcode in WRITE_ONLY and len(operands) == 2:
+        writes |= location(operands[0])
+        if opcode != 'lea':
+            reads |= location(operands[1])
+    elif opcode == 'imul' and len(operands) == 3:
+        writes |= location(operands[0])
+        reads |= location(operands[1])
+    elif opcode in READ_WRITE and len(operands) == 2:
+        writes |= location(operands[0])
+        if not (opcode == 'xor' and operands[0] == operands[1]):
+            reads |= location(operands[0]) | location(operands[1])
+    elif opcode in COMPARES and len(operands) == 2:
+        reads |= location(operands[0]) | location(operands[1])
+    elif opcode.startswith('set') and len(operands) == 1:
+        # Byte write keeps the upper bits: read-modify-write
+        reads |= location(operands[0]) | {'flags'}
+        writes |= location(operands[0])
+    elif opcode in ('cdq', 'cqo'):
+        reads.add('reg:a')
+        writes.add('reg:d')
+    elif opcode == 'idiv' and len(operands) == 1:
+        reads |= {'reg:a', 'reg:d'} | location(operands[0])
+        writes |= {'reg:a', 'reg:d'}
+    elif opcode == 'xchg' and len(operands) == 2:
+        both = location(operands[0]) | location(operands[1])
+        reads |= both
+        writes |= both
+    else:
+        return None
+    if opcode in WRITES_FLAGS:
+        writes.add('flags')
+    return reads, writes
+
+
+class DependenceGraph:
+    """DAG over one block: edge (i, j, latency) orders j after i"""
+
+    def __init__(self, instructions: List[AsmInstruction]):
+        self.instructions = instructions
+        self.latency = [latency_of(instruction) for instruction in instructions]
+        self.preds: List[List[tuple]] = [[] for _ in instructions]
+        self.succs: List[List[tuple]] = [[] for _ in instructions]
+        self.build()
+
+    def add_edge(self, source: int, target: int, latency: int):
+        self.preds[target].append((source, latency))
+        self.succs[source].append((target, latency))
+
+    def build(self):
+        last_writer: Dict[str, int] = {}
+        readers: Dict[str, List[int]] = {}
+        for index, instruction in enumerate(self.instructions):
+            reads, writes = effects(instruction)
+            for resource in reads:
+                if resource in last_writer:                   # read after write
+                    writer = last_writer[resource]
+                    self.add_edge(writer, index, self.latency[writer])
+            for resource in writes:
+                for reader in readers.get(resource, []):      # write after read
+                    if reader != index:
+                        self.add_edge(reader, index, 0)
+                if resource in last_writer:                   # write after write
+                    self.add_edge(last_writer[resource], index, 1)
+            for resource in reads:
+                readers.setdefault(resource, []).append(index)
+            for resource in writes:
+                last_writer[resource] = index
+                readers[resource] = []
+
+    def critical_path(self) -> List[int]:
+        """Longest latency path from each node to the end of the block"""
+        height = [0] * len(self.instructions)
+        for index in reversed(range(len(self.instructions))):
+            height[index] = max([self.latency[index]] +
+                                [latency + height[succ] for succ, latency in self.succs[index]])
+        return height
+
+    def cycles(self, order: List[int]) -> int:
+        """Cycles to run the nodes in the given order: one issue per cycle,
+        stalling until every operand is ready"""
+        issue = {}
+        cycle = 0
+        finish = 0
+        for index in order:
+            ready = max([cycle] + [issue[pred] + latency for pred, latency in self.preds[index]])
+            issue[index] = ready
+            cycle = ready + 1
+            finish = max(finish, ready + self.latency[index])
+        return finish
+
+    def schedule(self) -> List[int]:
+        """List scheduling: at each cycle issue the ready node with the
+        longest path to the end of the block (ties keep source order)"""
+        height = self.critical_path()
+        waiting = [len(preds) for preds in self.preds]
+        earliest = [0] * len(self.instructions)
+        ready = [index for index, count in enumerate(waiting) if count == 0]
+        order = []
+        cycle = 0
+        while ready:
+            available = [index for index in ready if earliest[index] <= cycle]
+            if not available:
+                cycle = min(earliest[index] for index in ready)
+                continue
+            chosen = max(available, key=lambda index: (height[index], -index))
+            ready.remove(chosen)
+            order.append(chosen)
+            for succ, latency in self.succs[chosen]:
+                earliest[succ] = max(earliest[succ], cycle + latency)
+                waiting[succ] -= 1
+                if waiting[succ] == 0:
+                    ready.append(succ)
+            cycle += 1
+        return order
+
+
+def blocks(code: List[AsmInstruction]) -> List[tuple]:
+    """(start, end) ranges of instructions that may be reordered"""
+    ranges = []
+    start = None
+    for position, entry in enumerate(code + [AsmInstruction(label='end')]):
+        movable = entry.is_instruction() and effects(entry) is not None
+        if movable and start is None:
+            start = position
+        elif not movable and start is not None:
+            ranges.append((start, position))
+            start = None
+    return ranges
+
+
+def estimate_cycles(code: List[AsmInstruction]) -> int:
+    """Cycle estimate of straight-line code in its current order"""
+    total = 0
+    for start, end in blocks(code):
+        total += DependenceGraph(code[start:end]).cycles(list(range(end - start)))
+    return total + sum(1 for entry in code if entry.is_instruction() and effects(entry) is None)
+
+
+class InstructionScheduler:
+    """List-schedules every block of the .text section"""
+
+    def __init__(self, assembly: List[str]):
+        self.assembly = assembly
+        self.cycles_before = 0
+        self.cycles_after = 0
+        self.blocks = 0
+        self.moved = 0
+
+    def optimize(self) -> List[str]:
+        if 'section .text' not in self.assembly:
+            return list(self.assembly)
+        split = self.assembly.index('section .text') + 1
+        code, lines = strip_markers([AsmInstruction.parse(line) for line in self.assembly[split:]])
+        self.cycles_before = estimate_cycles(code)
+        for start, end in blocks(code):
+            if end - start < 2:
+                continue
+            graph = DependenceGraph(code[start:end])
+            order = graph.schedule()
+            if graph.cycles(order) < graph.cycles(list(range(end - start))):
+                self.moved += sum(1 for position, index in enumerate(order) if position != index)
+                code[start:end] = [graph.instructions[index] for index in order]
+                lines[start:end] = [lines[start + index] for index in order]
+            self.blocks += 1
+        self.cycles_after = estimate_cycles(code)
+        code = insert_markers(code, lines)
+        return self.assembly[:split] + [instruction.render() for instruction in code]
+
+    def display(self):
+        print(f"\nScheduling: {self.blocks} blocks, {self.moved} instructions moved, "
+              f"estimated cycles {self.cycles_before} -> {self.cycles_after}")
+
+
+# Testing function for the instruction scheduler
+def test_instruction_scheduler(source_code: str, assembly: List[str] = None):
+    """Test the instruction scheduler independently"""
+    print("\n" + "="*60)
+    print(" TESTING INSTRUCTION SCHEDULER")
+    print("="*60)
+
+    try:
+        if assembly is None:
+            from code_generator import test_code_generator
+            assembly = test_code_generator(source_code)
+            if assembly is None:
+                return None
+
+        scheduler = InstructionScheduler(assembly)
+        scheduled = scheduler.optimize()
+        scheduler.display()
+        print("\nScheduled Assembly Code:")
+        print("-" * 50)
+        for line in scheduled:
+            print(line)
+        print("\n✓ Instruction Scheduling Successful!")
+        return scheduled
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int a = 6;
+    int b = 7;
+    int c = 3;
+    int d = a * b + c;
+    int e = (c + 1) * (a - 2);
+    int f = d / c + e;
+    print(f);
+    """
+
+    test_instruction_scheduler(test_code)
@@ -0,0 +1,665 @@
+"""
+============================================
+BACKEND: TREE-PATTERN INSTRUCTION SELECTION
+CSE 430 - Compiler Design Lab
+============================================
+
+Rebuilds expression trees from the TAC and covers them with the
+cheapest x86 instruction patterns (dynamic-programming tiling):
+
+    t0 = j * 4
+    t1 = i + t0          =>     mov eax, [i]
+    t2 = t1 + 8                 mov ecx, [j]
+    x = t2                      lea eax, [eax+ecx*4+8]
+                                mov [x], eax
+
+A temporary is folded into the tree of its single use when that use is
+in the same basic block, nothing in between writes a name the tree
+reads, and the value is dead afterwards.  Division results are not
+folded (idiv needs eax and edx), and a tree never needs more than the
+three scratch registers.
+
+Trees are evaluated in the scratch registers eax, ecx and edx; the
+temporaries that remain go to the register allocator.
+"""
+
+from typing import List, Dict, Optional
+from control_flow import (ControlFlowGraph, is_temp, is_int_constant,
+                          used_vars, defined_var, COMPARISON_OPERATORS)
+from runtime_library import PRINT_ROUTINES
+
+
+# Scratch registers for evaluating trees (all have 8-bit halves for setcc)
+SCRATCH_REGISTERS = ['eax', 'ecx', 'edx']
+# Registers the allocator hands out to temporaries that are not folded
+SELECTION_REGISTERS = ['ebx', 'esi', 'edi']
+
+JUMP_IF = {'<': 'jl', '>': 'jg', '==': 'je', '!=': 'jne', '<=': 'jle', '>=': 'jge'}
+JUMP_UNLESS = {'<': 'jge', '>': 'jle', '==': 'jne', '!=': 'je', '<=': 'jg', '>=': 'jl'}
+ARITHMETIC = {'+': 'add', '-': 'sub', '*': 'imul'}
+
+
+class Node:
+    """Expression tree node: a leaf operand or an operator with two kids"""
+
+    def __init__(self, op: str, kids: List['Node'] = None, name: str = None):
+        self.op = op                # 'leaf' or a TAC operator
+        self.kids = kids or []
+        self.name = name            # operand text of a leaf
+        self.kind = None            # leaf kind: 'imm', 'mem', 'areg', 'string'
+        self.cost = {}              # nonterminal -> cheapest cost
+        self.rule = {}              # nonterminal -> pattern name
+        self.address = None         # (base, index, scale, disp) of the best addr tiling
+
+    def is_leaf(self) -> bool:
+        return self.op == 'leaf'
+
+    def reads(self) -> set:
+        if self.is_leaf():
+            return {self.name}
+        return set().union(*(kid.reads() for kid in self.kids))
+
+    def need(self) -> int:
+        """Sethi-Ullman register need (leaves as left operands need one)"""
+        if self.is_leaf():
+            return 1
+        left, right = self.kids
+        right_need = 0 if right.is_leaf() else right.need()
+        left_need = left.need()
+        if left_need == right_need:
+            return left_need + 1
+        return max(left_need, right_need)
+
+    def __repr__(self):
+        if self.is_leaf():
+            return self.name
+        return f"({self.kids[0]!r} {self.op} {self.kids[1]!r})"
+
+
+class Statement:
+    """One tree-level statement: assign, print, branch, goto or label"""
+
+    def __init__(self, kind: str, tree: Node = None, dest: str = None,
+                 label: str = None, branch: str = None):
+        self.kind = kind
+        self.position = None        # index of the TAC instruction it came from
+        self.tree = tree
+        self.dest = dest
+        self.label = label
+        self.branch = branch        # 'if_false' / 'if_true'
+
+
+# ---------- pattern table ----------
+# (name, nonterminal produced, cost of the emitted instructions)
+# Operand costs are added by the tiler: src = reg/mem/imm, rm = reg/mem,
+# ri = reg/imm, r = register (read only).
+
+PATTERNS = [
+    ('load-imm', 'reg', 1),             # mov r, imm
+    ('load-mem', 'reg', 1),             # mov r, [x]
+    ('load-string', 'reg', 1),          # lea r, [str0]
+    ('copy', 'reg', 1),                 # mov r, reg
+    ('add', 'reg', 1),                  # add r, src
+    ('sub', 'reg', 1),                  # sub r, src
+    ('imul', 'reg', 3),                 # imul r, src
+    ('imul-imm', 'reg', 3),             # imul r, rm, imm
+    ('shl', 'reg', 1),                  # shl r, k            (x * 2^k)
+    ('lea', 'reg', 1),                  # lea r, [addr]
+    ('setcc', 'reg', 3),                # cmp r, src ; setcc ; movzx
+    ('addr-base', 'addr', 0),           # [r]
+    ('addr-disp', 'addr', 0),           # [addr + imm]
+    ('addr-index', 'addr', 0),          # [r + r]
+    ('addr-scaled', 'addr', 0),         # [r + r*s]
+    ('addr-scale-only', 'addr', 0),     # [r*s]
+    ('addr-scale-self', 'addr', 0),     # [r + r*s]   (x * 3, 5, 9)
+]
+PATTERN_COST = {name: cost for name, _, cost in PATTERNS}
+SCALES = {2: 1, 4: 2, 8: 3}
+
+
+def power_of_two(node: Node) -> Optional[int]:
+    if node.is_leaf() and node.kind == 'imm':
+        value = int(node.name)
+        if value > 1 and value & (value - 1) == 0:
+            return value.bit_length() - 1
+    return None
+
+
+class InstructionSelector:
+    """Builds trees from TAC, tiles them and emits x86 through a generator"""
+
+    def __init__(self, tac: List[str], symbol_table=None):
+        self.tac = tac
+        self.symbol_table = symbol_table
+        self.statements: List[Statement] = []
+        self.materialized = set()   # temporaries that still need storage
+        self.folded = 0
+        self.rules_used: Dict[str, int] = {}
+        self.total_cost = 0
+        self.generator = None
+        self.free = []
+        self.build()
+
+    # ---------- tree building ----------
+
+    def is_temporary(self, name: str) -> bool:
+        if self.symbol_table is not None and name in self.symbol_table.symbols:
+            return False
+        return is_temp(name)
+
+    def foldable(self, block, index: int, live_out: set) -> bool:
+        """Whether the temp defined at block.instructions[index] has exactly
+        one later use in this block and is dead after it"""
+        parts = block.instructions[index].split()
+        name = parts[0]
+        if len(parts) == 5 and parts[3] == '/':
+            return False
+        for position in range(index + 1, len(block.instructions)):
+            instruction = block.instructions[position]
+            uses = used_vars(instruction).count(name)
+            if uses > 1:
+                return False
+            if uses == 1:
+                # Dead afterwards: redefined here or later, or not live out
+                if defined_var(instruction) == name:
+                    return True
+                for later in block.instructions[position + 1:]:
+                    if name in used_vars(later):
+                        return False
+                    if defined_var(later) == name:
+                        return True
+                return name not in live_out
+            if defined_var(instruction) == name:
+                return False
+        return False
+
+    def build(self):
+        cfg = ControlFlowGraph(self.tac)
+        _, live_out = cfg.liveness()
+        position = 0
+        for block in cfg.blocks:
+            if block.label:
+                self.statements.append(Statement('label', label=block.label))
+                self.statements[-1].position = position
+                position += 1
+            pending: Dict[str, Node] = {}
+            for index, instruction in enumerate(block.instructions):
+                built = len(self.statements)
+                self.build_instruction(block, index, instruction, pending, live_out[block])
+                for statement in self.statements[built:]:
+                    statement.position = position
+                position += 1
+
+    def leaf_or_tree(self, name: str, pending: Dict[str, Node]) -> Node:
+        if name in pending:
+            self.folded += 1
+            return pending.pop(name)
+        if self.is_temporary(name):
+            self.materialized.add(name)
+        return Node('leaf', name=name)
+
+    def combine(self, op: str, left: Node, right: Node, pending, sources) -> Node:
+        """Operator node; folded kids are materialized again when the tree
+        would need more scratch registers than there are"""
+        node = Node(op, [left, right])
+        while node.need() > len(SCRATCH_REGISTERS):
+            kid = max((k for k in node.kids if not k.is_leaf()), key=lambda k: k.need())
+            name = sources[id(kid)]
+            self.statements.append(Statement('assign', kid, dest=name))
+            self.materialized.add(name)
+            node.kids[node.kids.index(kid)] = Node('leaf', name=name)
+        return node
+
+    def materialize(self, name: str, pending: Dict[str, Node]):
+        self.statements.append(Statement('assign', pending.pop(name), dest=name))
+        self.materialized.add(name)
+
+    def build_instruction(self, block, index: int, instruction: str,
+                          pending: Dict[str, Node], live_out: set):
+        parts = instruction.split()
+        sources = {}
+
+        def tree(name):
+            was_pending = name in pending
+            node = self.leaf_or_tree(name, pending)
+            if was_pending:
+                sources[id(node)] = name
+            return node
+
+        statement = None
+        if parts[0] == 'goto':
+            statement = Statement('goto', label=parts[1])
+        elif parts[0] in ('if_false', 'if_true'):
+            if len(parts) == 6:
+                condition = self.combine(parts[2], tree(parts[1]), tree(parts[3]),
+                                         pending, sources)
+            else:
+                condition = tree(parts[1])
+            statement = Statement('branch', condition, label=parts[-1], branch=parts[0])
+        elif parts[0] == 'print':
+            statement = Statement('print', tree(parts[1]))
+        elif len(parts) == 3:
+            statement = Statement('assign', tree(parts[2]), dest=parts[0])
+        elif len(parts) == 5:
+            statement = Statement('assign', self.combine(parts[3], tree(parts[2]), tree(parts[4]),
+                                                         pending, sources), dest=parts[0])
+
+        # Trees that read the name written here must be evaluated first
+        written = defined_var(instruction)
+        if written:
+            for name in [n for n, t in pending.items() if written in t.reads()]:
+                self.materialize(name, pending)
+
+        dest = statement.dest if statement else None
+        if dest and self.is_temporary(dest) and self.foldable(block, index, live_out):
+            pending[dest] = statement.tree
+            return
+        if dest and self.is_temporary(dest):
+            self.materialized.add(dest)
+        if statement:
+            self.statements.append(statement)
+
+    # ---------- tiling ----------
+
+    def classify(self, node: Node):
+        """Leaf kinds once registers are known"""
+        if node.is_leaf():
+            location = self.generator.location(node.name)
+            if is_int_constant(node.name):
+                node.kind = 'imm'
+            elif node.name.startswith('str') and node.name in self.generator.string_literals.values():
+                node.kind = 'string'
+            elif location.startswith('['):
+                node.kind = 'mem'
+            else:
+                node.kind = 'areg'
+        for kid in node.kids:
+            self.classify(kid)
+
+    def operand_cost(self, node: Node, allowed: str) -> int:
+        """Cost of node as an operand: src, rm, ri or r"""
+        if node.is_leaf():
+            free = {'src': ('imm', 'mem', 'areg'), 'rm': ('mem', 'areg'),
+                    'ri': ('imm', 'areg'), 'r': ('areg',)}[allowed]
+            if node.kind in free:
+                return 0
+        return node.cost['reg']
+
+    def consider(self, node: Node, nonterminal: str, rule: str, cost: int, address=None):
+        if cost < node.cost.get(nonterminal, float('inf')):
+            node.cost[nonterminal] = cost
+            node.rule[nonterminal] = rule
+            if nonterminal == 'addr':
+                node.address = address
+
+    def tile(self, node: Node):
+        """Bottom-up dynamic programming over the pattern table"""
+        for kid in node.kids:
+            self.tile(kid)
+        if node.is_leaf():
+            rule = {'imm': 'load-imm', 'mem': 'load-mem', 'string': 'load-string',
+                    'areg': 'copy'}[node.kind]
+            self.consider(node, 'reg', rule, PATTERN_COST[rule])
+            self.consider(node, 'addr', 'addr-base', self.operand_cost(node, 'r'),
+                          (node, None, 1, 0))
+            return
+
+        left, right = node.kids
+        op = node.op
+        if op in ('+', '-', '*'):
+            name = ARITHMETIC[op]
+            self.consider(node, 'reg', name, PATTERN_COST[name] + left.cost['reg']
+                          + self.operand_cost(right, 'src'))
+            if op != '-':
+                self.consider(node, 'reg', name + '/swap', PATTERN_COST[name] + right.cost['reg']
+                              + self.operand_cost(left, 'src'))
+        if op == '*':
+            for value, other in ((right, left), (left, right)):
+                if value.is_leaf() and value.kind == 'imm':
+                    self.consider(node, 'reg', 'imul-imm', PATTERN_COST['imul-imm']
+                                  + self.operand_cost(other, 'rm'))
+                    if power_of_two(value) is not None:
+                        self.consider(node, 'reg', 'shl', PATTERN_COST['shl'] + other.cost['reg'])
+        if op == '/':
+            self.consider(node, 'reg', 'div', 20 + left.cost['reg'] + self.operand_cost(right, 'rm'))
+        if op in COMPARISON_OPERATORS:
+            self.consider(node, 'reg', 'setcc', PATTERN_COST['setcc'] + self.operand_cost(left, 'r')
+                          + self.operand_cost(right, 'src'))
+
+        self.tile_address(node)
+        if 'addr' in node.cost and node.rule['addr'] != 'addr-base':
+            self.consider(node, 'reg', 'lea', PATTERN_COST['lea'] + node.cost['addr'])
+        self.consider(node, 'addr', 'addr-base', node.cost['reg'], (node, None, 1, 0))
+
+    def tile_address(self, node: Node):
+        left, right = node.kids
+        if node.op == '+':
+            for a, b in ((left, right), (right, left)):
+                if b.is_leaf() and b.kind == 'imm' and 'addr' in a.cost:
+                    base, index, scale, disp = a.address
+                    self.consider(node, 'addr', 'addr-disp', a.cost['addr'],
+                                  (base, index, scale, disp + int(b.name)))
+                if (not b.is_leaf() and b.op == '*' and b.kids[1].is_leaf()
+                        and b.kids[1].kind == 'imm' and int(b.kids[1].name) in SCALES):
+                    self.consider(node, 'addr', 'addr-scaled',
+                                  self.operand_cost(a, 'r') + self.operand_cost(b.kids[0], 'r'),
+                                  (a, b.kids[0], int(b.kids[1].name), 0))
+            self.consider(node, 'addr', 'addr-index',
+                          self.operand_cost(left, 'r') + self.operand_cost(right, 'r'),
+                          (left, right, 1, 0))
+        elif node.op == '-' and right.is_leaf() and right.kind == 'imm' and 'addr' in left.cost:
+            base, index, scale, disp = left.address
+            self.consider(node, 'addr', 'addr-disp', left.cost['addr'],
+                          (base, index, scale, disp - int(right.name)))
+        elif node.op == '*' and right.is_leaf() and right.kind == 'imm':
+            value = int(right.name)
+            if value in SCALES:
+                self.consider(node, 'addr', 'addr-scale-only', self.operand_cost(left, 'r'),
+                              (None, left, value, 0))
+            elif value - 1 in SCALES:
+                self.consider(node, 'addr', 'addr-scale-self', self.operand_cost(left, 'r'),
+                              (left, left, value - 1, 0))
+
+    # ---------- emission ----------
+
+    def emit(self, line: str):
+        self.generator.assembly.append(f"    {line}")
+
+    def used(self, rule: str):
+        self.rules_used[rule] = self.rules_used.get(rule, 0) + 1
+
+    def take(self, preferred: str = None) -> str:
+        """A scratch register for a result, preferably `preferred`; a
+        register outside the scratch pool (the allocator's) is used as is"""
+        if preferred is not None and preferred not in SCRATCH_REGISTERS:
+            return preferred
+        if preferred in self.free:
+            self.free.remove(preferred)
+            return preferred
+        return self.free.pop(0)
+
+    def release(self, operand):
+        if operand in SCRATCH_REGISTERS and operand not in self.free:
+            self.free.append(operand)
+
+    def operand(self, node: Node, allowed: str) -> str:
+        """Operand text for node in an operand position (may emit code)"""
+        if node.is_leaf() and self.operand_cost(node, allowed) == 0:
+            return self.generator.location(node.name)
+        return self.evaluate(node)
+
+    def operands(self, left: Node, left_allowed: str, right: Node, right_allowed: str) -> tuple:
+        """Operands of a two-operand instruction, the kid that needs more
+        registers evaluated first (Sethi-Ullman order)"""
+        if (0 if right.is_leaf() else right.need()) > left.need():
+            second = self.operand(right, right_allowed)
+            first = self.operand(left, left_allowed)
+        else:
+            first = self.operand(left, left_allowed)
+            second = self.operand(right, right_allowed)
+        return first, second
+
+    def evaluate(self, node: Node, target: str = None) -> str:
+        """Emit code computing node into a register and return it"""
+        rule = node.rule['reg']
+        self.used(rule)
+        if node.is_leaf():
+            register = self.take(target)
+            location = self.generator.location(node.name)
+            if rule == 'load-string':
+                self.emit(f"lea {register}, [{node.name}]")
+            else:
+                self.emit(f"mov {register}, {location}")
+            return register
+
+        left, right = node.kids
+        if rule in ('add', 'sub', 'imul', 'add/swap', 'imul/swap'):
+            if rule.endswith('/swap'):
+                left, right = right, left
+            instruction = rule.split('/')[0]
+            if (0 if right.is_leaf() else right.need()) > left.need():
+                source = self.operand(right, 'src')
+                register = self.evaluate(left, target)
+            else:
+                register = self.evaluate(left, target)
+                source = self.operand(right, 'src')
+            self.emit(f"{instruction} {register}, {source}")
+            self.release(source)
+            return register
+        if rule == 'imul-imm':
+            value, other = (right, left) if right.is_leaf() and right.kind == 'imm' else (left, right)
+            source = self.operand(other, 'rm')
+            self.release(source)
+            register = self.take(target)
+            self.emit(f"imul {register}, {source}, {value.name}")
+            return register
+        if rule == 'shl':
+            value, other = (right, left) if power_of_two(right) is not None else (left, right)
+            register = self.evaluate(other, target)
+            self.emit(f"shl {register}, {power_of_two(value)}")
+            return register
+        if rule == 'lea':
+            address, registers = self.address(node.address)
+            for register in registers:
+                self.release(register)
+            register = self.take(target)
+            self.emit(f"lea {register}, [{address}]")
+            return register
+        if rule == 'setcc':
+            first, second = self.operands(left, 'r', right, 'src')
+            self.emit(f"cmp {first}, {second}")
+            self.release(first)
+            self.release(second)
+            register = self.take(target if target in SCRATCH_REGISTERS else None)
+            self.emit(f"set{JUMP_IF[node.op][1:]} {register[1]}l")
+            self.emit(f"movzx {register}, {register[1]}l")
+            return register
+        if rule == 'div':
+            return self.divide(left, right)
+        raise ValueError(f"No pattern for {node!r}")
+
+    def address(self, address) -> tuple:
+        """Address text and the scratch registers it holds"""
+        base, index, scale, disp = address
+        held = []
+        text = ""
+        if base is not None:
+            text = self.operand(base, 'r')
+            held.append(text)
+        if index is not None:
+            register = text if index is base else self.operand(index, 'r')
+            if index is not base:
+                held.append(register)
+            text += ("+" if text else "") + register + (f"*{scale}" if scale > 1 else "")
+        if disp:
+            text += f"{disp:+d}" if text else str(disp)
+        return text, held
+
+    def divide(self, left: Node, right: Node) -> str:
+        """eax = left / right; idiv needs the dividend in eax and clobbers
+        edx (and ecx when the divisor has to move), so registers enclosing
+        subtrees hold are saved around it"""
+        held = [register for register in SCRATCH_REGISTERS if register not in self.free]
+        for register in held:
+            self.emit(f"push {register}")
+        self.free = list(SCRATCH_REGISTERS)
+        dividend, divisor = self.operands(left, 'r', right, 'rm')
+        if divisor == 'eax':
+            if dividend == 'ecx':
+                self.emit("xchg eax, ecx")
+            else:
+                self.emit("mov ecx, eax")
+                self.emit(f"mov eax, {dividend}")
+            divisor = 'ecx'
+        else:
+            if dividend != 'eax':
+                self.emit(f"mov eax, {dividend}")
+            if divisor == 'edx':
+                self.emit("mov ecx, edx")
+                divisor = 'ecx'
+        self.emit("cdq")
+        self.emit(f"idiv {'dword ' if divisor.startswith('[') else ''}{divisor}")
+        result = 'eax'
+        if 'eax' in held:
+            result = next(register for register in SCRATCH_REGISTERS if register not in held)
+            self.emit(f"mov {result}, eax")
+        for register in reversed(held):
+            self.emit(f"pop {register}")
+        self.free = [register for register in SCRATCH_REGISTERS
+                     if register not in held and register != result]
+        return result
+
+    def emit_statement(self, statement: Statement):
+        self.free = list(SCRATCH_REGISTERS)
+        kind = statement.kind
+        if kind == 'label':
+            self.generator.assembly.append(f"{statement.label}:")
+        elif kind == 'goto':
+            self.emit(f"jmp {statement.label}")
+        elif kind == 'print':
+            tree = statement.tree
+            self.generator.assembly.append(f"    ; Print {tree!r}")
+            if tree.is_leaf():
+                self.generator.print_value(tree.name)
+                return
+            register = self.evaluate(tree, 'eax')
+            if register != 'eax':
+                self.emit(f"mov eax, {register}")
+            self.generator.call_runtime(PRINT_ROUTINES['int'])
+        elif kind == 'branch':
+            self.emit_branch(statement)
+        elif kind == 'assign':
+            self.emit_assign(statement.dest, statement.tree)
+
+    def emit_branch(self, statement: Statement):
+        tree = statement.tree
+        if not tree.is_leaf() and tree.op in COMPARISON_OPERATORS:
+            left, right = tree.kids
+            op = tree.op
+        else:
+            left, right, op = tree, Node('leaf', name='0'), '!='
+            right.kind = 'imm'
+        jump = JUMP_IF[op] if statement.branch == 'if_true' else JUMP_UNLESS[op]
+        if left.is_leaf() and left.kind == 'mem' and self.operand_cost(right, 'ri') == 0:
+            self.used('cmp-mem')
+            prefix = 'dword ' if right.kind == 'imm' else ''
+            self.emit(f"cmp {prefix}{self.generator.location(left.name)}, "
+                      f"{self.generator.location(right.name)}")
+        else:
+            first, second = self.operands(left, 'r', right, 'src')
+            self.emit(f"cmp {first}, {second}")
+        self.emit(f"{jump} {statement.label}")
+
+    def emit_assign(self, dest: str, tree: Node):
+        location = self.generator.location(dest)
+        in_register = not location.startswith('[')
+        if tree.is_leaf():
+            if self.is_temporary(dest):
+                string = self.generator.value_type(tree.name) == 'string'
+                self.generator.temp_types[dest] = 'string' if string else 'int'
+            if self.generator.is_double(dest) and self.generator.is_double(tree.name):
+                self.used('copy-double')
+                self.generator.copy_double(dest, tree.name)
+                return
+            if in_register or tree.kind in ('areg',) or (tree.kind == 'imm'):
+                if in_register:
+                    if self.generator.location(tree.name) != location:
+                        self.evaluate(tree, location)
+                elif tree.kind == 'imm':
+                    self.used('store-imm')
+                    self.emit(f"mov dword {location}, {tree.name}")
+                else:
+                    self.emit(f"mov {location}, {self.generator.location(tree.name)}")
+                return
+            register = self.evaluate(tree)
+            self.emit(f"mov {location}, {register}")
+            return
+
+        # Read-modify-write: x = x + src  =>  add dword [x], src  /  add ebx, src
+        updates = ('+', '-', '*') if in_register else ('+', '-')
+        if tree.op in updates:
+            left, right = tree.kids
+            if tree.op != '-' and right.is_leaf() and right.name == dest:
+                left, right = right, left
+            if left.is_leaf() and left.name == dest and dest not in right.reads():
+                self.used(f"{ARITHMETIC[tree.op]}-{'reg' if in_register else 'mem'}")
+                source = self.operand(right, 'src' if in_register else 'ri')
+                prefix = 'dword ' if right.is_leaf() and right.kind == 'imm' and not in_register else ''
+                self.emit(f"{ARITHMETIC[tree.op]} {prefix}{location}, {source}")
+                return
+
+        target = location if in_register and dest not in tree.reads() else None
+        register = self.evaluate(tree, target)
+        if register != location:
+            self.emit(f"mov {location}, {register}")
+
+    def select(self, generator):
+        """Tile every tree and emit the statements through generator"""
+        self.generator = generator
+        for statement in self.statements:
+            if statement.tree is not None:
+                self.classify(statement.tree)
+                self.tile(statement.tree)
+                self.total_cost += statement.tree.cost['reg']
+            generator.mark_source(statement.position)
+            self.emit_statement(statement)
+
+    def display(self):
+        print(f"\nInstruction selection: {len(self.statements)} statements, "
+              f"{self.folded} temporaries folded into trees, total tile cost {self.total_cost}")
+        for rule, count in sorted(self.rules_used.items(), key=lambda item: -item[1]):
+            print(f"  {rule:<16} {count}x")
+
+
+# Testing function for instruction selection
+def test_instruction_selection(source_code: str):
+    """Show the trees rebuilt from TAC and the selected instructions"""
+    print("\n" + "="*60)
+    print(" TESTING TREE-PATTERN INSTRUCTION SELECTION")
+    print("="*60)
+
+    try:
+        from code_generator import test_code_generator
+        from semantic_analyzer import test_semantic_analyzer
+        from intermediate_code import test_intermediate_code
+
+        symbol_table = test_semantic_analyzer(source_code)
+        tac, string_literals = test_intermediate_code(source_code)
+        if symbol_table is None or tac is None:
+            return None
+
+        selector = InstructionSelector(tac, symbol_table)
+        print("\nExpression Trees:")
+        print("-" * 50)
+        for statement in selector.statements:
+            if statement.kind == 'assign':
+                print(f"  {statement.dest} := {statement.tree!r}")
+            elif statement.kind in ('print', 'branch'):
+                print(f"  {statement.kind} {statement.tree!r}")
+
+        from code_generator import AssemblyGenerator
+        generator = AssemblyGenerator(tac, symbol_table, string_literals,
+                                      select_instructions=True)
+        assembly = generator.generate()
+        print("\n✓ Instruction Selection Successful!")
+        return assembly
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 3;
+    int j = 5;
+    int x = i + j * 4 + 8;
+    int y = x * 3 - i;
+    int z = (x + y) * (i - j) + (x - y) / 2;
+    x = x + 1;
+    if (z > x * 2) {
+        print(z);
+    }
+    """
+
+    test_instruction_selection(test_code)
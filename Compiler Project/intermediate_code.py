@@ -7,8 +7,10 @@ ID - 21201118
 ============================================
 """
 
+import heapq
 from typing import List, Dict
 from parser import *
+from control_flow import COMPARISON_OPERATORS
 
 
 class IntermediateCode:
@@ -16,16 +18,34 @@ class IntermediateCode:
    
     def __init__(self):
         self.code = []
-        self.temp_count = 0
+        self.source_lines = []     # source line of each TAC instruction
+        self.line = None           # line of the statement being generated
+        self.temp_count = 0        # peak number of temporary slots in use
+        self.temps_created = 0     # temporaries requested (without recycling)
+        self.free_temps = []       # min-heap of recycled temporary numbers
+        self.live_temps = set()    # temporary numbers handed out and not yet released
         self.label_count = 0
         self.string_literals = {}
         self.string_count = 0
    
     def new_temp(self):
-        """Generate a new temporary variable"""
-        temp = f"t{self.temp_count}"
-        self.temp_count += 1
-        return temp
+        """Generate a temporary variable, reusing a released slot if possible"""
+        if self.free_temps:
+            number = heapq.heappop(self.free_temps)
+        else:
+            number = self.temp_count
+            self.temp_count += 1
+        self.temps_created += 1
+        self.live_temps.add(number)
+        return f"t{number}"
+   
+    def release_temp(self, operand):
+        """Return a temporary to the pool once its last use has been emitted"""
+        if isinstance(operand, str) and operand[:1] == 't' and operand[1:].isdigit():
+            number = int(operand[1:])
+            if number in self.live_temps:
+                self.live_temps.remove(number)
+                heapq.heappush(self.free_temps, number)
    
     def new_label(self):
         """Generate a new label"""
@@ -44,6 +64,7 @@ class IntermediateCode:
     def emit(self, instruction):
         """Add instruction to code list"""
         self.code.append(instruction)
+        self.source_lines.append(self.line)
    
     def generate(self, ast: Program):
         """Generate intermediate code"""
@@ -65,28 +86,40 @@ class IntermediateCode:
             for value, label in self.string_literals.items():
                 print(f"{label}: \"{value}\"")
        
+        print(f"\nTemporaries: {self.temp_count} slots for {self.temps_created} values")
+       
         return self.code
    
     def generate_statement(self, node):
+        # The enclosing if / while owns the code emitted after this statement
+        enclosing = self.line
+        if node.line is not None:
+            self.line = node.line
+        self.generate_code(node)
+        self.line = enclosing
+   
+    def generate_code(self, node):
         if isinstance(node, Declaration):
             if node.value:
                 temp = self.generate_expression(node.value)
                 self.emit(f"{node.var_name} = {temp}")
+                self.release_temp(temp)
        
         elif isinstance(node, Assignment):
             temp = self.generate_expression(node.expression)
             self.emit(f"{node.var_name} = {temp}")
+            self.release_temp(temp)
        
         elif isinstance(node, PrintStatement):
             temp = self.generate_expression(node.expression)
             self.emit(f"print {temp}")
+            self.release_temp(temp)
        
         elif isinstance(node, IfStatement):
-            cond_temp = self.generate_expression(node.condition)
             false_label = self.new_label()
             end_label = self.new_label()
            
-            self.emit(f"if_false {cond_temp} goto {false_label}")
+            self.generate_condition(node.condition, false_label)
            
             for stmt in node.true_block:
                 self.generate_statement(stmt)
@@ -105,8 +138,7 @@ class IntermediateCode:
             end_label = self.new_label()
            
             self.emit(f"{start_label}:")
-            cond_temp = self.generate_expression(node.condition)
-            self.emit(f"if_false {cond_temp} goto {end_label}")
+            self.generate_condition(node.condition, end_label)
            
             for stmt in node.body:
                 self.generate_statement(stmt)
@@ -114,6 +146,20 @@ class IntermediateCode:
             self.emit(f"goto {start_label}")
             self.emit(f"{end_label}:")
    
+    def generate_condition(self, node, false_label):
+        """Jump to false_label unless the condition holds"""
+        if isinstance(node, BinaryOp) and node.operator in COMPARISON_OPERATORS:
+            # Fused compare-and-branch: no temporary for the comparison result
+            left_temp = self.generate_expression(node.left)
+            right_temp = self.generate_expression(node.right)
+            self.emit(f"if_false {left_temp} {node.operator} {right_temp} goto {false_label}")
+            self.release_temp(left_temp)
+            self.release_temp(right_temp)
+        else:
+            cond_temp = self.generate_expression(node)
+            self.emit(f"if_false {cond_temp} goto {false_label}")
+            self.release_temp(cond_temp)
+   
     def generate_expression(self, node):
         if isinstance(node, Number):
             return str(node.value)
@@ -131,6 +177,10 @@ class IntermediateCode:
         elif isinstance(node, BinaryOp):
             left_temp = self.generate_expression(node.left)
             right_temp = self.generate_expression(node.right)
+            # Operands are read before the result is written, so the
+            # result may take over one of their slots
+            self.release_temp(left_temp)
+            self.release_temp(right_temp)
             result_temp = self.new_temp()
             self.emit(f"{result_temp} = {left_temp} {node.operator} {right_temp}")
             return result_temp
@@ -0,0 +1,201 @@
+"""
+============================================
+OPTIMIZATION: BRANCH & JUMP OPTIMIZATION
+CSE 430 - Compiler Design Lab
+============================================
+
+Cleans up the jumps produced by if/while lowering:
+
+- jump threading:          goto L1 ... L1: goto L2    =>  goto L2
+- jumps to the next line:  goto L1  L1:               =>  L1:
+- adjacent labels:         L0:  L1:                   =>  L0:
+- condition inversion:     if_false c goto L1
+                           goto L2
+                           L1:                        =>  if_true c goto L2
+- unreachable blocks and labels nothing jumps to are removed.
+"""
+
+from typing import List
+from control_flow import (ControlFlowGraph, is_label, label_name, is_goto,
+                          is_conditional_jump, is_jump, jump_target, retarget_jump)
+
+
+INVERTED_BRANCH = {'if_false': 'if_true', 'if_true': 'if_false'}
+
+
+class JumpOptimizer:
+    """Repeats the jump clean-ups until the TAC stops changing"""
+
+    def __init__(self, tac: List[str]):
+        self.tac = tac
+        self.threaded = 0
+        self.removed_jumps = 0
+        self.merged_labels = 0
+        self.inverted = 0
+        self.removed_unreachable = 0
+
+    def optimize(self) -> List[str]:
+        tac = list(self.tac)
+        while True:
+            new = self.merge_labels(tac)
+            new = self.thread_jumps(new)
+            new = self.invert_branches(new)
+            new = self.remove_jumps_to_next(new)
+            new = self.remove_unreachable(new)
+            if new == tac:
+                return tac
+            tac = new
+
+    def jumps_removed(self) -> int:
+        return self.removed_jumps + self.inverted
+
+    def merge_labels(self, tac: List[str]) -> List[str]:
+        """Keep only the first label of every run of adjacent labels"""
+        alias = {}
+        result = []
+        for instruction in tac:
+            if is_label(instruction) and result and is_label(result[-1]):
+                alias[label_name(instruction)] = label_name(result[-1])
+                self.merged_labels += 1
+                continue
+            result.append(instruction)
+        if not alias:
+            return result
+        return [retarget_jump(instr, alias.get(jump_target(instr), jump_target(instr)))
+                if is_jump(instr) else instr for instr in result]
+
+    def final_target(self, tac: List[str], label: str) -> str:
+        """Follow chains of labels that only hold an unconditional goto"""
+        positions = {label_name(instr): i for i, instr in enumerate(tac) if is_label(instr)}
+        seen = {label}
+        while label in positions:
+            index = positions[label] + 1
+            while index < len(tac) and is_label(tac[index]):
+                index += 1
+            if index >= len(tac) or not is_goto(tac[index]):
+                break
+            following = jump_target(tac[index])
+            if following in seen:
+                break
+            seen.add(following)
+            label = following
+        return label
+
+    def thread_jumps(self, tac: List[str]) -> List[str]:
+        result = []
+        for instruction in tac:
+            if is_jump(instruction):
+                target = jump_target(instruction)
+                final = self.final_target(tac, target)
+                if final != target:
+                    instruction = retarget_jump(instruction, final)
+                    self.threaded += 1
+            result.append(instruction)
+        return result
+
+    def invert_branches(self, tac: List[str]) -> List[str]:
+        """`if_false c goto L1; goto L2; L1:` becomes `if_true c goto L2; L1:`"""
+        result = []
+        index = 0
+        while index < len(tac):
+            instruction = tac[index]
+            if (index + 2 < len(tac) and is_conditional_jump(instruction)
+                    and is_goto(tac[index + 1]) and is_label(tac[index + 2])
+                    and jump_target(instruction) == label_name(tac[index + 2])):
+                parts = instruction.split()
+                parts[0] = INVERTED_BRANCH[parts[0]]
+                parts[-1] = jump_target(tac[index + 1])
+                result.append(" ".join(parts))
+                self.inverted += 1
+                index += 2
+                continue
+            result.append(instruction)
+            index += 1
+        return result
+
+    def remove_jumps_to_next(self, tac: List[str]) -> List[str]:
+        result = []
+        for index, instruction in enumerate(tac):
+            if is_jump(instruction):
+                following = index + 1
+                next_labels = set()
+                while following < len(tac) and is_label(tac[following]):
+                    next_labels.add(label_name(tac[following]))
+                    following += 1
+                if jump_target(instruction) in next_labels:
+                    self.removed_jumps += 1
+                    continue
+            result.append(instruction)
+        return result
+
+    def remove_unreachable(self, tac: List[str]) -> List[str]:
+        """Drop blocks control never reaches and labels nothing jumps to"""
+        cfg = ControlFlowGraph(tac)
+        reachable = cfg.reachable()
+        kept = []
+        for block in cfg.blocks:
+            if block in reachable:
+                kept.append(block)
+            else:
+                self.removed_unreachable += len(block.instructions)
+        targets = {jump_target(instr) for block in kept
+                   for instr in block.instructions if is_jump(instr)}
+        result = []
+        for block in kept:
+            if block.label and block.label in targets:
+                result.append(f"{block.label}:")
+            result.extend(block.instructions)
+        return result
+
+    def display(self):
+        print(f"\nJump optimization: {self.threaded} threaded, "
+              f"{self.removed_jumps} jumps removed, {self.inverted} branches inverted, "
+              f"{self.merged_labels} labels merged, "
+              f"{self.removed_unreachable} unreachable instructions removed")
+
+
+# Testing function for jump optimization
+def test_jump_optimizer(source_code: str, tac: List[str] = None):
+    """Test branch and jump optimization independently"""
+    print("\n" + "="*60)
+    print(" TESTING BRANCH & JUMP OPTIMIZATION")
+    print("="*60)
+
+    try:
+        if tac is None:
+            from intermediate_code import test_intermediate_code
+            tac, _ = test_intermediate_code(source_code)
+            if tac is None:
+                return None
+
+        optimizer = JumpOptimizer(tac)
+        optimized = optimizer.optimize()
+        optimizer.display()
+        print("\nOptimized TAC:")
+        print("-" * 50)
+        for i, instruction in enumerate(optimized, 1):
+            print(f"{i:3d}. {instruction}")
+        print("\n✓ Jump Optimization Successful!")
+        return optimized
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    while (i < 10) {
+        if (i > 5) {
+            print(i);
+        } else {
+            if (i == 2) {
+                print("two");
+            }
+        }
+        i = i + 1;
+    }
+    """
+
+    test_jump_optimizer(test_code)
@@ -0,0 +1,195 @@
+"""
+============================================
+BACKEND SUPPORT: SOURCE-LINE PROFILER
+CSE 430 - Compiler Design Lab
+============================================
+
+Runs a program's x86 code in the emulator and charges every executed
+instruction, and its cycles, to the source line it was compiled from:
+
+     Line    Instrs   Runtime     Cycles      %  Source
+        6      6000         0      34000  55.4%  total = total + i * j;
+        7      2000         0      10000  16.3%  j = j + 1;
+       10        58      3772       5558   9.1%  print(total);
+
+- Lines come from the source map ('; line N' markers, see
+  source_map.py), so the profile is of the code the -O level really
+  generates, after the TAC passes, peephole and scheduler.
+- Runtime library instructions are charged to the line whose call
+  reached them (the print statement), in the Runtime column.  Line 0 is
+  the epilogue: the final flush of buffered output and the exit.
+- Cycles use the scheduler's machine model (instruction_scheduler.py):
+  one instruction per cycle plus its latency, with LOAD_LATENCY extra
+  for a memory operand.  It ranks lines; it is not a timing of a real
+  CPU.
+"""
+
+from collections import Counter
+from typing import List
+from x86_emulator import X86Emulator, EmulatorError
+from peephole import AsmInstruction
+from instruction_scheduler import latency_of
+from source_map import EPILOGUE_LINE
+
+
+class LineProfiler(X86Emulator):
+    """X86Emulator that counts instructions and cycles per source line"""
+
+    def __init__(self, assembly: List[str], max_steps: int = 10_000_000):
+        super().__init__(assembly, max_steps)
+        self.costs = [latency_of(AsmInstruction.parse(line)) for line in self.listing]
+        self.line_instructions = Counter()      # program instructions per line
+        self.line_runtime = Counter()           # runtime library instructions per line
+        self.line_cycles = Counter()            # both, in cycles
+
+    def run(self) -> List[str]:
+        """X86Emulator.run, charging each instruction to a line; the
+        runtime library keeps the line of the code that called it"""
+        code, lines, costs = self.code, self.source_lines, self.costs
+        line = None
+        while self.exit_code is None:
+            pc = self.pc
+            if not 0 <= pc < len(code):
+                raise EmulatorError(f"Execution left the program at instruction {pc}")
+            opcode, handler, operands = code[pc]
+            if pc < self.runtime_start:
+                line = lines[pc]
+                self.program_instructions += 1
+                self.line_instructions[line] += 1
+            else:
+                self.line_runtime[line] += 1
+            self.line_cycles[line] += costs[pc]
+            self.pc += 1
+            self.instructions += 1
+            if self.instructions > self.max_steps:
+                raise EmulatorError(f"Step limit of {self.max_steps} exceeded")
+            self.opcodes[opcode] += 1
+            if handler is None:
+                self.branches += 1
+                if self.condition(opcode[1:]):
+                    self.taken_branches += 1
+                    self.pc = self.labels[operands[0].symbol]
+            else:
+                handler(*operands)
+        return self.output()
+
+    def hot_lines(self) -> List[tuple]:
+        """(line, instructions, runtime instructions, cycles), hottest first"""
+        return sorted(((line, self.line_instructions[line], self.line_runtime[line], cycles)
+                       for line, cycles in self.line_cycles.items()),
+                      key=lambda row: (-row[3], row[0] if row[0] is not None else -1))
+
+    def report(self, source_code: str, top: int = None):
+        """Hot-line table annotated with the source text"""
+        source = source_code.split('\n')
+        total = sum(self.line_cycles.values()) or 1
+        print("\nHot Lines (by estimated cycles):")
+        print("-" * 78)
+        print(f"{'Line':>5} {'Instrs':>9} {'Runtime':>9} {'Cycles':>10} {'%':>6}  Source")
+        print("-" * 78)
+        rows = self.hot_lines()
+        for line, instructions, runtime, cycles in rows[:top]:
+            if line is None:
+                text = "(no line information)"
+            elif line == EPILOGUE_LINE:
+                text = "(exit: flush output)"
+            else:
+                text = source[line - 1].strip() if 0 < line <= len(source) else ""
+            label = '-' if line is None else line
+            print(f"{label:>5} {instructions:>9} {runtime:>9} {cycles:>10} "
+                  f"{cycles * 100 / total:>5.1f}%  {text}")
+        if top is not None and len(rows) > top:
+            print(f"  ... {len(rows) - top} colder lines")
+        print("-" * 78)
+        print(f"{'Total':>5} {sum(self.line_instructions.values()):>9} "
+              f"{sum(self.line_runtime.values()):>9} {sum(self.line_cycles.values()):>10}")
+
+
+def profile(source_code: str, opt_level: str = 'O1', max_steps: int = 10_000_000) -> LineProfiler:
+    """Compile with a source map at an -O level and run under the profiler"""
+    import io
+    import contextlib
+    from lexer import Lexer
+    from parser import Parser
+    from semantic_analyzer import SemanticAnalyzer
+    from intermediate_code import IntermediateCode
+    from pass_manager import PassManager
+    from code_generator import AssemblyGenerator
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = Parser(Lexer(source_code).tokenize()).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        generator = IntermediateCode()
+        tac = generator.generate(ast)
+        manager = PassManager(opt_level, symbol_table, generator.string_literals)
+        tac = manager.run(tac, generator.source_lines)
+        assembly = AssemblyGenerator(tac, symbol_table, generator.string_literals,
+                                     source_lines=manager.source_lines,
+                                     **manager.codegen_options()).generate()
+    profiler = LineProfiler(assembly, max_steps)
+    profiler.run()
+    return profiler
+
+
+# Testing function for the line profiler
+def test_line_profiler(source_code: str, opt_level: str = 'O1'):
+    """Profile a program by source line and check that the profile
+    accounts for every executed instruction and the output is unchanged"""
+    print("\n" + "="*60)
+    print(f" TESTING SOURCE-LINE PROFILER (-{opt_level})")
+    print("="*60)
+
+    try:
+        from ast_interpreter import ASTInterpreter
+        from lexer import Lexer
+        from parser import Parser
+        import io
+        import contextlib
+
+        profiler = profile(source_code, opt_level)
+        print("\nProgram Output:")
+        print("-" * 50)
+        for line in profiler.output():
+            print(line)
+        profiler.report(source_code)
+
+        if sum(profiler.line_instructions.values()) + sum(profiler.line_runtime.values()) \
+                != profiler.instructions:
+            raise RuntimeError("The profile does not account for every executed instruction")
+        if None in profiler.line_instructions:
+            raise RuntimeError("Some program instructions have no source line")
+        with contextlib.redirect_stdout(io.StringIO()):
+            ast = Parser(Lexer(source_code).tokenize()).parse()
+        expected = ASTInterpreter(ast).run()
+        if profiler.output() != expected:
+            raise RuntimeError(f"Profiled output {profiler.output()} differs from the AST interpreter {expected}")
+        print("\nOutput matches the AST interpreter")
+        print("\n✓ Line Profiling Successful!")
+        return profiler
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code: the inner loop body is hot, the prints pay for the
+    # runtime library's number formatting
+    test_code = """int i = 0;
+int total = 0;
+while (i < 200) {
+    int j = 0;
+    while (j < 10) {
+        total = total + i * j;
+        j = j + 1;
+    }
+    if (i - (i / 7) * 7 == 0) {
+        print(total);
+    }
+    i = i + 1;
+}
+print(total / 3);
+print("done");
+"""
+
+    test_line_profiler(test_code, 'O0')
+    test_line_profiler(test_code, 'O2')
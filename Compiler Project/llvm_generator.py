@@ -0,0 +1,524 @@
+"""
+============================================
+PHASE 5 (ALTERNATIVE): LLVM IR GENERATOR
+CSE 430 - Compiler Design Lab
+============================================
+
+Lowers TAC to textual LLVM IR so that the LLVM optimizer (opt) and
+code generator (llc) can take over:
+
+    i = i + 1               %v.1 = load i64, i64* %i.addr
+                    =>      %v.2 = add i64 %v.1, 1
+                            store i64 %v.2, i64* %i.addr
+
+- Every variable and temporary gets an alloca in the entry block
+  (i64 for int, double for float, i8* for string), so mem2reg / SROA
+  promote them to SSA registers.  A temporary that holds values of
+  different types gets one slot per type.
+- Labels become basic blocks; if_false / if_true become conditional
+  branches to the label and a fall-through block.
+- String literals are private constants; print calls printf.  Floats
+  print with the fewest digits that read back as the same double, like
+  the TAC interpreter (Python repr).
+
+Golden files (tests/golden/<name>.ll) hold the expected IR of the
+benchmark corpus and GOLDEN_PROGRAMS; a missing or different file fails
+the test.  After an intended change to the output, regenerate them:
+
+    python llvm_generator.py --update-golden
+"""
+
+import os
+import sys
+import shutil
+import struct
+import subprocess
+import tempfile
+from fractions import Fraction
+from typing import List, Dict, Optional
+from semantic_analyzer import SymbolTable
+from control_flow import is_int_constant, is_float_constant, is_label, label_name
+
+
+LLVM_TYPES = {'int': 'i64', 'float': 'double', 'string': 'i8*'}
+LLVM_ZERO = {'int': '0', 'float': '0.0', 'string': 'null'}
+INT_ARITHMETIC = {'+': 'add', '-': 'sub', '*': 'mul', '/': 'sdiv'}
+FLOAT_ARITHMETIC = {'+': 'fadd', '-': 'fsub', '*': 'fmul', '/': 'fdiv'}
+INT_COMPARE = {'<': 'slt', '>': 'sgt', '==': 'eq', '!=': 'ne', '<=': 'sle', '>=': 'sge'}
+# Ordered comparisons except !=, which is true for NaN (as on the x86-64 backend)
+FLOAT_COMPARE = {'<': 'olt', '>': 'ogt', '==': 'oeq', '!=': 'une', '<=': 'ole', '>=': 'oge'}
+
+# Golden IR files, and programs checked there besides the benchmark corpus
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'golden')
+GOLDEN_PROGRAMS = {
+    'mixed_types': """
+    int i = 0;
+    int total = 0;
+    float scale = 2.5;
+    while (i < 10) {
+        if (i > 4) {
+            total = total + i * 3;
+        } else {
+            total = total - 1;
+        }
+        i = i + 1;
+    }
+    print(total);
+    print(total * scale);
+    print(7 / 2);
+    print("done");
+    """,
+    'strings_and_comparisons': """
+    string name = "mini";
+    int a = 2;
+    int b = 1;
+    if (name == "mini") {
+        print(name);
+    }
+    print((a < b) - (a > b));
+    print(a / 3.0 >= 0.5);
+    """,
+}
+
+# Runtime support: format strings and the float printer
+LLVM_PRELUDE = r"""@fmt.int = private unnamed_addr constant [6 x i8] c"%lld\0A\00"
+@fmt.str = private unnamed_addr constant [4 x i8] c"%s\0A\00"
+@fmt.e = private unnamed_addr constant [5 x i8] c"%.*e\00"
+@fmt.f = private unnamed_addr constant [5 x i8] c"%.*f\00"
+@fmt.g = private unnamed_addr constant [5 x i8] c"%.*g\00"
+
+declare i32 @printf(i8*, ...)
+declare i32 @snprintf(i8*, i64, i8*, ...)
+declare double @strtod(i8*, i8**)
+declare i8* @strchr(i8*, i32)
+declare i32 @atoi(i8*)
+declare i32 @strcmp(i8*, i8*)
+
+; Shortest round-trip formatting of a double, as Python's repr()
+define private void @print_float(double %value) {
+entry:
+  %scientific = alloca [40 x i8]
+  %buffer = alloca [48 x i8]
+  %digits = getelementptr inbounds [40 x i8], [40 x i8]* %scientific, i64 0, i64 0
+  %text = getelementptr inbounds [48 x i8], [48 x i8]* %buffer, i64 0, i64 0
+  %e = getelementptr inbounds [5 x i8], [5 x i8]* @fmt.e, i64 0, i64 0
+  br label %try
+try:
+  %precision = phi i32 [ 1, %entry ], [ %next, %retry ]
+  %places = sub i32 %precision, 1
+  call i32 (i8*, i64, i8*, ...) @snprintf(i8* %digits, i64 40, i8* %e, i32 %places, double %value)
+  %back = call double @strtod(i8* %digits, i8** null)
+  %same = fcmp oeq double %back, %value
+  %last = icmp sge i32 %precision, 17
+  %done = or i1 %same, %last
+  br i1 %done, label %exponent, label %retry
+retry:
+  %next = add i32 %precision, 1
+  br label %try
+exponent:
+  %mark = call i8* @strchr(i8* %digits, i32 101)
+  %special = icmp eq i8* %mark, null
+  br i1 %special, label %nan, label %range
+nan:
+  call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @fmt.str, i64 0, i64 0), i8* %digits)
+  ret void
+range:
+  %power = getelementptr inbounds i8, i8* %mark, i64 1
+  %exp = call i32 @atoi(i8* %power)
+  %low = icmp sge i32 %exp, -4
+  %high = icmp slt i32 %exp, 16
+  %fixed = and i1 %low, %high
+  br i1 %fixed, label %positional, label %general
+positional:
+  %decimals = sub i32 %places, %exp
+  %positive = icmp sgt i32 %decimals, 0
+  %count = select i1 %positive, i32 %decimals, i32 1
+  %f = getelementptr inbounds [5 x i8], [5 x i8]* @fmt.f, i64 0, i64 0
+  call i32 (i8*, i64, i8*, ...) @snprintf(i8* %text, i64 48, i8* %f, i32 %count, double %value)
+  br label %print
+general:
+  %g = getelementptr inbounds [5 x i8], [5 x i8]* @fmt.g, i64 0, i64 0
+  call i32 (i8*, i64, i8*, ...) @snprintf(i8* %text, i64 48, i8* %g, i32 %precision, double %value)
+  br label %print
+print:
+  call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @fmt.str, i64 0, i64 0), i8* %text)
+  ret void
+}"""
+
+
+def double_literal(value: float) -> str:
+    """LLVM spelling of a double: decimal when exact, hex bit pattern otherwise"""
+    text = repr(value)
+    if 'e' not in text and 'n' not in text and Fraction(text) == Fraction(value):
+        return text
+    return "0x%016X" % struct.unpack('>Q', struct.pack('>d', value))[0]
+
+
+def string_constant(text: str) -> tuple:
+    """(LLVM c"..." body, byte length) of a NUL-terminated string"""
+    data = text.encode('utf-8') + b'\0'
+    body = ''.join(chr(byte) if 32 <= byte < 127 and chr(byte) not in '"\\'
+                   else f"\\{byte:02X}" for byte in data)
+    return f'c"{body}"', len(data)
+
+
+class LLVMGenerator:
+    """Generates an LLVM IR module from TAC"""
+
+    def __init__(self, tac: List[str], symbol_table: SymbolTable, string_literals: Dict,
+                 peephole: bool = True, select_instructions: bool = False,
+                 schedule: bool = False):
+        # Machine-level options are left to llc; they are accepted so -O
+        # level options apply to every target
+        self.tac = tac
+        self.symbol_table = symbol_table
+        self.string_literals = string_literals
+        self.strings = {label: value for value, label in string_literals.items()}
+        self.ir: List[str] = []
+        self.body: List[str] = []
+        self.slots: Dict[tuple, str] = {}      # (name, type) -> alloca register
+        self.temp_types: Dict[str, str] = {}   # temporary -> type of its current value
+        self.next_value = 0
+        self.next_block = 0
+        self.terminated = False
+
+    # ---------- types ----------
+
+    def type_of(self, name: str) -> str:
+        if is_float_constant(name):
+            return 'float'
+        if is_int_constant(name):
+            return 'int'
+        if name in self.strings:
+            return 'string'
+        if name in self.symbol_table.symbols:
+            return self.symbol_table.symbols[name]['type']
+        return self.temp_types.get(name, 'int')
+
+    # ---------- values ----------
+
+    def fresh(self) -> str:
+        self.next_value += 1
+        return f"%v.{self.next_value}"
+
+    def emit(self, line: str):
+        if self.terminated:
+            # Code after a branch starts a new (unreachable) block
+            self.next_block += 1
+            self.body.append(f"bb.{self.next_block}:")
+            self.terminated = False
+        self.body.append(f"  {line}")
+
+    def terminate(self, line: str):
+        self.emit(line)
+        self.terminated = True
+
+    def slot(self, name: str, value_type: str) -> str:
+        """alloca holding name (temporaries get one per type they hold)"""
+        key = (name, value_type)
+        if key not in self.slots:
+            suffix = '' if name in self.symbol_table.symbols or value_type == 'int' else f".{value_type}"
+            self.slots[key] = f"%{name}{suffix}.addr"
+        return self.slots[key]
+
+    def load(self, name: str) -> str:
+        """LLVM operand holding the value of a TAC operand, in its own type"""
+        if is_int_constant(name):
+            return name
+        if is_float_constant(name):
+            return double_literal(float(name))
+        if name in self.strings:
+            _, size = string_constant(self.strings[name])
+            return f"getelementptr inbounds ([{size} x i8], [{size} x i8]* @{name}, i64 0, i64 0)"
+        value_type = self.type_of(name)
+        llvm_type = LLVM_TYPES[value_type]
+        value = self.fresh()
+        self.emit(f"{value} = load {llvm_type}, {llvm_type}* {self.slot(name, value_type)}")
+        return value
+
+    def convert(self, value: str, source: str, target: str, original: str) -> str:
+        """Convert an operand between int and double"""
+        if source == target:
+            return value
+        if (source, target) == ('int', 'float'):
+            if is_int_constant(original):
+                return double_literal(float(original))
+            result = self.fresh()
+            self.emit(f"{result} = sitofp i64 {value} to double")
+            return result
+        if (source, target) == ('float', 'int'):
+            result = self.fresh()
+            self.emit(f"{result} = fptosi double {value} to i64")
+            return result
+        raise ValueError(f"Cannot use a {source} value as {target} in LLVM IR")
+
+    def operand(self, name: str, target: str) -> str:
+        return self.convert(self.load(name), self.type_of(name), target, name)
+
+    def store(self, dest: str, value: str, value_type: str):
+        """Store a value into dest, converting to the declared type of a variable"""
+        if dest in self.symbol_table.symbols:
+            target = self.symbol_table.symbols[dest]['type']
+            value = self.convert(value, value_type, target, value)
+        else:
+            target = value_type
+            self.temp_types[dest] = value_type
+        llvm_type = LLVM_TYPES[target]
+        self.emit(f"store {llvm_type} {value}, {llvm_type}* {self.slot(dest, target)}")
+
+    def truth(self, name: str) -> str:
+        """i1 that is true when a value is non-zero (a string is never false)"""
+        value_type = self.type_of(name)
+        if value_type == 'string':
+            return 'true'
+        value = self.load(name)
+        result = self.fresh()
+        if value_type == 'float':
+            self.emit(f"{result} = fcmp une double {value}, 0.0")
+        else:
+            self.emit(f"{result} = icmp ne i64 {value}, 0")
+        return result
+
+    def compare(self, left: str, op: str, right: str) -> str:
+        """i1 result of (left op right)"""
+        kinds = (self.type_of(left), self.type_of(right))
+        if 'string' in kinds:
+            if kinds != ('string', 'string'):
+                raise ValueError(f"Cannot compare {kinds[0]} with {kinds[1]} in LLVM IR")
+            a, b = self.load(left), self.load(right)
+            order = self.fresh()
+            self.emit(f"{order} = call i32 @strcmp(i8* {a}, i8* {b})")
+            result = self.fresh()
+            self.emit(f"{result} = icmp {INT_COMPARE[op]} i32 {order}, 0")
+        elif 'float' in kinds:
+            a, b = self.operand(left, 'float'), self.operand(right, 'float')
+            result = self.fresh()
+            self.emit(f"{result} = fcmp {FLOAT_COMPARE[op]} double {a}, {b}")
+        else:
+            a, b = self.operand(left, 'int'), self.operand(right, 'int')
+            result = self.fresh()
+            self.emit(f"{result} = icmp {INT_COMPARE[op]} i64 {a}, {b}")
+        return result
+
+    # ---------- generation ----------
+
+    def generate(self) -> List[str]:
+        """Generate an LLVM IR module (one list entry per line)"""
+        print("\n" + "="*50)
+        print("PHASE 5: CODE GENERATION (LLVM IR)")
+        print("="*50)
+
+        for instruction in self.tac:
+            self.convert_instruction(instruction)
+        self.terminate("ret i32 0")
+
+        self.ir = ["; Generated by the Mini Compiler LLVM backend",
+                   "; ModuleID = 'mini'", ""]
+        for label, value in self.strings.items():
+            body, size = string_constant(value)
+            self.ir.append(f"@{label} = private unnamed_addr constant [{size} x i8] {body}")
+        self.ir.extend(LLVM_PRELUDE.splitlines())
+        self.ir.append("")
+        self.ir.append("define i32 @main() {")
+        self.ir.append("entry:")
+        for (name, value_type), register in self.slots.items():
+            self.ir.append(f"  {register} = alloca {LLVM_TYPES[value_type]}")
+        for (name, value_type), register in self.slots.items():
+            llvm_type = LLVM_TYPES[value_type]
+            self.ir.append(f"  store {llvm_type} {LLVM_ZERO[value_type]}, {llvm_type}* {register}")
+        self.ir.extend(self.body)
+        self.ir.append("}")
+
+        print("\nGenerated LLVM IR:")
+        print("-" * 50)
+        for line in self.ir:
+            print(line)
+        return self.ir
+
+    def convert_instruction(self, instruction: str):
+        """Convert single TAC instruction to LLVM IR"""
+        parts = instruction.split()
+
+        if is_label(instruction):
+            # A label opens a block; the previous block falls through into it
+            if not self.terminated:
+                self.terminate(f"br label %{label_name(instruction)}")
+            self.body.append(instruction)
+            self.terminated = False
+
+        elif '=' in instruction and len(parts) == 3:
+            # Simple assignment: x = y
+            dest, _, src = parts
+            self.store(dest, self.load(src), self.type_of(src))
+
+        elif '=' in instruction and len(parts) == 5:
+            # Binary operation: t0 = x op y
+            dest, _, left, op, right = parts
+            kinds = (self.type_of(left), self.type_of(right))
+            if op in INT_COMPARE:
+                flag = self.compare(left, op, right)
+                result = self.fresh()
+                self.emit(f"{result} = zext i1 {flag} to i64")
+                self.store(dest, result, 'int')
+            elif 'string' in kinds:
+                raise ValueError(f"Operator '{op}' on strings is not supported in LLVM IR")
+            elif 'float' in kinds:
+                a, b = self.operand(left, 'float'), self.operand(right, 'float')
+                result = self.fresh()
+                self.emit(f"{result} = {FLOAT_ARITHMETIC[op]} double {a}, {b}")
+                self.store(dest, result, 'float')
+            else:
+                a, b = self.operand(left, 'int'), self.operand(right, 'int')
+                result = self.fresh()
+                self.emit(f"{result} = {INT_ARITHMETIC[op]} i64 {a}, {b}")
+                self.store(dest, result, 'int')
+
+        elif parts[0] == 'print':
+            var = parts[1]
+            value_type = self.type_of(var)
+            value = self.load(var)
+            if value_type == 'float':
+                self.emit(f"call void @print_float(double {value})")
+            else:
+                size, format_label = (6, 'fmt.int') if value_type == 'int' else (4, 'fmt.str')
+                self.emit(f"call i32 (i8*, ...) @printf(i8* getelementptr inbounds "
+                          f"([{size} x i8], [{size} x i8]* @{format_label}, i64 0, i64 0), "
+                          f"{LLVM_TYPES[value_type]} {value})")
+
+        elif parts[0] in ('if_false', 'if_true'):
+            # if_false c goto L / fused if_false a < b goto L
+            if len(parts) == 6:
+                condition = self.compare(parts[1], parts[2], parts[3])
+            else:
+                condition = self.truth(parts[1])
+            self.next_block += 1
+            fall_through = f"bb.{self.next_block}"
+            taken, not_taken = f"%{parts[-1]}", f"%{fall_through}"
+            if parts[0] == 'if_false':
+                taken, not_taken = not_taken, taken
+            self.terminate(f"br i1 {condition}, label {taken}, label {not_taken}")
+            self.body.append(f"{fall_through}:")
+            self.terminated = False
+
+        elif parts[0] == 'goto':
+            self.terminate(f"br label %{parts[1]}")
+
+
+def find_llvm_tool(name: str) -> Optional[str]:
+    """Path of opt / llc, also trying versioned names such as opt-14"""
+    for candidate in [name] + [f"{name}-{version}" for version in range(20, 10, -1)]:
+        if shutil.which(candidate):
+            return candidate
+    return None
+
+
+def build_llvm(ir: List[str], output: str, opt_flags=('-O2',)) -> str:
+    """opt + llc + the system C compiler (for linking with libc)"""
+    opt, llc = find_llvm_tool('opt'), find_llvm_tool('llc')
+    linker = shutil.which(os.environ.get('CC', 'cc')) or shutil.which('gcc')
+    if not (opt and llc and linker):
+        raise RuntimeError("opt, llc and a C compiler are needed to build LLVM IR")
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'program.ll')
+        optimized = os.path.join(directory, 'program.opt.ll')
+        obj = os.path.join(directory, 'program.o')
+        with open(source, 'w') as handle:
+            handle.write("\n".join(ir) + "\n")
+        for command in ([opt, *opt_flags, '-S', source, '-o', optimized],
+                        [llc, '-O2', '-filetype=obj', '-relocation-model=pic', optimized, '-o', obj],
+                        [linker, obj, '-o', output]):
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"{command[0]} failed:\n{result.stderr}")
+    return output
+
+
+def golden_corpus() -> Dict[str, str]:
+    """Programs with golden IR: the benchmark corpus and GOLDEN_PROGRAMS"""
+    from benchmark import BENCHMARK_CORPUS
+    corpus = dict(BENCHMARK_CORPUS)
+    corpus.update(GOLDEN_PROGRAMS)
+    return corpus
+
+
+def golden_path(name: str) -> str:
+    return os.path.join(GOLDEN_DIR, f"{name}.ll")
+
+
+def check_golden(ir: List[str], golden: str, update: bool = False):
+    """Compare IR with a golden file; update=True (re)writes the file"""
+    text = "\n".join(ir) + "\n"
+    if update:
+        os.makedirs(os.path.dirname(golden), exist_ok=True)
+        with open(golden, 'w') as handle:
+            handle.write(text)
+        return
+    if not os.path.exists(golden):
+        raise FileNotFoundError(f"Golden file {golden} is missing "
+                                f"(python llvm_generator.py --update-golden writes it)")
+    with open(golden) as handle:
+        if handle.read() != text:
+            raise RuntimeError(f"LLVM IR differs from the golden file {golden}")
+
+
+# Testing function for the LLVM IR backend
+def test_llvm_generator(source_code: str, golden: str = None, run: bool = True,
+                        update_golden: bool = False):
+    """Generate LLVM IR and compare it with a golden file (rewritten only
+    with update_golden); when opt/llc are installed, build and run the
+    program and check its output against the TAC interpreter"""
+    print("\n" + "="*60)
+    print(" TESTING LLVM IR GENERATOR")
+    print("="*60)
+
+    try:
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+        from intermediate_code import IntermediateCode
+        from tac_interpreter import TACInterpreter
+
+        ast = Parser(Lexer(source_code).tokenize()).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        generator = IntermediateCode()
+        tac = generator.generate(ast)
+        ir = LLVMGenerator(tac, symbol_table, generator.string_literals).generate()
+
+        if golden:
+            check_golden(ir, golden, update_golden)
+            if update_golden:
+                print(f"\nWrote golden file {golden}")
+            else:
+                print(f"\nLLVM IR matches the golden file {golden}")
+
+        if run:
+            if not (find_llvm_tool('opt') and find_llvm_tool('llc')):
+                print("\nopt/llc not found; skipping the end-to-end run")
+            else:
+                with tempfile.TemporaryDirectory() as directory:
+                    executable = build_llvm(ir, os.path.join(directory, 'program'))
+                    output = subprocess.run([executable], capture_output=True, text=True,
+                                            timeout=30).stdout.splitlines()
+                expected = TACInterpreter(tac, generator.string_literals).run()
+                print("\nProgram Output (opt -O2, llc):")
+                print("-" * 50)
+                for line in output:
+                    print(line)
+                if output != expected:
+                    raise RuntimeError(f"LLVM output {output} differs from the TAC interpreter {expected}")
+                print("\nOutput matches the TAC interpreter")
+
+        print("\n✓ LLVM IR Generation Successful!")
+        return ir
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Golden-file check of the corpus; --update-golden rewrites the files
+    update = '--update-golden' in sys.argv[1:]
+    failed = [name for name, source in golden_corpus().items()
+              if test_llvm_generator(source, golden_path(name), update_golden=update) is None]
+    if failed:
+        sys.exit(f"LLVM golden check failed: {', '.join(failed)}")
@@ -0,0 +1,544 @@
+"""
+============================================
+OPTIMIZATION: LOOP ANALYSIS & INDUCTION VARIABLES
+CSE 430 - Compiler Design Lab
+============================================
+
+Finds natural loops in the control flow graph, recognizes basic and
+derived induction variables and computes trip counts for counting
+loops such as
+
+    int i = 0;
+    while (i < N) { ...; i = i + 1; }
+
+InductionVariableOptimizer uses the analysis to strength-reduce
+multiplications by an induction variable into additions and to fold the
+`t = i + 1; i = t` increment into a single `i = i + 1`.
+"""
+
+from typing import List, Dict, Optional
+from control_flow import (ControlFlowGraph, BasicBlock, is_temp, is_int_constant,
+                          is_constant, is_conditional_jump, is_fused_branch, jump_target,
+                          retarget_jump, defined_var, used_vars, replace_uses,
+                          next_temp_index, COMPARISON_OPERATORS)
+
+
+# Operator with its operands swapped: (a < b) == (b > a)
+SWAPPED_COMPARISON = {'<': '>', '>': '<', '<=': '>=', '>=': '<=', '==': '==', '!=': '!='}
+
+
+class InductionVariable:
+    """Variable whose value is base * factor + offset on every iteration"""
+
+    def __init__(self, name: str, base: str, step: int, factor: int = 1, offset: int = 0):
+        self.name = name
+        self.base = base
+        self.step = step          # change of the base variable per iteration
+        self.factor = factor
+        self.offset = offset
+        self.init = None          # constant value on loop entry (basic only)
+        self.update = None        # (block, index) of the basic update
+        self.sites = []           # (block, index) definitions of a derived IV
+
+    def is_basic(self) -> bool:
+        return self.name == self.base
+
+    def __repr__(self):
+        if self.is_basic():
+            return f"BasicIV({self.name}, init={self.init}, step={self.step})"
+        return (f"DerivedIV({self.name} = {self.base} * {self.factor} + {self.offset}, "
+                f"step={self.step * self.factor})")
+
+
+class Loop:
+    """Natural loop: a header block plus every block that reaches a back edge"""
+
+    def __init__(self, header: BasicBlock, string_labels=()):
+        self.header = header
+        self.blocks = {header}
+        self.string_labels = string_labels
+        self.latches = []
+        self.preheader = None
+        self.parent = None
+        self.depth = 1
+        self.induction_variables = {}
+        self.derived_variables = []
+        self.condition = None     # (iv, operator, bound) tested on entry to an iteration
+        self.trip_count = None
+
+    def defines(self, name: str) -> bool:
+        return any(defined_var(instr) == name
+                   for block in self.blocks for instr in block.instructions)
+
+    def is_invariant(self, operand: str) -> bool:
+        return is_constant(operand, self.string_labels) or not self.defines(operand)
+
+    def size(self) -> int:
+        return sum(len(block.instructions) for block in self.blocks)
+
+    def __repr__(self):
+        return (f"Loop({self.header.label}, {len(self.blocks)} blocks, "
+                f"depth={self.depth}, trip_count={self.trip_count})")
+
+
+class LoopAnalysis:
+    """Loop nest, induction variables and trip counts of a CFG"""
+
+    def __init__(self, cfg: ControlFlowGraph, symbol_table=None):
+        self.cfg = cfg
+        self.symbol_table = symbol_table
+        self.loops = []
+
+    def analyze(self) -> List[Loop]:
+        self.loops = self.find_loops()
+        for loop in self.loops:
+            loop.preheader = self.find_preheader(loop)
+        # Innermost loops first, so transforms see nested loops before outer ones
+        self.loops.sort(key=lambda loop: -loop.depth)
+        for loop in self.loops:
+            self.find_induction_variables(loop)
+            self.compute_trip_count(loop)
+        return self.loops
+
+    def find_loops(self) -> List[Loop]:
+        """One natural loop per header, found from back edges n -> h where h dom n"""
+        dom = self.cfg.dominators()
+        loops = {}
+        for block in dom:
+            for succ in block.successors:
+                if succ in dom[block]:
+                    loop = loops.setdefault(succ, Loop(succ, self.cfg.string_labels))
+                    loop.latches.append(block)
+                    stack = [block]
+                    while stack:
+                        node = stack.pop()
+                        if node not in loop.blocks:
+                            loop.blocks.add(node)
+                            stack.extend(node.predecessors)
+        result = list(loops.values())
+        for loop in result:
+            enclosing = [other for other in result
+                         if other is not loop and loop.blocks < other.blocks]
+            if enclosing:
+                loop.parent = min(enclosing, key=lambda other: len(other.blocks))
+            loop.depth = len(enclosing) + 1
+        return result
+
+    def find_preheader(self, loop: Loop) -> Optional[BasicBlock]:
+        """Unique block outside the loop whose only successor is the header"""
+        outside = [p for p in loop.header.predecessors if p not in loop.blocks]
+        if len(outside) == 1 and outside[0].successors == [loop.header]:
+            return outside[0]
+        return None
+
+    def innermost_loop(self, block: BasicBlock) -> Optional[Loop]:
+        containing = [loop for loop in self.loops if block in loop.blocks]
+        return max(containing, key=lambda loop: loop.depth, default=None)
+
+    def blocks_of(self, loop: Loop) -> List[BasicBlock]:
+        """Blocks of the loop in layout order"""
+        return [block for block in self.cfg.blocks if block in loop.blocks]
+
+    def is_int(self, name: str) -> bool:
+        if self.symbol_table is None or is_temp(name):
+            return True
+        return self.symbol_table.get_type(name) == 'int'
+
+    def definitions(self, loop: Loop) -> Dict[str, list]:
+        defs = {}
+        for block in self.blocks_of(loop):
+            for index, instruction in enumerate(block.instructions):
+                name = defined_var(instruction)
+                if name:
+                    defs.setdefault(name, []).append((block, index))
+        return defs
+
+    def find_induction_variables(self, loop: Loop):
+        dom = self.cfg.dominators()
+        defs = self.definitions(loop)
+        loop.induction_variables = {}
+        loop.derived_variables = []
+
+        # Basic IVs: named variables updated exactly once per iteration by a constant
+        for name, sites in defs.items():
+            if is_temp(name) or len(sites) != 1 or not self.is_int(name):
+                continue
+            block, index = sites[0]
+            if self.innermost_loop(block) is not loop:
+                continue
+            if not all(block in dom[latch] for latch in loop.latches):
+                continue
+            step = self.update_step(name, block, index)
+            if step is None:
+                continue
+            iv = InductionVariable(name, name, step)
+            iv.update = (block, index)
+            iv.init = self.initial_value(loop, name)
+            loop.induction_variables[name] = iv
+
+        # Derived IVs: t = iv * c, t = iv + c, t = iv - c, looked at per definition site
+        for block in self.blocks_of(loop):
+            local = {}
+            for index, instruction in enumerate(block.instructions):
+                parts = instruction.split()
+                name = defined_var(instruction)
+                derived = None
+                if name and len(parts) == 5 and is_temp(name):
+                    derived = self.derive(parts[2], parts[3], parts[4], loop, local)
+                    if derived is None and parts[3] in ('+', '*'):
+                        derived = self.derive(parts[4], parts[3], parts[2], loop, local)
+                if derived is not None:
+                    iv = InductionVariable(name, derived.base, derived.step,
+                                           derived.factor, derived.offset)
+                    iv.sites = [(block, index)]
+                    loop.derived_variables.append(iv)
+                    local[name] = iv
+                elif name in local:
+                    del local[name]
+                if name in loop.induction_variables:
+                    # Derived values computed before the update refer to the old base
+                    local = {k: v for k, v in local.items() if v.base != name}
+
+    def update_step(self, name: str, block: BasicBlock, index: int) -> Optional[int]:
+        """Step of `v = v + c`, `v = v - c` or `t = v + c; v = t`"""
+        parts = block.instructions[index].split()
+        if len(parts) == 5:
+            return self.increment(name, parts[2], parts[3], parts[4])
+        if len(parts) == 3 and is_temp(parts[2]) and index > 0:
+            previous = block.instructions[index - 1].split()
+            if len(previous) == 5 and previous[0] == parts[2]:
+                return self.increment(name, previous[2], previous[3], previous[4])
+        return None
+
+    def increment(self, name: str, left: str, op: str, right: str) -> Optional[int]:
+        if op == '+' and left == name and is_int_constant(right):
+            return int(right)
+        if op == '+' and right == name and is_int_constant(left):
+            return int(left)
+        if op == '-' and left == name and is_int_constant(right):
+            return -int(right)
+        return None
+
+    def derive(self, operand: str, op: str, constant: str, loop: Loop, local):
+        """Linear function of an IV described by `operand op constant`"""
+        if not is_int_constant(constant):
+            return None
+        value = int(constant)
+        if operand in local:
+            source = local[operand]
+        elif operand in loop.induction_variables:
+            source = loop.induction_variables[operand]
+        else:
+            return None
+        factor, offset = source.factor, source.offset
+        if op == '*':
+            factor, offset = factor * value, offset * value
+        elif op == '+':
+            offset += value
+        elif op == '-':
+            offset -= value
+        else:
+            return None
+        return InductionVariable(None, source.base, source.step, factor, offset)
+
+    def initial_value(self, loop: Loop, name: str) -> Optional[int]:
+        """Constant assigned to name on the straight-line path into the loop"""
+        block = loop.preheader
+        seen = set()
+        while block is not None and block not in seen and block not in loop.blocks:
+            seen.add(block)
+            for instruction in reversed(block.instructions):
+                if defined_var(instruction) == name:
+                    parts = instruction.split()
+                    if len(parts) == 3 and is_int_constant(parts[2]):
+                        return int(parts[2])
+                    return None
+            block = block.predecessors[0] if len(block.predecessors) == 1 else None
+        return None
+
+    def exit_condition(self, loop: Loop):
+        """(left, op, right) that must hold for the loop to keep running"""
+        header = loop.header
+        last = header.terminator()
+        if last is None or not is_conditional_jump(last):
+            return None
+        target = self.cfg.block_map().get(jump_target(last))
+        if target is None or target in loop.blocks or not last.startswith('if_false'):
+            return None
+        if is_fused_branch(last):
+            _, left, op, right, _, _ = last.split()
+            return left, op, right
+        cond = last.split()[1]
+        for instruction in reversed(header.instructions[:-1]):
+            if defined_var(instruction) == cond:
+                parts = instruction.split()
+                if len(parts) == 5 and parts[3] in COMPARISON_OPERATORS:
+                    return parts[2], parts[3], parts[4]
+                return None
+        return None
+
+    def compute_trip_count(self, loop: Loop):
+        loop.condition = None
+        loop.trip_count = None
+        condition = self.exit_condition(loop)
+        if condition is None:
+            return
+        left, op, right = condition
+        if left not in loop.induction_variables and right in loop.induction_variables:
+            left, op, right = right, SWAPPED_COMPARISON[op], left
+        iv = loop.induction_variables.get(left)
+        if iv is None or not loop.is_invariant(right):
+            return
+        if iv.update[0] is loop.header:
+            return
+        loop.condition = (left, op, right)
+        if iv.init is not None and is_int_constant(right):
+            loop.trip_count = trip_count(iv.init, iv.step, op, int(right))
+
+    def top_tested_layout(self, loop: Loop):
+        """(first, last) layout indices of a while loop in the shape
+        IntermediateCode lowers it to, or None:
+
+            header:  ...; if_false cond goto exit
+                     body (jumps stay inside the loop or go to header)
+                     goto header
+            exit:
+        """
+        blocks = self.cfg.blocks
+        first = blocks.index(loop.header)
+        last = first + len(loop.blocks) - 1
+        if last + 1 >= len(blocks) or set(blocks[first:last + 1]) != loop.blocks:
+            return None
+        test = loop.header.terminator()
+        if (test is None or not test.startswith('if_false')
+                or jump_target(test) != blocks[last + 1].label):
+            return None
+        if blocks[last].terminator() != f"goto {loop.header.label}":
+            return None
+        by_label = self.cfg.block_map()
+        for block in blocks[first + 1:last + 1]:
+            target = jump_target(block.terminator() or "")
+            if target is not None and by_label.get(target) not in loop.blocks:
+                return None
+        return first, last
+
+    def display(self):
+        print("\nLoops:")
+        print("-" * 50)
+        if not self.loops:
+            print("  (none)")
+        for loop in self.loops:
+            print(f"  {loop}")
+            for iv in loop.induction_variables.values():
+                print(f"    {iv}")
+            for iv in loop.derived_variables:
+                print(f"    {iv}")
+
+
+def compare(left: int, op: str, right: int) -> bool:
+    return {'<': left < right, '>': left > right, '<=': left <= right,
+            '>=': left >= right, '==': left == right, '!=': left != right}[op]
+
+
+def trip_count(init: int, step: int, op: str, bound: int) -> Optional[int]:
+    """Iterations of a top-tested loop `while (iv op bound)`, None if unbounded"""
+    if not compare(init, op, bound):
+        return 0
+    if step == 0:
+        return None
+    if op == '==':
+        return 1
+    if op == '!=':
+        distance = bound - init
+        if distance % step == 0 and distance // step > 0:
+            return distance // step
+        return None
+    if (op in ('<', '<=') and step < 0) or (op in ('>', '>=') and step > 0):
+        return None
+    last = {'<': bound - 1, '<=': bound, '>': bound + 1, '>=': bound}[op]
+    return abs(last - init) // abs(step) + 1
+
+
+# ============================================
+# INDUCTION VARIABLE OPTIMIZATION
+# ============================================
+
+def add_constant(name: str, value: int) -> str:
+    """TAC for name += value without a negative literal operand"""
+    if value < 0:
+        return f"{name} = {name} - {-value}"
+    return f"{name} = {name} + {value}"
+
+class InductionVariableOptimizer:
+    """Strength reduction of derived IVs and increment folding"""
+
+    def __init__(self, tac: List[str], symbol_table=None, strength_reduce: bool = True,
+                 string_literals: Dict = None):
+        self.tac = tac
+        self.symbol_table = symbol_table
+        self.string_literals = string_literals or {}
+        self.reduce = strength_reduce
+        self.reduced = 0
+        self.folded = 0
+
+    def optimize(self) -> List[str]:
+        tac = list(self.tac)
+        while True:
+            cfg = ControlFlowGraph(tac, self.string_literals.values())
+            analysis = LoopAnalysis(cfg, self.symbol_table)
+            changed = False
+            for loop in analysis.analyze():
+                if self.fold_increments(cfg, loop) or (
+                        self.reduce and self.strength_reduce(cfg, loop)):
+                    changed = True
+                    break
+            tac = cfg.to_tac()
+            if not changed:
+                return tac
+
+    def fold_increments(self, cfg: ControlFlowGraph, loop: Loop) -> bool:
+        """`t = i + 1; i = t` becomes `i = i + 1` when t is dead afterwards"""
+        _, live_out = cfg.liveness()
+        for iv in loop.induction_variables.values():
+            block, index = iv.update
+            parts = block.instructions[index].split()
+            if len(parts) != 3 or index == 0:
+                continue
+            if self.used_later(block, index, parts[2], live_out):
+                continue
+            previous = block.instructions[index - 1].split()
+            block.instructions[index - 1:index + 1] = [f"{iv.name} = " + " ".join(previous[2:])]
+            self.folded += 1
+            return True
+        return False
+
+    def strength_reduce(self, cfg: ControlFlowGraph, loop: Loop) -> bool:
+        """Replace the first `t = iv * c` in the loop by a running sum"""
+        for derived in loop.derived_variables:
+            block, index = derived.sites[0]
+            if block.instructions[index].split()[3] != '*':
+                continue
+            if derived.factor in (0, 1):
+                continue
+            base = loop.induction_variables[derived.base]
+            preheader = loop.preheader or self.insert_preheader(cfg, loop)
+            if preheader is None:
+                continue
+            running = f"t{next_temp_index(cfg.to_tac())}"
+
+            # Entry value, computed once before the loop
+            init = [f"{running} = {base.name} * {derived.factor}"]
+            if derived.offset:
+                init.append(add_constant(running, derived.offset))
+            position = len(preheader.instructions)
+            if preheader.terminator() is not None:
+                position -= 1
+            preheader.instructions[position:position] = init
+
+            # Keep running == base * factor + offset right after every base update
+            update_block, update_index = base.update
+            update_block.instructions.insert(
+                update_index + 1, add_constant(running, base.step * derived.factor))
+            if update_block is block and update_index < index:
+                index += 1
+
+            block.instructions[index] = f"{derived.name} = {running}"
+            self.forward_copy(cfg, block, index)
+            self.reduced += 1
+            return True
+        return False
+
+    def forward_copy(self, cfg: ControlFlowGraph, block: BasicBlock, index: int):
+        """Rewrite later uses of `t = s` in the block to read s and drop the copy"""
+        temp, _, source = block.instructions[index].split()
+        _, live_out = cfg.liveness()
+        rewritten = list(block.instructions)
+        for position in range(index + 1, len(block.instructions)):
+            instruction = block.instructions[position]
+            rewritten[position] = replace_uses(instruction, {temp: source})
+            written = defined_var(instruction)
+            if written == temp:
+                break
+            if written == source:
+                if self.used_later(block, position, temp, live_out):
+                    return
+                break
+        else:
+            if temp in live_out[block]:
+                return
+        del rewritten[index]
+        block.instructions[:] = rewritten
+
+    def used_later(self, block: BasicBlock, position: int, name: str, live_out) -> bool:
+        """Is the value name holds after instruction `position` read again?"""
+        for instruction in block.instructions[position + 1:]:
+            if name in used_vars(instruction):
+                return True
+            if defined_var(instruction) == name:
+                return False
+        return name in live_out[block]
+
+    def insert_preheader(self, cfg: ControlFlowGraph, loop: Loop) -> Optional[BasicBlock]:
+        header = loop.header
+        position = cfg.blocks.index(header)
+        previous = cfg.blocks[position - 1] if position > 0 else None
+        if previous in loop.blocks and cfg.fallthrough(previous) is header:
+            return None
+        jumping = [p for p in header.predecessors
+                   if p not in loop.blocks and p.terminator()
+                   and jump_target(p.terminator()) == header.label]
+        label = cfg.fresh_label() if jumping else None
+        preheader = cfg.insert_block_before(header, label)
+        for pred in jumping:
+            pred.instructions[-1] = retarget_jump(pred.instructions[-1], label)
+        cfg.link()
+        loop.preheader = preheader
+        return preheader
+
+
+# Testing function for loop analysis
+def test_loop_analysis(source_code: str, tac: List[str] = None, symbol_table=None):
+    """Test loop analysis and induction variable optimization independently"""
+    print("\n" + "="*60)
+    print(" TESTING LOOP ANALYSIS & INDUCTION VARIABLES")
+    print("="*60)
+
+    try:
+        if tac is None:
+            from intermediate_code import test_intermediate_code
+            tac, _ = test_intermediate_code(source_code)
+            if tac is None:
+                return None
+
+        analysis = LoopAnalysis(ControlFlowGraph(tac), symbol_table)
+        analysis.analyze()
+        analysis.display()
+
+        optimizer = InductionVariableOptimizer(tac, symbol_table)
+        optimized = optimizer.optimize()
+        print(f"\nStrength-reduced IVs: {optimizer.reduced}, "
+              f"folded increments: {optimizer.folded}")
+        print("\nOptimized TAC:")
+        print("-" * 50)
+        for i, instruction in enumerate(optimized, 1):
+            print(f"{i:3d}. {instruction}")
+        print("\n✓ Loop Analysis Successful!")
+        return optimized
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    int offset = 0;
+    while (i < 10) {
+        offset = i * 4 + 8;
+        print(offset);
+        i = i + 1;
+    }
+    """
+
+    test_loop_analysis(test_code)
@@ -0,0 +1,149 @@
+"""
+============================================
+OPTIMIZATION: LOOP ROTATION
+CSE 430 - Compiler Design Lab
+============================================
+
+Turns top-tested while loops into guarded do-while loops, so every
+iteration ends in a single backward conditional branch instead of a
+forward exit test plus an unconditional jump back:
+
+    L0: if_false i < n goto L1        L0: if_false i < n goto L1   # guard
+        body                  =>      L2: body
+        goto L0                           if_true i < n goto L2
+    L1:                               L1:
+
+The guard keeps the zero-iteration case: when the condition is false on
+entry the body is skipped exactly as before.  Loops that LoopAnalysis
+proves run at least once lose the guard branch.
+"""
+
+from typing import List, Dict
+from control_flow import (ControlFlowGraph, is_jump, jump_target, retarget_jump,
+                          next_label_index)
+from loop_analysis import LoopAnalysis
+
+
+class LoopRotator:
+    """Rotates every while loop into a bottom-tested layout"""
+
+    def __init__(self, tac: List[str], symbol_table=None, string_literals: Dict = None):
+        self.tac = tac
+        self.symbol_table = symbol_table
+        self.string_literals = string_literals or {}
+        self.rotated = 0
+        self.guards_removed = 0
+        self.next_label = 0
+        self.done = set()
+
+    def optimize(self) -> List[str]:
+        tac = list(self.tac)
+        self.next_label = next_label_index(tac)
+        while True:
+            cfg = ControlFlowGraph(tac, self.string_literals.values())
+            analysis = LoopAnalysis(cfg, self.symbol_table)
+            for loop in analysis.analyze():
+                if loop.header.label in self.done:
+                    continue
+                self.done.add(loop.header.label)
+                layout = analysis.top_tested_layout(loop)
+                if layout is not None:
+                    guarded = loop.trip_count is None or loop.trip_count == 0
+                    if not guarded:
+                        self.guards_removed += 1
+                    tac = self.rotate(cfg, loop.header, *layout, guarded)
+                    self.rotated += 1
+                    break
+            else:
+                return tac
+
+    def fresh_label(self) -> str:
+        label = f"L{self.next_label}"
+        self.next_label += 1
+        return label
+
+    def rotate(self, cfg: ControlFlowGraph, header, first: int, last: int,
+               guarded: bool = True) -> List[str]:
+        test = header.instructions[:-1]
+        branch = header.instructions[-1].split()
+        body_label = self.fresh_label()
+        latch_label = self.fresh_label()
+        self.done.add(body_label)
+
+        # if_false c goto exit  =>  if_true c goto body
+        back_edge = " ".join(['if_true'] + branch[1:-1] + [body_label])
+
+        body = ControlFlowGraph.flatten(cfg.blocks[first + 1:last + 1])[:-1]
+        continues = False
+        guard = header.instructions if guarded else test
+        rotated = [f"{header.label}:"] + guard + [f"{body_label}:"]
+        for instruction in body:
+            if is_jump(instruction) and jump_target(instruction) == header.label:
+                # An early jump back to the header now goes to the bottom test
+                instruction = retarget_jump(instruction, latch_label)
+                continues = True
+            rotated.append(instruction)
+        if continues:
+            rotated.append(f"{latch_label}:")
+        rotated.extend(test)
+        rotated.append(back_edge)
+
+        return (ControlFlowGraph.flatten(cfg.blocks[:first]) + rotated
+                + ControlFlowGraph.flatten(cfg.blocks[last + 1:]))
+
+    def display(self):
+        print(f"\nLoop rotation: {self.rotated} loops rotated to do-while form, "
+              f"{self.guards_removed} entry guards removed")
+
+
+# Testing function for loop rotation
+def test_loop_rotation(source_code: str, tac: List[str] = None, string_literals=None):
+    """Test loop rotation independently"""
+    print("\n" + "="*60)
+    print(" TESTING LOOP ROTATION")
+    print("="*60)
+
+    try:
+        if tac is None:
+            from intermediate_code import test_intermediate_code
+            tac, string_literals = test_intermediate_code(source_code)
+            if tac is None:
+                return None
+
+        rotator = LoopRotator(tac)
+        rotated = rotator.optimize()
+        rotator.display()
+        print("\nRotated TAC:")
+        print("-" * 50)
+        for i, instruction in enumerate(rotated, 1):
+            print(f"{i:3d}. {instruction}")
+
+        from tac_interpreter import TACInterpreter
+        before = TACInterpreter(tac, string_literals)
+        after = TACInterpreter(rotated, string_literals)
+        if before.run() != after.run():
+            raise RuntimeError("Rotated program prints different output")
+        print(f"\nExecuted branches: {before.branches + before.jumps} -> "
+              f"{after.branches + after.jumps}")
+        print("\n✓ Loop Rotation Successful!")
+        return rotated
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    while (i < 5) {
+        print(i);
+        i = i + 1;
+    }
+    int n = 0;
+    while (n > 0) {
+        print(n);
+    }
+    """
+
+    test_loop_rotation(test_code)
@@ -0,0 +1,278 @@
+"""
+============================================
+OPTIMIZATION: LOOP UNROLLING
+CSE 430 - Compiler Design Lab
+============================================
+
+Unrolls innermost while loops using the trip counts from LoopAnalysis.
+
+Full unrolling (constant trip count, small body):
+
+    L0: if_false i < 3 goto L1        body
+        body                    =>    body
+        goto L0                       body
+    L1:                           L1:
+
+Partial unrolling by `factor` (bounded counting loop):
+
+    L0: t = i + 3                     # are 4 more iterations valid?
+        if_false t < n goto L5
+        body; body; body; body
+        goto L0
+    L5: if_false i < n goto L1        # remainder loop (original loop)
+        body
+        goto L5
+    L1:
+
+With a training-run profile (block_layout.py), loops that never ran are
+left alone, and the profiled average trip count stands in for an
+unknown one when deciding on partial unrolling.
+"""
+
+from typing import List, Dict, Optional
+from control_flow import (ControlFlowGraph, is_label, label_name, is_jump,
+                          jump_target, retarget_jump, defined_var, is_temp,
+                          next_temp_index, next_label_index)
+from loop_analysis import LoopAnalysis, Loop
+
+
+class LoopUnroller:
+    """Full and partial unrolling of innermost loops"""
+
+    def __init__(self, tac: List[str], symbol_table=None, factor: int = 4,
+                 max_body_size: int = 16, max_full_unroll_size: int = 64,
+                 max_full_trip_count: int = 16, loop_profile: Dict[str, list] = None,
+                 string_literals: Dict = None):
+        self.tac = tac
+        self.symbol_table = symbol_table
+        self.string_literals = string_literals or {}
+        self.factor = factor
+        self.max_body_size = max_body_size
+        self.max_full_unroll_size = max_full_unroll_size
+        self.max_full_trip_count = max_full_trip_count
+        self.loop_profile = loop_profile    # header label -> [entries, iterations]
+        self.fully_unrolled = 0
+        self.partially_unrolled = 0
+        self.next_label = 0
+        self.next_temp = 0
+        self.done = set()
+
+    def optimize(self) -> List[str]:
+        tac = list(self.tac)
+        self.next_label = next_label_index(tac)
+        self.next_temp = next_temp_index(tac)
+        while True:
+            cfg = ControlFlowGraph(tac, self.string_literals.values())
+            analysis = LoopAnalysis(cfg, self.symbol_table)
+            for loop in analysis.analyze():
+                if loop.header.label in self.done or any(
+                        other.parent is loop for other in analysis.loops):
+                    continue
+                self.done.add(loop.header.label)
+                new = self.unroll(cfg, analysis, loop)
+                if new is not None:
+                    tac = new
+                    break
+            else:
+                return tac
+
+    def fresh_label(self) -> str:
+        label = f"L{self.next_label}"
+        self.next_label += 1
+        return label
+
+    def fresh_temp(self) -> str:
+        temp = f"t{self.next_temp}"
+        self.next_temp += 1
+        return temp
+
+    def loop_shape(self, cfg: ControlFlowGraph, analysis: LoopAnalysis, loop: Loop):
+        """(first, last) layout indices of an unrollable while loop, or None"""
+        layout = analysis.top_tested_layout(loop)
+        if layout is None:
+            return None
+        first, last = layout
+        # Code before the test may only compute the condition, which is dead
+        # once the branch has been taken either way
+        live_in, _ = cfg.liveness()
+        for instruction in loop.header.instructions[:-1]:
+            name = defined_var(instruction)
+            if (not name or not is_temp(name) or name in live_in[cfg.blocks[last + 1]]
+                    or name in live_in[cfg.blocks[first + 1]]):
+                return None
+        return first, last
+
+    def body_tac(self, cfg: ControlFlowGraph, first: int, last: int) -> List[str]:
+        """Loop body without the header test and the closing back edge"""
+        body = []
+        for block in cfg.blocks[first + 1:last + 1]:
+            if block.label:
+                body.append(f"{block.label}:")
+            body.extend(block.instructions)
+        return body[:-1]
+
+    def copy_body(self, body: List[str], header: str, next_start: str) -> List[str]:
+        """Body with fresh labels; `goto header` continues with the next copy"""
+        renamed = {label_name(instr): self.fresh_label() for instr in body if is_label(instr)}
+        renamed[header] = next_start
+        copy = []
+        for instruction in body:
+            if is_label(instruction):
+                copy.append(f"{renamed[label_name(instruction)]}:")
+            elif is_jump(instruction):
+                target = jump_target(instruction)
+                copy.append(retarget_jump(instruction, renamed.get(target, target)))
+            else:
+                copy.append(instruction)
+        return copy
+
+    def unroll(self, cfg: ControlFlowGraph, analysis: LoopAnalysis,
+               loop: Loop) -> Optional[List[str]]:
+        shape = self.loop_shape(cfg, analysis, loop)
+        if shape is None:
+            return None
+        first, last = shape
+        counts = self.loop_profile.get(loop.header.label) if self.loop_profile else None
+        if counts is not None and counts[1] == 0:
+            return None     # never iterated in the training run
+        body = self.body_tac(cfg, first, last)
+        size = len([instr for instr in body if not is_label(instr)])
+        before = cfg.blocks[:first]
+        after = cfg.blocks[last + 1:]
+
+        trips = loop.trip_count
+        if (trips is not None and trips <= self.max_full_trip_count
+                and trips * (size + len(loop.header.instructions)) <= self.max_full_unroll_size):
+            unrolled = self.full_unroll(loop.header, body, trips)
+            self.fully_unrolled += 1
+        elif self.can_partially_unroll(loop, size):
+            unrolled = self.partial_unroll(cfg, loop, first, last, body)
+            self.partially_unrolled += 1
+        else:
+            return None
+        return (ControlFlowGraph.flatten(before) + unrolled
+                + ControlFlowGraph.flatten(after))
+
+    def full_unroll(self, header, body: List[str], trips: int) -> List[str]:
+        result = [f"{header.label}:"]
+        starts = [self.fresh_label() for _ in range(trips)]
+        for iteration in range(trips):
+            result.extend(self.copy_body(body, header.label, starts[iteration]))
+            result.append(f"{starts[iteration]}:")
+        return result
+
+    def can_partially_unroll(self, loop: Loop, size: int) -> bool:
+        if self.factor < 2 or size > self.max_body_size or loop.condition is None:
+            return False
+        expected = loop.trip_count
+        if expected is None:
+            expected = self.profiled_trip_count(loop)
+        if expected is not None and expected < self.factor:
+            return False
+        iv, op, _ = loop.condition
+        step = loop.induction_variables[iv].step
+        return (op in ('<', '<=') and step > 0) or (op in ('>', '>=') and step < 0)
+
+    def profiled_trip_count(self, loop: Loop) -> Optional[float]:
+        """Average iterations per entry in the training run, if profiled"""
+        counts = self.loop_profile.get(loop.header.label) if self.loop_profile else None
+        if not counts or counts[0] == 0:
+            return None
+        entries, iterations = counts
+        return iterations / entries
+
+    def partial_unroll(self, cfg: ControlFlowGraph, loop: Loop, first: int, last: int,
+                       body: List[str]) -> List[str]:
+        header = loop.header
+        iv, op, bound = loop.condition
+        step = loop.induction_variables[iv].step
+        remainder = self.fresh_label()
+        self.done.add(remainder)
+        ahead = self.fresh_temp()
+        distance = (self.factor - 1) * step
+
+        result = [f"{header.label}:"]
+        if distance < 0:
+            result.append(f"{ahead} = {iv} - {-distance}")
+        else:
+            result.append(f"{ahead} = {iv} + {distance}")
+        result.append(f"if_false {ahead} {op} {bound} goto {remainder}")
+        starts = [self.fresh_label() for _ in range(self.factor - 1)] + [header.label]
+        for copy in range(self.factor):
+            if copy > 0:
+                result.append(f"{starts[copy - 1]}:")
+            result.extend(self.copy_body(body, header.label, starts[copy]))
+        result.append(f"goto {header.label}")
+
+        # The original loop, relabelled, runs the remaining iterations
+        original = ControlFlowGraph.flatten(cfg.blocks[first:last + 1])
+        renamed = {label_name(instr): self.fresh_label() for instr in original if is_label(instr)}
+        renamed[header.label] = remainder
+        for instruction in original:
+            if is_label(instruction):
+                result.append(f"{renamed[label_name(instruction)]}:")
+            elif is_jump(instruction):
+                target = jump_target(instruction)
+                result.append(retarget_jump(instruction, renamed.get(target, target)))
+            else:
+                result.append(instruction)
+        return result
+
+    def display(self):
+        print(f"\nLoop unrolling: {self.fully_unrolled} fully unrolled, "
+              f"{self.partially_unrolled} partially unrolled by {self.factor}")
+
+
+# Testing function for loop unrolling
+def test_loop_unroll(source_code: str, tac: List[str] = None, string_literals=None):
+    """Test loop unrolling independently"""
+    print("\n" + "="*60)
+    print(" TESTING LOOP UNROLLING")
+    print("="*60)
+
+    try:
+        if tac is None:
+            from intermediate_code import test_intermediate_code
+            tac, string_literals = test_intermediate_code(source_code)
+            if tac is None:
+                return None
+
+        unroller = LoopUnroller(tac)
+        unrolled = unroller.optimize()
+        unroller.display()
+        print("\nUnrolled TAC:")
+        print("-" * 50)
+        for i, instruction in enumerate(unrolled, 1):
+            print(f"{i:3d}. {instruction}")
+
+        from tac_interpreter import TACInterpreter
+        before = TACInterpreter(tac, string_literals)
+        after = TACInterpreter(unrolled, string_literals)
+        if before.run() != after.run():
+            raise RuntimeError("Unrolled program prints different output")
+        print(f"\nDynamic instructions: {before.instructions} -> {after.instructions}")
+        print("\n✓ Loop Unrolling Successful!")
+        return unrolled
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    int total = 0;
+    while (i < 4) {
+        total = total + i;
+        i = i + 1;
+    }
+    int n = 10;
+    while (i < n) {
+        print(i);
+        i = i + 1;
+    }
+    print(total);
+    """
+
+    test_loop_unroll(test_code)
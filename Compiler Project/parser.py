@@ -17,7 +17,7 @@ from lexer import Token, Lexer
 
 class ASTNode:
     """Base class for Abstract Syntax Tree nodes"""
-    pass
+    line = None     # source line of a statement's first token (set by the parser)
 
 
 class Program(ASTNode):
@@ -132,17 +132,19 @@ class Parser:
             return None
        
         if token.type in ['INT', 'FLOAT', 'STRING_TYPE']:
-            return self.parse_declaration()
+            statement = self.parse_declaration()
         elif token.type == 'ID':
-            return self.parse_assignment()
+            statement = self.parse_assignment()
         elif token.type == 'IF':
-            return self.parse_if()
+            statement = self.parse_if()
         elif token.type == 'WHILE':
-            return self.parse_while()
+            statement = self.parse_while()
         elif token.type == 'PRINT':
-            return self.parse_print()
+            statement = self.parse_print()
         else:
             raise SyntaxError(f"Unexpected token {token.type}")
+        statement.line = token.line
+        return statement
    
     def parse_declaration(self):
         """Parse variable declaration"""
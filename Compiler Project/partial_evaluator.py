@@ -0,0 +1,257 @@
+"""
+============================================
+OPTIMIZATION: WHOLE-PROGRAM PARTIAL EVALUATION
+CSE 430 - Compiler Design Lab
+============================================
+
+The language has no input, so a program's output is fixed when it is
+compiled.  The partial evaluator runs the TAC at compile time (with the
+TAC interpreter's semantics) and replaces what it ran by its effect:
+
+    i = 0                             print 0
+    L0: if_false i < 3 goto L1   =>   print 1
+        print i                       print 2
+        i = i + 1
+        goto L0
+    L1:
+
+- A program that finishes within the budgets becomes its output
+  sequence: one print of a constant (or string label) per line.
+- Otherwise evaluation stops at a loop header and the program is
+  specialized there: the prints so far, assignments of the values the
+  rest of the program reads, and a jump into the original code, of
+  which only the part reachable from that point is kept (the residual
+  code).
+- Budgets: max_steps TAC instructions, and max_residual prints kept in
+  the specialized prefix (its memory; a program printing in an endless
+  loop stops there).  Running out of steps lets the evaluator go on to
+  the next loop header (a label some later jump goes back to), so the
+  residual loop keeps a single entry.
+- Evaluation also stops before an instruction that would fail (division
+  by zero), produce an int outside 32 bits (the narrowest backend
+  wraps there, the interpreter does not), a float that is not finite,
+  or a string with no literal label; the residual code runs it.
+
+The budgets make the pass safe on programs that never stop.
+"""
+
+import math
+from typing import List, Dict, Optional
+from control_flow import (ControlFlowGraph, is_label, label_name, is_jump, jump_target,
+                          next_label_index)
+from tac_interpreter import TACInterpreter, apply_operator
+from source_map import remap_lines
+
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+class Stop(Exception):
+    """Compile-time evaluation cannot go past the current instruction"""
+
+
+class PartialEvaluator:
+    """Runs TAC at compile time and keeps a specialized residual program"""
+
+    def __init__(self, tac: List[str], symbol_table=None, string_literals: Dict = None,
+                 max_steps: int = 100_000, max_residual: int = 4096, source_lines: List = None):
+        self.tac = tac
+        self.source_lines = source_lines    # per TAC instruction; per residual one after optimize()
+        self.symbol_table = symbol_table
+        self.string_literals = string_literals or {}     # value -> label
+        self.max_steps = max_steps
+        self.max_residual = max_residual
+        self.interpreter = TACInterpreter(tac, string_literals)
+        self.prints: List[str] = []     # residual print operands, in order
+        self.print_positions: List[int] = []    # TAC index of the print each came from
+        self.steps = 0
+        self.stopped_at = None          # TAC index evaluation stopped at
+        self.reason = None
+        self.residual_size = 0
+
+    # ---------- evaluation ----------
+
+    def constant(self, value) -> str:
+        """TAC operand for a value, or Stop when the backends cannot hold it"""
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, int):
+            if not INT_MIN <= value <= INT_MAX:
+                raise Stop("an int result needs more than 32 bits")
+            return str(value)
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                raise Stop("a float result is not finite")
+            return repr(value)
+        if isinstance(value, str) and value in self.string_literals:
+            return self.string_literals[value]
+        raise Stop("a string value has no literal label")
+
+    def evaluate(self) -> Optional[int]:
+        """Run until the program ends (None) or a stop; returns the TAC
+        index the residual code starts at"""
+        labels = {label_name(instr): i for i, instr in enumerate(self.tac) if is_label(instr)}
+        # Loop headers: targets of backward jumps
+        headers = {labels[jump_target(instr)] for i, instr in enumerate(self.tac)
+                   if is_jump(instr) and labels[jump_target(instr)] <= i}
+        pc = 0
+        while pc < len(self.tac):
+            instruction = self.tac[pc]
+            if is_label(instruction):
+                if self.steps >= self.max_steps and pc in headers:
+                    self.reason = f"step budget of {self.max_steps} used up"
+                    return pc
+                pc += 1
+                continue
+            if len(self.prints) >= self.max_residual:
+                self.reason = f"residual budget of {self.max_residual} prints reached"
+                return pc
+            try:
+                pc = self.step(instruction, pc, labels)
+            except Stop as reason:
+                self.reason = str(reason)
+                return pc
+            except Exception as error:
+                # The program fails here at runtime; leave that to the residual code
+                self.reason = f"'{instruction}' fails: {error}"
+                return pc
+            self.steps += 1
+        return None
+
+    def step(self, instruction: str, pc: int, labels: Dict[str, int]) -> int:
+        """Execute one instruction; nothing changes when it raises"""
+        interpreter = self.interpreter
+        parts = instruction.split()
+        if parts[0] == 'goto':
+            return labels[parts[1]]
+        if parts[0] in ('if_false', 'if_true'):
+            if len(parts) == 6:
+                condition = apply_operator(interpreter.value(parts[1]), parts[2],
+                                           interpreter.value(parts[3]))
+            else:
+                condition = interpreter.value(parts[1])
+            if bool(condition) == (parts[0] == 'if_true'):
+                return labels[parts[-1]]
+            return pc + 1
+        if parts[0] == 'print':
+            self.prints.append(self.constant(interpreter.value(parts[1])))
+            self.print_positions.append(pc)
+            return pc + 1
+        if len(parts) == 3:
+            value = interpreter.value(parts[2])
+        elif len(parts) == 5:
+            value = apply_operator(interpreter.value(parts[2]), parts[3], interpreter.value(parts[4]))
+        else:
+            raise Stop(f"cannot evaluate '{instruction}'")
+        self.constant(value)
+        interpreter.variables[parts[0]] = value
+        return pc + 1
+
+    # ---------- residual program ----------
+
+    def optimize(self) -> List[str]:
+        entry = self.evaluate()
+        self.stopped_at = entry
+        residual = [f"print {operand}" for operand in self.prints]
+        lines = None
+        if self.source_lines is not None:
+            # A folded print keeps the line of the print statement
+            lines = [self.source_lines[position] for position in self.print_positions]
+        if entry is None:
+            self.residual_size = len(residual)
+            self.source_lines = lines
+            return residual
+
+        # Enter the original code at the stop, through a label
+        code = list(self.tac)
+        if is_label(code[entry]):
+            label = label_name(code[entry])
+        else:
+            label = f"L{next_label_index(code)}"
+            code.insert(entry, f"{label}:")
+        cfg = ControlFlowGraph([f"goto {label}"] + code)
+        reachable = cfg.reachable()
+        live_in, _ = cfg.liveness()
+        target = cfg.block_map()[label]
+        kept = [block for block in cfg.blocks[1:] if block in reachable]
+
+        # Values the residual code may read before writing them
+        for name in sorted(live_in[target]):
+            if name in self.interpreter.variables:
+                residual.append(f"{name} = {self.constant(self.interpreter.variables[name])}")
+        self.residual_size = len(residual)
+        if kept and kept[0] is not target:
+            residual.append(f"goto {label}")
+        code = ControlFlowGraph.flatten(kept)
+        if lines is not None:
+            entry_line = self.source_lines[entry]
+            lines += [entry_line] * (len(residual) - len(lines))
+            lines += remap_lines(self.tac, self.source_lines, code)
+            self.source_lines = lines
+        return residual + code
+
+    def display(self):
+        if self.stopped_at is None:
+            print(f"\nPartial evaluation: evaluated completely in {self.steps} steps, "
+                  f"{len(self.prints)} prints")
+        else:
+            print(f"\nPartial evaluation: {self.steps} steps evaluated, {len(self.prints)} prints "
+                  f"and {self.residual_size - len(self.prints)} values specialized; "
+                  f"residual code from instruction {self.stopped_at} ({self.reason})")
+
+
+# Testing function for partial evaluation
+def test_partial_evaluator(source_code: str, max_steps: int = 100_000):
+    """Partially evaluate a program and check that the residual program
+    prints the same output"""
+    print("\n" + "="*60)
+    print(" TESTING PARTIAL EVALUATION")
+    print("="*60)
+
+    try:
+        from intermediate_code import test_intermediate_code
+        tac, string_literals = test_intermediate_code(source_code)
+        if tac is None:
+            return None
+
+        evaluator = PartialEvaluator(tac, string_literals=string_literals, max_steps=max_steps)
+        residual = evaluator.optimize()
+        evaluator.display()
+        print("\nResidual TAC:")
+        print("-" * 50)
+        for i, instruction in enumerate(residual, 1):
+            print(f"{i:3d}. {instruction}")
+
+        before = TACInterpreter(tac, string_literals)
+        after = TACInterpreter(residual, string_literals)
+        if before.run() != after.run():
+            raise RuntimeError("Residual program prints different output")
+        print(f"\nDynamic instructions: {before.instructions} -> {after.instructions}")
+        print("\n✓ Partial Evaluation Successful!")
+        return residual
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code: evaluated completely
+    test_code = """
+    int i = 0;
+    int total = 0;
+    float rate = 1.5;
+    while (i < 10) {
+        if (i - (i / 3) * 3 == 0) {
+            total = total + i;
+        }
+        i = i + 1;
+    }
+    print(total);
+    print(total * rate);
+    print("done");
+    """
+
+    test_partial_evaluator(test_code)
+
+    # Over the step budget: the first iterations are specialized away and
+    # the loop is left as residual code
+    test_partial_evaluator(test_code.replace("10", "100000"), max_steps=200)
@@ -0,0 +1,321 @@
+"""
+============================================
+OPTIMIZATION: PASS MANAGER
+CSE 430 - Compiler Design Lab
+============================================
+
+Runs optimization pipelines over the Three-Address Code.
+
+- Analyses (CFG, liveness, loops, ...) are computed on demand and cached
+  until a transform changes the TAC; a transform may declare analyses
+  it preserves.
+- Transforms run in the order given by the -O level pipeline and may be
+  skipped by a gate that looks at analyses (e.g. no loops, no unrolling).
+- Every pass is timed and its effect on the TAC size is recorded.
+- Source lines given with the TAC are carried through every pass
+  (source_map.remap_lines).
+- The level also selects code generator options (peephole pass).
+- With a training-run profile (block_layout.py), blocks are laid out
+  so hot paths fall through and the profile guides loop unrolling.
+
+    -O0  no optimization, no peephole pass
+    -O1  jump clean-up, increment folding, loop rotation, temp reuse
+    -O2  O1 plus strength reduction and loop unrolling
+    -O3  O2 after partial evaluation (the program is run at compile time
+         within a budget and reduced to its output where it finishes)
+    -Os  O1 without loop rotation, so the code never grows
+"""
+
+import time
+from typing import List, Dict, Callable
+
+from control_flow import ControlFlowGraph
+from loop_analysis import LoopAnalysis, InductionVariableOptimizer
+from temp_allocator import TempAllocator, live_intervals
+from jump_optimizer import JumpOptimizer
+from loop_unroll import LoopUnroller
+from loop_rotation import LoopRotator
+from partial_evaluator import PartialEvaluator
+from block_layout import BlockLayout, block_ids
+from source_map import remap_lines
+
+
+class Analysis:
+    """Named analysis computed from the current TAC"""
+
+    def __init__(self, name: str, compute: Callable):
+        self.name = name
+        self.compute = compute      # compute(manager) -> result
+
+
+class Pass:
+    """Named transform returning new TAC"""
+
+    def __init__(self, name: str, run: Callable, preserves=(), gate: Callable = None):
+        self.name = name
+        self.run = run              # run(manager) -> List[str]
+        self.preserves = set(preserves)
+        self.gate = gate            # gate(manager) -> bool, False skips the pass
+
+
+class PassRecord:
+    """Timing and size effect of one pass execution"""
+
+    def __init__(self, name: str, seconds: float, size_before: int, size_after: int,
+                 skipped: bool = False):
+        self.name = name
+        self.seconds = seconds
+        self.size_before = size_before
+        self.size_after = size_after
+        self.skipped = skipped
+
+
+class PassManager:
+    """Registers analyses and transforms and runs -O level pipelines"""
+
+    PIPELINES = {
+        'O0': [],
+        'O1': ['jump-threading', 'increment-folding', 'loop-rotation', 'jump-threading',
+               'temp-allocation'],
+        'O2': ['strength-reduction', 'loop-unroll', 'loop-rotation', 'jump-threading',
+               'temp-allocation'],
+        'O3': ['partial-evaluation', 'strength-reduction', 'loop-unroll', 'loop-rotation',
+               'jump-threading', 'temp-allocation'],
+        'Os': ['jump-threading', 'increment-folding', 'jump-threading', 'temp-allocation'],
+    }
+
+    # Run before temp allocation when a profile is given; -Os keeps the
+    # source order, which never needs extra jumps
+    LAYOUT_PASSES = ['block-layout', 'jump-threading']
+    LAYOUT_LEVELS = ('O1', 'O2', 'O3')
+
+    # AssemblyGenerator options per level
+    CODEGEN_OPTIONS = {
+        'O0': {'peephole': False, 'select_instructions': False, 'schedule': False},
+        'O1': {'peephole': True, 'select_instructions': True, 'schedule': False},
+        'O2': {'peephole': True, 'select_instructions': True, 'schedule': True},
+        'O3': {'peephole': True, 'select_instructions': True, 'schedule': True},
+        'Os': {'peephole': True, 'select_instructions': True, 'schedule': False},
+    }
+
+    def __init__(self, opt_level: str = 'O1', symbol_table=None, string_literals: Dict = None,
+                 profile=None):
+        opt_level = opt_level.lstrip('-')
+        if opt_level not in self.PIPELINES:
+            raise ValueError(f"Unknown optimization level '-{opt_level}'")
+        self.opt_level = opt_level
+        self.symbol_table = symbol_table
+        self.string_literals = string_literals or {}
+        self.profile = profile      # block_layout.Profile of the unoptimized TAC
+        self.tac = []
+        self.source_lines = None    # source line per TAC instruction, when given
+        self.pass_lines = None      # lines a pass worked out for its own result
+        self.block_ids = None       # profile block ID per TAC instruction, with a profile
+        self.analyses = {}
+        self.passes = {}
+        self.cache = {}
+        self.analysis_runs = {}
+        self.analysis_hits = {}
+        self.records = []
+        self.register_defaults()
+
+    # ---------- registration ----------
+
+    def register_analysis(self, name: str, compute: Callable):
+        self.analyses[name] = Analysis(name, compute)
+
+    def register_pass(self, name: str, run: Callable, preserves=(), gate: Callable = None):
+        self.passes[name] = Pass(name, run, preserves, gate)
+
+    def register_defaults(self):
+        self.register_analysis('cfg', lambda pm: ControlFlowGraph(
+            pm.tac, pm.string_literals.values()))
+        self.register_analysis('liveness', lambda pm: pm.get_analysis('cfg').liveness())
+        self.register_analysis('loops', lambda pm: LoopAnalysis(
+            pm.get_analysis('cfg'), pm.symbol_table).analyze())
+        self.register_analysis('live-intervals', lambda pm: live_intervals(pm.tac))
+
+        has_loops = lambda pm: bool(pm.get_analysis('loops'))
+        self.register_pass('jump-threading',
+                           lambda pm: JumpOptimizer(pm.tac).optimize())
+        self.register_pass('increment-folding',
+                           lambda pm: InductionVariableOptimizer(
+                               pm.tac, pm.symbol_table, strength_reduce=False,
+                               string_literals=pm.string_literals).optimize(),
+                           gate=has_loops)
+        self.register_pass('strength-reduction',
+                           lambda pm: InductionVariableOptimizer(
+                               pm.tac, pm.symbol_table,
+                               string_literals=pm.string_literals).optimize(),
+                           gate=has_loops)
+        self.register_pass('loop-unroll',
+                           lambda pm: LoopUnroller(
+                               pm.tac, pm.symbol_table,
+                               loop_profile=pm.profile.loops if pm.profile else None,
+                               string_literals=pm.string_literals).optimize(),
+                           gate=has_loops)
+        self.register_pass('loop-rotation',
+                           lambda pm: LoopRotator(pm.tac, pm.symbol_table,
+                                                   pm.string_literals).optimize(),
+                           gate=has_loops)
+        self.register_pass('partial-evaluation', partial_evaluation)
+        # Partial evaluation can fold a program away entirely: nothing to lay out
+        self.register_pass('block-layout', block_layout,
+                           gate=lambda pm: bool(pm.block_ids))
+        self.register_pass('temp-allocation',
+                           lambda pm: TempAllocator(pm.tac, pm.symbol_table).allocate())
+
+    # ---------- analyses ----------
+
+    def get_analysis(self, name: str):
+        """Cached result of an analysis over the current TAC"""
+        if name in self.cache:
+            self.analysis_hits[name] = self.analysis_hits.get(name, 0) + 1
+            return self.cache[name]
+        result = self.analyses[name].compute(self)
+        self.cache[name] = result
+        self.analysis_runs[name] = self.analysis_runs.get(name, 0) + 1
+        return result
+
+    def invalidate(self, preserved=()):
+        """Drop every cached analysis except the preserved ones"""
+        self.cache = {name: result for name, result in self.cache.items() if name in preserved}
+
+    # ---------- running ----------
+
+    def pipeline(self) -> List[str]:
+        passes = list(self.PIPELINES[self.opt_level])
+        if self.profile is not None and self.opt_level in self.LAYOUT_LEVELS:
+            passes[-1:-1] = self.LAYOUT_PASSES
+        return passes
+
+    def codegen_options(self) -> Dict:
+        return dict(self.CODEGEN_OPTIONS[self.opt_level])
+
+    def run(self, tac: List[str], source_lines: List = None) -> List[str]:
+        self.tac = list(tac)
+        self.source_lines = list(source_lines) if source_lines is not None else None
+        self.block_ids = None
+        if self.profile is not None:
+            if not self.profile.matches(tac):
+                raise ValueError("The profile was recorded for different code")
+            self.block_ids = block_ids(tac)
+        self.cache = {}
+        self.records = []
+        for name in self.pipeline():
+            self.run_pass(self.passes[name])
+        return self.tac
+
+    def run_pass(self, transform: Pass):
+        size_before = ir_size(self.tac)
+        start = time.perf_counter()
+        if transform.gate is not None and not transform.gate(self):
+            self.records.append(PassRecord(transform.name, time.perf_counter() - start,
+                                           size_before, size_before, skipped=True))
+            return
+        self.pass_lines = None
+        new_tac = transform.run(self)
+        elapsed = time.perf_counter() - start
+        if new_tac != self.tac:
+            if self.pass_lines is not None:
+                self.source_lines = self.pass_lines
+            elif self.source_lines is not None:
+                self.source_lines = remap_lines(self.tac, self.source_lines, new_tac)
+            if self.block_ids is not None:
+                self.block_ids = remap_lines(self.tac, self.block_ids, new_tac)
+            self.tac = new_tac
+            self.invalidate(transform.preserves)
+        self.records.append(PassRecord(transform.name, elapsed, size_before, ir_size(self.tac)))
+
+    def display(self):
+        print(f"\nPass Report (-{self.opt_level}):")
+        print("-" * 60)
+        if not self.records:
+            print("  (no passes)")
+            return
+        print(f"{'Pass':<22} {'Time (ms)':>10} {'TAC size':>18}")
+        print("-" * 60)
+        total = 0.0
+        for record in self.records:
+            total += record.seconds
+            change = record.size_after - record.size_before
+            size = f"{record.size_before} -> {record.size_after} ({change:+d})"
+            note = "  skipped" if record.skipped else ""
+            print(f"{record.name:<22} {record.seconds * 1000:>10.3f} {size:>18}{note}")
+        print("-" * 60)
+        first, last = self.records[0].size_before, self.records[-1].size_after
+        print(f"{'Total':<22} {total * 1000:>10.3f} {f'{first} -> {last} ({last - first:+d})':>18}")
+        runs = ", ".join(f"{name} {count}x (cached {self.analysis_hits.get(name, 0)}x)"
+                         for name, count in self.analysis_runs.items())
+        if runs:
+            print(f"Analyses: {runs}")
+
+
+def partial_evaluation(pm: PassManager) -> List[str]:
+    """Partial evaluation pass; folded prints keep their source lines"""
+    evaluator = PartialEvaluator(pm.tac, pm.symbol_table, pm.string_literals,
+                                 source_lines=pm.source_lines)
+    tac = evaluator.optimize()
+    pm.pass_lines = evaluator.source_lines
+    return tac
+
+
+def block_layout(pm: PassManager) -> List[str]:
+    """Profile-guided block layout pass; instructions keep their lines"""
+    layout = BlockLayout(pm.tac, pm.profile, pm.block_ids)
+    tac = layout.optimize()
+    if pm.source_lines is not None:
+        pm.pass_lines = layout.carry(pm.source_lines)
+    return tac
+
+
+def ir_size(tac: List[str]) -> int:
+    """Number of TAC instructions, labels excluded"""
+    return sum(1 for instruction in tac if not instruction.endswith(':'))
+
+
+# Testing function for the pass manager
+def test_pass_manager(source_code: str, opt_level: str = 'O2'):
+    """Run an optimization pipeline independently"""
+    print("\n" + "="*60)
+    print(f" TESTING PASS MANAGER (-{opt_level.lstrip('-')})")
+    print("="*60)
+
+    try:
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+        from intermediate_code import IntermediateCode
+        tokens = Lexer(source_code).tokenize()
+        ast = Parser(tokens).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        ic_generator = IntermediateCode()
+        tac = ic_generator.generate(ast)
+
+        manager = PassManager(opt_level, symbol_table, ic_generator.string_literals)
+        optimized = manager.run(tac)
+        manager.display()
+        print("\nOptimized TAC:")
+        print("-" * 50)
+        for i, instruction in enumerate(optimized, 1):
+            print(f"{i:3d}. {instruction}")
+        print("\n✓ Optimization Successful!")
+        return optimized
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    int total = 0;
+    while (i < 100) {
+        total = total + i * 4;
+        i = i + 1;
+    }
+    print(total);
+    """
+
+    test_pass_manager(test_code)
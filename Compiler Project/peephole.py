@@ -0,0 +1,348 @@
+"""
+============================================
+OPTIMIZATION: PEEPHOLE OPTIMIZER (ASSEMBLY)
+CSE 430 - Compiler Design Lab
+============================================
+
+Slides a small window over the generated assembly and rewrites
+instruction patterns from a rule table, repeating until no rule fires:
+
+    mov [t0], ebx              mov [t0], ebx
+    mov eax, [t0]      =>      mov eax, ebx
+
+    cmp ebx, 0         =>      test ebx, ebx
+
+    jmp L1
+L1:                    =>  L1:
+
+Instructions are parsed into AsmInstruction objects first, so rules
+match opcodes and operands rather than text.  A rule never looks across
+a jump target, and no rule matches a call (the runtime print routines
+read eax and memory), so nothing is rewritten across one; comments
+are skipped.
+"""
+
+from typing import List, Optional
+
+
+class AsmInstruction:
+    """One line of the .text section: an instruction, a label or a comment"""
+
+    def __init__(self, opcode: str = None, operands: List[str] = None,
+                 label: str = None, comment: str = None, source: str = None):
+        self.opcode = opcode
+        self.operands = operands or []
+        self.label = label
+        self.comment = comment
+        self.source = source        # original text, kept while unchanged
+
+    @staticmethod
+    def parse(line: str) -> 'AsmInstruction':
+        text, _, comment = line.partition(';')
+        text = text.strip()
+        comment = comment.strip() if _ else None
+        if not text:
+            return AsmInstruction(comment=comment, source=line)
+        if text.endswith(':'):
+            return AsmInstruction(label=text[:-1], comment=comment, source=line)
+        opcode, _, rest = text.partition(' ')
+        operands = [operand.strip() for operand in rest.split(',')] if rest.strip() else []
+        return AsmInstruction(opcode, operands, comment=comment, source=line)
+
+    def is_instruction(self) -> bool:
+        return self.opcode is not None
+
+    def render(self) -> str:
+        if self.source is not None:
+            return self.source
+        if self.label is not None:
+            return f"{self.label}:"
+        line = f"    {self.opcode}"
+        if self.operands:
+            line += " " + ", ".join(self.operands)
+        if self.comment:
+            line += f"    ; {self.comment}"
+        return line
+
+    def __repr__(self):
+        return f"AsmInstruction({self.render().strip()!r})"
+
+
+# ---------- operand helpers ----------
+
+REGISTER_FAMILIES = {
+    'al': 'a', 'ax': 'a', 'eax': 'a', 'rax': 'a',
+    'bl': 'b', 'bx': 'b', 'ebx': 'b', 'rbx': 'b',
+    'cl': 'c', 'cx': 'c', 'ecx': 'c', 'rcx': 'c',
+    'dl': 'd', 'dx': 'd', 'edx': 'd', 'rdx': 'd',
+    'si': 'si', 'esi': 'si', 'rsi': 'si',
+    'di': 'di', 'edi': 'di', 'rdi': 'di',
+    'bp': 'bp', 'ebp': 'bp', 'rbp': 'bp',
+    **{f"r{n}{suffix}": f"r{n}" for n in range(8, 16) for suffix in ('', 'd', 'w', 'b')},
+    **{f"xmm{n}": f"xmm{n}" for n in range(16)},
+}
+
+# Plain register/memory moves, by register class
+MOVES = ('mov', 'movsd')
+
+
+def is_register(operand: str) -> bool:
+    return operand in REGISTER_FAMILIES
+
+
+def is_memory(operand: str) -> bool:
+    return operand.endswith(']')
+
+
+def address(operand: str) -> str:
+    """Memory operand without its size prefix: 'dword [x]' -> '[x]'"""
+    return operand[operand.index('['):]
+
+
+def is_immediate(operand: str, value: int = None) -> bool:
+    try:
+        number = int(operand, 0)
+    except ValueError:
+        return False
+    return value is None or number == value
+
+
+def mentions(operand: str, register: str) -> bool:
+    """Whether an operand reads any part of a register"""
+    family = REGISTER_FAMILIES[register]
+    tokens = operand.replace('[', ' ').replace(']', ' ').replace('+', ' ') \
+                    .replace('-', ' ').replace('*', ' ').split()
+    return any(REGISTER_FAMILIES.get(token) == family for token in tokens)
+
+
+def reads_flags(instruction: AsmInstruction) -> bool:
+    opcode = instruction.opcode or ''
+    return ((opcode.startswith('j') and opcode != 'jmp') or opcode.startswith('set')
+            or opcode.startswith('cmov') or opcode in ('adc', 'sbb'))
+
+
+def is_jump(instruction: AsmInstruction) -> bool:
+    return (instruction.opcode or '').startswith('j')
+
+
+# ---------- rules ----------
+# Each rule receives a window of instructions and returns the replacement
+# list, or None when it does not apply.
+
+def redundant_move(window):
+    """mov r, r"""
+    first, = window
+    if first.opcode in MOVES and first.operands[0] == first.operands[1]:
+        return []
+    return None
+
+
+def store_then_load(window):
+    """mov [x], r ; mov r2, [x]  =>  mov [x], r ; mov r2, r   (r may be an immediate)"""
+    store, load = window
+    if (store.opcode in MOVES and load.opcode == store.opcode and is_memory(store.operands[0])
+            and (is_register(store.operands[1])
+                 or (store.opcode == 'mov' and is_immediate(store.operands[1])))
+            and is_memory(load.operands[1]) and address(load.operands[1]) == address(store.operands[0])
+            and is_register(load.operands[0])):
+        if load.operands[0] == store.operands[1]:
+            return [store]
+        return [store, AsmInstruction(store.opcode, [load.operands[0], store.operands[1]])]
+    return None
+
+
+def dead_load(window):
+    """mov r, x ; mov r, y  =>  mov r, y   (y does not read r)"""
+    first, second = window
+    if (first.opcode in MOVES and second.opcode == first.opcode and is_register(first.operands[0])
+            and first.operands[0] == second.operands[0]
+            and not mentions(second.operands[1], first.operands[0])):
+        return [second]
+    return None
+
+
+def dead_store(window):
+    """mov [x], a ; mov [x], b  =>  mov [x], b"""
+    first, second = window
+    if (first.opcode in MOVES and second.opcode == first.opcode and is_memory(first.operands[0])
+            and is_memory(second.operands[0])
+            and address(first.operands[0]) == address(second.operands[0])
+            and not (is_memory(second.operands[1])
+                     and address(second.operands[1]) == address(first.operands[0]))):
+        return [second]
+    return None
+
+
+def compare_with_zero(window):
+    """cmp r, 0  =>  test r, r"""
+    first, = window
+    if first.opcode == 'cmp' and is_register(first.operands[0]) and is_immediate(first.operands[1], 0):
+        return [AsmInstruction('test', [first.operands[0], first.operands[0]])]
+    return None
+
+
+def zero_register(window):
+    """mov r, 0  =>  xor r, r   (when the next instruction does not read flags)"""
+    first, second = window
+    if (first.opcode == 'mov' and is_register(first.operands[0])
+            and is_immediate(first.operands[1], 0)
+            and second.is_instruction() and not reads_flags(second)):
+        return [AsmInstruction('xor', [first.operands[0], first.operands[0]]), second]
+    return None
+
+
+def identity_arithmetic(window):
+    """add r, 0 / sub r, 0 / imul r, 1  =>  (nothing)"""
+    first, second = window
+    if (((first.opcode in ('add', 'sub') and is_immediate(first.operands[-1], 0))
+            or (first.opcode == 'imul' and len(first.operands) == 2
+                and is_immediate(first.operands[1], 1)))
+            and second.is_instruction() and not reads_flags(second)):
+        return [second]
+    return None
+
+
+def jump_to_next(window):
+    """jmp L ; L:  =>  L:"""
+    jump, label = window
+    if is_jump(jump) and label.label is not None and jump.operands == [label.label]:
+        return [label]
+    return None
+
+
+def unreachable_after_jump(window):
+    """jmp L ; instr  =>  jmp L   (instr has no label, nothing reaches it)"""
+    jump, following = window
+    if jump.opcode == 'jmp' and following.is_instruction():
+        return [jump]
+    return None
+
+
+# (name, window size, rule)
+PEEPHOLE_RULES = [
+    ('redundant-move', 1, redundant_move),
+    ('store-then-load', 2, store_then_load),
+    ('dead-load', 2, dead_load),
+    ('dead-store', 2, dead_store),
+    ('compare-with-zero', 1, compare_with_zero),
+    ('zero-register', 2, zero_register),
+    ('identity-arithmetic', 2, identity_arithmetic),
+    ('jump-to-next', 2, jump_to_next),
+    ('unreachable-after-jump', 2, unreachable_after_jump),
+]
+
+
+class PeepholeOptimizer:
+    """Pattern-rule rewriting of the .text section until a fixed point"""
+
+    def __init__(self, assembly: List[str], rules=None):
+        self.assembly = assembly
+        self.rules = rules or PEEPHOLE_RULES
+        self.fired = {name: 0 for name, _, _ in self.rules}
+        self.instructions_before = 0
+        self.instructions_after = 0
+
+    def optimize(self) -> List[str]:
+        if 'section .text' not in self.assembly:
+            return list(self.assembly)
+        split = self.assembly.index('section .text') + 1
+        code = [AsmInstruction.parse(line) for line in self.assembly[split:]]
+        self.instructions_before = count_instructions(code)
+        while self.apply_rules(code):
+            pass
+        self.instructions_after = count_instructions(code)
+        return self.assembly[:split] + [instruction.render() for instruction in code]
+
+    def window(self, code: List[AsmInstruction], start: int, size: int) -> Optional[list]:
+        """Positions of `size` entries from `start`, skipping comments.
+        Only the last entry may be a label (for jump_to_next)."""
+        if not code[start].is_instruction():
+            return None
+        positions = []
+        for position in range(start, len(code)):
+            entry = code[position]
+            if entry.opcode is None and entry.label is None:
+                continue
+            positions.append(position)
+            if len(positions) == size:
+                return positions
+            if not entry.is_instruction():
+                return None
+        return None
+
+    def apply_rules(self, code: List[AsmInstruction]) -> bool:
+        changed = False
+        position = 0
+        while position < len(code):
+            for name, size, rule in self.rules:
+                positions = self.window(code, position, size)
+                if positions is None:
+                    continue
+                replacement = rule([code[p] for p in positions])
+                if replacement is not None:
+                    # Rewrite in place so that skipped comments stay put
+                    for p, instruction in zip(positions, replacement):
+                        code[p] = instruction
+                    for p in reversed(positions[len(replacement):]):
+                        del code[p]
+                    self.fired[name] += 1
+                    changed = True
+                    break
+            else:
+                position += 1
+        return changed
+
+    def display(self):
+        saved = self.instructions_before - self.instructions_after
+        print(f"\nPeephole: {self.instructions_before} -> {self.instructions_after} "
+              f"instructions ({saved} saved)")
+        for name, count in self.fired.items():
+            if count:
+                print(f"  {name:<24} {count}x")
+
+
+def count_instructions(code: List[AsmInstruction]) -> int:
+    return sum(1 for instruction in code if instruction.is_instruction())
+
+
+# Testing function for the peephole optimizer
+def test_peephole(source_code: str, assembly: List[str] = None):
+    """Test the peephole optimizer independently"""
+    print("\n" + "="*60)
+    print(" TESTING PEEPHOLE OPTIMIZER")
+    print("="*60)
+
+    try:
+        if assembly is None:
+            from code_generator import test_code_generator
+            assembly = test_code_generator(source_code)
+            if assembly is None:
+                return None
+
+        optimizer = PeepholeOptimizer(assembly)
+        optimized = optimizer.optimize()
+        optimizer.display()
+        print("\nOptimized Assembly Code:")
+        print("-" * 50)
+        for line in optimized:
+            print(line)
+        print("\n✓ Peephole Optimization Successful!")
+        return optimized
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int x = 10;
+    int y = 20;
+    int sum = x + y;
+    print(sum);
+    if (sum > 25) {
+        print(sum);
+    }
+    """
+
+    test_peephole(test_code)
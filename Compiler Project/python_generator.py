@@ -0,0 +1,336 @@
+"""
+============================================
+PHASE 5 (ALTERNATIVE): PYTHON CODE OBJECTS
+CSE 430 - Compiler Design Lab
+============================================
+
+Compiles a program ahead of time to a CPython code object, for running
+mini-language programs inside a Python process:
+
+    int i = 0;                      def program(_emit):
+    while (i < 3) {         =>          v_i = 0
+        print(i);                       while v_i < 3:
+        i = i + 1;                          _emit(str(v_i))
+    }                                       v_i = v_i + 1
+
+- The AST (after semantic analysis) is lowered to Python source and
+  compiled with the built-in compile().
+- Variables are locals of the generated function (LOAD_FAST /
+  STORE_FAST), renamed v_<name> so they never clash with keywords or
+  helpers; if/while become Python if/while.
+- Values keep the TAC interpreter's semantics: int division truncates
+  toward zero (_div) and a comparison used as a value is 0 or 1.
+- print hands each line to a sink callable; run_program() collects the
+  lines and writes them out in one call.
+- Code objects are cached by a hash of the source text, in memory and
+  optionally on disk with marshal.
+"""
+
+import hashlib
+import io
+import contextlib
+import marshal
+import os
+import sys
+from typing import List, Optional
+from parser import (Program, Declaration, Assignment, BinaryOp, Number, FloatNumber,
+                    StringLiteral, Variable, IfStatement, WhileLoop, PrintStatement)
+from semantic_analyzer import SymbolTable
+
+
+COMPARISONS = ('<', '>', '==', '!=', '<=', '>=')
+
+# Runtime support emitted before the program function
+PYTHON_PRELUDE = '''def _div(left, right):
+    if right == 0:
+        raise ZeroDivisionError("Division by zero")
+    if isinstance(left, int) and isinstance(right, int):
+        quotient = abs(left) // abs(right)
+        return quotient if (left < 0) == (right < 0) else -quotient
+    return left / right
+'''
+
+# Bumped whenever the generated code changes
+CACHE_VERSION = 1
+
+
+class PythonCodeGenerator:
+    """Generates a Python module with one function per program"""
+
+    def __init__(self, ast: Program, symbol_table: SymbolTable):
+        self.ast = ast
+        self.symbol_table = symbol_table
+        self.lines: List[str] = []
+
+    def generate(self) -> List[str]:
+        """Generate Python source code (one list entry per line)"""
+        print("\n" + "="*50)
+        print("PHASE 5: CODE GENERATION (PYTHON)")
+        print("="*50)
+
+        self.lines = ["# Generated by the Mini Compiler Python backend"]
+        self.lines.extend(PYTHON_PRELUDE.splitlines())
+        self.lines.append("")
+        self.lines.append("def program(_emit):")
+        # Variables start at 0, as in the TAC interpreter
+        unset = self.read_before_set()
+        for name in self.symbol_table.symbols:
+            if name in unset:
+                self.emit(f"v_{name} = 0", 1)
+        for statement in self.ast.statements:
+            self.statement(statement, 1)
+        if self.lines[-1] == "def program(_emit):":
+            self.emit("pass", 1)
+
+        print("\nGenerated Python Code:")
+        print("-" * 50)
+        for line in self.lines:
+            print(line)
+        return self.lines
+
+    def read_before_set(self) -> set:
+        """Variables that may be read before a top-level statement assigns them"""
+        assigned, unset = set(), set()
+        for node in self.ast.statements:
+            unset |= variables_read(node) - assigned
+            if isinstance(node, Declaration) and node.value is not None:
+                assigned.add(node.var_name)
+            elif isinstance(node, Assignment):
+                assigned.add(node.var_name)
+        return unset
+
+    # ---------- statements ----------
+
+    def emit(self, text: str, depth: int):
+        self.lines.append("    " * depth + text)
+
+    def block(self, statements, depth: int):
+        if not statements:
+            self.emit("pass", depth)
+        for statement in statements or []:
+            self.statement(statement, depth)
+
+    def statement(self, node, depth: int):
+        if isinstance(node, Declaration):
+            if node.value is not None:
+                self.emit(f"v_{node.var_name} = {self.value(node.value)}", depth)
+        elif isinstance(node, Assignment):
+            self.emit(f"v_{node.var_name} = {self.value(node.expression)}", depth)
+        elif isinstance(node, PrintStatement):
+            if isinstance(node.expression, StringLiteral):
+                self.emit(f"_emit({self.value(node.expression)})", depth)
+            else:
+                self.emit(f"_emit(str({self.value(node.expression)}))", depth)
+        elif isinstance(node, IfStatement):
+            self.emit(f"if {unwrap(node.condition, self.expression(node.condition))}:", depth)
+            self.block(node.true_block, depth + 1)
+            if node.false_block:
+                self.emit("else:", depth)
+                self.block(node.false_block, depth + 1)
+        elif isinstance(node, WhileLoop):
+            self.emit(f"while {unwrap(node.condition, self.expression(node.condition))}:", depth)
+            self.block(node.body, depth + 1)
+
+    def value(self, node) -> str:
+        """Expression whose value is stored or printed: comparisons give 0/1"""
+        text = self.expression(node)
+        if isinstance(node, BinaryOp) and node.operator in COMPARISONS:
+            return f"int{text}"
+        return unwrap(node, text)
+
+    # ---------- expressions ----------
+
+    def expression(self, node) -> str:
+        """Python text of an expression; binary operations are parenthesized
+        (Python would chain a < b < c)"""
+        if isinstance(node, (Number, FloatNumber, StringLiteral)):
+            return repr(node.value)
+        if isinstance(node, Variable):
+            return f"v_{node.name}"
+        if isinstance(node, BinaryOp):
+            left, right = self.expression(node.left), self.expression(node.right)
+            if node.operator == '/':
+                return f"_div({unwrap(node.left, left)}, {unwrap(node.right, right)})"
+            return f"({left} {node.operator} {right})"
+        raise ValueError(f"Cannot lower {type(node).__name__} to Python")
+
+
+def variables_read(node) -> set:
+    """Names of all variables an AST node reads, including nested blocks"""
+    if isinstance(node, Variable):
+        return {node.name}
+    if isinstance(node, BinaryOp):
+        return variables_read(node.left) | variables_read(node.right)
+    if isinstance(node, Declaration):
+        return variables_read(node.value) if node.value is not None else set()
+    if isinstance(node, Assignment):
+        return variables_read(node.expression)
+    if isinstance(node, PrintStatement):
+        return variables_read(node.expression)
+    if isinstance(node, IfStatement):
+        names = variables_read(node.condition)
+        for statement in (node.true_block or []) + (node.false_block or []):
+            names |= variables_read(statement)
+        return names
+    if isinstance(node, WhileLoop):
+        names = variables_read(node.condition)
+        for statement in node.body or []:
+            names |= variables_read(statement)
+        return names
+    return set()
+
+
+def unwrap(node, text: str) -> str:
+    """Drop the parentheses around a binary operation used as a whole"""
+    if isinstance(node, BinaryOp) and node.operator != '/':
+        return text[1:-1]
+    return text
+
+
+class CodeCache:
+    """Code objects keyed by source hash; with a directory they are also
+    stored as marshal files (valid for this Python version only)"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, source_code: str) -> str:
+        tag = f"{CACHE_VERSION}:{sys.implementation.cache_tag}:"
+        return hashlib.sha256((tag + source_code).encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mcc")
+
+    def get(self, source_code: str):
+        key = self.key(source_code)
+        code = self.entries.get(key)
+        if code is None and self.directory and os.path.exists(self.path(key)):
+            with open(self.path(key), 'rb') as handle:
+                code = marshal.load(handle)
+            self.entries[key] = code
+        if code is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return code
+
+    def put(self, source_code: str, code):
+        key = self.key(source_code)
+        self.entries[key] = code
+        if self.directory:
+            with open(self.path(key), 'wb') as handle:
+                marshal.dump(code, handle)
+
+    def display(self):
+        print(f"\nCode cache: {len(self.entries)} entries, {self.hits} hits, {self.misses} misses")
+
+
+def compile_program(source_code: str, cache: Optional[CodeCache] = None):
+    """Phases 1-3 and the Python backend, quietly; returns a code object"""
+    if cache is not None:
+        code = cache.get(source_code)
+        if code is not None:
+            return code
+    from lexer import Lexer
+    from parser import Parser
+    from semantic_analyzer import SemanticAnalyzer
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = Parser(Lexer(source_code).tokenize()).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        lines = PythonCodeGenerator(ast, symbol_table).generate()
+    code = compile("\n".join(lines) + "\n", '<mini program>', 'exec')
+    if cache is not None:
+        cache.put(source_code, code)
+    return code
+
+
+def load_program(code):
+    """The program function defined by a compiled module code object"""
+    namespace = {'__name__': 'mini_program'}
+    exec(code, namespace)
+    return namespace['program']
+
+
+def run_program(code, sink=None) -> List[str]:
+    """Run a compiled program; output is buffered and written to sink
+    (a file object) in one call"""
+    output = []
+    load_program(code)(output.append)
+    if sink is not None and output:
+        sink.write("\n".join(output) + "\n")
+    return output
+
+
+# Testing function for the Python backend
+def test_python_generator(source_code: str):
+    """Generate Python, compile it to a code object and check its output
+    against the TAC interpreter"""
+    print("\n" + "="*60)
+    print(" TESTING PYTHON CODE GENERATOR")
+    print("="*60)
+
+    try:
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+        from intermediate_code import IntermediateCode
+        from tac_interpreter import TACInterpreter
+
+        ast = Parser(Lexer(source_code).tokenize()).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        lines = PythonCodeGenerator(ast, symbol_table).generate()
+        code = compile("\n".join(lines) + "\n", '<mini program>', 'exec')
+
+        output = run_program(code)
+        print("\nProgram Output:")
+        print("-" * 50)
+        for line in output:
+            print(line)
+        generator = IntermediateCode()
+        tac = generator.generate(ast)
+        expected = TACInterpreter(tac, generator.string_literals).run()
+        if output != expected:
+            raise RuntimeError(f"Python output {output} differs from the TAC interpreter {expected}")
+        print("\nOutput matches the TAC interpreter")
+
+        cache = CodeCache()
+        first = compile_program(source_code, cache)
+        if compile_program(source_code, cache) is not first:
+            raise RuntimeError("The code cache missed a compiled program")
+        cache.display()
+
+        print("\n✓ Python Code Generation Successful!")
+        return code
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    int total = 0;
+    float scale = 2.5;
+    while (i < 10) {
+        if (i > 4) {
+            total = total + i * 3;
+        } else {
+            total = total - 1;
+        }
+        i = i + 1;
+    }
+    print(total);
+    print(total * scale);
+    print(7 / 2);
+    print(i > 5);
+    print("done");
+    """
+
+    test_python_generator(test_code)
@@ -0,0 +1,139 @@
+"""
+============================================
+OPTIMIZATION: LINEAR-SCAN REGISTER ALLOCATION
+CSE 430 - Compiler Design Lab
+============================================
+
+Assigns TAC temporaries to x86 general-purpose registers using the
+live intervals from temp_allocator (Poletto & Sarkar linear scan).
+
+- eax and edx stay free as scratch registers: idiv, cdq and setcc
+  need them, and memory-to-memory moves go through eax.
+- When more temporaries are live than there are registers, the one
+  with the lowest spill weight lives in memory instead; uses inside
+  loops weigh 10x per nesting level.
+- Only spilled temporaries need a slot in .bss.
+"""
+
+from typing import List, Dict, Callable
+from control_flow import ControlFlowGraph, is_temp, is_label
+from loop_analysis import LoopAnalysis
+from temp_allocator import live_intervals
+
+
+# Registers handed out to temporaries (eax/edx are scratch)
+ALLOCATABLE_REGISTERS = ['ebx', 'ecx', 'esi', 'edi']
+
+
+class RegisterAllocator:
+    """Linear-scan assignment of temporaries to registers"""
+
+    def __init__(self, tac: List[str], symbol_table=None,
+                 registers: List[str] = None, track: Callable[[str], bool] = None):
+        self.tac = tac
+        self.symbol_table = symbol_table
+        self.registers = list(registers or ALLOCATABLE_REGISTERS)
+        self.track = track          # further restricts which temporaries compete
+        self.assignment: Dict[str, str] = {}
+        self.spilled = set()
+        self.weights: Dict[str, float] = {}
+
+    def is_temporary(self, name: str) -> bool:
+        if self.symbol_table is not None and name in self.symbol_table.symbols:
+            return False
+        return is_temp(name) and (self.track is None or self.track(name))
+
+    def loop_depths(self) -> List[int]:
+        """Loop nesting depth of every TAC position"""
+        cfg = ControlFlowGraph(self.tac)
+        analysis = LoopAnalysis(cfg, self.symbol_table)
+        analysis.analyze()
+        depths = []
+        for block in cfg.blocks:
+            loop = analysis.innermost_loop(block)
+            depth = loop.depth if loop else 0
+            if block.label:
+                depths.append(depth)
+            depths.extend([depth] * len(block.instructions))
+        return depths
+
+    def spill_weights(self) -> Dict[str, float]:
+        depths = self.loop_depths()
+        weights = {}
+        for position, instruction in enumerate(self.tac):
+            if is_label(instruction):
+                continue
+            for part in instruction.split():
+                if self.is_temporary(part):
+                    weights[part] = weights.get(part, 0) + 10 ** depths[position]
+        return weights
+
+    def allocate(self) -> Dict[str, str]:
+        """Map of temporary -> register; the rest end up in self.spilled"""
+        intervals = live_intervals(self.tac, self.is_temporary)
+        self.weights = self.spill_weights()
+        free = list(self.registers)
+        active = []      # intervals holding a register, by increasing end
+
+        for interval in sorted(intervals.values(), key=lambda i: (i.start, i.name)):
+            # Registers of intervals that ended are free again
+            for old in [a for a in active if a.end <= interval.start]:
+                active.remove(old)
+                free.append(self.assignment[old.name])
+            if free:
+                self.assignment[interval.name] = free.pop(0)
+                active.append(interval)
+            else:
+                victim = min(active + [interval],
+                             key=lambda i: (self.weights.get(i.name, 0), -i.end))
+                self.spilled.add(victim.name)
+                if victim is not interval:
+                    self.assignment[interval.name] = self.assignment.pop(victim.name)
+                    active.remove(victim)
+                    active.append(interval)
+            active.sort(key=lambda i: i.end)
+        return self.assignment
+
+    def display(self):
+        print(f"\nRegister allocation: {len(self.assignment)} temporaries in registers, "
+              f"{len(self.spilled)} spilled to memory")
+        for name in sorted(self.assignment, key=lambda n: int(n[1:])):
+            print(f"  {name:<6} -> {self.assignment[name]}")
+        for name in sorted(self.spilled, key=lambda n: int(n[1:])):
+            print(f"  {name:<6} -> [{name}]  (weight {self.weights.get(name, 0)})")
+
+
+# Testing function for register allocation
+def test_register_allocator(source_code: str, tac: List[str] = None, symbol_table=None):
+    """Test register allocation independently"""
+    print("\n" + "="*60)
+    print(" TESTING REGISTER ALLOCATION")
+    print("="*60)
+
+    try:
+        if tac is None:
+            from intermediate_code import test_intermediate_code
+            tac, _ = test_intermediate_code(source_code)
+            if tac is None:
+                return None
+
+        allocator = RegisterAllocator(tac, symbol_table)
+        assignment = allocator.allocate()
+        allocator.display()
+        print("\n✓ Register Allocation Successful!")
+        return assignment
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int a = 1;
+    int b = 2;
+    int c = (a + b) * (a - b) + (a * b) / (b - a) + (a + 1) * (b + 2) * (a + b + 3);
+    print(c);
+    """
+
+    test_register_allocator(test_code)
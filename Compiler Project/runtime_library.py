@@ -0,0 +1,795 @@
+"""
+============================================
+BACKEND SUPPORT: BUFFERED PRINT RUNTIME
+CSE 430 - Compiler Design Lab
+============================================
+
+A small runtime library written in assembly and linked into every
+generated program, so that print produces output without one system
+call per line:
+
+    print(x);        =>     mov eax, [x]
+                            call rt_print_int      ; digits into the buffer
+
+    (program end)    =>     call rt_flush          ; one write(1, buffer, n)
+
+- Output goes to a fixed 4096-byte buffer that is written out with a
+  single write system call when the next value does not fit and once
+  at exit (a short write is retried with the rest).
+- Integers are converted with a multiply by the reciprocal of 10
+  instead of div; on x86 the digits are first counted against a
+  power-of-ten table so they are written straight into the buffer.
+- rt_print_float prints 15 significant digits in the layout of
+  Python's repr (250.0, 0.001, 1e+16, 1.5e-05, inf, nan): the value is
+  scaled into [1e14, 1e15) with one multiply or divide by an exact
+  power of ten, rounded to an integer and split into digits.  The
+  scaling rounds, so the 15th digit can be one off.
+- rt_print_string copies a NUL-terminated string.
+- Every routine appends a newline and preserves all registers except
+  eax (x86) or the System V scratch registers (x86-64).
+
+Only the routines a program calls, and the ones they call, are linked.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+RUNTIME_BUFFER_SIZE = 4096
+
+# Runtime routine printing each value type
+PRINT_ROUTINES = {'int': 'rt_print_int', 'float': 'rt_print_float', 'string': 'rt_print_string'}
+
+# Buffer state shared by all routines
+X86_RUNTIME_DATA = f"""section .bss
+    alignb 4
+    rt_used resd 1
+    rt_digits resb 16
+    rt_buffer resb {RUNTIME_BUFFER_SIZE}"""
+
+# 32-bit x86 (Linux int 0x80): name -> (routines it calls, assembly)
+X86_RUNTIME: Dict[str, Tuple[tuple, str]] = {
+    'rt_flush': ((), """rt_flush:                          ; write out the buffer
+    push eax
+    push ebx
+    push ecx
+    push edx
+    mov edx, [rt_used]
+    lea ecx, [rt_buffer]
+rt_flush_write:
+    test edx, edx
+    jle rt_flush_done
+    mov eax, 4                     ; sys_write
+    mov ebx, 1                     ; stdout
+    int 0x80
+    test eax, eax
+    jle rt_flush_done              ; write error: drop the rest
+    add ecx, eax
+    sub edx, eax
+    jmp rt_flush_write
+rt_flush_done:
+    mov dword [rt_used], 0
+    pop edx
+    pop ecx
+    pop ebx
+    pop eax
+    ret"""),
+
+    'rt_reserve': (('rt_flush',), f"""rt_reserve:                        ; room for ecx bytes; edi = rt_used
+    mov edi, [rt_used]
+    add edi, ecx
+    cmp edi, {RUNTIME_BUFFER_SIZE}
+    jbe rt_reserve_done
+    call rt_flush
+rt_reserve_done:
+    mov edi, [rt_used]
+    ret"""),
+
+    'rt_decimal': ((), """rt_decimal:                        ; ecx digits of eax, ending at esi
+    push ebx
+    mov ebx, eax
+rt_decimal_digit:
+    mov eax, 3435973837            ; 0xCCCCCCCD: n / 10 = n * this >> 35
+    mul ebx
+    shr edx, 3
+    lea eax, [edx+edx*4]
+    add eax, eax
+    sub ebx, eax                   ; n % 10
+    add ebx, 48
+    sub esi, 1
+    mov byte [esi], bl
+    mov ebx, edx
+    sub ecx, 1
+    jnz rt_decimal_digit
+    pop ebx
+    ret"""),
+
+    'rt_print_int': (('rt_reserve', 'rt_decimal'), """section .rodata
+    align 4
+    rt_pow10 dd 10, 100, 1000, 10000, 100000, 1000000, 10000000, 100000000, 1000000000
+section .text
+rt_print_int:                      ; eax = value
+    push ebx
+    push ecx
+    push edx
+    push esi
+    push edi
+    mov ebx, eax
+    mov ecx, 12
+    call rt_reserve
+    test ebx, ebx
+    jns rt_int_magnitude
+    mov byte [rt_buffer+edi], 45   ; '-'
+    add edi, 1
+    neg ebx
+rt_int_magnitude:
+    mov ecx, 1                     ; number of digits
+rt_int_count:
+    cmp ecx, 10
+    je rt_int_write
+    cmp ebx, [rt_pow10+ecx*4-4]
+    jb rt_int_write
+    add ecx, 1
+    jmp rt_int_count
+rt_int_write:
+    add edi, ecx
+    lea esi, [rt_buffer+edi]
+    mov eax, ebx
+    call rt_decimal
+    mov byte [rt_buffer+edi], 10
+    add edi, 1
+    mov [rt_used], edi
+    pop edi
+    pop esi
+    pop edx
+    pop ecx
+    pop ebx
+    ret"""),
+
+    'rt_print_string': (('rt_flush', 'rt_reserve'), f"""rt_print_string:                   ; eax = NUL-terminated string
+    push ebx
+    push ecx
+    push edi
+    mov ebx, eax
+    mov edi, [rt_used]
+rt_string_byte:
+    movzx eax, byte [ebx]
+    test eax, eax
+    jz rt_string_end
+    cmp edi, {RUNTIME_BUFFER_SIZE}
+    jb rt_string_store
+    mov [rt_used], edi
+    call rt_flush
+    xor edi, edi
+rt_string_store:
+    mov byte [rt_buffer+edi], al
+    add edi, 1
+    add ebx, 1
+    jmp rt_string_byte
+rt_string_end:
+    mov [rt_used], edi
+    mov ecx, 1
+    call rt_reserve
+    mov byte [rt_buffer+edi], 10
+    add edi, 1
+    mov [rt_used], edi
+    pop edi
+    pop ecx
+    pop ebx
+    ret"""),
+
+    'rt_print_float': (('rt_reserve', 'rt_decimal'), """section .rodata
+    align 8
+    rt_pow10f dq 1.0, 10.0, 100.0, 1000.0, 10000.0, 100000.0, 1000000.0, 10000000.0, 100000000.0, 1000000000.0, 10000000000.0, 100000000000.0, 1000000000000.0, 10000000000000.0, 100000000000000.0, 1000000000000000.0, 1e+16, 1e+17, 1e+18, 1e+19, 1e+20, 1e+21, 1e+22
+    rt_float_tiny dq 1e-08
+    rt_float_shift dq 4503599627370496.0
+    rt_minus_one dq -1.0
+section .text
+rt_print_float:                    ; eax = address of a double
+    push ebx
+    push ecx
+    push edx
+    push esi
+    push edi
+    mov esi, eax
+    mov ecx, 32
+    call rt_reserve
+    mov edx, [esi+4]               ; sign, exponent, top of the mantissa
+    mov ebx, edx
+    and ebx, 2147483647
+    cmp ebx, 2146435072            ; exponent all ones: inf or nan
+    jb rt_float_finite
+    and ebx, 1048575
+    or ebx, [esi]
+    jnz rt_float_nan
+    test edx, edx
+    jns rt_float_inf
+    mov byte [rt_buffer+edi], 45
+    add edi, 1
+rt_float_inf:
+    mov byte [rt_buffer+edi], 105
+    mov byte [rt_buffer+edi+1], 110
+    mov byte [rt_buffer+edi+2], 102
+    add edi, 3
+    jmp rt_float_done
+rt_float_nan:
+    mov byte [rt_buffer+edi], 110
+    mov byte [rt_buffer+edi+1], 97
+    mov byte [rt_buffer+edi+2], 110
+    add edi, 3
+    jmp rt_float_done
+rt_float_finite:
+    movsd xmm0, [esi]
+    test edx, edx
+    jns rt_float_positive
+    mov byte [rt_buffer+edi], 45   ; '-'
+    add edi, 1
+    mulsd xmm0, [rt_minus_one]
+rt_float_positive:
+    or ebx, [esi]
+    jnz rt_float_nonzero
+    mov byte [rt_buffer+edi], 48   ; "0.0"
+    mov byte [rt_buffer+edi+1], 46
+    mov byte [rt_buffer+edi+2], 48
+    add edi, 3
+    jmp rt_float_done
+rt_float_nonzero:
+    xor ecx, ecx                   ; value = xmm0 * 10^ecx
+rt_float_big:
+    ucomisd xmm0, [rt_pow10f+176]
+    jb rt_float_small
+    divsd xmm0, [rt_pow10f+128]
+    add ecx, 16
+    jmp rt_float_big
+rt_float_small:
+    ucomisd xmm0, [rt_float_tiny]
+    jae rt_float_range
+    mulsd xmm0, [rt_pow10f+128]
+    sub ecx, 16
+    jmp rt_float_small
+rt_float_range:
+    xor ebx, ebx                   ; scale into [1e14, 1e15) by 10^ebx
+    ucomisd xmm0, [rt_pow10f+112]
+    jb rt_float_up
+rt_float_down:
+    ucomisd xmm0, [rt_pow10f+ebx*8+120]
+    jb rt_float_divide
+    add ebx, 1
+    jmp rt_float_down
+rt_float_divide:
+    divsd xmm0, [rt_pow10f+ebx*8]
+    add ebx, 14                    ; decimal exponent
+    jmp rt_float_round
+rt_float_up:
+    add ebx, 1
+    movsd xmm1, xmm0
+    mulsd xmm1, [rt_pow10f+ebx*8]
+    ucomisd xmm1, [rt_pow10f+112]
+    jb rt_float_up
+    movsd xmm0, xmm1
+    neg ebx
+    add ebx, 14
+rt_float_round:
+    addsd xmm0, [rt_float_shift]   ; round to an integer (2^52)
+    subsd xmm0, [rt_float_shift]
+    ucomisd xmm0, [rt_pow10f+120]
+    jb rt_float_split
+    divsd xmm0, [rt_pow10f+8]      ; rounded up to 1e15
+    add ebx, 1
+rt_float_split:
+    add ebx, ecx
+    movsd xmm1, xmm0
+    divsd xmm1, [rt_pow10f+64]
+    cvttsd2si eax, xmm1            ; first 7 digits
+    cvtsi2sd xmm1, eax
+    mulsd xmm1, [rt_pow10f+64]
+    subsd xmm0, xmm1
+    cvttsd2si edx, xmm0            ; last 8 digits
+    push edx
+    mov ecx, 7
+    lea esi, [rt_digits+7]
+    call rt_decimal
+    pop eax
+    mov ecx, 8
+    lea esi, [rt_digits+15]
+    call rt_decimal
+    mov byte [rt_digits+15], 48    ; 16th integer digit of values near 1e16
+    mov ecx, 15                    ; significant digits
+rt_float_trim:
+    cmp ecx, 1
+    je rt_float_layout
+    movzx eax, byte [rt_digits+ecx-1]
+    cmp eax, 48
+    jne rt_float_layout
+    sub ecx, 1
+    jmp rt_float_trim
+rt_float_layout:
+    cmp ebx, 16
+    jge rt_float_exponent
+    cmp ebx, -4
+    jl rt_float_exponent
+    xor esi, esi
+    test ebx, ebx
+    js rt_float_fraction
+rt_float_integer:
+    movzx eax, byte [rt_digits+esi]
+    mov byte [rt_buffer+edi], al
+    add edi, 1
+    add esi, 1
+    cmp esi, ebx
+    jle rt_float_integer
+    mov byte [rt_buffer+edi], 46   ; '.'
+    add edi, 1
+    cmp esi, ecx
+    jl rt_float_rest
+    mov byte [rt_buffer+edi], 48
+    add edi, 1
+    jmp rt_float_done
+rt_float_fraction:
+    mov byte [rt_buffer+edi], 48   ; "0." and leading zeros
+    mov byte [rt_buffer+edi+1], 46
+    add edi, 2
+rt_float_zeros:
+    add ebx, 1
+    jz rt_float_rest
+    mov byte [rt_buffer+edi], 48
+    add edi, 1
+    jmp rt_float_zeros
+rt_float_rest:
+    movzx eax, byte [rt_digits+esi]
+    mov byte [rt_buffer+edi], al
+    add edi, 1
+    add esi, 1
+    cmp esi, ecx
+    jl rt_float_rest
+    jmp rt_float_done
+rt_float_exponent:
+    movzx eax, byte [rt_digits]
+    mov byte [rt_buffer+edi], al
+    add edi, 1
+    mov esi, 1
+    cmp ecx, 1
+    je rt_float_e
+    mov byte [rt_buffer+edi], 46
+    add edi, 1
+rt_float_mantissa:
+    movzx eax, byte [rt_digits+esi]
+    mov byte [rt_buffer+edi], al
+    add edi, 1
+    add esi, 1
+    cmp esi, ecx
+    jl rt_float_mantissa
+rt_float_e:
+    mov byte [rt_buffer+edi], 101  ; "e+" / "e-"
+    mov byte [rt_buffer+edi+1], 43
+    test ebx, ebx
+    jns rt_float_e_digits
+    mov byte [rt_buffer+edi+1], 45
+    neg ebx
+rt_float_e_digits:
+    add edi, 2
+    mov ecx, 2
+    cmp ebx, 100
+    jl rt_float_e_write
+    mov ecx, 3
+rt_float_e_write:
+    add edi, ecx
+    lea esi, [rt_buffer+edi]
+    mov eax, ebx
+    call rt_decimal
+rt_float_done:
+    mov byte [rt_buffer+edi], 10
+    add edi, 1
+    mov [rt_used], edi
+    pop edi
+    pop esi
+    pop edx
+    pop ecx
+    pop ebx
+    ret"""),
+}
+
+
+# Buffer state of the x86-64 routines
+X64_RUNTIME_DATA = f"""section .bss
+    alignb 8
+    rt_used resq 1
+    rt_digits resb 32
+    rt_buffer resb {RUNTIME_BUFFER_SIZE}"""
+
+# x86-64 System V (Linux syscall): arguments in rdi or xmm0; rbx, rbp,
+# r12-r15 and xmm8-xmm15 are left alone
+X64_RUNTIME: Dict[str, Tuple[tuple, str]] = {
+    'rt_flush': ((), """rt_flush:                          ; write out the buffer
+    push rax
+    push rcx
+    push rdx
+    push rsi
+    push rdi
+    push r11
+    mov rdx, [rt_used]
+    lea rsi, [rt_buffer]
+rt_flush_write:
+    test rdx, rdx
+    jle rt_flush_done
+    mov eax, 1                     ; sys_write
+    mov edi, 1                     ; stdout
+    syscall
+    test rax, rax
+    jle rt_flush_done              ; write error: drop the rest
+    add rsi, rax
+    sub rdx, rax
+    jmp rt_flush_write
+rt_flush_done:
+    mov qword [rt_used], 0
+    pop r11
+    pop rdi
+    pop rsi
+    pop rdx
+    pop rcx
+    pop rax
+    ret"""),
+
+    'rt_reserve': (('rt_flush',), f"""rt_reserve:                        ; room for rcx bytes; r8 = buffer, r9 = rt_used
+    mov r9, [rt_used]
+    add r9, rcx
+    cmp r9, {RUNTIME_BUFFER_SIZE}
+    jbe rt_reserve_done
+    call rt_flush
+rt_reserve_done:
+    mov r9, [rt_used]
+    lea r8, [rt_buffer]
+    ret"""),
+
+    'rt_decimal': ((), """rt_decimal:                        ; rax as at least rcx digits ending at rsi; rsi = first
+    mov r10, 0xCCCCCCCCCCCCCCCD    ; n / 10 = n * this >> 67
+    mov r11, rax
+rt_decimal_digit:
+    mov rax, r11
+    mul r10
+    shr rdx, 3
+    lea rax, [rdx+rdx*4]
+    add rax, rax
+    sub r11, rax                   ; n % 10
+    add r11, 48
+    sub rsi, 1
+    mov [rsi], r11b
+    mov r11, rdx
+    sub rcx, 1
+    jg rt_decimal_digit
+    test r11, r11
+    jnz rt_decimal_digit
+    ret"""),
+
+    'rt_copy_digits': ((), """rt_copy_digits:                    ; digits from rsi to the end of rt_digits
+    lea rdx, [rt_digits+32]
+rt_copy_byte:
+    movzx eax, byte [rsi]
+    mov [r8+r9], al
+    add r9, 1
+    add rsi, 1
+    cmp rsi, rdx
+    jb rt_copy_byte
+    ret"""),
+
+    'rt_print_int': (('rt_reserve', 'rt_decimal', 'rt_copy_digits'), """rt_print_int:                      ; rdi = value
+    mov rcx, 21
+    call rt_reserve
+    mov rax, rdi
+    test rax, rax
+    jns rt_int_digits
+    mov byte [r8+r9], 45           ; '-'
+    add r9, 1
+    neg rax
+rt_int_digits:
+    lea rsi, [rt_digits+32]
+    mov rcx, 1
+    call rt_decimal
+    call rt_copy_digits
+    mov byte [r8+r9], 10
+    add r9, 1
+    mov [rt_used], r9
+    ret"""),
+
+    'rt_print_string': (('rt_flush', 'rt_reserve'), f"""rt_print_string:                   ; rdi = NUL-terminated string
+    mov rcx, 1
+    call rt_reserve
+rt_string_byte:
+    movzx eax, byte [rdi]
+    test eax, eax
+    jz rt_string_end
+    cmp r9, {RUNTIME_BUFFER_SIZE}
+    jb rt_string_store
+    mov [rt_used], r9
+    call rt_flush
+    xor r9d, r9d
+rt_string_store:
+    mov [r8+r9], al
+    add r9, 1
+    add rdi, 1
+    jmp rt_string_byte
+rt_string_end:
+    mov [rt_used], r9
+    mov rcx, 1
+    call rt_reserve
+    mov byte [r8+r9], 10
+    add r9, 1
+    mov [rt_used], r9
+    ret"""),
+
+    'rt_print_float': (('rt_reserve', 'rt_decimal', 'rt_copy_digits'), """section .rodata
+    align 8
+    rt_pow10f dq 1.0, 10.0, 100.0, 1000.0, 10000.0, 100000.0, 1000000.0, 10000000.0, 100000000.0, 1000000000.0, 10000000000.0, 100000000000.0, 1000000000000.0, 10000000000000.0, 100000000000000.0, 1000000000000000.0, 1e+16, 1e+17, 1e+18, 1e+19, 1e+20, 1e+21, 1e+22
+    rt_float_tiny dq 1e-08
+    rt_float_shift dq 4503599627370496.0
+    rt_minus_one dq -1.0
+section .text
+rt_print_float:                    ; xmm0 = value
+    mov rcx, 32
+    call rt_reserve
+    movq rax, xmm0
+    mov rdx, rax
+    shl rdx, 1                     ; drop the sign bit
+    shr rdx, 1
+    mov r10, 0x7FF0000000000000
+    cmp rdx, r10                   ; exponent all ones: inf or nan
+    jb rt_float_finite
+    ja rt_float_nan
+    test rax, rax
+    jns rt_float_inf
+    mov byte [r8+r9], 45
+    add r9, 1
+rt_float_inf:
+    mov byte [r8+r9], 105
+    mov byte [r8+r9+1], 110
+    mov byte [r8+r9+2], 102
+    add r9, 3
+    jmp rt_float_done
+rt_float_nan:
+    mov byte [r8+r9], 110
+    mov byte [r8+r9+1], 97
+    mov byte [r8+r9+2], 110
+    add r9, 3
+    jmp rt_float_done
+rt_float_finite:
+    test rax, rax
+    jns rt_float_positive
+    mov byte [r8+r9], 45           ; '-'
+    add r9, 1
+    mulsd xmm0, [rt_minus_one]
+rt_float_positive:
+    test rdx, rdx
+    jnz rt_float_nonzero
+    mov byte [r8+r9], 48           ; "0.0"
+    mov byte [r8+r9+1], 46
+    mov byte [r8+r9+2], 48
+    add r9, 3
+    jmp rt_float_done
+rt_float_nonzero:
+    lea r11, [rt_pow10f]
+    xor ecx, ecx                   ; value = xmm0 * 10^rcx
+rt_float_big:
+    ucomisd xmm0, [r11+176]
+    jb rt_float_small
+    divsd xmm0, [r11+128]
+    add rcx, 16
+    jmp rt_float_big
+rt_float_small:
+    ucomisd xmm0, [rt_float_tiny]
+    jae rt_float_range
+    mulsd xmm0, [r11+128]
+    sub rcx, 16
+    jmp rt_float_small
+rt_float_range:
+    xor r10d, r10d                 ; scale into [1e14, 1e15) by 10^r10
+    ucomisd xmm0, [r11+112]
+    jb rt_float_up
+rt_float_down:
+    ucomisd xmm0, [r11+r10*8+120]
+    jb rt_float_divide
+    add r10, 1
+    jmp rt_float_down
+rt_float_divide:
+    divsd xmm0, [r11+r10*8]
+    add r10, 14                    ; decimal exponent
+    jmp rt_float_round
+rt_float_up:
+    add r10, 1
+    movsd xmm1, xmm0
+    mulsd xmm1, [r11+r10*8]
+    ucomisd xmm1, [r11+112]
+    jb rt_float_up
+    movsd xmm0, xmm1
+    neg r10
+    add r10, 14
+rt_float_round:
+    addsd xmm0, [rt_float_shift]   ; round to an integer (2^52)
+    subsd xmm0, [rt_float_shift]
+    ucomisd xmm0, [r11+120]
+    jb rt_float_split
+    divsd xmm0, [r11+8]            ; rounded up to 1e15
+    add r10, 1
+rt_float_split:
+    add r10, rcx
+    push r10
+    cvttsd2si rax, xmm0
+    lea rsi, [rt_digits+15]
+    mov rcx, 15
+    call rt_decimal
+    pop rdx                        ; rdx = decimal exponent
+    lea r11, [rt_digits]
+    mov byte [r11+15], 48          ; 16th integer digit of values near 1e16
+    mov rcx, 15                    ; significant digits
+rt_float_trim:
+    cmp rcx, 1
+    je rt_float_layout
+    cmp byte [r11+rcx-1], 48
+    jne rt_float_layout
+    sub rcx, 1
+    jmp rt_float_trim
+rt_float_layout:
+    cmp rdx, 16
+    jge rt_float_exponent
+    cmp rdx, -4
+    jl rt_float_exponent
+    xor esi, esi
+    test rdx, rdx
+    js rt_float_fraction
+rt_float_integer:
+    movzx eax, byte [r11+rsi]
+    mov [r8+r9], al
+    add r9, 1
+    add rsi, 1
+    cmp rsi, rdx
+    jle rt_float_integer
+    mov byte [r8+r9], 46           ; '.'
+    add r9, 1
+    cmp rsi, rcx
+    jl rt_float_rest
+    mov byte [r8+r9], 48
+    add r9, 1
+    jmp rt_float_done
+rt_float_fraction:
+    mov byte [r8+r9], 48           ; "0." and leading zeros
+    mov byte [r8+r9+1], 46
+    add r9, 2
+rt_float_zeros:
+    add rdx, 1
+    jz rt_float_rest
+    mov byte [r8+r9], 48
+    add r9, 1
+    jmp rt_float_zeros
+rt_float_rest:
+    movzx eax, byte [r11+rsi]
+    mov [r8+r9], al
+    add r9, 1
+    add rsi, 1
+    cmp rsi, rcx
+    jl rt_float_rest
+    jmp rt_float_done
+rt_float_exponent:
+    movzx eax, byte [r11]
+    mov [r8+r9], al
+    add r9, 1
+    mov esi, 1
+    cmp rcx, 1
+    je rt_float_e
+    mov byte [r8+r9], 46
+    add r9, 1
+rt_float_mantissa:
+    movzx eax, byte [r11+rsi]
+    mov [r8+r9], al
+    add r9, 1
+    add rsi, 1
+    cmp rsi, rcx
+    jl rt_float_mantissa
+rt_float_e:
+    mov byte [r8+r9], 101          ; "e+" / "e-"
+    mov byte [r8+r9+1], 43
+    test rdx, rdx
+    jns rt_float_e_digits
+    mov byte [r8+r9+1], 45
+    neg rdx
+rt_float_e_digits:
+    add r9, 2
+    mov rax, rdx
+    lea rsi, [rt_digits+32]
+    mov rcx, 2
+    call rt_decimal
+    call rt_copy_digits
+rt_float_done:
+    mov byte [r8+r9], 10
+    add r9, 1
+    mov [rt_used], r9
+    ret"""),
+}
+
+
+def link_runtime(called: Iterable[str], library: Dict[str, Tuple[tuple, str]],
+                 data: str) -> List[str]:
+    """Assembly of the called routines and everything they call, in
+    library order, after the shared data"""
+    needed = set()
+    pending = list(called)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(library[name][0])
+    lines = ["", "; Runtime library"]
+    lines.extend(data.splitlines())
+    lines.append("section .text")
+    for name, (_, text) in library.items():
+        if name in needed:
+            lines.append("")
+            lines.extend(text.splitlines())
+    return lines
+
+
+# Testing function for the runtime library
+def test_runtime_library(source_code: str, path: str = '/tmp/minicompiler_runtime'):
+    """Build a static x86 executable, run it (Linux only) and check its
+    output against the TAC interpreter"""
+    print("\n" + "="*60)
+    print(" TESTING BUFFERED PRINT RUNTIME")
+    print("="*60)
+
+    try:
+        import io
+        import contextlib
+        import subprocess
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+        from intermediate_code import IntermediateCode
+        from code_generator import AssemblyGenerator
+        from elf_writer import ELFWriter
+        from tac_interpreter import TACInterpreter
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            ast = Parser(Lexer(source_code).tokenize()).parse()
+            symbol_table = SemanticAnalyzer().analyze(ast)
+            generator = IntermediateCode()
+            tac = generator.generate(ast)
+            assembly_generator = AssemblyGenerator(tac, symbol_table, generator.string_literals)
+            assembly = assembly_generator.generate()
+        print(f"\nLinked routines: {', '.join(sorted(assembly_generator.runtime_calls))}")
+        print(f"Runtime: {len(assembly_generator.runtime)} assembly lines, "
+              f"{RUNTIME_BUFFER_SIZE}-byte output buffer")
+
+        ELFWriter(assembly).write(path)
+        result = subprocess.run([path], capture_output=True, text=True, timeout=10)
+        output = result.stdout.splitlines()
+        print("\nProgram Output:")
+        print("-" * 50)
+        for line in output[:20]:
+            print(line)
+        if len(output) > 20:
+            print(f"... ({len(output)} lines)")
+
+        expected = TACInterpreter(tac, generator.string_literals).run()
+        if output != expected:
+            raise RuntimeError(f"Executable output {output[:5]} differs from the TAC interpreter {expected[:5]}")
+        print("\nOutput matches the TAC interpreter")
+        print("\n✓ Runtime Library Successful!")
+        return output
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code: more output than fits in one buffer
+    test_code = """
+    int i = 0;
+    float rate = 0.001;
+    float big = 12345678.5;
+    while (i < 1000) {
+        print(i * 7919);
+        print("tick");
+        i = i + 1;
+    }
+    print(rate);
+    print(big);
+    print(0 - 2147483647);
+    """
+
+    test_runtime_library(test_code)
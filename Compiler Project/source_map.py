@@ -0,0 +1,130 @@
+"""
+============================================
+BACKEND SUPPORT: SOURCE MAPS
+CSE 430 - Compiler Design Lab
+============================================
+
+Carries source line numbers from the tokens to the machine code:
+
+    Token.line  ->  statement.line  ->  IntermediateCode.source_lines
+                ->  PassManager.source_lines  ->  '; line N' markers
+
+- The parser stores the line of a statement's first token on the node.
+- The TAC generator records, for every TAC instruction, the line of the
+  statement that emitted it (an if or while owns its condition test and
+  its jumps; the statements of its blocks own their own code).
+- Optimization passes return new TAC without lines.  remap_lines()
+  aligns the new TAC with the old one, ignoring the names of
+  temporaries and labels.  Copies made by unrolling or rotation take
+  the line of the instruction they copy, rewritten runs (folded
+  increments) take the lines of the run they replace, and anything
+  else new takes the line of the instruction before it.
+- AssemblyGenerator writes a '    ; line N' comment whenever the source
+  line changes.  The peephole pass skips comments, and the scheduler
+  moves instructions with their line (strip_markers / insert_markers),
+  so the markers never change the generated code.  Line 0 marks the
+  program epilogue (final flush and exit).
+- X86Encoder records the line in effect at every instruction, which the
+  line profiler (line_profiler.py) charges executed instructions to.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import List, Optional
+from peephole import AsmInstruction
+
+MARKER = re.compile(r'^\s*;\s*line (\d+)\s*$')
+TEMPORARY = re.compile(r'\bt\d+\b')
+LABEL = re.compile(r'\bL\d+\b')
+
+# Line of the code after the last statement (flush and exit)
+EPILOGUE_LINE = 0
+
+
+def line_marker(line: int) -> str:
+    return f"    ; line {line}"
+
+
+def marker_line(text: str) -> Optional[int]:
+    """Line number of a '; line N' marker, None for any other line"""
+    match = MARKER.match(text)
+    return int(match.group(1)) if match else None
+
+
+def shape(instruction: str, labels: bool = True) -> str:
+    """Instruction text with temporaries (and labels) renamed away"""
+    instruction = TEMPORARY.sub('t', instruction)
+    return LABEL.sub('L', instruction) if labels else instruction
+
+
+def lines_by_shape(shapes: List[str], lines: List[Optional[int]]) -> dict:
+    """shape -> the distinct lines of the instructions with that shape"""
+    found = {}
+    for text, line in zip(shapes, lines):
+        found.setdefault(text, [])
+        if line not in found[text]:
+            found[text].append(line)
+    return found
+
+
+def remap_lines(old_tac: List[str], old_lines: List[Optional[int]],
+                new_tac: List[str]) -> List[Optional[int]]:
+    """Source lines for new_tac, produced by a pass from old_tac"""
+    # Labels keep their names for the alignment, so jumps pair up with
+    # the jumps they were
+    old_exact = [shape(instruction, labels=False) for instruction in old_tac]
+    new_exact = [shape(instruction, labels=False) for instruction in new_tac]
+    lines: List[Optional[int]] = [None] * len(new_tac)
+    replaced = {}       # new position -> line of the old code it replaces
+    matcher = SequenceMatcher(None, old_exact, new_exact, autojunk=False)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == 'equal':
+            lines[new_start:new_end] = old_lines[old_start:old_end]
+        elif tag == 'replace':
+            old_size, new_size = old_end - old_start, new_end - new_start
+            for offset in range(new_size):
+                replaced[new_start + offset] = old_lines[old_start + offset * old_size // new_size]
+
+    # Copies of an instruction (unrolled bodies, rotated tests) share its
+    # line; when several lines have the same instruction, the copy stays
+    # on the line of the code before it if it can
+    exact = lines_by_shape(old_exact, old_lines)
+    loose = lines_by_shape([shape(instruction) for instruction in old_tac], old_lines)
+    previous = next((line for line in old_lines if line is not None), None)
+    for position, instruction in enumerate(new_tac):
+        if lines[position] is None:
+            found = exact.get(new_exact[position]) or loose.get(shape(instruction))
+            if found:
+                lines[position] = previous if previous in found else found[0]
+            else:
+                lines[position] = replaced.get(position, previous)
+        previous = lines[position]
+    return lines
+
+
+def strip_markers(code) -> tuple:
+    """AsmInstruction list without line markers, and the line of each entry"""
+    entries, lines = [], []
+    line = None
+    for entry in code:
+        if entry.comment is not None and entry.opcode is None and entry.label is None:
+            marked = marker_line(entry.render())
+            if marked is not None:
+                line = marked
+                continue
+        entries.append(entry)
+        lines.append(line)
+    return entries, lines
+
+
+def insert_markers(code, lines) -> list:
+    """Inverse of strip_markers: a marker before every instruction whose
+    line differs from the previous instruction's"""
+    result = []
+    current = None
+    for entry, line in zip(code, lines):
+        if entry.is_instruction() and line is not None and line != current:
+            result.append(AsmInstruction.parse(line_marker(line)))
+            current = line
+        result.append(entry)
+    return result
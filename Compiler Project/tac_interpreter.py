@@ -0,0 +1,158 @@
+"""
+============================================
+OPTIMIZATION SUPPORT: TAC INTERPRETER
+CSE 430 - Compiler Design Lab
+============================================
+
+Runs Three-Address Code directly so that optimization passes can be
+checked for correctness (same printed output) and measured by their
+dynamic instruction and branch counts.
+"""
+
+import re
+from typing import List, Dict
+from control_flow import is_label, label_name, is_float_constant
+
+
+class TACRuntimeError(Exception):
+    pass
+
+
+def apply_operator(left, op: str, right):
+    """Evaluate a binary operator with the semantics of the generated code"""
+    if op == '+':
+        return left + right
+    if op == '-':
+        return left - right
+    if op == '*':
+        return left * right
+    if op == '/':
+        if right == 0:
+            raise TACRuntimeError("Division by zero")
+        if isinstance(left, int) and isinstance(right, int):
+            # idiv truncates toward zero
+            quotient = abs(left) // abs(right)
+            return quotient if (left < 0) == (right < 0) else -quotient
+        return left / right
+    if op == '<':
+        return int(left < right)
+    if op == '>':
+        return int(left > right)
+    if op == '==':
+        return int(left == right)
+    if op == '!=':
+        return int(left != right)
+    if op == '<=':
+        return int(left <= right)
+    if op == '>=':
+        return int(left >= right)
+    raise TACRuntimeError(f"Unknown operator '{op}'")
+
+
+class TACInterpreter:
+    """Executes TAC and counts executed instructions and branches"""
+
+    def __init__(self, tac: List[str], string_literals: Dict = None, max_steps: int = 10_000_000):
+        self.tac = tac
+        self.strings = {label: value for value, label in (string_literals or {}).items()}
+        self.max_steps = max_steps
+        self.variables = {}
+        self.output = []
+        self.instructions = 0
+        self.branches = 0
+        self.taken_branches = 0
+        self.jumps = 0
+
+    def value(self, operand: str):
+        if re.fullmatch(r'-?\d+', operand):
+            return int(operand)
+        if is_float_constant(operand):
+            return float(operand)
+        if operand in self.strings:
+            return self.strings[operand]
+        return self.variables.get(operand, 0)
+
+    def run(self) -> List[str]:
+        labels = {label_name(instr): i for i, instr in enumerate(self.tac) if is_label(instr)}
+        pc = 0
+        while pc < len(self.tac):
+            instruction = self.tac[pc]
+            pc += 1
+            if is_label(instruction):
+                continue
+            self.instructions += 1
+            if self.instructions > self.max_steps:
+                raise TACRuntimeError(f"Step limit of {self.max_steps} exceeded")
+            parts = instruction.split()
+
+            if parts[0] == 'goto':
+                self.jumps += 1
+                pc = labels[parts[1]]
+            elif parts[0] in ('if_false', 'if_true'):
+                if len(parts) == 6:
+                    condition = apply_operator(self.value(parts[1]), parts[2], self.value(parts[3]))
+                else:
+                    condition = self.value(parts[1])
+                self.branches += 1
+                if bool(condition) == (parts[0] == 'if_true'):
+                    self.taken_branches += 1
+                    pc = labels[parts[-1]]
+            elif parts[0] == 'print':
+                self.output.append(str(self.value(parts[1])))
+            elif len(parts) == 3:
+                self.variables[parts[0]] = self.value(parts[2])
+            elif len(parts) == 5:
+                self.variables[parts[0]] = apply_operator(
+                    self.value(parts[2]), parts[3], self.value(parts[4]))
+            else:
+                raise TACRuntimeError(f"Cannot execute '{instruction}'")
+        return self.output
+
+    def display(self):
+        print("\nProgram Output:")
+        print("-" * 50)
+        for line in self.output:
+            print(line)
+        print(f"\nExecuted {self.instructions} instructions, "
+              f"{self.branches} conditional branches ({self.taken_branches} taken), "
+              f"{self.jumps} jumps")
+
+
+# Testing function for the TAC interpreter
+def test_tac_interpreter(source_code: str, tac: List[str] = None, string_literals: Dict = None):
+    """Run TAC independently"""
+    print("\n" + "="*60)
+    print(" TESTING TAC INTERPRETER")
+    print("="*60)
+
+    try:
+        if tac is None:
+            from intermediate_code import test_intermediate_code
+            tac, string_literals = test_intermediate_code(source_code)
+            if tac is None:
+                return None
+
+        interpreter = TACInterpreter(tac, string_literals)
+        output = interpreter.run()
+        interpreter.display()
+        print("\n✓ TAC Execution Successful!")
+        return output
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    int total = 0;
+    while (i < 5) {
+        total = total + i;
+        i = i + 1;
+    }
+    print(total);
+    print("done");
+    """
+
+    test_tac_interpreter(test_code)
@@ -0,0 +1,162 @@
+"""
+============================================
+OPTIMIZATION: TEMPORARY SLOT ALLOCATION
+CSE 430 - Compiler Design Lab
+============================================
+
+Computes live intervals of TAC temporaries from the CFG liveness
+analysis and renumbers them so that temporaries whose live ranges do
+not overlap share a slot.  IntermediateCode already recycles expression
+temporaries while generating; this pass is run again after
+optimizations that introduce temporaries living across blocks.
+"""
+
+import heapq
+from typing import List, Dict, Callable
+from control_flow import ControlFlowGraph, is_temp, temp_index, used_vars, defined_var
+
+
+class LiveInterval:
+    """Positions [start, end] in the TAC over which a name is live"""
+
+    def __init__(self, name: str, start: int, end: int):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.uses = 0
+
+    def __repr__(self):
+        return f"LiveInterval({self.name}, {self.start}-{self.end})"
+
+
+def live_intervals(tac: List[str], track: Callable[[str], bool] = is_temp) -> Dict[str, LiveInterval]:
+    """Live interval of every tracked name, indexed by TAC position.
+
+    Positions are indices into `tac`; a value last read at position p and
+    a value written at p may share storage because operands are read
+    before the result is stored.
+    """
+    cfg = ControlFlowGraph(tac)
+    _, live_out = cfg.liveness()
+    intervals = {}
+
+    def extend(name, position):
+        interval = intervals.get(name)
+        if interval is None:
+            intervals[name] = LiveInterval(name, position, position)
+        else:
+            interval.start = min(interval.start, position)
+            interval.end = max(interval.end, position)
+
+    position = 0
+    for block in cfg.blocks:
+        if block.label:
+            position += 1
+        first = position
+        position += len(block.instructions)
+        live = {name for name in live_out[block] if track(name)}
+        for offset in range(len(block.instructions) - 1, -1, -1):
+            here = first + offset
+            instruction = block.instructions[offset]
+            written = defined_var(instruction)
+            reads = [name for name in used_vars(instruction) if track(name)]
+            for name in live:
+                extend(name, here + 1 if name != written else here)
+            for name in reads:
+                extend(name, here)
+                intervals[name].uses += 1
+            if written and track(written):
+                extend(written, here)
+                live.discard(written)
+            live.update(reads)
+        for name in live:
+            # Live on entry: the value arrives from before this block
+            extend(name, first)
+    return intervals
+
+
+class TempAllocator:
+    """Linear-scan assignment of temporaries to as few slots as possible"""
+
+    def __init__(self, tac: List[str], symbol_table=None):
+        self.tac = tac
+        self.symbol_table = symbol_table
+        self.temps_before = 0
+        self.temps_after = 0
+        self.mapping = {}
+
+    def is_temporary(self, name: str) -> bool:
+        """Compiler temporaries, never a declared variable that looks like one"""
+        if self.symbol_table is not None and name in self.symbol_table.symbols:
+            return False
+        return is_temp(name)
+
+    def allocate(self) -> List[str]:
+        intervals = live_intervals(self.tac, self.is_temporary)
+        self.temps_before = len({temp_index(part) for instr in self.tac
+                                 for part in instr.split() if self.is_temporary(part)})
+        free_slots = []
+        active = []      # heap of (end, slot)
+        slot_count = 0
+        for interval in sorted(intervals.values(), key=lambda i: (i.start, i.name)):
+            while active and active[0][0] <= interval.start:
+                _, slot = heapq.heappop(active)
+                heapq.heappush(free_slots, slot)
+            if free_slots:
+                slot = heapq.heappop(free_slots)
+            else:
+                slot = slot_count
+                slot_count += 1
+            self.mapping[interval.name] = f"t{slot}"
+            heapq.heappush(active, (interval.end, slot))
+        self.temps_after = slot_count
+        return [self.rename(instruction) for instruction in self.tac]
+
+    def rename(self, instruction: str) -> str:
+        if instruction.endswith(':'):
+            return instruction
+        return " ".join(self.mapping.get(part, part) for part in instruction.split())
+
+    def display(self):
+        print(f"\nTemporaries: {self.temps_before} -> {self.temps_after} slots "
+              f"(.bss {self.temps_before * 4} -> {self.temps_after * 4} bytes)")
+
+
+# Testing function for temporary allocation
+def test_temp_allocator(source_code: str, tac: List[str] = None):
+    """Test temporary slot allocation independently"""
+    print("\n" + "="*60)
+    print(" TESTING TEMPORARY SLOT ALLOCATION")
+    print("="*60)
+
+    try:
+        if tac is None:
+            from intermediate_code import test_intermediate_code
+            tac, _ = test_intermediate_code(source_code)
+            if tac is None:
+                return None
+
+        allocator = TempAllocator(tac)
+        allocated = allocator.allocate()
+        allocator.display()
+        print("\nRenumbered TAC:")
+        print("-" * 50)
+        for i, instruction in enumerate(allocated, 1):
+            print(f"{i:3d}. {instruction}")
+        print("\n✓ Temporary Allocation Successful!")
+        return allocated
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int a = 1;
+    int b = 2;
+    int c = (a + b) * (a - b) + (a * b) / (b - a);
+    print(c);
+    """
+
+    test_temp_allocator(test_code)
@@ -0,0 +1,6 @@
+"""The compiler modules import each other by name from the project directory"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
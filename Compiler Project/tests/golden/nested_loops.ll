@@ -0,0 +1,120 @@
+; Generated by the Mini Compiler LLVM backend
+; ModuleID = 'mini'
+
+@fmt.int = private unnamed_addr constant [6 x i8] c"%lld\0A\00"
+@fmt.str = private unnamed_addr constant [4 x i8] c"%s\0A\00"
+@fmt.e = private unnamed_addr constant [5 x i8] c"%.*e\00"
+@fmt.f = private unnamed_addr constant [5 x i8] c"%.*f\00"
+@fmt.g = private unnamed_addr constant [5 x i8] c"%.*g\00"
+
+declare i32 @printf(i8*, ...)
+declare i32 @snprintf(i8*, i64, i8*, ...)
+declare double @strtod(i8*, i8**)
+declare i8* @strchr(i8*, i32)
+declare i32 @atoi(i8*)
+declare i32 @strcmp(i8*, i8*)
+
+; Shortest round-trip formatting of a double, as Python's repr()
+define private void @print_float(double %value) {
+entry:
+  %scientific = alloca [40 x i8]
+  %buffer = alloca [48 x i8]
+  %digits = getelementptr inbounds [40 x i8], [40 x i8]* %scientific, i64 0, i64 0
+  %text = getelementptr inbounds [48 x i8], [48 x i8]* %buffer, i64 0, i64 0
+  %e = getelementptr inbounds [5 x i8], [5 x i8]* @fmt.e, i64 0, i64 0
+  br label %try
+try:
+  %precision = phi i32 [ 1, %entry ], [ %next, %retry ]
+  %places = sub i32 %precision, 1
+  call i32 (i8*, i64, i8*, ...) @snprintf(i8* %digits, i64 40, i8* %e, i32 %places, double %value)
+  %back = call double @strtod(i8* %digits, i8** null)
+  %same = fcmp oeq double %back, %value
+  %last = icmp sge i32 %precision, 17
+  %done = or i1 %same, %last
+  br i1 %done, label %exponent, label %retry
+retry:
+  %next = add i32 %precision, 1
+  br label %try
+exponent:
+  %mark = call i8* @strchr(i8* %digits, i32 101)
+  %special = icmp eq i8* %mark, null
+  br i1 %special, label %nan, label %range
+nan:
+  call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @fmt.str, i64 0, i64 0), i8* %digits)
+  ret void
+range:
+  %power = getelementptr inbounds i8, i8* %mark, i64 1
+  %exp = call i32 @atoi(i8* %power)
+  %low = icmp sge i32 %exp, -4
+  %high = icmp slt i32 %exp, 16
+  %fixed = and i1 %low, %high
+  br i1 %fixed, label %positional, label %general
+positional:
+  %decimals = sub i32 %places, %exp
+  %positive = icmp sgt i32 %decimals, 0
+  %count = select i1 %positive, i32 %decimals, i32 1
+  %f = getelementptr inbounds [5 x i8], [5 x i8]* @fmt.f, i64 0, i64 0
+  call i32 (i8*, i64, i8*, ...) @snprintf(i8* %text, i64 48, i8* %f, i32 %count, double %value)
+  br label %print
+general:
+  %g = getelementptr inbounds [5 x i8], [5 x i8]* @fmt.g, i64 0, i64 0
+  call i32 (i8*, i64, i8*, ...) @snprintf(i8* %text, i64 48, i8* %g, i32 %precision, double %value)
+  br label %print
+print:
+  call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @fmt.str, i64 0, i64 0), i8* %text)
+  ret void
+}
+
+define i32 @main() {
+entry:
+  %i.addr = alloca i64
+  %total.addr = alloca i64
+  %j.addr = alloca i64
+  %t0.addr = alloca i64
+  store i64 0, i64* %i.addr
+  store i64 0, i64* %total.addr
+  store i64 0, i64* %j.addr
+  store i64 0, i64* %t0.addr
+  store i64 0, i64* %i.addr
+  store i64 0, i64* %total.addr
+  br label %L0
+L0:
+  %v.1 = load i64, i64* %i.addr
+  %v.2 = icmp slt i64 %v.1, 20
+  br i1 %v.2, label %bb.1, label %L1
+bb.1:
+  store i64 0, i64* %j.addr
+  br label %L2
+L2:
+  %v.3 = load i64, i64* %j.addr
+  %v.4 = icmp slt i64 %v.3, 20
+  br i1 %v.4, label %bb.2, label %L3
+bb.2:
+  %v.5 = load i64, i64* %i.addr
+  %v.6 = load i64, i64* %j.addr
+  %v.7 = mul i64 %v.5, %v.6
+  store i64 %v.7, i64* %t0.addr
+  %v.8 = load i64, i64* %total.addr
+  %v.9 = load i64, i64* %t0.addr
+  %v.10 = add i64 %v.8, %v.9
+  store i64 %v.10, i64* %t0.addr
+  %v.11 = load i64, i64* %t0.addr
+  store i64 %v.11, i64* %total.addr
+  %v.12 = load i64, i64* %j.addr
+  %v.13 = add i64 %v.12, 1
+  store i64 %v.13, i64* %t0.addr
+  %v.14 = load i64, i64* %t0.addr
+  store i64 %v.14, i64* %j.addr
+  br label %L2
+L3:
+  %v.15 = load i64, i64* %i.addr
+  %v.16 = add i64 %v.15, 1
+  store i64 %v.16, i64* %t0.addr
+  %v.17 = load i64, i64* %t0.addr
+  store i64 %v.17, i64* %i.addr
+  br label %L0
+L1:
+  %v.18 = load i64, i64* %total.addr
+  call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([6 x i8], [6 x i8]* @fmt.int, i64 0, i64 0), i64 %v.18)
+  ret i32 0
+}
@@ -0,0 +1,124 @@
+; Generated by the Mini Compiler LLVM backend
+; ModuleID = 'mini'
+
+@str0 = private unnamed_addr constant [5 x i8] c"mini\00"
+@fmt.int = private unnamed_addr constant [6 x i8] c"%lld\0A\00"
+@fmt.str = private unnamed_addr constant [4 x i8] c"%s\0A\00"
+@fmt.e = private unnamed_addr constant [5 x i8] c"%.*e\00"
+@fmt.f = private unnamed_addr constant [5 x i8] c"%.*f\00"
+@fmt.g = private unnamed_addr constant [5 x i8] c"%.*g\00"
+
+declare i32 @printf(i8*, ...)
+declare i32 @snprintf(i8*, i64, i8*, ...)
+declare double @strtod(i8*, i8**)
+declare i8* @strchr(i8*, i32)
+declare i32 @atoi(i8*)
+declare i32 @strcmp(i8*, i8*)
+
+; Shortest round-trip formatting of a double, as Python's repr()
+define private void @print_float(double %value) {
+entry:
+  %scientific = alloca [40 x i8]
+  %buffer = alloca [48 x i8]
+  %digits = getelementptr inbounds [40 x i8], [40 x i8]* %scientific, i64 0, i64 0
+  %text = getelementptr inbounds [48 x i8], [48 x i8]* %buffer, i64 0, i64 0
+  %e = getelementptr inbounds [5 x i8], [5 x i8]* @fmt.e, i64 0, i64 0
+  br label %try
+try:
+  %precision = phi i32 [ 1, %entry ], [ %next, %retry ]
+  %places = sub i32 %precision, 1
+  call i32 (i8*, i64, i8*, ...) @snprintf(i8* %digits, i64 40, i8* %e, i32 %places, double %value)
+  %back = call double @strtod(i8* %digits, i8** null)
+  %same = fcmp oeq double %back, %value
+  %last = icmp sge i32 %precision, 17
+  %done = or i1 %same, %last
+  br i1 %done, label %exponent, label %retry
+retry:
+  %next = add i32 %precision, 1
+  br label %try
+exponent:
+  %mark = call i8* @strchr(i8* %digits, i32 101)
+  %special = icmp eq i8* %mark, null
+  br i1 %special, label %nan, label %range
+nan:
+  call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @fmt.str, i64 0, i64 0), i8* %digits)
+  ret void
+range:
+  %power = getelementptr inbounds i8, i8* %mark, i64 1
+  %exp = call i32 @atoi(i8* %power)
+  %low = icmp sge i32 %exp, -4
+  %high = icmp slt i32 %exp, 16
+  %fixed = and i1 %low, %high
+  br i1 %fixed, label %positional, label %general
+positional:
+  %decimals = sub i32 %places, %exp
+  %positive = icmp sgt i32 %decimals, 0
+  %count = select i1 %positive, i32 %decimals, i32 1
+  %f = getelementptr inbounds [5 x i8], [5 x i8]* @fmt.f, i64 0, i64 0
+  call i32 (i8*, i64, i8*, ...) @snprintf(i8* %text, i64 48, i8* %f, i32 %count, double %value)
+  br label %print
+general:
+  %g = getelementptr inbounds [5 x i8], [5 x i8]* @fmt.g, i64 0, i64 0
+  call i32 (i8*, i64, i8*, ...) @snprintf(i8* %text, i64 48, i8* %g, i32 %precision, double %value)
+  br label %print
+print:
+  call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @fmt.str, i64 0, i64 0), i8* %text)
+  ret void
+}
+
+define i32 @main() {
+entry:
+  %name.addr = alloca i8*
+  %a.addr = alloca i64
+  %b.addr = alloca i64
+  %t0.addr = alloca i64
+  %t1.addr = alloca i64
+  %t0.float.addr = alloca double
+  store i8* null, i8** %name.addr
+  store i64 0, i64* %a.addr
+  store i64 0, i64* %b.addr
+  store i64 0, i64* %t0.addr
+  store i64 0, i64* %t1.addr
+  store double 0.0, double* %t0.float.addr
+  store i8* getelementptr inbounds ([5 x i8], [5 x i8]* @str0, i64 0, i64 0), i8** %name.addr
+  store i64 2, i64* %a.addr
+  store i64 1, i64* %b.addr
+  %v.1 = load i8*, i8** %name.addr
+  %v.2 = call i32 @strcmp(i8* %v.1, i8* getelementptr inbounds ([5 x i8], [5 x i8]* @str0, i64 0, i64 0))
+  %v.3 = icmp eq i32 %v.2, 0
+  br i1 %v.3, label %bb.1, label %L0
+bb.1:
+  %v.4 = load i8*, i8** %name.addr
+  call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @fmt.str, i64 0, i64 0), i8* %v.4)
+  br label %L1
+L0:
+  br label %L1
+L1:
+  %v.5 = load i64, i64* %a.addr
+  %v.6 = load i64, i64* %b.addr
+  %v.7 = icmp slt i64 %v.5, %v.6
+  %v.8 = zext i1 %v.7 to i64
+  store i64 %v.8, i64* %t0.addr
+  %v.9 = load i64, i64* %a.addr
+  %v.10 = load i64, i64* %b.addr
+  %v.11 = icmp sgt i64 %v.9, %v.10
+  %v.12 = zext i1 %v.11 to i64
+  store i64 %v.12, i64* %t1.addr
+  %v.13 = load i64, i64* %t0.addr
+  %v.14 = load i64, i64* %t1.addr
+  %v.15 = sub i64 %v.13, %v.14
+  store i64 %v.15, i64* %t0.addr
+  %v.16 = load i64, i64* %t0.addr
+  call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([6 x i8], [6 x i8]* @fmt.int, i64 0, i64 0), i64 %v.16)
+  %v.17 = load i64, i64* %a.addr
+  %v.18 = sitofp i64 %v.17 to double
+  %v.19 = fdiv double %v.18, 3.0
+  store double %v.19, double* %t0.float.addr
+  %v.20 = load double, double* %t0.float.addr
+  %v.21 = fcmp oge double %v.20, 0.5
+  %v.22 = zext i1 %v.21 to i64
+  store i64 %v.22, i64* %t0.addr
+  %v.23 = load i64, i64* %t0.addr
+  call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([6 x i8], [6 x i8]* @fmt.int, i64 0, i64 0), i64 %v.23)
+  ret i32 0
+}
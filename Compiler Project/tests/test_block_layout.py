@@ -0,0 +1,55 @@
+"""
+Profile-guided block layout regressions: a profile recorded with
+BlockProfiler and used at every layout level must keep the program's
+output, including programs that -O3 folds down to no code at all.
+"""
+
+import io
+import contextlib
+
+import pytest
+
+from lexer import Lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+from intermediate_code import IntermediateCode
+from pass_manager import PassManager
+from block_layout import BlockProfiler
+from code_generator import AssemblyGenerator
+from x86_emulator import X86Emulator
+from ast_interpreter import ASTInterpreter
+
+PROGRAMS = [
+    # No output: partial evaluation leaves empty TAC at -O3
+    "int i = 0; while (i < 3) { i = i + 1; }",
+    "int i = 0; while (i < 3) { if (i > 5) { print(i); } i = i + 1; }",
+    "int i = 0; int s = 0; while (i < 10) { if (i > 6) { s = s + i; } i = i + 1; } print(s);",
+]
+
+
+def run_with_profile(source: str, level: str) -> list:
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = Parser(Lexer(source).tokenize()).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        generator = IntermediateCode()
+        tac = generator.generate(ast)
+        profiler = BlockProfiler(tac, generator.string_literals)
+        profiler.run()
+        manager = PassManager(level, symbol_table, generator.string_literals,
+                              profiler.profile())
+        optimized = manager.run(tac)
+        assembly = AssemblyGenerator(optimized, symbol_table, generator.string_literals,
+                                     **manager.codegen_options()).generate()
+    return X86Emulator(assembly).run()
+
+
+def expected(source: str) -> list:
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = Parser(Lexer(source).tokenize()).parse()
+    return ASTInterpreter(ast).run()
+
+
+@pytest.mark.parametrize('level', ['O2', 'O3'])
+@pytest.mark.parametrize('source', PROGRAMS)
+def test_profile_use(source, level):
+    assert run_with_profile(source, level) == expected(source)
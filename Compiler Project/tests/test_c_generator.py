@@ -0,0 +1,49 @@
+"""
+C backend regressions: programs built with the system C compiler must
+print what the AST interpreter prints.
+"""
+
+import io
+import os
+import subprocess
+import contextlib
+
+import pytest
+
+from lexer import Lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+from ast_interpreter import ASTInterpreter
+from c_generator import CCodeGenerator, compile_c, find_c_compiler
+
+pytestmark = pytest.mark.skipif(find_c_compiler() is None, reason="no C compiler")
+
+PROGRAMS = [
+    # Comparisons are C ints; printing them as long long needs a cast
+    "int a = 2; int b = 1; print((a < b) - (a > b));",
+    "int a = 2; int b = 1; print(a < b); print(a > b);",
+    'string s = "x"; print((s == "x") - 2);',
+    "int a = 5; int b = 3; print((a >= b) * (0 - 1) + (a != b) - 4);",
+    "int a = 3; while ((a > 0) == 1) { a = a - 1; } print(a);",
+]
+
+
+def run_c(source: str, directory: str) -> list:
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = Parser(Lexer(source).tokenize()).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        lines = CCodeGenerator(ast, symbol_table).generate()
+    executable = compile_c(lines, os.path.join(directory, 'program'))
+    return subprocess.run([executable], capture_output=True, text=True,
+                          timeout=30).stdout.splitlines()
+
+
+def expected(source: str) -> list:
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = Parser(Lexer(source).tokenize()).parse()
+    return ASTInterpreter(ast).run()
+
+
+@pytest.mark.parametrize('source', PROGRAMS)
+def test_printed_comparisons(source, tmp_path):
+    assert run_c(source, str(tmp_path)) == expected(source)
@@ -0,0 +1,101 @@
+"""
+Instruction selection regressions: x86 code run in the emulator must
+print what the AST interpreter prints, at every level that selects
+instructions (-O1, -O2, -Os) and at -O0 for reference.
+"""
+
+import io
+import random
+import contextlib
+
+import pytest
+
+from lexer import Lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+from intermediate_code import IntermediateCode
+from pass_manager import PassManager
+from code_generator import AssemblyGenerator
+from x86_emulator import X86Emulator
+from ast_interpreter import ASTInterpreter
+
+LEVELS = ['O0', 'O1', 'O2', 'Os']
+
+# Comparisons and divisions nested inside arithmetic
+PROGRAMS = [
+    "int a = 3; int b = 7; print(a * 9 - (b - 1) + (a < b));",
+    "int a = 3; int b = 7; print((a < b) * 5 + (b > a) * (a == 3));",
+    "int a = 8; int b = 3; print(a * 2 - a / b + (a != b));",
+    "int a = 8; int b = 3; print((a + b) * (a - b) - (a + 1) / (b - 1));",
+    "int a = 2; int b = 9; int c = 1; "
+    "print(((b <= ((c != c) < a)) >= (((b + b) == (c > c)) < ((b + c) >= (b + b)))));",
+    "int a = 5; int b = 2; int c = 0; c = (a / b) + (a < b) * 4 - (b - a) * 3; print(c);",
+    "int a = 5; int b = 2; int i = 0; "
+    "while (i < 6) { if ((a * i - b) / 3 > (i == 2) + 1) { print(i * 7 + (a > i)); } i = i + 1; }",
+]
+
+
+def run_x86(source: str, level: str) -> list:
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = Parser(Lexer(source).tokenize()).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        generator = IntermediateCode()
+        tac = generator.generate(ast)
+        manager = PassManager(level, symbol_table, generator.string_literals)
+        tac = manager.run(tac)
+        assembly = AssemblyGenerator(tac, symbol_table, generator.string_literals,
+                                     **manager.codegen_options()).generate()
+    return X86Emulator(assembly).run()
+
+
+def expected(source: str) -> list:
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = Parser(Lexer(source).tokenize()).parse()
+    return ASTInterpreter(ast).run()
+
+
+def random_expression(rng: random.Random, depth: int) -> str:
+    if depth == 0 or rng.random() < 0.25:
+        return rng.choice(['a', 'b', 'c', str(rng.randint(0, 9))])
+    op = rng.choice(['+', '-', '*', '/', '<', '>', '==', '!=', '<=', '>='])
+    right = random_expression(rng, depth - 1)
+    if op == '/':
+        right = f"({right} * 0 + {rng.randint(1, 5)})"
+    return f"({random_expression(rng, depth - 1)} {op} {right})"
+
+
+def random_program(seed: int) -> str:
+    rng = random.Random(seed)
+    source = " ".join(f"int {name} = {rng.randint(0, 9)};" for name in 'abc')
+    for _ in range(4):
+        source += (f" {rng.choice('abc')} = {random_expression(rng, 4)};"
+                   f" print({random_expression(rng, 4)});")
+    return source
+
+
+@pytest.mark.parametrize('level', LEVELS)
+@pytest.mark.parametrize('source', PROGRAMS)
+def test_nested_expressions(source, level):
+    assert run_x86(source, level) == expected(source)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_random_expressions(seed):
+    source = random_program(seed)
+    reference = expected(source)
+    for level in LEVELS:
+        assert run_x86(source, level) == reference, f"-{level}: {source}"
+
+
+# User variables whose names start with "str" are values, not string labels
+STR_NAMED = [
+    "int strength = 5; int x = strength + 1; print(x);",
+    "int stride = 4; int str1 = 3; print(stride * str1 - (str1 < stride));",
+    'int str1 = 7; string s = "hi"; print(s); print(str1 / 2);',
+]
+
+
+@pytest.mark.parametrize('level', LEVELS)
+@pytest.mark.parametrize('source', STR_NAMED)
+def test_str_named_variables(source, level):
+    assert run_x86(source, level) == expected(source)
@@ -0,0 +1,33 @@
+"""
+LLVM backend golden files: the IR of every program in the corpus must
+match its checked-in tests/golden/<name>.ll.  A missing file is a
+failure; regenerate with python llvm_generator.py --update-golden.
+"""
+
+import pytest
+
+from lexer import Lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+from intermediate_code import IntermediateCode
+from llvm_generator import LLVMGenerator, check_golden, golden_corpus, golden_path
+
+CORPUS = golden_corpus()
+
+
+def lower(source):
+    ast = Parser(Lexer(source).tokenize()).parse()
+    symbol_table = SemanticAnalyzer().analyze(ast)
+    generator = IntermediateCode()
+    tac = generator.generate(ast)
+    return LLVMGenerator(tac, symbol_table, generator.string_literals).generate()
+
+
+@pytest.mark.parametrize("name", sorted(CORPUS))
+def test_golden_ir(name):
+    check_golden(lower(CORPUS[name]), golden_path(name))
+
+
+def test_missing_golden_fails(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        check_golden(lower(CORPUS['sum_to_100']), str(tmp_path / 'missing.ll'))
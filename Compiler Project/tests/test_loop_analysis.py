@@ -0,0 +1,47 @@
+"""
+Loop analysis regressions: a loop-invariant operand is one the loop never
+writes; string literal labels come from the program's string_literals,
+never from the shape of a name.
+"""
+
+import io
+import contextlib
+
+import pytest
+
+from lexer import Lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+from intermediate_code import IntermediateCode
+from control_flow import ControlFlowGraph
+from loop_analysis import LoopAnalysis
+from test_instruction_selection import LEVELS, run_x86, expected
+
+PROGRAMS = [
+    # str1 is a user variable written in the loop, not a string label
+    "int str1 = 5; int i = 0; while (i < str1) { str1 = str1 - 1; i = i + 1; } print(i);",
+    'int str1 = 9; int i = 0; while (i < str1) { print("x"); str1 = str1 - 2; i = i + 1; } print(i);',
+]
+
+
+def lower(source: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        ast = Parser(Lexer(source).tokenize()).parse()
+        symbol_table = SemanticAnalyzer().analyze(ast)
+        generator = IntermediateCode()
+        tac = generator.generate(ast)
+    return tac, symbol_table, generator.string_literals
+
+
+def test_invariant_operands():
+    tac, symbol_table, string_literals = lower(PROGRAMS[1])
+    cfg = ControlFlowGraph(tac, string_literals.values())
+    [loop] = LoopAnalysis(cfg, symbol_table).analyze()
+    assert not loop.is_invariant('str1')
+    assert all(loop.is_invariant(label) for label in string_literals.values())
+
+
+@pytest.mark.parametrize('level', LEVELS + ['O3'])
+@pytest.mark.parametrize('source', PROGRAMS)
+def test_str_named_loop_bound(source, level):
+    assert run_x86(source, level) == expected(source)
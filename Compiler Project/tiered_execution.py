@@ -0,0 +1,524 @@
+"""
+============================================
+OPTIMIZATION: TIERED EXECUTION WITH HOT-LOOP TRACING
+CSE 430 - Compiler Design Lab
+============================================
+
+Programs start on the AST interpreter, which counts the back edges of
+every while loop.  When a loop reaches the threshold:
+
+1. the next iteration is recorded: the type of every variable the loop
+   uses on entry, which way each if went, and the types left behind by
+   nested loops;
+2. the recording is compiled to a Python closure specialized for those
+   types (int division by _idiv, no type dispatch), with guards:
+     - an entry guard on the variable types,
+     - a branch guard on every if with only one recorded direction,
+     - a type guard after each nested loop (run by the engine);
+3. the loop switches to the closure, which runs iterations on local
+   variables until the condition is false or a guard fails.
+
+A failed guard writes the locals back and falls back to the
+interpreter, which finishes the iteration from the guarded statement
+(a side exit).  A side exit that keeps failing adds its direction to the
+trace and the loop is recompiled; a loop whose types do not stay the
+same from one iteration to the next is left to the interpreter.
+display() reports the tier transitions of every loop.
+
+Compiling a trace costs a few hundred microseconds, more than short
+loops run for; a CodeCache shared between runs keeps the trace code
+objects so later runs of the same program only pay for the recording.
+"""
+
+from typing import List, Dict
+from parser import (Program, Declaration, Assignment, BinaryOp, Number, FloatNumber,
+                    StringLiteral, Variable, IfStatement, WhileLoop, PrintStatement)
+from ast_interpreter import ASTInterpreter
+from tac_interpreter import TACRuntimeError
+from python_generator import CodeCache
+
+
+COMPARISONS = ('<', '>', '==', '!=', '<=', '>=')
+# Recompilations (new entry types or branch directions) before a loop is
+# left to the interpreter for good
+MAX_COMPILES = 4
+
+
+class TraceAbort(Exception):
+    """The recorded iteration cannot be compiled"""
+    pass
+
+
+def _idiv(left, right):
+    """int / int, truncating toward zero"""
+    if right == 0:
+        raise TACRuntimeError("Division by zero")
+    quotient = abs(left) // abs(right)
+    return quotient if (left < 0) == (right < 0) else -quotient
+
+
+def _fdiv(left, right):
+    if right == 0:
+        raise TACRuntimeError("Division by zero")
+    return left / right
+
+
+def describe(node) -> str:
+    """Source text of an expression"""
+    if isinstance(node, BinaryOp):
+        return f"{describe(node.left)} {node.operator} {describe(node.right)}"
+    if isinstance(node, Variable):
+        return node.name
+    if isinstance(node, StringLiteral):
+        return f'"{node.value}"'
+    return str(node.value)
+
+
+def names_in(node) -> set:
+    """Every variable a statement or expression reads or writes"""
+    if isinstance(node, Variable):
+        return {node.name}
+    if isinstance(node, BinaryOp):
+        return names_in(node.left) | names_in(node.right)
+    if isinstance(node, Declaration):
+        return {node.var_name} | (names_in(node.value) if node.value is not None else set())
+    if isinstance(node, Assignment):
+        return {node.var_name} | names_in(node.expression)
+    if isinstance(node, PrintStatement):
+        return names_in(node.expression)
+    if isinstance(node, IfStatement):
+        names = names_in(node.condition)
+        for statement in (node.true_block or []) + (node.false_block or []):
+            names |= names_in(statement)
+        return names
+    if isinstance(node, WhileLoop):
+        names = names_in(node.condition)
+        for statement in node.body or []:
+            names |= names_in(statement)
+        return names
+    return set()
+
+
+class Recording:
+    """What one interpreted iteration of a hot loop saw"""
+
+    def __init__(self, entry_types: Dict[str, str]):
+        self.entry_types = entry_types
+        self.directions: Dict[int, set] = {}      # id(IfStatement) -> {True, False}
+        self.loop_types: Dict[int, dict] = {}     # id(WhileLoop) -> types after it
+
+
+class LoopProfile:
+    """Counters and the current trace of one while loop"""
+
+    def __init__(self, number: int, loop: WhileLoop):
+        self.name = f"L{number}"
+        self.loop = loop
+        self.names = sorted(names_in(loop))
+        self.tier = 'interpreted'          # -> recording -> compiled / blacklisted
+        self.back_edges = 0
+        self.trace = None
+        self.exits = []                    # exit number -> (frames, IfStatement or None)
+        self.recording = None
+        self.compiles = 0
+        self.entries = 0
+        self.trace_iterations = 0
+        self.side_exits = 0
+        self.guard_failures = 0
+        self.exit_counts: Dict[int, int] = {}
+        self.cold = set()                  # ids of ifs whose exits cannot join the trace
+        self.reason = ''
+
+
+class TraceCompiler:
+    """Generates the specialized closure for one recorded loop"""
+
+    def __init__(self, profile: LoopProfile, recording: Recording):
+        self.profile = profile
+        self.recording = recording
+        self.names = profile.names
+        self.lines: List[str] = []
+        self.exits = []
+        self.nodes = []
+
+    def emit(self, text: str, depth: int):
+        self.lines.append("    " * depth + text)
+
+    def write_back(self, depth: int):
+        for name in self.names:
+            self.emit(f"V[{name!r}] = v_{name}", depth)
+
+    def reload(self, depth: int):
+        for name in self.names:
+            self.emit(f"v_{name} = V.get({name!r}, 0)", depth)
+
+    def type_check(self, types: Dict[str, str]) -> str:
+        return " or ".join(f"type(v_{name}) is not {types[name]}" for name in self.names)
+
+    def leave(self, frames: list, node, depth: int):
+        """Side exit: undo the statement count of the rest of the iteration,
+        write back and tell the engine where to resume"""
+        pending = sum(len(block) - start for block, start in frames)
+        if pending:
+            self.emit(f"steps -= {pending}", depth)
+        self.write_back(depth)
+        self.emit("_state.statements = steps", depth)
+        self.emit(f"return ('exit', {len(self.exits)}, iterations)", depth)
+        self.exits.append((frames, node))
+
+    # ---------- expressions ----------
+
+    def expression(self, node, types: Dict[str, str]) -> tuple:
+        """(Python text, type) with type one of int, float, str, bool"""
+        if isinstance(node, Number):
+            return repr(node.value), 'int'
+        if isinstance(node, FloatNumber):
+            return repr(node.value), 'float'
+        if isinstance(node, StringLiteral):
+            return repr(node.value), 'str'
+        if isinstance(node, Variable):
+            return f"v_{node.name}", types[node.name]
+        if isinstance(node, BinaryOp):
+            left, left_type = self.expression(node.left, types)
+            right, right_type = self.expression(node.right, types)
+            kinds = {'int' if kind == 'bool' else kind for kind in (left_type, right_type)}
+            op = node.operator
+            if op in ('==', '!='):
+                return f"({left} {op} {right})", 'bool'
+            if 'str' in kinds and (kinds != {'str'} or op not in ('+',) + COMPARISONS):
+                raise TraceAbort(f"'{op}' on {left_type} and {right_type}")
+            if op in COMPARISONS:
+                return f"({left} {op} {right})", 'bool'
+            if op == '/':
+                helper = '_idiv' if kinds == {'int'} else '_fdiv'
+                return f"{helper}({left}, {right})", 'int' if kinds == {'int'} else 'float'
+            result = 'str' if kinds == {'str'} else 'float' if 'float' in kinds else 'int'
+            return f"({left} {op} {right})", result
+        raise TraceAbort(f"Cannot compile {type(node).__name__}")
+
+    def value(self, node, types: Dict[str, str]) -> tuple:
+        """Expression stored or printed: comparisons become 0/1"""
+        text, kind = self.expression(node, types)
+        if kind == 'bool':
+            return f"int{text}", 'int'
+        return text, kind
+
+    # ---------- statements ----------
+
+    def block(self, statements: list, types: Dict[str, str], depth: int, frames: list) -> bool:
+        """Emit a block along the recorded paths; True when every path
+        through it leaves the trace"""
+        statements = statements or []
+        if statements:
+            self.emit(f"steps += {len(statements)}", depth)
+        for index, node in enumerate(statements):
+            here = [(statements, index)] + frames
+            after = [(statements, index + 1)] + frames
+            if isinstance(node, (Declaration, Assignment)):
+                expression = node.value if isinstance(node, Declaration) else node.expression
+                if expression is not None:
+                    text, kind = self.value(expression, types)
+                    self.emit(f"v_{node.var_name} = {text}", depth)
+                    types[node.var_name] = kind
+            elif isinstance(node, PrintStatement):
+                text, kind = self.value(node.expression, types)
+                self.emit(f"_emit({text})" if kind == 'str' and isinstance(node.expression, StringLiteral)
+                          else f"_emit(str({text}))", depth)
+            elif isinstance(node, IfStatement):
+                condition, _ = self.expression(node.condition, types)
+                seen = self.recording.directions.get(id(node), set())
+                if seen == {True, False}:
+                    true_types, false_types = dict(types), dict(types)
+                    self.emit(f"if {condition}:", depth)
+                    true_exits = self.block(node.true_block, true_types, depth + 1, after)
+                    if not node.true_block:
+                        self.emit("pass", depth + 1)
+                    false_exits = False
+                    if node.false_block:
+                        self.emit("else:", depth)
+                        false_exits = self.block(node.false_block, false_types, depth + 1, after)
+                    if true_exits and false_exits:
+                        return True
+                    if not true_exits and not false_exits and true_types != false_types:
+                        raise TraceAbort("branches leave different types")
+                    types.update(false_types if true_exits else true_types)
+                elif seen:
+                    taken = True in seen
+                    self.emit(f"if {'not ' if taken else ''}{condition}:", depth)
+                    self.leave(here, node, depth + 1)
+                    branch = node.true_block if taken else node.false_block
+                    if self.block(branch, types, depth, after):
+                        return True
+                else:
+                    self.leave(here, node, depth)
+                    return True
+            elif isinstance(node, WhileLoop):
+                if id(node) not in self.recording.loop_types:
+                    self.leave(here, None, depth)
+                    return True
+                # Nested loop: run by the engine (and its own trace)
+                self.write_back(depth)
+                self.emit("_state.statements = steps", depth)
+                self.emit(f"_state.run_loop(_nodes[{len(self.nodes)}])", depth)
+                self.nodes.append(node)
+                self.emit("steps = _state.statements", depth)
+                self.reload(depth)
+                types.update(self.recording.loop_types[id(node)])
+                self.emit(f"if {self.type_check(types)}:", depth)
+                self.leave(after, None, depth + 1)
+        return False
+
+    def compile(self, state, cache: CodeCache = None):
+        entry = self.recording.entry_types
+        types = dict(entry)
+        loop = self.profile.loop
+        self.emit("def make_trace(_state, _nodes, _idiv, _fdiv, TACRuntimeError):", 0)
+        self.emit("_emit = _state.output.append", 1)
+        self.emit("def trace():", 1)
+        self.emit("V = _state.variables", 2)
+        self.reload(2)
+        self.emit(f"if {self.type_check(entry)}:", 2)
+        self.emit("return ('type', 0, 0)", 3)
+        self.emit("steps = _state.statements", 2)
+        self.emit("limit = _state.max_steps", 2)
+        self.emit("iterations = 0", 2)
+        self.emit("while True:", 2)
+        self.emit("if steps > limit:", 3)
+        self.write_back(4)
+        self.emit("_state.statements = steps", 4)
+        self.emit("raise TACRuntimeError(f'Step limit of {limit} exceeded')", 4)
+        condition, _ = self.expression(loop.condition, types)
+        self.emit(f"if not {condition}:", 3)
+        self.write_back(4)
+        self.emit("_state.statements = steps", 4)
+        self.emit("return ('done', 0, iterations)", 4)
+        if not self.block(loop.body, types, 3, []):
+            if types != entry:
+                changed = ", ".join(name for name in self.names if types[name] != entry[name])
+                raise TraceAbort(f"types of {changed} change between iterations")
+        self.emit("iterations += 1", 3)
+        self.emit("return trace", 1)
+
+        source = "\n".join(self.lines) + "\n"
+        code = cache.get(source) if cache is not None else None
+        if code is None:
+            code = compile(source, f"<trace {self.profile.name}>", 'exec')
+            if cache is not None:
+                cache.put(source, code)
+        namespace = {}
+        exec(code, namespace)
+        return namespace['make_trace'](state, self.nodes, _idiv, _fdiv, TACRuntimeError)
+
+
+class TieredInterpreter(ASTInterpreter):
+    """AST interpreter that moves hot loops to compiled traces"""
+
+    def __init__(self, ast: Program, threshold: int = 20, max_steps: int = 10_000_000,
+                 cache: CodeCache = None):
+        super().__init__(ast, max_steps)
+        self.threshold = threshold
+        self.cache = cache                 # trace code objects shared between runs
+        self.hot_exit = max(threshold // 10, 1)
+        self.profiles: Dict[int, LoopProfile] = {}
+        self.recording = None
+        self.number_loops(ast.statements)
+
+    def number_loops(self, statements):
+        for node in statements or []:
+            if isinstance(node, WhileLoop):
+                self.profiles[id(node)] = LoopProfile(len(self.profiles), node)
+                self.number_loops(node.body)
+            elif isinstance(node, IfStatement):
+                self.number_loops(node.true_block)
+                self.number_loops(node.false_block)
+
+    def types_of(self, names) -> Dict[str, str]:
+        return {name: type(self.variables.get(name, 0)).__name__ for name in names}
+
+    def execute(self, node):
+        if isinstance(node, WhileLoop):
+            self.statements += 1
+            if self.statements > self.max_steps:
+                raise TACRuntimeError(f"Step limit of {self.max_steps} exceeded")
+            outer = self.recording
+            self.recording = None
+            self.run_loop(node)
+            self.recording = outer
+            if outer is not None:
+                profile = self.profiles[id(node)]
+                outer.loop_types[id(node)] = self.types_of(profile.names)
+        elif isinstance(node, IfStatement) and self.recording is not None:
+            self.statements += 1
+            if self.statements > self.max_steps:
+                raise TACRuntimeError(f"Step limit of {self.max_steps} exceeded")
+            taken = bool(self.evaluate(node.condition))
+            self.recording.directions.setdefault(id(node), set()).add(taken)
+            self.execute_block(node.true_block if taken else node.false_block)
+        else:
+            super().execute(node)
+
+    # ---------- tiers ----------
+
+    def run_loop(self, loop: WhileLoop):
+        profile = self.profiles[id(loop)]
+        while True:
+            if profile.trace is not None:
+                profile.entries += 1
+                kind, number, iterations = profile.trace()
+                profile.trace_iterations += iterations
+                if kind == 'done':
+                    return
+                if kind == 'exit':
+                    self.side_exit(profile, number)
+                    profile.back_edges += 1
+                    continue
+                # Entry guard failed: interpret this iteration, re-record if it keeps failing
+                profile.guard_failures += 1
+                if profile.guard_failures % self.hot_exit == 0:
+                    profile.trace = None
+                    profile.tier = 'recording'
+            if not self.evaluate(loop.condition):
+                return
+            if profile.tier == 'recording':
+                self.record(profile)
+            else:
+                self.execute_block(loop.body)
+            profile.back_edges += 1
+            if profile.tier == 'interpreted' and profile.back_edges >= self.threshold:
+                profile.tier = 'recording'
+
+    def record(self, profile: LoopProfile):
+        """Interpret one iteration while recording it, then compile"""
+        recording = Recording(self.types_of(profile.names))
+        outer = self.recording
+        self.recording = recording
+        try:
+            self.execute_block(profile.loop.body)
+        finally:
+            self.recording = outer
+        profile.recording = recording
+        self.compile_trace(profile)
+
+    def compile_trace(self, profile: LoopProfile):
+        """Compile the recording; a loop that cannot be compiled (or has been
+        compiled too often) stays in the interpreter"""
+        try:
+            if profile.compiles >= MAX_COMPILES:
+                raise TraceAbort(f"{MAX_COMPILES} compilations")
+            self.install(profile)
+        except TraceAbort as abort:
+            profile.tier, profile.trace = 'blacklisted', None
+            profile.reason = str(abort)
+
+    def install(self, profile: LoopProfile):
+        compiler = TraceCompiler(profile, profile.recording)
+        profile.trace = compiler.compile(self, self.cache)
+        profile.exits = compiler.exits
+        profile.exit_counts = {}
+        profile.compiles += 1
+        profile.tier = 'compiled'
+
+    def side_exit(self, profile: LoopProfile, number: int):
+        """Finish the iteration in the interpreter from the guarded
+        statement; a hot branch exit is added to the trace"""
+        profile.side_exits += 1
+        frames, node = profile.exits[number]
+        if node is not None and id(node) not in profile.cold:
+            taken = bool(self.evaluate(node.condition))
+            profile.exit_counts[number] = profile.exit_counts.get(number, 0) + 1
+            if profile.exit_counts[number] >= self.hot_exit and profile.compiles < MAX_COMPILES:
+                directions = profile.recording.directions
+                previous = set(directions.get(id(node), set()))
+                directions[id(node)] = previous | {taken}
+                try:
+                    self.install(profile)
+                except TraceAbort:
+                    # Keep the current trace; this exit stays a side exit
+                    directions[id(node)] = previous
+                    profile.cold.add(id(node))
+        for block, start in frames:
+            for statement in block[start:]:
+                self.execute(statement)
+
+    def display(self):
+        print(f"\nTiered execution (threshold {self.threshold} back edges):")
+        header = (f"{'Loop':<5} {'Condition':<20} {'Tier':<12} {'Interp.':>7} {'Compiles':>8} "
+                  f"{'Entries':>7} {'Traced':>7} {'Exits':>6} {'Guards':>6}")
+        print(header)
+        print("-" * len(header))
+        for profile in self.profiles.values():
+            print(f"{profile.name:<5} {describe(profile.loop.condition)[:20]:<20} {profile.tier:<12} "
+                  f"{profile.back_edges:>7} {profile.compiles:>8} {profile.entries:>7} "
+                  f"{profile.trace_iterations:>7} {profile.side_exits:>6} {profile.guard_failures:>6}")
+            if profile.reason:
+                print(f"      left to the interpreter: {profile.reason}")
+        profiles = self.profiles.values()
+        tier_ups = sum(1 for profile in profiles if profile.compiles)
+        recompiles = sum(max(profile.compiles - 1, 0) for profile in profiles)
+        print(f"\nTransitions: {tier_ups} loops compiled, {recompiles} recompilations, "
+              f"{sum(p.side_exits for p in profiles)} side exits, "
+              f"{sum(p.guard_failures for p in profiles)} entry guard failures, "
+              f"{sum(1 for p in profiles if p.tier == 'blacklisted')} loops left interpreted")
+        print(f"Iterations: {sum(p.back_edges for p in profiles)} interpreted, "
+              f"{sum(p.trace_iterations for p in profiles)} in traces; "
+              f"{self.statements} statements executed")
+
+
+# Testing function for tiered execution
+def test_tiered_execution(source_code: str, threshold: int = 20):
+    """Run a program with tiered execution; its output and statement count
+    must match the AST interpreter"""
+    print("\n" + "="*60)
+    print(" TESTING TIERED EXECUTION")
+    print("="*60)
+
+    try:
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+
+        ast = Parser(Lexer(source_code).tokenize()).parse()
+        SemanticAnalyzer().analyze(ast)
+        tiered = TieredInterpreter(ast, threshold)
+        output = tiered.run()
+        print("\nProgram Output:")
+        print("-" * 50)
+        for line in output:
+            print(line)
+        tiered.display()
+
+        baseline = ASTInterpreter(ast)
+        if baseline.run() != output or baseline.statements != tiered.statements:
+            raise RuntimeError("Tiered execution differs from the AST interpreter")
+        print("\nOutput and statement count match the AST interpreter")
+        print("\n✓ Tiered Execution Successful!")
+        return tiered
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    int evens = 0;
+    float total = 0.0;
+    while (i < 200) {
+        if (i - (i / 2) * 2 == 0) {
+            evens = evens + 1;
+        } else {
+            total = total + 0.5;
+        }
+        int j = 0;
+        while (j < 5) {
+            j = j + 1;
+        }
+        i = i + 1;
+    }
+    print(evens);
+    print(total);
+    print(j);
+    """
+
+    test_tiered_execution(test_code)
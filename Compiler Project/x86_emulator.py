@@ -0,0 +1,524 @@
+"""
+============================================
+BACKEND SUPPORT: x86 EMULATOR
+CSE 430 - Compiler Design Lab
+============================================
+
+Runs the 32-bit x86 assembly of AssemblyGenerator (and the runtime
+library linked into it) in-process, so generated code can be measured
+deterministically without a native toolchain:
+
+    mov eax, [i]          eax = load32(address of i)       1 read
+    add eax, 1            eax = eax + 1, sets CF ZF SF OF
+    cmp eax, 10
+    jl L0                 taken when SF != OF              1 branch
+
+- State is the eight general-purpose registers, CF/ZF/SF/OF/PF, the
+  xmm registers (as doubles) and a flat little-endian memory image
+  laid out exactly as ELFWriter lays out the executable: .rodata,
+  .data and .bss at their addresses, with a stack above .bss.
+- Instructions are parsed with the ELF writer's Operand parser, so the
+  emulator accepts exactly what the encoder can encode.  Return
+  addresses pushed by call are instruction numbers.
+- int 0x80 implements write (captured as the program's output) and
+  exit.  idiv by zero or with an overflowing quotient stops with an
+  EmulatorError, where the real program would get SIGFPE.
+- Counts: executed instructions (split into program and runtime
+  library), memory reads and writes (stack included), conditional
+  branches and how many were taken, jumps and calls.
+"""
+
+import math
+import struct
+from collections import Counter
+from typing import List
+from elf_writer import ELFWriter, CONDITIONS, BASE_ADDRESS, align_up
+
+MASK32 = 0xFFFFFFFF
+ESP = 4
+
+# Register numbers of eax and edx (implicit operands of cdq, mul, idiv)
+EAX, EDX = 0, 2
+
+SYS_EXIT = 1
+SYS_WRITE = 4
+
+
+class EmulatorError(Exception):
+    pass
+
+
+def signed(value: int, bits: int = 32) -> int:
+    return value - (1 << bits) if value >> (bits - 1) else value
+
+
+class X86Emulator:
+    """Executes AssemblyGenerator output and counts what it does"""
+
+    def __init__(self, assembly: List[str], max_steps: int = 10_000_000, stack_size: int = 65536):
+        self.max_steps = max_steps
+        writer = ELFWriter(assembly)
+        writer.layout()
+        self.symbols = writer.symbols
+        self.labels = writer.encoder.labels            # label -> instruction number
+        self.listing = [line for _, _, line in writer.encoder.instructions]   # assembly text per instruction
+        self.source_lines = writer.encoder.source_lines  # program line per instruction
+        # (opcode, handler or None for a conditional jump, operands)
+        self.code = []
+        for opcode, operands, line in writer.encoder.instructions:
+            handler = None
+            if not self.is_conditional(opcode):
+                handler = getattr(self, 'op_' + opcode, None)
+                if handler is None:
+                    raise EmulatorError(f"Cannot emulate: {line.strip()}")
+            self.code.append((opcode, handler, operands))
+        # The runtime library is linked after the program
+        runtime = [index for label, index in self.labels.items() if label.startswith('rt_')]
+        self.runtime_start = min(runtime, default=len(self.code))
+
+        # Flat memory from the start of the image to the top of the stack
+        bss = writer.sections['.bss']
+        self.base = BASE_ADDRESS
+        self.stack_top = align_up(writer.addresses['.bss'] + bss.size, 16) + stack_size
+        self.memory = bytearray(self.stack_top - self.base)
+        for name in ('.rodata', '.data'):
+            start = writer.addresses[name] - self.base
+            data = writer.sections[name].data
+            self.memory[start:start + len(data)] = data
+
+        self.registers = [0] * 8
+        self.registers[ESP] = self.stack_top
+        self.xmm = [0.0] * 8
+        self.cf = self.zf = self.sf = self.of = self.pf = False
+        self.pc = self.labels['_start']
+        self.exit_code = None
+        self.stdout = bytearray()
+
+        self.instructions = 0
+        self.program_instructions = 0
+        self.memory_reads = 0
+        self.memory_writes = 0
+        self.branches = 0
+        self.taken_branches = 0
+        self.jumps = 0
+        self.calls = 0
+        self.opcodes = Counter()
+
+    def is_conditional(self, opcode: str) -> bool:
+        return opcode.startswith('j') and opcode[1:] in CONDITIONS
+
+    # ---------- execution ----------
+
+    def run(self) -> List[str]:
+        """Run until exit; returns the printed lines"""
+        code = self.code
+        while self.exit_code is None:
+            if not 0 <= self.pc < len(code):
+                raise EmulatorError(f"Execution left the program at instruction {self.pc}")
+            opcode, handler, operands = code[self.pc]
+            if self.pc < self.runtime_start:
+                self.program_instructions += 1
+            self.pc += 1
+            self.instructions += 1
+            if self.instructions > self.max_steps:
+                raise EmulatorError(f"Step limit of {self.max_steps} exceeded")
+            self.opcodes[opcode] += 1
+            if handler is None:
+                self.branches += 1
+                if self.condition(opcode[1:]):
+                    self.taken_branches += 1
+                    self.pc = self.labels[operands[0].symbol]
+            else:
+                handler(*operands)
+        return self.output()
+
+    def output(self) -> List[str]:
+        return self.stdout.decode('utf-8', 'replace').splitlines()
+
+    # ---------- operands ----------
+
+    def address(self, operand) -> int:
+        address = operand.value
+        if operand.symbol is not None:
+            address += self.symbols[operand.symbol]
+        if operand.base is not None:
+            address += self.registers[operand.base]
+        if operand.index is not None:
+            address += self.registers[operand.index] * operand.scale
+        return address & MASK32
+
+    def offset(self, operand, size: int) -> int:
+        offset = self.address(operand) - self.base
+        if offset < 0 or offset + size > len(self.memory):
+            raise EmulatorError(f"Segmentation fault at {self.address(operand):#010x}")
+        return offset
+
+    def load(self, operand, size: int = 4) -> int:
+        if operand.kind == 'reg':
+            value = self.registers[operand.register]
+            return value & 0xFF if size == 1 else value
+        if operand.kind == 'imm':
+            return operand.value & ((1 << 8 * size) - 1)
+        offset = self.offset(operand, size)
+        self.memory_reads += 1
+        return int.from_bytes(self.memory[offset:offset + size], 'little')
+
+    def store(self, operand, value: int, size: int = 4):
+        if operand.kind == 'reg':
+            if size == 1:
+                register = self.registers[operand.register]
+                self.registers[operand.register] = register & ~0xFF | value & 0xFF
+            else:
+                self.registers[operand.register] = value & MASK32
+            return
+        offset = self.offset(operand, size)
+        self.memory_writes += 1
+        self.memory[offset:offset + size] = (value & ((1 << 8 * size) - 1)).to_bytes(size, 'little')
+
+    def load_double(self, operand) -> float:
+        if operand.kind == 'reg':
+            return self.xmm[operand.register]
+        offset = self.offset(operand, 8)
+        self.memory_reads += 1
+        return struct.unpack_from('<d', self.memory, offset)[0]
+
+    def push(self, value: int):
+        self.registers[ESP] = (self.registers[ESP] - 4) & MASK32
+        offset = self.registers[ESP] - self.base
+        self.memory_writes += 1
+        self.memory[offset:offset + 4] = (value & MASK32).to_bytes(4, 'little')
+
+    def pop(self) -> int:
+        offset = self.registers[ESP] - self.base
+        if offset + 4 > len(self.memory):
+            raise EmulatorError("Stack underflow")
+        self.registers[ESP] += 4
+        self.memory_reads += 1
+        return int.from_bytes(self.memory[offset:offset + 4], 'little')
+
+    # ---------- flags ----------
+
+    def set_result(self, result: int, bits: int = 32):
+        self.zf = result == 0
+        self.sf = bool(result >> (bits - 1) & 1)
+        self.pf = bin(result & 0xFF).count('1') % 2 == 0
+
+    def condition(self, code: str) -> bool:
+        number = CONDITIONS[code]
+        if number >> 1 == 0:
+            holds = self.of
+        elif number >> 1 == 1:
+            holds = self.cf
+        elif number >> 1 == 2:
+            holds = self.zf
+        elif number >> 1 == 3:
+            holds = self.cf or self.zf
+        elif number >> 1 == 4:
+            holds = self.sf
+        elif number >> 1 == 5:
+            holds = self.pf
+        elif number >> 1 == 6:
+            holds = self.sf != self.of
+        else:
+            holds = self.zf or self.sf != self.of
+        # Odd condition numbers are the negations (jae = not jb, ...)
+        return holds != bool(number & 1)
+
+    def arithmetic(self, opcode: str, dest, source) -> int:
+        size = 1 if dest.byte or source.byte else 4
+        bits = 8 * size
+        mask = (1 << bits) - 1
+        sign = 1 << (bits - 1)
+        left, right = self.load(dest, size), self.load(source, size)
+        if opcode == 'add':
+            result = left + right
+            self.cf = result > mask
+            result &= mask
+            self.of = bool((left ^ result) & (right ^ result) & sign)
+        elif opcode in ('sub', 'cmp'):
+            result = (left - right) & mask
+            self.cf = left < right
+            self.of = bool((left ^ right) & (left ^ result) & sign)
+        else:
+            result = {'and': left & right, 'test': left & right,
+                      'or': left | right, 'xor': left ^ right}[opcode]
+            self.cf = self.of = False
+        self.set_result(result, bits)
+        if opcode not in ('cmp', 'test'):
+            self.store(dest, result, size)
+
+    # ---------- integer instructions ----------
+
+    def op_mov(self, dest, source):
+        size = 1 if dest.byte or source.byte else 4
+        self.store(dest, self.load(source, size), size)
+
+    def op_movzx(self, dest, source):
+        self.store(dest, self.load(source, 1))
+
+    def op_lea(self, dest, source):
+        self.store(dest, self.address(source))
+
+    def op_xchg(self, first, second):
+        value = self.load(first)
+        self.store(first, self.load(second))
+        self.store(second, value)
+
+    def op_add(self, dest, source):
+        self.arithmetic('add', dest, source)
+
+    def op_sub(self, dest, source):
+        self.arithmetic('sub', dest, source)
+
+    def op_cmp(self, dest, source):
+        self.arithmetic('cmp', dest, source)
+
+    def op_and(self, dest, source):
+        self.arithmetic('and', dest, source)
+
+    def op_or(self, dest, source):
+        self.arithmetic('or', dest, source)
+
+    def op_xor(self, dest, source):
+        self.arithmetic('xor', dest, source)
+
+    def op_test(self, dest, source):
+        self.arithmetic('test', dest, source)
+
+    def op_imul(self, dest, source, value=None):
+        if value is None:
+            source, value = dest, source
+        product = signed(self.load(source)) * signed(self.load(value))
+        result = product & MASK32
+        self.cf = self.of = signed(result) != product
+        self.set_result(result)
+        self.store(dest, result)
+
+    def op_mul(self, source):
+        product = self.registers[EAX] * self.load(source)
+        self.registers[EAX] = product & MASK32
+        self.registers[EDX] = product >> 32
+        self.cf = self.of = self.registers[EDX] != 0
+
+    def op_idiv(self, source):
+        divisor = signed(self.load(source))
+        if divisor == 0:
+            raise EmulatorError("Division by zero (SIGFPE)")
+        dividend = signed(self.registers[EDX] << 32 | self.registers[EAX], 64)
+        quotient = abs(dividend) // abs(divisor)
+        if (dividend < 0) != (divisor < 0):
+            quotient = -quotient
+        if not -2**31 <= quotient < 2**31:
+            raise EmulatorError("Quotient overflow in idiv (SIGFPE)")
+        self.registers[EAX] = quotient & MASK32
+        self.registers[EDX] = (dividend - quotient * divisor) & MASK32
+
+    def op_cdq(self):
+        self.registers[EDX] = MASK32 if self.registers[EAX] >> 31 else 0
+
+    def op_neg(self, dest):
+        value = self.load(dest)
+        result = -value & MASK32
+        self.cf = value != 0
+        self.of = value == 0x80000000
+        self.set_result(result)
+        self.store(dest, result)
+
+    def op_shl(self, dest, count):
+        shift = count.value & 31
+        if shift:
+            value = self.load(dest)
+            self.cf = bool(value >> (32 - shift) & 1)
+            result = value << shift & MASK32
+            self.of = bool(result >> 31) != self.cf
+            self.set_result(result)
+            self.store(dest, result)
+
+    def op_shr(self, dest, count):
+        shift = count.value & 31
+        if shift:
+            value = self.load(dest)
+            self.cf = bool(value >> (shift - 1) & 1)
+            self.of = bool(value >> 31)
+            result = value >> shift
+            self.set_result(result)
+            self.store(dest, result)
+
+    def __getattr__(self, name: str):
+        # setl, sete, ... share one implementation
+        if name.startswith('op_set') and name[6:] in CONDITIONS:
+            code = name[6:]
+            return lambda dest: self.store(dest, int(self.condition(code)), 1)
+        raise AttributeError(name)
+
+    # ---------- control flow ----------
+
+    def op_jmp(self, target):
+        self.jumps += 1
+        self.pc = self.labels[target.symbol]
+
+    def op_call(self, target):
+        self.calls += 1
+        self.push(self.pc)
+        self.pc = self.labels[target.symbol]
+
+    def op_ret(self):
+        self.pc = self.pop()
+
+    def op_push(self, source):
+        self.push(self.load(source))
+
+    def op_pop(self, dest):
+        self.store(dest, self.pop())
+
+    def op_int(self, vector):
+        if vector.value != 0x80:
+            raise EmulatorError(f"Unsupported interrupt {vector.value:#x}")
+        number = self.registers[EAX]
+        if number == SYS_EXIT:
+            self.exit_code = self.registers[3] & 0xFF          # ebx
+        elif number == SYS_WRITE:
+            start = self.registers[1] - self.base               # ecx
+            length = self.registers[EDX]
+            if self.registers[3] != 1 or start < 0 or start + length > len(self.memory):
+                self.registers[EAX] = -9 & MASK32               # EBADF
+                return
+            self.stdout += self.memory[start:start + length]
+            self.registers[EAX] = length
+        else:
+            raise EmulatorError(f"Unsupported system call {number}")
+
+    # ---------- SSE2 scalar doubles ----------
+
+    def op_movsd(self, dest, source):
+        value = self.load_double(source)
+        if dest.kind == 'reg':
+            self.xmm[dest.register] = value
+        else:
+            offset = self.offset(dest, 8)
+            self.memory_writes += 1
+            struct.pack_into('<d', self.memory, offset, value)
+
+    def op_addsd(self, dest, source):
+        self.xmm[dest.register] += self.load_double(source)
+
+    def op_subsd(self, dest, source):
+        self.xmm[dest.register] -= self.load_double(source)
+
+    def op_mulsd(self, dest, source):
+        self.xmm[dest.register] *= self.load_double(source)
+
+    def op_divsd(self, dest, source):
+        left, right = self.xmm[dest.register], self.load_double(source)
+        if right == 0.0:
+            # IEEE 754: x/0 is a signed infinity, 0/0 and nan/0 are nan
+            if left == 0.0 or math.isnan(left):
+                self.xmm[dest.register] = math.nan
+            else:
+                self.xmm[dest.register] = math.copysign(math.inf, left) * math.copysign(1.0, right)
+        else:
+            self.xmm[dest.register] = left / right
+
+    def op_ucomisd(self, first, second):
+        left, right = self.xmm[first.register], self.load_double(second)
+        unordered = math.isnan(left) or math.isnan(right)
+        self.zf = unordered or left == right
+        self.pf = unordered
+        self.cf = unordered or left < right
+        self.of = self.sf = False
+
+    def op_cvttsd2si(self, dest, source):
+        value = self.load_double(source)
+        if math.isnan(value) or not -2**31 <= math.trunc(value) < 2**31:
+            self.store(dest, 0x80000000)        # integer indefinite
+        else:
+            self.store(dest, math.trunc(value))
+
+    def op_cvtsi2sd(self, dest, source):
+        self.xmm[dest.register] = float(signed(self.load(source)))
+
+    # ---------- report ----------
+
+    def display(self):
+        print("\nProgram Output:")
+        print("-" * 50)
+        for line in self.output():
+            print(line)
+        print(f"\nExecuted {self.instructions} instructions "
+              f"({self.program_instructions} program, "
+              f"{self.instructions - self.program_instructions} runtime library)")
+        print(f"Memory: {self.memory_reads} reads, {self.memory_writes} writes")
+        print(f"Branches: {self.branches} conditional ({self.taken_branches} taken), "
+              f"{self.jumps} jumps, {self.calls} calls")
+        common = ", ".join(f"{opcode} {count}" for opcode, count in self.opcodes.most_common(6))
+        print(f"Most executed: {common}")
+
+
+def emulate(assembly: List[str], max_steps: int = 10_000_000) -> X86Emulator:
+    """Run assembly to completion and return the finished emulator"""
+    emulator = X86Emulator(assembly, max_steps)
+    emulator.run()
+    return emulator
+
+
+# Testing function for the x86 emulator
+def test_x86_emulator(source_code: str, assembly: List[str] = None):
+    """Run the generated x86 code in the emulator and check its output
+    against the TAC interpreter"""
+    print("\n" + "="*60)
+    print(" TESTING x86 EMULATOR")
+    print("="*60)
+
+    try:
+        import io
+        import contextlib
+        from lexer import Lexer
+        from parser import Parser
+        from semantic_analyzer import SemanticAnalyzer
+        from intermediate_code import IntermediateCode
+        from code_generator import AssemblyGenerator
+        from tac_interpreter import TACInterpreter
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            ast = Parser(Lexer(source_code).tokenize()).parse()
+            symbol_table = SemanticAnalyzer().analyze(ast)
+            generator = IntermediateCode()
+            tac = generator.generate(ast)
+            if assembly is None:
+                assembly = AssemblyGenerator(tac, symbol_table, generator.string_literals).generate()
+
+        emulator = emulate(assembly)
+        emulator.display()
+
+        expected = TACInterpreter(tac, generator.string_literals).run()
+        if emulator.output() != expected:
+            raise RuntimeError(f"Emulated output {emulator.output()} differs from the TAC interpreter {expected}")
+        print("\nOutput matches the TAC interpreter")
+        print("\n✓ x86 Emulation Successful!")
+        return emulator
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Test code
+    test_code = """
+    int i = 0;
+    int total = 0;
+    float rate = 2.5;
+    while (i < 20) {
+        if (i - (i / 3) * 3 == 0) {
+            total = total + i * 4;
+        } else {
+            total = total - 1;
+        }
+        i = i + 1;
+    }
+    print(total);
+    print(total / 7);
+    print(rate);
+    print("done");
+    """
+
+    test_x86_emulator(test_code)
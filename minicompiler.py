@@ -7,6 +7,7 @@
 
 
 import re
+import heapq
 from typing import List, Dict, Tuple
 
 
@@ -503,21 +504,40 @@ class SemanticAnalyzer:
 # ============================================
 
 
+COMPARISON_OPERATORS = ['<', '>', '==', '!=', '<=', '>=']
+
+
 class IntermediateCode:
     """Generates Three-Address Code (TAC)"""
    
     def __init__(self):
         self.code = []
-        self.temp_count = 0
+        self.temp_count = 0        # peak number of temporary slots in use
+        self.temps_created = 0     # temporaries requested (without recycling)
+        self.free_temps = []       # min-heap of recycled temporary numbers
+        self.live_temps = set()    # temporary numbers handed out and not yet released
         self.label_count = 0
         self.string_literals = {}
         self.string_count = 0
    
     def new_temp(self):
-        """Generate a new temporary variable"""
-        temp = f"t{self.temp_count}"
-        self.temp_count += 1
-        return temp
+        """Generate a temporary variable, reusing a released slot if possible"""
+        if self.free_temps:
+            number = heapq.heappop(self.free_temps)
+        else:
+            number = self.temp_count
+            self.temp_count += 1
+        self.temps_created += 1
+        self.live_temps.add(number)
+        return f"t{number}"
+   
+    def release_temp(self, operand):
+        """Return a temporary to the pool once its last use has been emitted"""
+        if isinstance(operand, str) and operand[:1] == 't' and operand[1:].isdigit():
+            number = int(operand[1:])
+            if number in self.live_temps:
+                self.live_temps.remove(number)
+                heapq.heappush(self.free_temps, number)
    
     def new_label(self):
         """Generate a new label"""
@@ -557,6 +577,8 @@ class IntermediateCode:
             for value, label in self.string_literals.items():
                 print(f"{label}: \"{value}\"")
        
+        print(f"\nTemporaries: {self.temp_count} slots for {self.temps_created} values")
+       
         return self.code
    
     def generate_statement(self, node):
@@ -564,21 +586,23 @@ class IntermediateCode:
             if node.value:
                 temp = self.generate_expression(node.value)
                 self.emit(f"{node.var_name} = {temp}")
+                self.release_temp(temp)
        
         elif isinstance(node, Assignment):
             temp = self.generate_expression(node.expression)
             self.emit(f"{node.var_name} = {temp}")
+            self.release_temp(temp)
        
         elif isinstance(node, PrintStatement):
             temp = self.generate_expression(node.expression)
             self.emit(f"print {temp}")
+            self.release_temp(temp)
        
         elif isinstance(node, IfStatement):
-            cond_temp = self.generate_expression(node.condition)
             false_label = self.new_label()
             end_label = self.new_label()
            
-            self.emit(f"if_false {cond_temp} goto {false_label}")
+            self.generate_condition(node.condition, false_label)
            
             for stmt in node.true_block:
                 self.generate_statement(stmt)
@@ -597,8 +621,7 @@ class IntermediateCode:
             end_label = self.new_label()
            
             self.emit(f"{start_label}:")
-            cond_temp = self.generate_expression(node.condition)
-            self.emit(f"if_false {cond_temp} goto {end_label}")
+            self.generate_condition(node.condition, end_label)
            
             for stmt in node.body:
                 self.generate_statement(stmt)
@@ -606,6 +629,20 @@ class IntermediateCode:
             self.emit(f"goto {start_label}")
             self.emit(f"{end_label}:")
    
+    def generate_condition(self, node, false_label):
+        """Jump to false_label unless the condition holds"""
+        if isinstance(node, BinaryOp) and node.operator in COMPARISON_OPERATORS:
+            # Fused compare-and-branch: no temporary for the comparison result
+            left_temp = self.generate_expression(node.left)
+            right_temp = self.generate_expression(node.right)
+            self.emit(f"if_false {left_temp} {node.operator} {right_temp} goto {false_label}")
+            self.release_temp(left_temp)
+            self.release_temp(right_temp)
+        else:
+            cond_temp = self.generate_expression(node)
+            self.emit(f"if_false {cond_temp} goto {false_label}")
+            self.release_temp(cond_temp)
+   
     def generate_expression(self, node):
         if isinstance(node, Number):
             return str(node.value)
@@ -623,6 +660,10 @@ class IntermediateCode:
         elif isinstance(node, BinaryOp):
             left_temp = self.generate_expression(node.left)
             right_temp = self.generate_expression(node.right)
+            # Operands are read before the result is written, so the
+            # result may take over one of their slots
+            self.release_temp(left_temp)
+            self.release_temp(right_temp)
             result_temp = self.new_temp()
             self.emit(f"{result_temp} = {left_temp} {node.operator} {right_temp}")
             return result_temp
@@ -635,6 +676,10 @@ class IntermediateCode:
 # ============================================
 
 
+# Conditional jump taken when the comparison fails
+JUMP_UNLESS = {'<': 'jge', '>': 'jle', '==': 'jne', '!=': 'je', '<=': 'jg', '>=': 'jl'}
+
+
 class AssemblyGenerator:
     """Generates simple assembly code from intermediate code"""
    
@@ -643,6 +688,7 @@ class AssemblyGenerator:
         self.symbol_table = symbol_table
         self.string_literals = string_literals
         self.assembly = []
+        self.constants = {}         # float literal value -> .rodata label
    
     def generate(self):
         """Generate assembly code"""
@@ -670,16 +716,31 @@ class AssemblyGenerator:
             elif info['type'] == 'string':
                 self.assembly.append(f"    {var_name} dd 0    ; string pointer")
        
+        # Float literals, one aligned slot per distinct value
+        for instr in self.tac:
+            if not instr.endswith(':'):
+                for part in instr.split():
+                    if re.fullmatch(r'-?\d+\.\d+', part) and float(part) not in self.constants:
+                        self.constants[float(part)] = f"flt{len(self.constants)}"
+        if self.constants:
+            self.assembly.append("")
+            self.assembly.append("; Read-only Data Section (constant pool)")
+            self.assembly.append("section .rodata")
+            self.assembly.append("    align 8")
+            for value, label in self.constants.items():
+                self.assembly.append(f"    {label} dq {value!r}")
+       
         self.assembly.append("")
         self.assembly.append("; BSS Section (temporary variables)")
         self.assembly.append("section .bss")
        
-        # Count temporaries
-        temp_count = max([int(instr.split('t')[1].split()[0])
-                         for instr in self.tac
-                         if 't' in instr and instr.split()[0].startswith('t')], default=-1) + 1
+        # One slot per temporary the TAC actually uses
+        self.temps = sorted({int(part[1:])
+                             for instr in self.tac if not instr.endswith(':')
+                             for part in instr.split()
+                             if re.fullmatch(r't\d+', part) and part not in self.symbol_table.symbols})
        
-        for i in range(temp_count):
+        for i in self.temps:
             self.assembly.append(f"    t{i} resd 1")
        
         # Code section
@@ -707,8 +768,18 @@ class AssemblyGenerator:
         for line in self.assembly:
             print(line)
        
+        print(f"\n.bss: {len(self.temps)} temporaries, {len(self.temps) * 4} bytes")
+       
         return self.assembly
    
+    def operand(self, name: str) -> str:
+        """Immediate for an integer literal, memory operand otherwise"""
+        if re.fullmatch(r'-?\d+', name):
+            return name
+        if re.fullmatch(r'-?\d+\.\d+', name):
+            return f"[{self.constants[float(name)]}]"
+        return f"[{name}]"
+   
     def convert_instruction(self, instruction: str):
         """Convert single TAC instruction to assembly"""
         parts = instruction.split()
@@ -721,16 +792,18 @@ class AssemblyGenerator:
             if src.startswith('str'):
                 self.assembly.append(f"    lea eax, [{src}]")
                 self.assembly.append(f"    mov [{dest}], eax")
+            elif re.fullmatch(r'-?\d+', src):
+                self.assembly.append(f"    mov dword [{dest}], {src}")
             else:
-                self.assembly.append(f"    mov eax, [{src}]")
+                self.assembly.append(f"    mov eax, {self.operand(src)}")
                 self.assembly.append(f"    mov [{dest}], eax")
        
         elif '=' in instruction and len(parts) == 5:
             # Binary operation: t0 = x + y
             dest, _, left, op, right = parts
            
-            self.assembly.append(f"    mov eax, [{left}]")
-            self.assembly.append(f"    mov ebx, [{right}]")
+            self.assembly.append(f"    mov eax, {self.operand(left)}")
+            self.assembly.append(f"    mov ebx, {self.operand(right)}")
            
             if op == '+':
                 self.assembly.append(f"    add eax, ebx")
@@ -766,13 +839,20 @@ class AssemblyGenerator:
             if var.startswith('str'):
                 self.assembly.append(f"    lea eax, [{var}]")
             else:
-                self.assembly.append(f"    mov eax, [{var}]")
+                self.assembly.append(f"    mov eax, {self.operand(var)}")
             self.assembly.append(f"    ; (print syscall would go here)")
        
+        elif instruction.startswith('if_false') and len(parts) == 6:
+            # Fused compare-and-branch: if_false a < b goto L
+            _, left, op, right, _, label = parts
+            self.assembly.append(f"    mov eax, {self.operand(left)}")
+            self.assembly.append(f"    cmp eax, {self.operand(right)}")
+            self.assembly.append(f"    {JUMP_UNLESS[op]} {label}")
+       
         elif instruction.startswith('if_false'):
             # Conditional jump
             _, cond, _, label = parts
-            self.assembly.append(f"    mov eax, [{cond}]")
+            self.assembly.append(f"    mov eax, {self.operand(cond)}")
             self.assembly.append(f"    cmp eax, 0")
             self.assembly.append(f"    je {label}")
        